@@ -0,0 +1,39 @@
+import os
+import sys
+import logging
+
+# Add the utils directory to the system path to import custom utility functions
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils/')))
+from io_utils import setup_logging, load_config, prompt_user_choice
+from reweighting_utils import perform_reweighting
+from interface_utils import get_user_inputs_for_reweighting
+
+
+if __name__ == "__main__":
+    """
+    Main script for the multi-histogram reweighting of the runs of each lattice side.
+    The reweighted chi prime, U and C are saved in the format of the secondary quantities,
+    so that fss_chi_fits.py can use them in place of the jackknife results.
+    """
+
+    # Setup logging
+    setup_logging(log_dir="../logs/", log_file="reweighting_analysis.log")
+
+    try:
+        # Load and verify the configuration
+        config_path = "../configs/reweighting_config.yaml"
+        config = load_config(config_path)
+        print("Loaded configuration:")
+        for key, value in config.items():
+            print(f"{key}: {value}\n")
+
+        # Ask the user if they want to adjust the configuration
+        if not prompt_user_choice("Is this configuration correct?"):
+            config = get_user_inputs_for_reweighting(config)
+
+        perform_reweighting(config['paths']['input_files'], config['paths']['output_dir'],
+                            config['settings']['first_index'], config['settings']['n_blocks'],
+                            config['settings']['n_points'], config['settings']['tol'], config['settings']['max_iter'])
+    except Exception as main_e:
+        # Log any unexpected errors
+        logging.critical(f"Unexpected error in main script: {main_e}", exc_info=True)
@@ -0,0 +1,82 @@
+import os
+import sys
+import logging
+import numpy as np
+import pandas as pd
+
+# Add the utils directory to the system path to import custom utility functions
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils/')))
+from io_utils import ensure_directory, setup_logging, load_config, prompt_user_choice, load_snapshots
+from correlation_utils import snapshots_structure_factor, xi_over_L
+from jackknife_utils import blocking_data, xi_L_var_jk
+from interface_utils import navigate_directories
+
+
+def snapshots_xi_L(input_paths, first_index, batch_size, block_size):
+    """
+    Second-moment correlation length over L of each snapshot archive, from the structure factor of the
+    snapshots (batched FFT), with the jackknife variance on blocks of block_size snapshots.
+
+    Parameters:
+        input_paths (list of str): Snapshot archives.
+        first_index (int): First snapshot used (post-thermalization).
+        batch_size (int): Snapshots transformed at once.
+        block_size (int): Snapshots in a block of the jackknife.
+
+    Returns:
+        pd.DataFrame: Columns 'L', 'beta', 'xi_L_mean', 'var_xi_L' and 'n_snapshots'.
+    """
+    D = 3
+    rows = []
+    for i, path in enumerate(input_paths):
+        header, snapshots = load_snapshots(path)
+        L, beta = header["L"], header["beta"]
+        g_0, g_kmin = snapshots_structure_factor(snapshots, batch_size=batch_size, first_index=first_index)
+        if len(g_0) < 2 * block_size:
+            logging.warning(f"Only {len(g_0)} snapshots in {path} after index {first_index}, skipped.")
+            continue
+        m2 = g_0 / L**D
+        rows.append({
+            "L": L,
+            "beta": beta,
+            "xi_L_mean": xi_over_L(np.mean(g_0), np.mean(g_kmin), L),
+            "var_xi_L": xi_L_var_jk(blocking_data(m2, block_size), blocking_data(g_kmin, block_size), L, D),
+            "n_snapshots": len(g_0),
+        })
+        logging.info(f"Processed lattice {L} with beta {beta} ({len(g_0)} snapshots), {i+1}/{len(input_paths)}.")
+    return pd.DataFrame(rows, columns=["L", "beta", "xi_L_mean", "var_xi_L", "n_snapshots"])
+
+
+if __name__ == "__main__":
+    """
+    Main script computing xi / L from the snapshot archives, without repeating the simulations.
+    The output has the means and the variances in the same file: it can be given to secondary_quantities_plot.py
+    both as means and as variances file.
+    """
+
+    # Setup logging
+    log_dir = "../logs/"
+    log_file = "snapshots_correlation_analysis.log"
+    setup_logging(log_dir=log_dir, log_file=log_file)
+
+    try:
+        # Load and verify the configuration
+        config_path = "../configs/snapshots_correlation_config.yaml"
+        config = load_config(config_path)
+        print("Loaded configuration:")
+        for key, value in config.items():
+            print(f"{key}: {value}\n")
+
+        # Ask the user if they want to choose other archives
+        if not prompt_user_choice("Is this configuration correct?"):
+            config['paths']['input_paths'] = navigate_directories(start_path=".", multi_select=True, file_extension=".snap")
+
+        df = snapshots_xi_L(config['paths']['input_paths'], config['settings']['first_index'],
+                            config['settings']['batch_size'], config['settings']['block_size'])
+        ensure_directory(config['paths']['output_dir'])
+        output_path = os.path.join(config['paths']['output_dir'], config['paths']['output_file'])
+        df.sort_values(by=["L", "beta"]).to_csv(output_path, index=False)
+        logging.info(f"xi / L of {len(df)} archives saved to {output_path}")
+    except Exception as main_e:
+        # Log any unexpected errors
+        logging.critical(f"Unexpected error in main script: {main_e}", exc_info=True)
@@ -8,7 +8,7 @@ import pandas as pd
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils/')))
 from io_utils import (load_config, ensure_directory, load_binary_file, 
                         extract_lattice_side, extract_beta, save_lattice_metrics_to_csv, 
-                        setup_logging
+                        setup_logging, read_data_header, load_measurement_streams, align_stream_rows
                     )
 from interface_utils import get_user_inputs_for_saving_lattice_metrics_to_csv
 
@@ -31,29 +31,47 @@ def process_file(file_path, output_dir, idx_threshold = 1000, n_cols=3):
         lattice_side = extract_lattice_side(file_path)
         beta = extract_beta(file_path)
     
-        # Load the binary data
-        data = load_binary_file(file_path, n_cols)
+        # Load the binary data (all the columns of the files with header, n_cols of the old ones)
+        header = read_data_header(file_path)
+        data = load_binary_file(file_path, n_cols if header is None else None)
         
         # Ensure data has enough rows
         if len(data) <= idx_threshold:
             raise ValueError(f"Insufficient data after index {idx_threshold}.")
         
-        mx, my, epsilon = data[idx_threshold:, 0], data[idx_threshold, 1], data[idx_threshold, 2]
-        m2 = mx**2 + my**2  # m squared
-    
         try:
-            mx, my, epsilon = data[idx_threshold:, 0], data[idx_threshold:, 1], data[idx_threshold:, 2]
-            m2 = mx**2 + my**2  # m squared
-            
-            # Calculate metrics
-            metrics = {
-                "mx": mx,
-                "my": my,
-                "epsilon": epsilon,
-                "absm": np.sqrt(m2),  # norm of vector_m
-                "m2": m2,             # m^2
-                "m4": m2**2,          # m^4
-            }
+            if header is not None and "winding2" in header["columns"]:
+                # Worm files (o2_worm): row means over closed-loop configurations, no magnetization vector, so
+                # |m| and m^4 (Binder cumulant) are not available. Helicity modulus from the winding numbers
+                columns = {name: data[idx_threshold:, i] for i, name in enumerate(header["columns"])}
+                metrics = {
+                    "epsilon": columns["energy_per_site"],
+                    "m2": columns["m2"],
+                    "helicity": columns["winding2"] / (3 * beta * lattice_side),
+                }
+            else:
+                mx, my, epsilon = data[idx_threshold:, 0], data[idx_threshold:, 1], data[idx_threshold:, 2]
+                m2 = mx**2 + my**2  # m squared
+
+                # Calculate metrics
+                metrics = {
+                    "mx": mx,
+                    "my": my,
+                    "epsilon": epsilon,
+                    "absm": np.sqrt(m2),  # norm of vector_m
+                    "m2": m2,             # m^2
+                    "m4": m2**2,          # m^4
+                }
+                # Observables of the measurement streams (o2_mcmc with e.g. structure_factor_step > 0), NaN in the
+                # rows at which they were not measured
+                for stream_header, stream_data in load_measurement_streams(file_path).values():
+                    aligned = align_stream_rows(stream_header, stream_data, header["printing_step"], len(data))
+                    for i, name in enumerate(stream_header["columns"]):
+                        metrics[name] = aligned[idx_threshold:, i]
+                if "bond_cos" in metrics:
+                    # helicity modulus from the bond sums (o2_mcmc with helicity_step > 0), the same metric of the
+                    # worm files: Upsilon = <bond_cos> - beta <bond_sin2>
+                    metrics["helicity"] = metrics["bond_cos"] - beta * metrics["bond_sin2"]
         except Exception as metric_err:
             raise ValueError(f"Metric calculation error for file {file_path}: {metric_err}")
     
@@ -8,7 +8,7 @@ import pandas as pd
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils/')))
 from io_utils import setup_logging, load_config, ensure_directory, prompt_user_choice
 from plot_utils import plot_finite_size_scaling
-from fss_utils import prepare_dataset_fss_plot
+from fss_utils import prepare_dataset_fss_plot, find_crossings
 from interface_utils import get_user_input_for_fss_plot
 
 if __name__=='__main__':
@@ -42,10 +42,22 @@ if __name__=='__main__':
         variables_to_plot = config["settings"]["variables_to_plot"]
         variables_names_latex = config["settings"]["variables_names_latex"]
         
+        crossing_variables = config["settings"].get("crossing_variables", [])
+
         for variable, variable_latex in zip(variables_to_plot, variables_names_latex):
+            # e.g. xi_L and helicity_L are only there when the runs measured them (structure_factor_step, helicity_step > 0)
+            if f"{variable}_mean" not in df_means.columns or df_means[f"{variable}_mean"].isna().all():
+                logging.warning(f"No values of {variable} in {config['paths']['file_name_means']}, plot skipped.")
+                continue
             save_path = os.path.join(plot_dir, f"{variable}_vs_beta_different_L.png")
             beta_list, means_data_set_list, std_devs_data_set_list, L_list = prepare_dataset_fss_plot(df_means, variable, df_vars=df_vars)
             plot_finite_size_scaling(beta_list, means_data_set_list, errors=std_devs_data_set_list, lattice_side_list=L_list, marker='.', cmap='tab10', xlabel=r"$\beta$", ylabel=variable_latex, save_path=save_path)
+            # Crossings of consecutive lattice sides, estimates of beta_c
+            if variable in crossing_variables:
+                df_crossings = find_crossings(beta_list, means_data_set_list, L_list)
+                crossings_path = os.path.join(plot_dir, f"{variable}_crossings.csv")
+                df_crossings.to_csv(crossings_path, index=False)
+                logging.info(f"Crossings of {variable} between consecutive L:\n{df_crossings}")
         
     except Exception as main_e:
         # Log any unexpected errors
@@ -0,0 +1,65 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "../include/accumulators.h"
+#include "../include/random.h"
+
+#define N_SAMPLES 100000
+#define LEVEL 5
+
+int main() {
+    double *series = (double *)malloc(N_SAMPLES * sizeof(double));
+    BlockingAccumulator blocking = {0};
+    double x = 0.0, mean = 0.0, block_mean, var = 0.0, error;
+    int n, b, block_size = 1 << LEVEL, n_blocks = N_SAMPLES / (1 << LEVEL);
+
+    if (series == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    // Correlated series (AR(1) process), so that the error grows with the level of the blocking
+    myrand_init(12345, 54);
+    for (n=0; n<N_SAMPLES; n++) {
+        x = 0.9 * x + (myrand() - 0.5);
+        series[n] = x;
+        blocking_add(&blocking, x);
+        mean += x;
+    }
+    mean /= N_SAMPLES;
+
+    // Error of the same level computed from the whole series
+    for (b=0; b<n_blocks; b++) {
+        block_mean = 0.0;
+        for (n=b*block_size; n<(b + 1)*block_size; n++) {
+            block_mean += series[n];
+        }
+        block_mean /= block_size;
+        var += block_mean * block_mean;
+    }
+    block_mean = 0.0;
+    for (n=0; n<n_blocks*block_size; n++) {
+        block_mean += series[n];
+    }
+    block_mean /= n_blocks * block_size;
+    var = var / n_blocks - block_mean * block_mean;
+    error = sqrt(var / (n_blocks - 1));
+
+    if (fabs(blocking.mean[0] - mean) < 1e-12 && blocking.n_blocks[LEVEL] == (unsigned long int)n_blocks &&
+        fabs(blocking_error(&blocking, LEVEL) - error) < 1e-10 * error) {
+        fprintf(stdout, "First test passed! Streaming blocking error at level %d: %lf, from the series: %lf\n", LEVEL,
+                blocking_error(&blocking, LEVEL), error);
+    } else {
+        fprintf(stdout, "First test failed: streaming blocking error at level %d: %lf, from the series: %lf\n", LEVEL,
+                blocking_error(&blocking, LEVEL), error);
+    }
+
+    // The correlations must show up as errors growing with the level
+    if (blocking_error(&blocking, LEVEL) > 2.0 * blocking_error(&blocking, 0)) {
+        fprintf(stdout, "Second test passed, the blocking error grows from %lf (level 0) to %lf (level %d)!\n",
+                blocking_error(&blocking, 0), blocking_error(&blocking, LEVEL), LEVEL);
+    } else {
+        fprintf(stdout, "Second test failed: the blocking error does not grow with the level.\n");
+    }
+    free(series);
+    return EXIT_SUCCESS;
+}
@@ -0,0 +1,57 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include "../include/functions.h"
+
+// Checks that the colors of the checkerboard cover every site once and that no two neighbors share a color
+int check_checkerboard(int lattice_side) {
+    int Vol = lattice_side * lattice_side * lattice_side;
+    int *neighbors = allocate_neighbors(lattice_side);
+    Checkerboard *checkerboard = allocate_checkerboard(neighbors, lattice_side);
+    int *color = (int *)malloc(Vol * sizeof(int));
+    int c, idx, n, d, flag = 0;
+
+    if (neighbors == NULL || checkerboard == NULL || color == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    for (n=0; n<Vol; n++) {
+        color[n] = -1;
+    }
+    for (c=0; c<checkerboard->n_colors; c++) {
+        for (idx=checkerboard->offsets[c]; idx<checkerboard->offsets[c + 1]; idx++) {
+            if (color[checkerboard->sites[idx]] != -1) {
+                flag = 1; // site with two colors
+            }
+            color[checkerboard->sites[idx]] = c;
+        }
+    }
+    for (n=0; n<Vol; n++) {
+        if (color[n] == -1) {
+            flag = 1; // site without color
+        }
+        for (d=0; d<N_NEIGHBORS; d++) {
+            if (color[neighbors[N_NEIGHBORS*n + d]] == color[n]) {
+                flag = 1; // neighbors with the same color
+            }
+        }
+    }
+
+    if (flag == 0) {
+        fprintf(stdout, "Test passed for L = %d: %d colors, no neighbors with the same color.\n", lattice_side, checkerboard->n_colors);
+    } else {
+        fprintf(stdout, "Test failed for L = %d: the coloring is not valid.\n", lattice_side);
+    }
+
+    free(color);
+    free(neighbors);
+    free_checkerboard(checkerboard);
+    return EXIT_SUCCESS;
+}
+
+int main() {
+    // Even side: the two sublattices of the checkerboard; odd side: extra colors on the boundary
+    check_checkerboard(8);
+    check_checkerboard(9);
+
+    return EXIT_SUCCESS;
+}
@@ -0,0 +1,90 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/checkpoint.h"
+#include "../include/random.h"
+
+#define L 6
+#define N_STREAMS 3
+#define CHECKPOINT_NAME "checkpoint_test.chk"
+#define CONFIGURATION_NAME "configuration_test.conf"
+
+int main() {
+    int Vol = L * L * L;
+    Spin2D *lattice = allocate(L), *lattice_read = allocate(L);
+    pcg32_random_t streams[N_STREAMS], streams_read[N_STREAMS], global_saved;
+    SimulationState state = {0}, state_read = {0};
+    int flag = 0, n;
+    double beta_read = 0.0, diff = 0.0;
+
+    if (lattice == NULL || lattice_read == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    myrand_init(12345, 54);
+    myrand_init_streams(streams, N_STREAMS, 12345, 54);
+    initialize_lattice(lattice, L, &pcg32_random_state);
+    state.lattice_side = L;
+    state.n_streams = N_STREAMS;
+    state.spin_size = (int)sizeof(spin_t);
+    state.beta = 0.45;
+    state.complete_lattice_sweeps = 1234;
+    state.percentage_metro_acc = 0.5;
+    state.data_size = 4321;
+    global_saved = pcg32_random_state;
+
+    if (write_checkpoint(CHECKPOINT_NAME, &state, lattice, streams) != EXIT_SUCCESS) {
+        fprintf(stdout, "Test failed: the checkpoint could not be written.\n");
+        return EXIT_SUCCESS;
+    }
+
+    // The global generator must be restored by the reading
+    myrand();
+    state_read.lattice_side = L;
+    state_read.n_streams = N_STREAMS;
+    state_read.spin_size = (int)sizeof(spin_t);
+    state_read.beta = 0.45;
+    if (read_checkpoint(CHECKPOINT_NAME, &state_read, lattice_read, streams_read) != EXIT_SUCCESS) {
+        flag = 1;
+    } else if (memcmp(lattice, lattice_read, (size_t)Vol * sizeof(Spin2D)) != 0 ||
+               memcmp(streams, streams_read, sizeof(streams)) != 0 ||
+               memcmp(&global_saved, &pcg32_random_state, sizeof(pcg32_random_t)) != 0 ||
+               state_read.complete_lattice_sweeps != 1234 || state_read.percentage_metro_acc != 0.5 || state_read.data_size != 4321) {
+        flag = 1;
+    }
+    if (flag == 0) {
+        fprintf(stdout, "First test passed! Lattice, generators and counters are restored.\n");
+    } else {
+        fprintf(stdout, "First test failed: the checkpoint was not restored correctly.\n");
+    }
+
+    // A checkpoint of a simulation at another beta must be refused
+    state_read.beta = 0.46;
+    if (read_checkpoint(CHECKPOINT_NAME, &state_read, lattice_read, streams_read) != EXIT_SUCCESS) {
+        fprintf(stdout, "Second test passed, the checkpoint of another simulation is refused!\n");
+    } else {
+        fprintf(stdout, "Second test failed: the checkpoint of another simulation was accepted.\n");
+    }
+
+    // The configuration of a run at another beta is a valid starting lattice: spins restored up to store_spin
+    if (write_configuration(CONFIGURATION_NAME, lattice, L, 0.45) != EXIT_SUCCESS ||
+        read_configuration(CONFIGURATION_NAME, lattice_read, L, &beta_read) != EXIT_SUCCESS) {
+        flag = 1;
+    }
+    for (n=0; n<Vol; n++) {
+        diff = fmax(diff, fmax(fabs(lattice[n].sx - lattice_read[n].sx), fabs(lattice[n].sy - lattice_read[n].sy)));
+    }
+    if (flag == 0 && diff < 4 * SPIN_EPSILON && beta_read == 0.45 && read_configuration(CONFIGURATION_NAME, lattice_read, L + 1, NULL) != EXIT_SUCCESS) {
+        fprintf(stdout, "Third test passed! The configuration is restored (max difference %.3e) and refused for another lattice_side.\n", diff);
+    } else {
+        fprintf(stdout, "Third test failed: configuration restored with max difference %.3e, beta %lf.\n", diff, beta_read);
+    }
+
+    remove(CHECKPOINT_NAME);
+    remove(CONFIGURATION_NAME);
+    free_lattice(lattice);
+    free_lattice(lattice_read);
+    return EXIT_SUCCESS;
+}
@@ -0,0 +1,51 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <stdint.h>
+#include "../include/data_header.h"
+
+#define FILE_NAME "data_header_test.bin"
+
+int main() {
+    DataHeader header = {30, DATA_N_COLS, 200, 12345, 0.45275, 1.0, 0.1, "metropolis", DATA_COLUMNS};
+    unsigned char buffer[DATA_HEADER_SIZE];
+    uint32_t header_size;
+    int32_t lattice_side;
+    uint64_t printing_step;
+    double beta, sample = 3.5, first_sample;
+    int flag = 0;
+    FILE *fp = fopen(FILE_NAME, "wb");
+
+    if (fp == NULL) {
+        fprintf(stderr, "Error opening %s\n", FILE_NAME);
+        return EXIT_FAILURE;
+    }
+    write_data_header(fp, &header);
+    fwrite(&sample, sizeof(double), 1, fp);
+    fclose(fp);
+
+    // The fields must be found at the offsets documented in data_header.h and the samples right after the header
+    fp = fopen(FILE_NAME, "rb");
+    if (fp == NULL || fread(buffer, 1, DATA_HEADER_SIZE, fp) != DATA_HEADER_SIZE || fread(&first_sample, sizeof(double), 1, fp) != 1) {
+        fprintf(stdout, "Test failed: the header could not be read back.\n");
+        return EXIT_SUCCESS;
+    }
+    fclose(fp);
+    memcpy(&header_size, buffer + 12, sizeof(uint32_t));
+    memcpy(&lattice_side, buffer + 16, sizeof(int32_t));
+    memcpy(&printing_step, buffer + 24, sizeof(uint64_t));
+    memcpy(&beta, buffer + 40, sizeof(double));
+    if (strcmp((char *)buffer, DATA_MAGIC) != 0 || header_size != DATA_HEADER_SIZE || lattice_side != 30 ||
+        printing_step != 200 || beta != 0.45275 || strcmp((char *)buffer + 72, "metropolis") != 0 ||
+        strcmp((char *)buffer + 104, DATA_COLUMNS) != 0 || first_sample != sample) {
+        flag = 1;
+    }
+
+    if (flag == 0) {
+        fprintf(stdout, "Test passed! The header has the documented layout (dtype %s, columns %s).\n", (char *)buffer + 64, (char *)buffer + 104);
+    } else {
+        fprintf(stdout, "Test failed: the header does not have the documented layout.\n");
+    }
+    remove(FILE_NAME);
+    return EXIT_SUCCESS;
+}
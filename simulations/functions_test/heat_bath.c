@@ -0,0 +1,103 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/random.h"
+
+#define L 6
+#define N_DRAWS 1000000
+#define N_SWEEPS 4000
+
+int main() {
+    Spin2D *lattice = allocate(L);
+    int *neighbors = allocate_neighbors(L);
+    LatticeTotals totals, exact;
+    double beta = 0.5, kappa, x, z0 = 0.0, z1 = 0.0, mean_cos = 0.0, mean_sin = 0.0, exact_cos, sigma;
+    double E_heat_bath = 0.0, E_metro = 0.0, diff_totals, small_kappas[] = {1e-8, 1.02e-8, 1.05e-8, 1e-7, 1e-6}, norm;
+    int n, k, bad_draws = 0, sweep, site = site_index(2, 3, 4, L), n_int = 100000;
+
+    if (lattice == NULL || neighbors == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    myrand_init(12345, 54);
+
+    // All the neighbors along x, S = (6, 0): the angle of the new spin has the von Mises distribution with kappa = 6 beta
+    for (n=0; n<L*L*L; n++) {
+        lattice[n].sx = 1.0; lattice[n].sy = 0.0;
+    }
+    kappa = 6 * beta;
+    for (n=0; n<N_DRAWS; n++) {
+        local_heat_bath(lattice, neighbors, site, beta, &pcg32_random_state, NULL);
+        mean_cos += lattice[site].sx / N_DRAWS;
+        mean_sin += lattice[site].sy / N_DRAWS;
+    }
+    // <cos x> = I1(kappa) / I0(kappa), the integrals computed with the midpoint rule
+    for (n=0; n<n_int; n++) {
+        x = -PI + (n + 0.5) * 2 * PI / n_int;
+        z0 += exp(kappa * cos(x));
+        z1 += cos(x) * exp(kappa * cos(x));
+    }
+    exact_cos = z1 / z0;
+    sigma = 1.0 / sqrt(N_DRAWS);
+    if (fabs(mean_cos - exact_cos) < 5 * sigma && fabs(mean_sin) < 5 * sigma) {
+        fprintf(stdout, "First test passed! <cos> = %lf (exact %lf), <sin> = %lf\n", mean_cos, exact_cos, mean_sin);
+    } else {
+        fprintf(stdout, "First test failed: <cos> = %lf (exact %lf), <sin> = %lf\n", mean_cos, exact_cos, mean_sin);
+    }
+
+    // Heat-bath and Metropolis chains must give the same mean energy, and the running totals must follow the lattice
+    beta = 0.25;
+    initialize_lattice(lattice, L, &pcg32_random_state);
+    totals = lattice_totals(lattice, neighbors, L);
+    for (sweep=0; sweep<N_SWEEPS; sweep++) {
+        heat_bath_sweep(lattice, neighbors, L, beta, NULL, &pcg32_random_state, &totals);
+        if (sweep >= N_SWEEPS / 4) {
+            E_heat_bath += totals.energy / (L * L * L);
+        }
+    }
+    exact = lattice_totals(lattice, neighbors, L);
+    diff_totals = fabs(totals.energy - exact.energy) + fabs(totals.magn.sx - exact.magn.sx) + fabs(totals.magn.sy - exact.magn.sy);
+    for (sweep=0; sweep<N_SWEEPS; sweep++) {
+        metropolis_sweep(lattice, neighbors, L, 1.0, beta, NULL, &pcg32_random_state, NULL);
+        if (sweep >= N_SWEEPS / 4) {
+            E_metro += energy_per_site(lattice, neighbors, L);
+        }
+    }
+    E_heat_bath /= N_SWEEPS - N_SWEEPS / 4;
+    E_metro /= N_SWEEPS - N_SWEEPS / 4;
+    if (diff_totals < 1e-9 + N_SWEEPS * L * L * L * SPIN_EPSILON && fabs(E_heat_bath - E_metro) < 0.01) {
+        fprintf(stdout, "Second test passed! Mean energy per site with heat-bath %lf, with Metropolis %lf.\n", E_heat_bath, E_metro);
+    } else {
+        fprintf(stdout, "Second test failed: mean energy per site with heat-bath %lf, with Metropolis %lf, drift of the totals %.3e.\n",
+                E_heat_bath, E_metro, diff_totals);
+    }
+
+    // Small kappa (just above 0): the sampler must not lose rho to the cancellation in tau - sqrt(2 tau), which gave
+    // NaN spins for kappa around 1e-8. With all the neighbors along x, kappa = 6 beta
+    for (n=0; n<L*L*L; n++) {
+        lattice[n].sx = 1.0; lattice[n].sy = 0.0;
+    }
+    mean_cos = 0.0;
+    for (k=0; k<(int)(sizeof(small_kappas) / sizeof(small_kappas[0])); k++) {
+        for (n=0; n<N_DRAWS / 10; n++) {
+            local_heat_bath(lattice, neighbors, site, small_kappas[k] / 6, &pcg32_random_state, NULL);
+            norm = sqrt((double)lattice[site].sx * lattice[site].sx + (double)lattice[site].sy * lattice[site].sy);
+            bad_draws += !(isfinite(lattice[site].sx) && isfinite(lattice[site].sy) && fabs(norm - 1.0) < 10 * SPIN_EPSILON);
+            mean_cos += lattice[site].sx;
+        }
+    }
+    // The distribution is flat within kappa / 2, so <cos> = 0 within the statistical error
+    mean_cos /= (double)k * (N_DRAWS / 10);
+    sigma = 1.0 / sqrt((double)k * (N_DRAWS / 10));
+    if (bad_draws == 0 && fabs(mean_cos) < 5 * sigma) {
+        fprintf(stdout, "Third test passed! Finite unit spins for kappa from 1e-8 to 1e-6, <cos> = %lf\n", mean_cos);
+    } else {
+        fprintf(stdout, "Third test failed: %d draws not finite or not of unit norm for kappa from 1e-8 to 1e-6, <cos> = %lf\n",
+                bad_draws, mean_cos);
+    }
+
+    free_lattice(lattice);
+    free(neighbors);
+    return EXIT_SUCCESS;
+}
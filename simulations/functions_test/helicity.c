@@ -0,0 +1,63 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/random.h"
+
+#define L 6
+
+int main() {
+    int Vol = L * L * L, i, j, k;
+    Spin2D *lattice = allocate(L);
+    int *neighbors = allocate_neighbors(L);
+    double bond_cos, bond_sin2, exact_cos, exact_sin2, energy;
+
+    if (lattice == NULL || neighbors == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    myrand_init(12345, 54);
+
+    // Ordered lattice: every bond has cos = 1 and sin = 0
+    for (i=0; i<Vol; i++) {
+        store_spin(&lattice[i], 1.0, 0.0);
+    }
+    helicity_sums(lattice, neighbors, L, &bond_cos, &bond_sin2);
+    if (fabs(bond_cos - 1.0) < 100.0 * SPIN_EPSILON && fabs(bond_sin2) < 100.0 * SPIN_EPSILON) {
+        fprintf(stdout, "First test passed! Ordered lattice: bond_cos = %lf, bond_sin2 = %e\n", bond_cos, bond_sin2);
+    } else {
+        fprintf(stdout, "First test failed: ordered lattice: bond_cos = %lf, bond_sin2 = %e\n", bond_cos, bond_sin2);
+    }
+
+    // Spin wave theta = 2 pi i / L along the first axis (a twist of 2 pi): the bonds along it have
+    // theta_x - theta_{x+a} = - 2 pi / L, so S_0 = - V sin(2 pi / L), the others are parallel
+    for (i=0; i<L; i++) {
+        for (j=0; j<L; j++) {
+            for (k=0; k<L; k++) {
+                store_spin(&lattice[site_index(i, j, k, L)], cos(2.0 * PI * i / L), sin(2.0 * PI * i / L));
+            }
+        }
+    }
+    helicity_sums(lattice, neighbors, L, &bond_cos, &bond_sin2);
+    exact_cos = (cos(2.0 * PI / L) + 2.0) / 3.0;
+    exact_sin2 = Vol * sin(2.0 * PI / L) * sin(2.0 * PI / L) / 3.0;
+    if (fabs(bond_cos - exact_cos) < 100.0 * SPIN_EPSILON && fabs(bond_sin2 - exact_sin2) < 100.0 * SPIN_EPSILON * Vol) {
+        fprintf(stdout, "Second test passed! Spin wave: bond_cos = %lf (exact %lf), bond_sin2 = %lf (exact %lf)\n", bond_cos, exact_cos, bond_sin2, exact_sin2);
+    } else {
+        fprintf(stdout, "Second test failed: spin wave: bond_cos = %lf (exact %lf), bond_sin2 = %lf (exact %lf)\n", bond_cos, exact_cos, bond_sin2, exact_sin2);
+    }
+
+    // Random lattice: the cosines of the bonds are the energy, bond_cos = - energy_per_site / 3
+    initialize_lattice(lattice, L, &pcg32_random_state);
+    helicity_sums(lattice, neighbors, L, &bond_cos, &bond_sin2);
+    energy = energy_per_site(lattice, neighbors, L);
+    if (fabs(bond_cos + energy / 3.0) < 1e-12 && bond_sin2 >= 0.0) {
+        fprintf(stdout, "Third test passed! Random lattice: bond_cos = %lf, - energy_per_site / 3 = %lf\n", bond_cos, -energy / 3.0);
+    } else {
+        fprintf(stdout, "Third test failed: random lattice: bond_cos = %lf, - energy_per_site / 3 = %lf\n", bond_cos, -energy / 3.0);
+    }
+
+    free_lattice(lattice);
+    free(neighbors);
+    return EXIT_SUCCESS;
+}
@@ -11,7 +11,7 @@
 
 
 int main() {
-    DoubleVector2D ***lattice;
+    Spin2D *lattice;
     double a = 1.0;
     int i, j, k;
 
@@ -26,8 +26,8 @@ int main() {
     for (i = 0; i < L; i++) {
         for (j = 0; j < L; j++) {
             for (k = 0; k < L; k++) {
-                lattice[i][j][k].sx = a;  // Set sx to 1.0
-                lattice[i][j][k].sy = a;  // Set sy to 1.0
+                lattice[site_index(i, j, k, L)].sx = a;  // Set sx to 1.0
+                lattice[site_index(i, j, k, L)].sy = a;  // Set sy to 1.0
             }
         }
     }
@@ -38,7 +38,7 @@ int main() {
         for (j = 0; j < L; j++) {
             for (k = 0; k < L; k++) {
                 // Check if either sx or sy does not match the expected value
-                if (lattice[i][j][k].sx != a || lattice[i][j][k].sy != a) {
+                if (lattice[site_index(i, j, k, L)].sx != a || lattice[site_index(i, j, k, L)].sy != a) {
                     flag = 1;  // Set flag if there's a mismatch
                     break;
                 }
@@ -60,7 +60,7 @@ int main() {
     }
 
     // Free the lattice
-    free_lattice(lattice, L);
+    free_lattice(lattice);
 
     return EXIT_SUCCESS;
 }
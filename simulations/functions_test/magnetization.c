@@ -7,7 +7,7 @@
 #define L 5
 
 int main() {
-    DoubleVector2D ***lattice = allocate(L);
+    Spin2D *lattice = allocate(L);
     double a = 127.32, b = 134.123;
     int i, j, k;
 
@@ -20,26 +20,24 @@ int main() {
     for (i=0; i<L; i++) {
         for (j=0; j<L; j++) {
             for (k=0; k<L; k++) {
-                lattice[i][j][k].sx = a;
-                lattice[i][j][k].sy = b;
+                lattice[site_index(i, j, k, L)].sx = a;
+                lattice[site_index(i, j, k, L)].sy = b;
             }
         }
     }
     
-    DoubleVector2D * m = magnetization(lattice, L);
-    
-    if (m==NULL) {
-	fprintf(stderr, "Test failed due to allocation issues!\n");
-        return EXIT_FAILURE;
-    } 
+    DoubleVector2D m = magnetization(lattice, L);
+    // Expected values rounded as the stored spins
+    a = (spin_t)a;
+    b = (spin_t)b;
 
-    if ((fabs(m->sx-a)<1e-12)&&(fabs(m->sy-b)<1e-12)) {
+    if ((fabs(m.sx-a)<1e-12)&&(fabs(m.sy-b)<1e-12)) {
         fprintf(stdout, "Test passed, vector magnetization is equal to the right value!\n");
-	fprintf(stdout, "m = (%.15lf, %.15lf), correct value = (%.15lf, %.15lf)\n", m->sx, m->sy, a, b);
+	fprintf(stdout, "m = (%.15lf, %.15lf), correct value = (%.15lf, %.15lf)\n", m.sx, m.sy, a, b);
         return EXIT_SUCCESS;
     } else {
         fprintf(stdout, "Test failed, vector magnetization is NOT equal to the right value!\n");
-        fprintf(stdout, "m = (%.15lf, %.15lf), correct value = (%.15lf, %.15lf)\n", m->sx, m->sy, a, b);
+        fprintf(stdout, "m = (%.15lf, %.15lf), correct value = (%.15lf, %.15lf)\n", m.sx, m.sy, a, b);
 	return EXIT_SUCCESS;
     }
 
@@ -0,0 +1,82 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <stdint.h>
+#include "../include/measurements.h"
+
+#define DATA_NAME "measurements_test.bin"
+#define STREAM_NAME "measurements_test.bin.sf"
+#define N_ROWS 10
+#define N_KEEP 6
+
+// Reads the stream: step of the header and the rows after it, returns the number of doubles read
+static long int read_stream(uint64_t *step, double *values, size_t max_values) {
+    unsigned char header[DATA_HEADER_SIZE];
+    FILE *fp = fopen(STREAM_NAME, "rb");
+    long int n;
+    if (fp == NULL || fread(header, 1, DATA_HEADER_SIZE, fp) != DATA_HEADER_SIZE) {
+        return -1;
+    }
+    memcpy(step, header + 24, sizeof(uint64_t));
+    n = (long int)fread(values, sizeof(double), max_values, fp);
+    fclose(fp);
+    return n;
+}
+
+int main() {
+    MeasurementStream stream = {"structure_factor", STRUCTURE_FACTOR_EXTENSION, STRUCTURE_FACTOR_COLUMNS, 5, STRUCTURE_FACTOR_N_COLS, 0, NULL, 0, 0.0};
+    DataHeader header = {8, STRUCTURE_FACTOR_N_COLS, 5, 12345, 0.45, 1.0, 0.1, "metropolis", STRUCTURE_FACTOR_COLUMNS};
+    double row[STRUCTURE_FACTOR_N_COLS], values[2 * N_ROWS * STRUCTURE_FACTOR_N_COLS];
+    uint64_t step = 0;
+    long int size = -1, n;
+    int i, flag = 0;
+
+    // New stream: the header with the step of the group, then the rows in order
+    flag |= open_measurement_stream(&stream, DATA_NAME, &header, -1) != EXIT_SUCCESS;
+    for (i=0; i<N_ROWS && !flag; i++) {
+        row[0] = i;
+        row[1] = -i;
+        flag |= write_measurement(&stream, row) != EXIT_SUCCESS;
+        if (i == N_KEEP - 1) {
+            size = sync_measurement_stream(&stream);
+        }
+    }
+    flag |= close_measurement_stream(&stream) != EXIT_SUCCESS;
+    n = read_stream(&step, values, 2 * N_ROWS * STRUCTURE_FACTOR_N_COLS);
+    flag |= (n != N_ROWS * STRUCTURE_FACTOR_N_COLS || step != 5 || stream.rows != N_ROWS);
+    for (i=0; i<N_ROWS && !flag; i++) {
+        flag |= (values[2*i] != i || values[2*i+1] != -i);
+    }
+    if (flag == 0) {
+        fprintf(stdout, "First test passed! The stream holds its header and the %d rows in order.\n", N_ROWS);
+    } else {
+        fprintf(stdout, "First test failed: the stream differs from the rows written.\n");
+    }
+
+    // Resumed stream: the rows after the size saved at the checkpoint are replaced by the new ones
+    flag = (size != DATA_HEADER_SIZE + N_KEEP * STRUCTURE_FACTOR_N_COLS * (long int)sizeof(double));
+    flag |= open_measurement_stream(&stream, DATA_NAME, &header, size) != EXIT_SUCCESS;
+    row[0] = 100.0;
+    row[1] = -100.0;
+    flag |= flag || write_measurement(&stream, row) != EXIT_SUCCESS;
+    flag |= close_measurement_stream(&stream) != EXIT_SUCCESS;
+    n = read_stream(&step, values, 2 * N_ROWS * STRUCTURE_FACTOR_N_COLS);
+    flag |= (n != (N_KEEP + 1) * STRUCTURE_FACTOR_N_COLS || values[2*N_KEEP] != 100.0 || values[2*N_KEEP-2] != N_KEEP - 1);
+    if (flag == 0) {
+        fprintf(stdout, "Second test passed! The resumed stream keeps %d rows and appends the new one.\n", N_KEEP);
+    } else {
+        fprintf(stdout, "Second test failed: the resumed stream is not correct.\n");
+    }
+
+    // A stream shorter than the checkpoint cannot be resumed
+    flag = open_measurement_stream(&stream, DATA_NAME, &header, size + 1000) == EXIT_SUCCESS;
+    close_measurement_stream(&stream);
+    if (flag == 0) {
+        fprintf(stdout, "Third test passed! A stream shorter than the checkpoint is refused.\n");
+    } else {
+        fprintf(stdout, "Third test failed: a stream shorter than the checkpoint was resumed.\n");
+    }
+
+    remove(STREAM_NAME);
+    return EXIT_SUCCESS;
+}
@@ -22,39 +22,42 @@ int main() {
     myrand_init(seed1, seed2);
 
     // Matrix declaration and allocation
-    DoubleVector2D ***lattice = allocate(lattice_side);
+    Spin2D *lattice = allocate(lattice_side);
+    int *neighbors = allocate_neighbors(lattice_side);
 
     // Checking allocation errors
-    if (lattice == NULL) {
+    if (lattice == NULL || neighbors == NULL) {
         fprintf(stderr, "Matrix allocation error.\n");
         return EXIT_FAILURE;
     }
 
     // Initializing the matrix
-    initialize_lattice(lattice, lattice_side);
+    initialize_lattice(lattice, lattice_side, &pcg32_random_state);
 
     // Testing the local_metropolis function on a specific site
     int i = 2, j = 2, k = 2;  // Indices of the site to update
-    DoubleVector2D s_old = lattice[i][j][k];
-    int acc = local_metropolis(lattice, i, j, k, lattice_side, alpha, beta);
+    int site = site_index(i, j, k, lattice_side);
+    DoubleVector2D s_old = spin_value(lattice[site]);
+    int acc = local_metropolis(lattice, neighbors, site, alpha, beta, &pcg32_random_state, NULL);
 
     // Checking the result
     if (acc == 1) {
-        double s_new_mod = sqrt(scalar_product(lattice[i][j][k], lattice[i][j][k]));
+        double s_new_mod = sqrt(scalar_product(spin_value(lattice[site]), spin_value(lattice[site])));
         printf("Update successful for lattice[%d][%d][%d]: sx_new = %.15lf, sy_new = %.15lf, s_new module = %.15lf\n",
-               i, j, k, lattice[i][j][k].sx, lattice[i][j][k].sy, s_new_mod);
+               i, j, k, lattice[site].sx, lattice[site].sy, s_new_mod);
         double s_old_mod = sqrt(scalar_product(s_old, s_old));
         printf("Old state: sx_old = %.15lf, sy_old = %.15lf, s_old module = %.15lf\n", s_old.sx, s_old.sy, s_old_mod);
     } else {
-        double s_new_mod = sqrt(scalar_product(lattice[i][j][k], lattice[i][j][k]));
+        double s_new_mod = sqrt(scalar_product(spin_value(lattice[site]), spin_value(lattice[site])));
         printf("Update not performed for lattice[%d][%d][%d]: sx_new = %.15lf, sy_new = %.15lf, s_new module = %.15lf\n",
-               i, j, k, lattice[i][j][k].sx, lattice[i][j][k].sy, s_new_mod);
+               i, j, k, lattice[site].sx, lattice[site].sy, s_new_mod);
         double s_old_mod = sqrt(scalar_product(s_old, s_old));
         printf("Old state: sx_old = %.15lf, sy_old = %.15lf, s_old module = %.15lf\n", s_old.sx, s_old.sy, s_old_mod);
     }
 
     // Memory release
-    free_lattice(lattice, lattice_side);
+    free_lattice(lattice);
+    free(neighbors);
 
     return EXIT_SUCCESS;
 }
@@ -6,37 +6,41 @@
 #define L 5
 
 int main(void) {
-    DoubleVector2D ***lattice, * s_result;
+    Spin2D *lattice;
+    DoubleVector2D * s_result;
+    int *neighbors;
     s_result = (DoubleVector2D *)malloc(sizeof(DoubleVector2D));
     // Allocate the lattice and check if allocation was successful
     lattice = allocate(L);
-    if (lattice == NULL) {
+    neighbors = allocate_neighbors(L);
+    if (lattice == NULL || neighbors == NULL) {
         fprintf(stderr, "Error: Allocation of lattice failed.\n");
         return EXIT_FAILURE;
     }
     // Initialize all the lattice 
-    int i, j, k;
+    int i, j, k, site = site_index(0, 1, L-1, L);
     double a = 12.4, b = 0.0;
     for (i=0; i<L; i++) {
         for (j=0; j<L; j++) {
             for (k=0; k<L; k++) {
-                lattice[i][j][k].sx = a;
-                lattice[i][j][k].sy = b;
+                lattice[site_index(i, j, k, L)].sx = a;
+                lattice[site_index(i, j, k, L)].sy = b;
             }
         }
     }   
 
-    lattice[0][1][L-1].sx = 1.5; lattice[0][1][L-1].sy = 124.3;
-    s_result->sx = lattice[0][1][L-1].sx; s_result->sy = -lattice[0][1][L-1].sy;
+    // The kernels keep the spins on the unit circle, so the starting spin must be a unit vector
+    lattice[site].sx = 0.6; lattice[site].sy = 0.8;
+    s_result->sx = lattice[site].sx; s_result->sy = -lattice[site].sy;
 
     fprintf(stdout, "FIRST TEST:\n");
     fprintf(stdout, "Starting vector s:\n");
-    fprintf(stdout, "%.14lf, %.14lf\n", lattice[0][1][L-1].sx, lattice[0][1][L-1].sy);
+    fprintf(stdout, "%.14lf, %.14lf\n", lattice[site].sx, lattice[site].sy);
     fprintf(stdout, "Vector S:\n");
     fprintf(stdout, "%.14lf, %.14lf\n", 4*a, 4*b);
-    if (microcanonical(lattice, 0, 1, L-1, L) == 1) {
+    if (microcanonical(lattice, neighbors, site, NULL) == 1) {
         fprintf(stdout, "New vector s from function:\n");
-        fprintf(stdout, "%.14lf, %.14lf\n", lattice[0][1][L-1].sx, lattice[0][1][L-1].sy);
+        fprintf(stdout, "%.14lf, %.14lf\n", lattice[site].sx, lattice[site].sy);
 	fprintf(stdout, "New vector s, real result:\n");
         fprintf(stdout, "%.14lf, %.14lf\n", s_result->sx, s_result->sy);
     } else {
@@ -44,7 +48,7 @@ int main(void) {
     }
 
     int is_equal = 0;
-    if ((fabs(lattice[0][1][L-1].sx - s_result->sx)>1e-15) & fabs(lattice[0][1][L-1].sy - s_result->sy)>1e-15) { // NB: pay attetion to == with doubles!
+    if ((fabs(lattice[site].sx - s_result->sx)>4*SPIN_EPSILON) & fabs(lattice[site].sy - s_result->sy)>4*SPIN_EPSILON) { // NB: pay attetion to == with doubles!
         fprintf(stdout, "Error in first test!\n");
         is_equal = 2;
     }
@@ -62,21 +66,21 @@ int main(void) {
     for (i=0; i<L; i++) {
         for (j=0; j<L; j++) {
             for (k=0; k<L; k++) {
-                lattice[i][j][k].sx = a;
-                lattice[i][j][k].sy = b;
+                lattice[site_index(i, j, k, L)].sx = a;
+                lattice[site_index(i, j, k, L)].sy = b;
             }
         }
     } 
-    lattice[0][1][L-1].sx = 1.5; lattice[0][1][L-1].sy = 124.3;
+    lattice[site].sx = 1.5; lattice[site].sy = 124.3;
 
 
     fprintf(stdout, "SECOND TEST:\n");
     fprintf(stdout, "Starting vector s:\n");
-    fprintf(stdout, "%.14lf, %.14lf\n", lattice[0][1][L-1].sx, lattice[0][1][L-1].sy);
+    fprintf(stdout, "%.14lf, %.14lf\n", lattice[site].sx, lattice[site].sy);
     fprintf(stdout, "Vector S:\n");
     fprintf(stdout, "%.14lf, %.14lf\n", 4*a, 4*b);
 
-    if (microcanonical(lattice, 0, 1, L-1, L) == 1) {
+    if (microcanonical(lattice, neighbors, site, NULL) == 1) {
         fprintf(stdout, "Second test didn't work!\n");
     } else {
         fprintf(stderr, "Error in microcanonical function: norm of S is too small.\n");
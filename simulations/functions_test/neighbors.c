@@ -0,0 +1,43 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include "../include/functions.h"
+
+#define L 5
+
+int main() {
+    int *neighbors = allocate_neighbors(L);
+    int i, j, k, n, flag = 0;
+
+    if (neighbors == NULL) {
+        fprintf(stderr, "Error: Allocation of neighbors table failed.\n");
+        return EXIT_FAILURE;
+    }
+
+    // Every entry of the table must coincide with the neighbor obtained with periodic boundary conditions
+    for (i=0; i<L; i++) {
+        for (j=0; j<L; j++) {
+            for (k=0; k<L; k++) {
+                n = site_index(i, j, k, L);
+                if (neighbors[N_NEIGHBORS*n + I_PLUS]  != site_index((i + 1) % L, j, k, L) ||
+                    neighbors[N_NEIGHBORS*n + J_PLUS]  != site_index(i, (j + 1) % L, k, L) ||
+                    neighbors[N_NEIGHBORS*n + K_PLUS]  != site_index(i, j, (k + 1) % L, L) ||
+                    neighbors[N_NEIGHBORS*n + I_MINUS] != site_index((i - 1 + L) % L, j, k, L) ||
+                    neighbors[N_NEIGHBORS*n + J_MINUS] != site_index(i, (j - 1 + L) % L, k, L) ||
+                    neighbors[N_NEIGHBORS*n + K_MINUS] != site_index(i, j, (k - 1 + L) % L, L)) {
+                    fprintf(stdout, "Wrong neighbors for site (%d, %d, %d)\n", i, j, k);
+                    flag = 1;
+                }
+            }
+        }
+    }
+
+    if (flag == 0) {
+        fprintf(stdout, "Test passed! Neighbors table is consistent with periodic boundary conditions.\n");
+    } else {
+        fprintf(stdout, "Test failed: some entries of the neighbors table are wrong.\n");
+    }
+
+    free(neighbors);
+
+    return EXIT_SUCCESS;
+}
@@ -1,15 +1,65 @@
 #include <stdio.h>
 #include <stdlib.h>
+#include <math.h>
 #include <time.h>
 
 #include "../include/random.h"
 
+#define N_DRAWS 1000
+#define N_STREAMS 4
+
 int main(void) {
     const unsigned long int seed1 = (unsigned long int) time(NULL); // seed for rng from current time
     const unsigned long int seed2 = seed1+127; // second seed for rng
-    
+    pcg32_random_t rng, copy, streams[N_STREAMS];
+    double block[N_DRAWS];
+    int i, s, ok = 1;
+
     // initialize random number generator
     myrand_init(seed1, seed2); // function in random.h
-
     fprintf(stdout, "%lf\n", myrand());
+
+    // The block of myrand_fill must be the sequence of the single draws, with 2^-32 in place of pow(2, 32)
+    pcg32_srandom_r(&rng, seed1, seed2);
+    copy = rng;
+    myrand_fill(&rng, block, N_DRAWS);
+    for (i=0; i<N_DRAWS; i++) {
+        if (block[i] != (double)pcg32_random_r(&copy) / pow(2.0, 32.0) || block[i] < 0.0 || block[i] >= 1.0) {
+            ok = 0;
+        }
+    }
+    if (ok && rng.state == copy.state) {
+        fprintf(stdout, "First test passed! myrand_fill gives the sequence of myrand_r.\n");
+    } else {
+        fprintf(stdout, "First test failed: myrand_fill differs from myrand_r.\n");
+    }
+
+    // Jump-ahead: advancing by N_DRAWS steps lands where N_DRAWS draws do, and 2^64 - N_DRAWS steps go back
+    pcg32_srandom_r(&rng, seed1, seed2);
+    copy = rng;
+    myrand_advance(&copy, N_DRAWS);
+    myrand_fill(&rng, block, N_DRAWS);
+    ok = (rng.state == copy.state);
+    myrand_advance(&copy, (uint64_t)0 - N_DRAWS);
+    pcg32_srandom_r(&rng, seed1, seed2);
+    ok = ok && (rng.state == copy.state);
+    // the split streams start at consecutive blocks of N_DRAWS numbers of the master sequence
+    myrand_split_streams(streams, N_STREAMS, &rng, N_DRAWS);
+    for (s=0; s<N_STREAMS; s++) {
+        ok = ok && (streams[s].state == rng.state);
+        myrand_fill(&rng, block, N_DRAWS);
+    }
+    if (ok) {
+        fprintf(stdout, "Second test passed! Jump-ahead matches the sequential draws.\n");
+    } else {
+        fprintf(stdout, "Second test failed: jump-ahead does not match the sequential draws.\n");
+    }
+
+    // Seeds from the clock of two calls in a row (same second) must differ
+    if (myrand_seed_from_clock() != myrand_seed_from_clock()) {
+        fprintf(stdout, "Third test passed! Different seeds from the clock in the same second.\n");
+    } else {
+        fprintf(stdout, "Third test failed: equal seeds from the clock.\n");
+    }
+    return EXIT_SUCCESS;
 }
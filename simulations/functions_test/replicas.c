@@ -0,0 +1,106 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/random.h"
+
+#define L 6
+#define R 8
+#define N_SWEEPS 2000
+
+int main() {
+    ReplicaLattice *replicas = allocate_replicas(L, R);
+    Spin2D *lattice = allocate(L), *copy = allocate(L);
+    int *neighbors = allocate_neighbors(L);
+    pcg32_random_t streams[R];
+    double betas[R], running[R][3], beta = 0.25, diff = 0.0, diff_totals = 0.0, E_replicas = 0.0, E_single = 0.0;
+    double tolerance = 1e-9 + N_SWEEPS * L * L * L * SPIN_EPSILON;
+    int r, n, sweep, first_ok = 1;
+
+    if (replicas == NULL || lattice == NULL || copy == NULL || neighbors == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    for (r=0; r<R; r++) {
+        betas[r] = beta;
+    }
+
+    // Replica r must start from the configuration drawn by initialize_lattice with the stream r of the threads
+    seed_replicas(replicas, 12345, 54);
+    myrand_init_streams(streams, R, 12345, 54);
+    initialize_replicas(replicas);
+    for (r=0; r<R; r++) {
+        initialize_lattice(lattice, L, &streams[r]);
+        get_replica(replicas, r, copy);
+        for (n=0; n<L*L*L; n++) {
+            if (lattice[n].sx != copy[n].sx || lattice[n].sy != copy[n].sy) {
+                first_ok = 0;
+            }
+        }
+    }
+    if (first_ok) {
+        fprintf(stdout, "First test passed! Each replica starts from the configuration of its own stream.\n");
+    } else {
+        fprintf(stdout, "First test failed: the replicas do not start from the configurations of their streams.\n");
+    }
+
+    // The microcanonical sweep is deterministic: on every replica it must give the lexicographic sweep of one lattice
+    for (sweep=0; sweep<10; sweep++) {
+        microcanonical_sweep_replicas(replicas, neighbors);
+    }
+    for (r=0; r<R; r++) {
+        get_replica(replicas, r, copy);
+        set_replica(replicas, r, copy);  // round trip, must leave the replica unchanged
+        myrand_init_streams(streams, R, 12345, 54);
+        initialize_lattice(lattice, L, &streams[r]);
+        for (sweep=0; sweep<10; sweep++) {
+            microcanonical_sweep(lattice, neighbors, L, NULL, NULL);
+        }
+        for (n=0; n<L*L*L; n++) {
+            diff = fmax(diff, fmax(fabs(lattice[n].sx - copy[n].sx), fabs(lattice[n].sy - copy[n].sy)));
+        }
+    }
+    if (diff < 1e-10) {
+        fprintf(stdout, "Second test passed! Microcanonical sweeps of the replicas equal the ones of a lattice (max difference %.3e).\n", diff);
+    } else {
+        fprintf(stdout, "Second test failed: microcanonical sweeps of the replicas differ by %.3e.\n", diff);
+    }
+
+    // Metropolis: running totals consistent with the configurations, and the same mean energy of a single lattice
+    // (in the disordered phase, where the chains decorrelate in a few sweeps)
+    replica_totals(replicas, neighbors);
+    myrand_init(12345, 54);
+    initialize_lattice(lattice, L, &pcg32_random_state);
+    for (sweep=0; sweep<N_SWEEPS; sweep++) {
+        metropolis_sweep_replicas(replicas, neighbors, 1.0, betas);
+        metropolis_sweep(lattice, neighbors, L, 1.0, beta, NULL, &pcg32_random_state, NULL);
+        if (sweep >= N_SWEEPS / 4) {
+            for (r=0; r<R; r++) {
+                E_replicas += replicas->energy[r] / (L * L * L) / R;
+            }
+            E_single += energy_per_site(lattice, neighbors, L);
+        }
+    }
+    E_replicas /= N_SWEEPS - N_SWEEPS / 4;
+    E_single /= N_SWEEPS - N_SWEEPS / 4;
+    for (r=0; r<R; r++) {
+        running[r][0] = replicas->energy[r]; running[r][1] = replicas->magn_x[r]; running[r][2] = replicas->magn_y[r];
+    }
+    replica_totals(replicas, neighbors);
+    for (r=0; r<R; r++) {
+        diff_totals += fabs(running[r][0] - replicas->energy[r]) + fabs(running[r][1] - replicas->magn_x[r]) +
+                       fabs(running[r][2] - replicas->magn_y[r]);
+    }
+    if (diff_totals < R * tolerance && fabs(E_replicas - E_single) < 0.01) {
+        fprintf(stdout, "Third test passed! Mean energy per site of the replicas %lf, of a single lattice %lf.\n", E_replicas, E_single);
+    } else {
+        fprintf(stdout, "Third test failed: mean energy per site of the replicas %lf, of a single lattice %lf, drift of the totals %.3e.\n",
+                E_replicas, E_single, diff_totals);
+    }
+
+    free_replicas(replicas);
+    free_lattice(lattice);
+    free_lattice(copy);
+    free(neighbors);
+    return EXIT_SUCCESS;
+}
@@ -0,0 +1,107 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <stdint.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/snapshots.h"
+#include "../include/random.h"
+
+#define L 32
+#define N_SNAPSHOTS 20  // more than a chunk (8 or 16 lattices of side 32), the last chunk is partial
+#define N_KEEP 5
+#define N_ADDED 3
+#define ARCHIVE_NAME "snapshots_test.snap"
+
+// Reads the archive after the header into values, returns the number of bytes read
+static long int read_archive(const char *file_name, void *values, size_t max_bytes) {
+    FILE *fp = fopen(file_name, "rb");
+    long int n;
+    if (fp == NULL || fseek(fp, SNAPSHOT_HEADER_SIZE, SEEK_SET) != 0) {
+        return -1;
+    }
+    n = (long int)fread(values, 1, max_bytes, fp);
+    fclose(fp);
+    return n;
+}
+
+int main() {
+    int Vol = L * L * L, s, n, flag = 0;
+    Spin2D *lattices = (Spin2D *)malloc((size_t)N_SNAPSHOTS * Vol * sizeof(Spin2D));
+    double *values = (double *)malloc((size_t)N_SNAPSHOTS * Vol * 2 * sizeof(double));
+    int16_t *angles = (int16_t *)values;
+    double diff, max_diff = 0.0;
+    SnapshotWriter *writer;
+    SnapshotStorage storage;
+
+    if (lattices == NULL || values == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    myrand_init(12345, 54);
+    for (s=0; s<N_SNAPSHOTS; s++) {
+        initialize_lattice(lattices + (size_t)s * Vol, L, &pcg32_random_state);
+    }
+
+    // float64: the archive holds the lattices in the order they were added, as doubles
+    parse_snapshot_storage("float64", &storage);
+    writer = open_snapshot_writer(ARCHIVE_NAME, L, storage, 10, 12345, 0.45, -1);
+    for (s=0; s<N_SNAPSHOTS && writer != NULL; s++) {
+        flag |= add_snapshot(writer, lattices + (size_t)s * Vol);
+    }
+    flag |= (writer == NULL) || close_snapshot_writer(writer);
+    flag |= read_archive(ARCHIVE_NAME, values, (size_t)N_SNAPSHOTS * Vol * 2 * sizeof(double) + 1) !=
+            (long int)N_SNAPSHOTS * Vol * 2 * (long int)sizeof(double);
+    for (n=0; n<N_SNAPSHOTS * Vol && !flag; n++) {
+        flag |= (values[2*n] != lattices[n].sx || values[2*n+1] != lattices[n].sy);
+    }
+    if (flag == 0) {
+        fprintf(stdout, "First test passed! The float64 archive holds all the snapshots in order.\n");
+    } else {
+        fprintf(stdout, "First test failed: the float64 archive differs from the lattices.\n");
+    }
+
+    // angle16: angles within half a step of the quantization, pi / 32768
+    flag = (parse_snapshot_storage("angle16", &storage) != EXIT_SUCCESS);
+    writer = open_snapshot_writer(ARCHIVE_NAME, L, storage, 10, 12345, 0.45, -1);
+    for (s=0; s<N_SNAPSHOTS && writer != NULL; s++) {
+        flag |= add_snapshot(writer, lattices + (size_t)s * Vol);
+    }
+    flag |= (writer == NULL) || close_snapshot_writer(writer);
+    flag |= read_archive(ARCHIVE_NAME, angles, (size_t)N_SNAPSHOTS * Vol * sizeof(int16_t) + 1) !=
+            (long int)N_SNAPSHOTS * Vol * (long int)sizeof(int16_t);
+    for (n=0; n<N_SNAPSHOTS * Vol && !flag; n++) {
+        diff = fabs(remainder(angles[n] * (PI / 32768.0) - atan2(lattices[n].sy, lattices[n].sx), 2.0 * PI));
+        max_diff = fmax(max_diff, diff);
+    }
+    if (flag == 0 && max_diff <= 0.5 * PI / 32768.0 + 1e-12) {
+        fprintf(stdout, "Second test passed! Largest error of the angle16 archive = %e\n", max_diff);
+    } else {
+        fprintf(stdout, "Second test failed: largest error of the angle16 archive = %e\n", max_diff);
+    }
+
+    // Continuing the archive of a resumed run: the snapshots after the first N_KEEP are replaced
+    writer = open_snapshot_writer(ARCHIVE_NAME, L, storage, 10, 12345, 0.45, N_KEEP);
+    flag = (writer == NULL);
+    for (s=0; s<N_ADDED && writer != NULL; s++) {
+        flag |= add_snapshot(writer, lattices + (size_t)(N_SNAPSHOTS - 1 - s) * Vol);
+    }
+    flag |= (writer == NULL) || close_snapshot_writer(writer);
+    flag |= read_archive(ARCHIVE_NAME, angles, (size_t)N_SNAPSHOTS * Vol * sizeof(int16_t)) !=
+            (long int)(N_KEEP + N_ADDED) * Vol * (long int)sizeof(int16_t);
+    for (n=0; n<Vol && !flag; n++) {
+        diff = fabs(remainder(angles[N_KEEP * Vol + n] * (PI / 32768.0) -
+                              atan2(lattices[(N_SNAPSHOTS - 1) * Vol + n].sy, lattices[(N_SNAPSHOTS - 1) * Vol + n].sx), 2.0 * PI));
+        flag |= (diff > 0.5 * PI / 32768.0 + 1e-12);
+    }
+    if (flag == 0) {
+        fprintf(stdout, "Third test passed! The continued archive keeps %d snapshots and appends the new ones.\n", N_KEEP);
+    } else {
+        fprintf(stdout, "Third test failed: the continued archive is not correct.\n");
+    }
+
+    remove(ARCHIVE_NAME);
+    free(lattices);
+    free(values);
+    return EXIT_SUCCESS;
+}
@@ -0,0 +1,61 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/cluster.h"
+#include "../include/random.h"
+
+#define L 8
+#define N_SWEEPS 2000
+
+// Largest deviation of the modulus of the spins from 1
+double max_modulus_error(Spin2D *lattice, int lattice_side) {
+    int n, Vol = lattice_side * lattice_side * lattice_side;
+    double err, max_err = 0.0;
+    for (n=0; n<Vol; n++) {
+        err = fabs(sqrt(scalar_product(spin_value(lattice[n]), spin_value(lattice[n]))) - 1.0);
+        if (err > max_err) {
+            max_err = err;
+        }
+    }
+    return max_err;
+}
+
+int main() {
+    Spin2D *lattice = allocate(L);
+    int *neighbors = allocate_neighbors(L);
+    ClusterWorkspace *workspace = allocate_cluster_workspace(L);
+    pcg32_random_t streams[1];
+    double err;
+    int sweep;
+
+    if (lattice == NULL || neighbors == NULL || workspace == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    myrand_init(12345, 54);
+    myrand_init_streams(streams, 1, 12345, 54);
+    initialize_lattice(lattice, L, &pcg32_random_state);
+
+    // No normalization pass: the kernels alone must keep the spins on the unit circle
+    for (sweep=0; sweep<N_SWEEPS; sweep++) {
+        microcanonical_sweep(lattice, neighbors, L, NULL, NULL);
+        metropolis_sweep(lattice, neighbors, L, 1.0, 0.45, NULL, streams, NULL);
+        wolff_sweep(lattice, neighbors, 0.45, workspace, streams, 1, NULL);
+        swendsen_wang(lattice, neighbors, 0.45, workspace, streams, 1, NULL);
+    }
+    err = max_modulus_error(lattice, L);
+
+    fprintf(stdout, "Spin storage %s: largest deviation of |s| from 1 after %d sweeps of each kernel = %.3e\n",
+            SPIN_STORAGE, N_SWEEPS, err);
+    if (err < 4 * SPIN_EPSILON) {
+        fprintf(stdout, "Test passed! The modulus of the spins does not drift.\n");
+    } else {
+        fprintf(stdout, "Test failed: the modulus of the spins drifted away from 1.\n");
+    }
+
+    free_lattice(lattice);
+    free(neighbors);
+    free_cluster_workspace(workspace);
+    return EXIT_SUCCESS;
+}
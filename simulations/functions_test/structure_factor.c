@@ -0,0 +1,75 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/random.h"
+
+#define L 6
+
+int main() {
+    int Vol = L * L * L, i, j, k, a, x[3];
+    Spin2D *lattice = allocate(L);
+    double g, g_direct, re_x, im_x, re_y, im_y, phase;
+    DoubleVector2D v;
+
+    if (lattice == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    myrand_init(12345, 54);
+
+    // Ordered lattice: all the weight is at k = 0, G(k_min) = 0
+    for (i=0; i<Vol; i++) {
+        store_spin(&lattice[i], 1.0, 0.0);
+    }
+    g = structure_factor_kmin(lattice, L);
+    if (fabs(g) < 100.0 * SPIN_EPSILON * Vol) {
+        fprintf(stdout, "First test passed! G(k_min) of the ordered lattice = %e\n", g);
+    } else {
+        fprintf(stdout, "First test failed: G(k_min) of the ordered lattice = %e\n", g);
+    }
+
+    // Spin wave theta = 2 pi i / L along the first axis: G = V / 2 along it and 0 along the others, V / 6 on average
+    // (up to the rounding of the stored spins)
+    for (i=0; i<L; i++) {
+        for (j=0; j<L; j++) {
+            for (k=0; k<L; k++) {
+                store_spin(&lattice[site_index(i, j, k, L)], cos(2.0 * PI * i / L), sin(2.0 * PI * i / L));
+            }
+        }
+    }
+    g = structure_factor_kmin(lattice, L);
+    if (fabs(g - Vol / 6.0) < 100.0 * SPIN_EPSILON * Vol) {
+        fprintf(stdout, "Second test passed! G(k_min) of the spin wave = %lf (exact %lf)\n", g, Vol / 6.0);
+    } else {
+        fprintf(stdout, "Second test failed: G(k_min) of the spin wave = %lf (exact %lf)\n", g, Vol / 6.0);
+    }
+
+    // Random lattice: the plane sums give the sum on the sites of s_x exp(i k_min . x)
+    initialize_lattice(lattice, L, &pcg32_random_state);
+    g = structure_factor_kmin(lattice, L);
+    g_direct = 0.0;
+    for (a=0; a<3; a++) {
+        re_x = im_x = re_y = im_y = 0.0;
+        for (i=0; i<L; i++) {
+            for (j=0; j<L; j++) {
+                for (k=0; k<L; k++) {
+                    x[0] = i; x[1] = j; x[2] = k;
+                    phase = 2.0 * PI * x[a] / L;
+                    v = spin_value(lattice[site_index(i, j, k, L)]);
+                    re_x += v.sx * cos(phase); im_x += v.sx * sin(phase);
+                    re_y += v.sy * cos(phase); im_y += v.sy * sin(phase);
+                }
+            }
+        }
+        g_direct += (re_x * re_x + im_x * im_x + re_y * re_y + im_y * im_y) / Vol / 3.0;
+    }
+    if (fabs(g - g_direct) < 1e-9 * g_direct) {
+        fprintf(stdout, "Third test passed! G(k_min) = %lf, direct sum on the sites = %lf\n", g, g_direct);
+    } else {
+        fprintf(stdout, "Third test failed: G(k_min) = %lf, direct sum on the sites = %lf\n", g, g_direct);
+    }
+
+    free_lattice(lattice);
+    return EXIT_SUCCESS;
+}
@@ -0,0 +1,69 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/cluster.h"
+#include "../include/random.h"
+
+#define L 6
+#define N_STREAMS 2
+
+int main() {
+    int Vol = L * L * L;
+    Spin2D *lattice = allocate(L);
+    int *neighbors = allocate_neighbors(L);
+    ClusterWorkspace *workspace = allocate_cluster_workspace(L);
+    pcg32_random_t streams[N_STREAMS];
+    unsigned long int n_clusters;
+    int n, c, flag = 0;
+
+    if (lattice == NULL || neighbors == NULL || workspace == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    myrand_init(12345, 54);
+    myrand_init_streams(streams, N_STREAMS, 12345, 54);
+
+    // Ordered lattice at very large beta: every bond is active and there is a single cluster
+    for (n=0; n<Vol; n++) {
+        lattice[n].sx = 1.0;
+        lattice[n].sy = 0.0;
+    }
+    n_clusters = swendsen_wang(lattice, neighbors, 1e10, workspace, streams, N_STREAMS, NULL);
+    if (n_clusters != 1) {
+        fprintf(stdout, "Ordered lattice at large beta: %lu clusters instead of 1\n", n_clusters);
+        flag = 1;
+    }
+
+    // Infinite temperature: no active bonds, every site is a cluster by itself
+    initialize_lattice(lattice, L, &pcg32_random_state);
+    n_clusters = swendsen_wang(lattice, neighbors, 0.0, workspace, streams, N_STREAMS, NULL);
+    if (n_clusters != (unsigned long int)Vol) {
+        fprintf(stdout, "Beta = 0: %lu clusters instead of %d\n", n_clusters, Vol);
+        flag = 1;
+    }
+
+    // The reflections must keep the spins on the unit circle and every site must point to the root of its cluster
+    for (c=0; c<1000; c++) {
+        swendsen_wang(lattice, neighbors, 0.45, workspace, streams, N_STREAMS, NULL);
+    }
+    for (n=0; n<Vol; n++) {
+        if (fabs(scalar_product(spin_value(lattice[n]), spin_value(lattice[n])) - 1.0) > 1e-10 + 16 * SPIN_EPSILON) {
+            flag = 1;
+        }
+        if (workspace->parent[workspace->parent[n]] != workspace->parent[n] || workspace->parent[n] > n) {
+            flag = 1;
+        }
+    }
+
+    if (flag == 0) {
+        fprintf(stdout, "Test passed! Swendsen-Wang clusters are consistent.\n");
+    } else {
+        fprintf(stdout, "Test failed: Swendsen-Wang clusters are not consistent.\n");
+    }
+
+    free_lattice(lattice);
+    free(neighbors);
+    free_cluster_workspace(workspace);
+    return EXIT_SUCCESS;
+}
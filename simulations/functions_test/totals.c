@@ -0,0 +1,75 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/cluster.h"
+#include "../include/random.h"
+
+#define L 6
+#define N_SWEEPS 200
+
+// Difference between the running totals and the ones computed from scratch
+double totals_difference(LatticeTotals running, LatticeTotals exact) {
+    return fabs(running.energy - exact.energy) + fabs(running.magn.sx - exact.magn.sx) + fabs(running.magn.sy - exact.magn.sy);
+}
+
+int main() {
+    Spin2D *lattice = allocate(L);
+    int *neighbors = allocate_neighbors(L);
+    ClusterWorkspace *workspace = allocate_cluster_workspace(L);
+    Checkerboard *checkerboard = allocate_checkerboard(neighbors, L);
+    pcg32_random_t streams[1];
+    LatticeTotals totals;
+    double beta = 0.45, diff_metro, diff_micro, diff_wolff, diff_sw;
+    // The reflections change the energy only through the rounding of the stored spins, which the running totals
+    // do not follow: the tolerance grows with the number of updates and the precision of the storage
+    double tolerance = 1e-9 + N_SWEEPS * L * L * L * SPIN_EPSILON;
+    int sweep;
+
+    if (lattice == NULL || neighbors == NULL || workspace == NULL || checkerboard == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    myrand_init(12345, 54);
+    myrand_init_streams(streams, 1, 12345, 54);
+    initialize_lattice(lattice, L, &pcg32_random_state);
+
+    // Every update kernel must keep the running totals equal to the ones of the current configuration
+    totals = lattice_totals(lattice, neighbors, L);
+    for (sweep=0; sweep<N_SWEEPS; sweep++) {
+        metropolis_sweep(lattice, neighbors, L, 1.0, beta, (sweep%2==0) ? NULL : checkerboard, streams, &totals);
+    }
+    diff_metro = totals_difference(totals, lattice_totals(lattice, neighbors, L));
+
+    totals = lattice_totals(lattice, neighbors, L);
+    for (sweep=0; sweep<N_SWEEPS; sweep++) {
+        microcanonical_sweep(lattice, neighbors, L, (sweep%2==0) ? NULL : checkerboard, &totals);
+    }
+    diff_micro = totals_difference(totals, lattice_totals(lattice, neighbors, L));
+
+    totals = lattice_totals(lattice, neighbors, L);
+    for (sweep=0; sweep<N_SWEEPS; sweep++) {
+        wolff_sweep(lattice, neighbors, beta, workspace, streams, 10, &totals);
+    }
+    diff_wolff = totals_difference(totals, lattice_totals(lattice, neighbors, L));
+
+    totals = lattice_totals(lattice, neighbors, L);
+    for (sweep=0; sweep<N_SWEEPS; sweep++) {
+        swendsen_wang(lattice, neighbors, beta, workspace, streams, 1, &totals);
+    }
+    diff_sw = totals_difference(totals, lattice_totals(lattice, neighbors, L));
+
+    fprintf(stdout, "Differences after %d sweeps: Metropolis %.3e, microcanonical %.3e, Wolff %.3e, Swendsen-Wang %.3e\n",
+            N_SWEEPS, diff_metro, diff_micro, diff_wolff, diff_sw);
+    if (diff_metro < tolerance && diff_micro < tolerance && diff_wolff < tolerance && diff_sw < tolerance) {
+        fprintf(stdout, "Test passed! Running totals are consistent with the lattice.\n");
+    } else {
+        fprintf(stdout, "Test failed: running totals drifted away from the lattice.\n");
+    }
+
+    free_lattice(lattice);
+    free(neighbors);
+    free_cluster_workspace(workspace);
+    free_checkerboard(checkerboard);
+    return EXIT_SUCCESS;
+}
@@ -0,0 +1,49 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/random.h"
+#include "../include/tuning.h"
+
+#define N_SAMPLES 200000
+
+int main() {
+    double *series = (double *)malloc(N_SAMPLES * sizeof(double));
+    double phi = 0.9, tau, exact, u1, u2;
+    int n;
+
+    if (series == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    myrand_init(12345, 54);
+
+    // Constant series: no fluctuations, tau = 1/2
+    for (n=0; n<N_SAMPLES; n++) {
+        series[n] = 1.0;
+    }
+    tau = autocorrelation_time(series, N_SAMPLES);
+    if (tau == 0.5) {
+        fprintf(stdout, "First test passed! tau of a constant series = %lf\n", tau);
+    } else {
+        fprintf(stdout, "First test failed: tau of a constant series = %lf\n", tau);
+    }
+
+    // AR(1) process x_n = phi x_{n-1} + gaussian noise: rho(t) = phi^t and tau = (1 + phi) / (2 (1 - phi))
+    series[0] = 0.0;
+    for (n=1; n<N_SAMPLES; n++) {
+        u1 = 1.0 - myrand();
+        u2 = myrand();
+        series[n] = phi * series[n-1] + sqrt(-2.0 * log(u1)) * cos(2 * PI * u2);
+    }
+    tau = autocorrelation_time(series, N_SAMPLES);
+    exact = (1.0 + phi) / (2.0 * (1.0 - phi));
+    if (fabs(tau - exact) < 0.05 * exact) {
+        fprintf(stdout, "Second test passed! tau of the AR(1) series = %lf (exact %lf)\n", tau, exact);
+    } else {
+        fprintf(stdout, "Second test failed: tau of the AR(1) series = %lf (exact %lf)\n", tau, exact);
+    }
+
+    free(series);
+    return EXIT_SUCCESS;
+}
@@ -0,0 +1,58 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/cluster.h"
+#include "../include/random.h"
+
+#define L 6
+
+int main() {
+    int Vol = L * L * L;
+    Spin2D *lattice = allocate(L);
+    int *neighbors = allocate_neighbors(L);
+    ClusterWorkspace *workspace = allocate_cluster_workspace(L);
+    int n, c, size, flag = 0;
+
+    if (lattice == NULL || neighbors == NULL || workspace == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    myrand_init(12345, 54);
+
+    // Ordered lattice at very large beta: every bond is activated, the cluster is the whole lattice
+    for (n=0; n<Vol; n++) {
+        lattice[n].sx = 1.0;
+        lattice[n].sy = 0.0;
+    }
+    size = wolff_cluster(lattice, neighbors, 1e10, workspace, &pcg32_random_state, NULL);
+    if (size != Vol) {
+        fprintf(stdout, "Ordered lattice at large beta: cluster of %d sites instead of %d\n", size, Vol);
+        flag = 1;
+    }
+
+    // Random lattice: the reflections must keep the spins on the unit circle
+    initialize_lattice(lattice, L, &pcg32_random_state);
+    for (c=0; c<1000; c++) {
+        wolff_cluster(lattice, neighbors, 0.45, workspace, &pcg32_random_state, NULL);
+    }
+    for (n=0; n<Vol; n++) {
+        if (fabs(scalar_product(spin_value(lattice[n]), spin_value(lattice[n])) - 1.0) > 1e-10 + 16 * SPIN_EPSILON) {
+            flag = 1;
+        }
+        if (workspace->in_cluster[n] != 0) {
+            flag = 1; // flags not reset after the cluster
+        }
+    }
+
+    if (flag == 0) {
+        fprintf(stdout, "Test passed! Wolff clusters are consistent.\n");
+    } else {
+        fprintf(stdout, "Test failed: Wolff clusters are not consistent.\n");
+    }
+
+    free_lattice(lattice);
+    free(neighbors);
+    free_cluster_workspace(workspace);
+    return EXIT_SUCCESS;
+}
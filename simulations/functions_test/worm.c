@@ -0,0 +1,78 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/random.h"
+#include "../include/worm.h"
+
+#define L 4
+#define N_SWEEPS 40000
+
+int main() {
+    int Vol = L * L * L;
+    int *neighbors = allocate_neighbors(L);
+    Spin2D *lattice = allocate(L);
+    WormState *worm;
+    WormEstimators estimators = {0};
+    LatticeTotals totals;
+    double beta = 0.3, ratio[6], z[7] = {0.0}, t, max_diff = 0.0;
+    double E_worm, m2_worm, E_metro = 0.0, m2_metro = 0.0;
+    int n, k, sweep, n_int = 100000;
+
+    if (neighbors == NULL || lattice == NULL) {
+        fprintf(stderr, "Error: allocation failed.\n");
+        return EXIT_FAILURE;
+    }
+    myrand_init(12345, 54);
+
+    // I_n(beta) = (1/pi) int_0^pi exp(beta cos t) cos(n t) dt, with the midpoint rule
+    bessel_ratios(0.45, ratio, 5);
+    for (k=0; k<n_int; k++) {
+        t = (k + 0.5) * PI / n_int;
+        for (n=0; n<7; n++) {
+            z[n] += exp(0.45 * cos(t)) * cos(n * t);
+        }
+    }
+    for (n=0; n<6; n++) {
+        max_diff = fmax(max_diff, fabs(ratio[n] - z[n+1] / z[n]) / ratio[n]);
+    }
+    if (max_diff < 1e-7) {
+        fprintf(stdout, "First test passed! Bessel ratios with relative error %.3e.\n", max_diff);
+    } else {
+        fprintf(stdout, "First test failed: Bessel ratios with relative error %.3e.\n", max_diff);
+    }
+
+    // Energy and <m^2> of the worm estimators must agree with the ones of the spin representation
+    worm = allocate_worm(L, beta);
+    if (worm == NULL) {
+        return EXIT_FAILURE;
+    }
+    worm_steps(worm, neighbors, (unsigned long int)Vol * N_SWEEPS / 10, &pcg32_random_state, &estimators);
+    estimators = (WormEstimators){0};
+    worm_steps(worm, neighbors, (unsigned long int)Vol * N_SWEEPS, &pcg32_random_state, &estimators);
+    E_worm = estimators.energy / estimators.z_steps;
+    m2_worm = (double)estimators.steps / estimators.z_steps / Vol;
+
+    initialize_lattice(lattice, L, &pcg32_random_state);
+    totals = lattice_totals(lattice, neighbors, L);
+    for (sweep=0; sweep<N_SWEEPS + N_SWEEPS / 10; sweep++) {
+        metropolis_sweep(lattice, neighbors, L, 2.0, beta, NULL, &pcg32_random_state, &totals);
+        microcanonical_sweep(lattice, neighbors, L, NULL, &totals);
+        if (sweep >= N_SWEEPS / 10) {
+            E_metro += totals.energy / Vol / N_SWEEPS;
+            m2_metro += (totals.magn.sx * totals.magn.sx + totals.magn.sy * totals.magn.sy) / Vol / Vol / N_SWEEPS;
+        }
+    }
+    if (fabs(E_worm - E_metro) < 0.01 && fabs(m2_worm - m2_metro) < 0.03 * m2_metro) {
+        fprintf(stdout, "Second test passed! Worm: E = %lf, <m^2> = %lf; Metropolis: E = %lf, <m^2> = %lf.\n",
+                E_worm, m2_worm, E_metro, m2_metro);
+    } else {
+        fprintf(stdout, "Second test failed: worm: E = %lf, <m^2> = %lf; Metropolis: E = %lf, <m^2> = %lf.\n",
+                E_worm, m2_worm, E_metro, m2_metro);
+    }
+
+    free_worm(worm);
+    free_lattice(lattice);
+    free(neighbors);
+    return EXIT_SUCCESS;
+}
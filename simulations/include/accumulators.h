@@ -0,0 +1,35 @@
+#ifndef ACCUMULATORS_H
+#define ACCUMULATORS_H
+
+#include <stdio.h>
+#include "functions.h"
+
+// Observables accumulated during the simulation, in this order: |m|, m^2, m^4, energy per site and its square
+#define N_OBSERVABLES 5
+#define OBSERVABLE_NAMES {"absm", "m2", "m4", "epsilon", "epsilon2"}
+// Levels of the blocking hierarchy: level k has blocks of 2^k samples, enough for 2^40 samples
+#define BLOCKING_LEVELS 40
+
+// Streaming blocking analysis of a time series (Flyvbjerg-Petersen): each sample enters level 0, the means of
+// pairs of consecutive blocks of level k form the blocks of level k+1. Mean and variance of the blocks of every
+// level are updated with Welford's algorithm, so that the series itself is never stored
+typedef struct {
+    unsigned long int n_blocks[BLOCKING_LEVELS];   // completed blocks of each level
+    double mean[BLOCKING_LEVELS];                  // mean of the blocks of each level
+    double m2[BLOCKING_LEVELS];                    // sum of the squared deviations from the mean of the blocks
+    double pending[BLOCKING_LEVELS];               // block of level k waiting for its pair, if has_pending[k]
+    int has_pending[BLOCKING_LEVELS];
+} BlockingAccumulator;
+
+typedef struct {
+    BlockingAccumulator observables[N_OBSERVABLES];
+} Accumulators;
+
+void reset_accumulators(Accumulators *acc);
+void blocking_add(BlockingAccumulator *blocking, double value);
+double blocking_error(const BlockingAccumulator *blocking, int level);
+void accumulate_sample(Accumulators *acc, DoubleVector2D magn, double E_per_site);
+int write_summary(const char *file_name, const Accumulators *acc, int lattice_side, double beta, unsigned long int printing_step,
+                  unsigned long int skipped_samples);
+
+#endif
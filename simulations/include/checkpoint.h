@@ -0,0 +1,38 @@
+#ifndef CHECKPOINT_H
+#define CHECKPOINT_H
+
+#include "functions.h"
+#include "accumulators.h"
+#include "pcg32min.h"
+#include "measurements.h"
+
+// Version of the layout of the checkpoint files, increased whenever SimulationState changes
+#define CHECKPOINT_VERSION 4
+
+// State of a simulation of o2_mcmc that is not stored in the lattice nor in the random generators:
+// together with them it is enough to continue the Markov chain exactly as if it had never been interrupted
+typedef struct {
+    int lattice_side;
+    int n_streams;                            // number of the random streams of the threads saved after the global generator
+    int spin_size;                            // sizeof(spin_t), a checkpoint cannot be read with a different spin storage
+    double beta;
+    double alpha, epsilon;                    // parameters of the production, chosen by the tuning if it was enabled
+    unsigned long int complete_lattice_sweeps;
+    unsigned long int micro_full_lattice, metro_full_lattice;
+    unsigned long int wolff_steps, wolff_flipped, sw_steps, sw_clusters;
+    double percentage_micro_acc, percentage_metro_acc;
+    LatticeTotals totals;                     // running totals, saved to keep the same rounding of an uninterrupted run
+    long int data_size;                       // bytes of the data file written up to the checkpoint
+    long int stream_sizes[MAX_MEASUREMENT_STREAMS]; // bytes of the measurement streams written up to the checkpoint
+    Accumulators accumulators;                // streaming moments and blocking of the samples (zero if not used)
+} SimulationState;
+
+// Version of the layout of the configuration files (lattice only, used to start a simulation from a saved lattice)
+#define CONFIGURATION_VERSION 1
+
+int write_checkpoint(const char *file_name, const SimulationState *state, const Spin2D *lattice, const pcg32_random_t *streams);
+int read_checkpoint(const char *file_name, SimulationState *state, Spin2D *lattice, pcg32_random_t *streams);
+int write_configuration(const char *file_name, const Spin2D *lattice, int lattice_side, double beta);
+int read_configuration(const char *file_name, Spin2D *lattice, int lattice_side, double *beta);
+
+#endif
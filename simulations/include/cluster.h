@@ -0,0 +1,26 @@
+#ifndef CLUSTER_H
+#define CLUSTER_H
+
+#include "functions.h"
+
+// Work arrays of the cluster algorithms, allocated once and reused by every update
+typedef struct {
+    int volume;
+    int *cluster;              // Wolff: sites of the last cluster built, in the order they were added
+    unsigned char *in_cluster; // Wolff: 1 if the site belongs to the cluster being built, 0 otherwise
+    double *projection;        // Swendsen-Wang: projection of each spin on the direction of the embedded Ising model
+    unsigned char *bonds;      // Swendsen-Wang: 1 if the bond from site n in the forward direction d is active, at 3*n+d
+    int *parent;               // Swendsen-Wang: union-find forest, parent[n] <= n and roots are the smallest site of their cluster
+    unsigned char *flip;       // Swendsen-Wang: 1 if the cluster whose root is n has to be reflected
+} ClusterWorkspace;
+
+ClusterWorkspace *allocate_cluster_workspace(int lattice_side);
+void free_cluster_workspace(ClusterWorkspace *workspace);
+int wolff_cluster(Spin2D *lattice, int *neighbors, double beta, ClusterWorkspace *workspace, pcg32_random_t *rng,
+                  LatticeTotals *totals);
+unsigned long int wolff_sweep(Spin2D *lattice, int *neighbors, double beta, ClusterWorkspace *workspace,
+                              pcg32_random_t *rng, int n_clusters, LatticeTotals *totals);
+unsigned long int swendsen_wang(Spin2D *lattice, int *neighbors, double beta, ClusterWorkspace *workspace,
+                                pcg32_random_t *streams, int n_streams, LatticeTotals *totals);
+
+#endif
@@ -0,0 +1,43 @@
+#ifndef DATA_HEADER_H
+#define DATA_HEADER_H
+
+#include <stdio.h>
+#include <stdint.h>
+
+// Header of the binary data files: DATA_HEADER_SIZE bytes written before the samples, so that a file can be read
+// without knowing how it was produced. Layout (byte offset: field), numbers in the byte order given by dtype:
+//   0: magic "O2DATA" (8 chars)          8: uint32 version        12: uint32 header size (offset of the samples)
+//  16: int32 lattice_side               20: int32 number of columns
+//  24: uint64 printing_step             32: uint64 seed
+//  40: float64 beta                     48: float64 alpha          56: float64 epsilon
+//  64: dtype of the samples, numpy string (8 chars, e.g. "<f8")
+//  72: update_scheme (32 chars)        104: names of the columns separated by commas (256 chars)
+// The remaining bytes up to DATA_HEADER_SIZE are zero, reserved for future fields.
+// The samples follow as rows of n_cols values, one row every printing_step complete sweeps
+#define DATA_MAGIC "O2DATA"
+#define DATA_VERSION 1
+#define DATA_HEADER_SIZE 512
+#define DATA_UPDATE_SCHEME_LENGTH 32
+#define DATA_COLUMNS_LENGTH 256
+
+// Names of the columns written by o2_mcmc and o2_tempering
+#define DATA_COLUMNS "mx,my,energy_per_site"
+#define DATA_N_COLS 3
+
+typedef struct {
+    int lattice_side;
+    int n_cols;
+    uint64_t printing_step;
+    uint64_t seed;
+    double beta;
+    double alpha;
+    double epsilon;
+    char update_scheme[DATA_UPDATE_SCHEME_LENGTH];
+    char columns[DATA_COLUMNS_LENGTH];
+} DataHeader;
+
+int write_data_header(FILE *fp, const DataHeader *header);
+int write_text_header(FILE *fp, const DataHeader *header);
+void format_beta(double beta, char *text, size_t size);
+
+#endif
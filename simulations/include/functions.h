@@ -1,22 +1,132 @@
 #ifndef FUNCTIONS
 #define FUNCTIONS
 
+#include <float.h>
+#include "pcg32min.h"
+
 #define PI 3.141592653589793
 
+// Number of nearest neighbors of a site in the 3D cubic lattice
+#define N_NEIGHBORS 6
+
+// Order of the directions in the neighbor table: the three forward neighbors come first,
+// so that looping on the first three entries visits every bond exactly once
+enum {I_PLUS, J_PLUS, K_PLUS, I_MINUS, J_MINUS, K_MINUS};
+
 typedef struct {
     double sx;
     double sy;
 } DoubleVector2D;
 
+// Storage of the spins of the lattice. By default the components are doubles (16 B per site); compiling with
+// -DFLOAT_SPINS they are stored as floats (8 B per site), so that the lattices up to L ~ 64 fit in the L2/L3 cache.
+// The new spins and the variations of the observables are computed in double precision, only the stored spins are rounded
+#ifdef FLOAT_SPINS
+typedef float spin_t;
+#define SPIN_STORAGE "float32"
+#define SPIN_EPSILON FLT_EPSILON
+#else
+typedef double spin_t;
+#define SPIN_STORAGE "float64"
+#define SPIN_EPSILON DBL_EPSILON
+#endif
+
+typedef struct {
+    spin_t sx;
+    spin_t sy;
+} Spin2D;
+
+// Running totals of the observables of a lattice: total energy and total magnetization (sum of the spins).
+// The update kernels add to them the variation due to each accepted move
+typedef struct {
+    double energy;
+    DoubleVector2D magn;
+} LatticeTotals;
+
+// Partition of the lattice sites in classes (colors) such that no two nearest neighbors share
+// the same color: the sites of one color can be updated at the same time by different threads.
+// For even lattice_side these are the two sublattices of the checkerboard (red/black); for odd
+// lattice_side the periodic boundary conditions break the bipartition and a few extra colors are needed.
+// The sites of color c are sites[offsets[c]], ..., sites[offsets[c+1]-1].
+typedef struct {
+    int n_colors;
+    int *offsets;
+    int *sites;
+} Checkerboard;
+
+// R independent replicas of the lattice stored interleaved (structure of arrays): the components of the spin of
+// replica r at site n are sx[n*R + r] and sy[n*R + r], so that the update of a site runs on all the replicas in
+// the SIMD lanes. Each replica has its own PCG32 generator (state and increment kept in arrays for the same reason),
+// its own beta in the sweeps and its own running totals. Best with R a multiple of the SIMD width (4 or 8)
+typedef struct {
+    int n_replicas;
+    int lattice_side;
+    spin_t *sx;
+    spin_t *sy;
+    uint64_t *rng_state;
+    uint64_t *rng_inc;
+    double *energy;                 // running totals of each replica: energy and magnetization (sum of the spins)
+    double *magn_x;
+    double *magn_y;
+    double *delta;                  // workspace of the sweeps: variations of energy, mx and my of each replica
+    unsigned long int *accepted;    // accepted moves of each replica in the last sweep
+} ReplicaLattice;
+
+// Spin of the lattice converted to double precision
+static inline DoubleVector2D spin_value(Spin2D s) {
+    DoubleVector2D v = {s.sx, s.sy};
+    return v;
+}
+
+// Stores the new value (sx, sy) of a spin, bringing its modulus back to 1 with one Newton step for 1/sqrt:
+// if |s|^2 = 1 + d the stored spin has |s|^2 = 1 + O(d^2). The kernels only change spins by rotations and
+// reflections, so d is of the order of the rounding error and the modulus stays 1 within the precision
+// of spin_t without any sqrt or division, nor a normalization pass on the whole lattice. Also in double
+// precision the stored spins differ at the rounding level from the ones of the normalization pass, so the
+// chains are not bit-identical to the ones of the old versions: they agree statistically
+static inline void store_spin(Spin2D *s, double sx, double sy) {
+    double c = 1.5 - 0.5 * (sx * sx + sy * sy);
+    s->sx = (spin_t)(c * sx);
+    s->sy = (spin_t)(c * sy);
+}
+
+// Index of the site (i, j, k) in the contiguous lattice array
+static inline int site_index(int i, int j, int k, int lattice_side) {
+    return (i * lattice_side + j) * lattice_side + k;
+}
+
 double scalar_product(DoubleVector2D s1, DoubleVector2D s2);
 int normalization(DoubleVector2D *s);
-void free_lattice(DoubleVector2D ***lattice, int lattice_side);
-DoubleVector2D ***allocate(int lattice_side);
-DoubleVector2D* magnetization(DoubleVector2D ***lattice, int lattice_side);
-double energy_per_site(DoubleVector2D ***lattice, int lattice_side);
-int initialize_lattice(DoubleVector2D ***lattice, int lattice_side);
-int microcanonical(DoubleVector2D ***lattice, int i, int j, int k, int lattice_side);
-int local_metropolis(DoubleVector2D ***lattice, int i, int j, int k, int lattice_side, double alpha, double beta);
+void free_lattice(Spin2D *lattice);
+Spin2D *allocate(int lattice_side);
+int spin_component_size(void);
+int *allocate_neighbors(int lattice_side);
+DoubleVector2D magnetization(Spin2D *lattice, int lattice_side);
+double structure_factor_kmin(Spin2D *lattice, int lattice_side);
+double energy_per_site(Spin2D *lattice, int *neighbors, int lattice_side);
+void helicity_sums(Spin2D *lattice, int *neighbors, int lattice_side, double *bond_cos, double *bond_sin2);
+LatticeTotals lattice_totals(Spin2D *lattice, int *neighbors, int lattice_side);
+int initialize_lattice(Spin2D *lattice, int lattice_side, pcg32_random_t *rng);
+int microcanonical(Spin2D *lattice, int *neighbors, int site, LatticeTotals *delta);
+int local_metropolis(Spin2D *lattice, int *neighbors, int site, double alpha, double beta, pcg32_random_t *rng, LatticeTotals *delta);
+int local_heat_bath(Spin2D *lattice, int *neighbors, int site, double beta, pcg32_random_t *rng, LatticeTotals *delta);
+Checkerboard *allocate_checkerboard(int *neighbors, int lattice_side);
+void free_checkerboard(Checkerboard *checkerboard);
+unsigned long int metropolis_sweep(Spin2D *lattice, int *neighbors, int lattice_side, double alpha, double beta,
+                                   const Checkerboard *checkerboard, pcg32_random_t *streams, LatticeTotals *totals);
+unsigned long int heat_bath_sweep(Spin2D *lattice, int *neighbors, int lattice_side, double beta,
+                                  const Checkerboard *checkerboard, pcg32_random_t *streams, LatticeTotals *totals);
+unsigned long int microcanonical_sweep(Spin2D *lattice, int *neighbors, int lattice_side, const Checkerboard *checkerboard,
+                                       LatticeTotals *totals);
+ReplicaLattice *allocate_replicas(int lattice_side, int n_replicas);
+void free_replicas(ReplicaLattice *replicas);
+void seed_replicas(ReplicaLattice *replicas, unsigned long int initstate, unsigned long int initseq);
+void initialize_replicas(ReplicaLattice *replicas);
+void get_replica(const ReplicaLattice *replicas, int r, Spin2D *lattice);
+void set_replica(ReplicaLattice *replicas, int r, const Spin2D *lattice);
+void replica_totals(ReplicaLattice *replicas, int *neighbors);
+unsigned long int metropolis_sweep_replicas(ReplicaLattice *replicas, int *neighbors, double alpha, const double *betas);
+unsigned long int microcanonical_sweep_replicas(ReplicaLattice *replicas, int *neighbors);
 int read_parameter(FILE *fp, char *param_name, char *param_type, void *value);
 
 #endif
@@ -0,0 +1,41 @@
+#ifndef MEASUREMENTS_H
+#define MEASUREMENTS_H
+
+#include <stdio.h>
+#include "data_header.h"
+
+// Observables measured with their own cadence: each group is written to its own stream, a file named after the
+// data file with the extension of the group (e.g. data.bin.sf), with a data header whose printing_step is the
+// number of complete sweeps between two measurements of the group. The rows of the data file (mx, my, energy,
+// cheap enough to be written every sweep) stay in the data file, expensive observables go to the streams
+#define MAX_MEASUREMENT_STREAMS 4   // streams whose size is saved in the checkpoints
+
+// Structure factor: G(0) = V m^2 and G(k_min) of structure_factor_kmin (functions.h), for the second-moment
+// correlation length
+#define STRUCTURE_FACTOR_EXTENSION "sf"
+#define STRUCTURE_FACTOR_COLUMNS "g_0,g_kmin"
+#define STRUCTURE_FACTOR_N_COLS 2
+// Helicity modulus: bond_cos and bond_sin2 of helicity_sums (functions.h), Upsilon = <bond_cos> - beta <bond_sin2>
+#define HELICITY_EXTENSION "hel"
+#define HELICITY_COLUMNS "bond_cos,bond_sin2"
+#define HELICITY_N_COLS 2
+
+typedef struct {
+    const char *name;               // name of the group, used in the report of the times
+    const char *extension;          // extension added to the name of the data file
+    const char *columns;            // names of the columns separated by commas, as in the data header
+    unsigned long int step;         // complete sweeps between two measurements, 0: the group is not measured
+    int n_cols;
+    int text;                       // rows written as text lines instead of doubles
+    FILE *fp;
+    unsigned long int rows;         // rows written by this run
+    double seconds;                 // wall-clock time spent measuring and writing the group
+} MeasurementStream;
+
+int open_measurement_stream(MeasurementStream *stream, const char *data_name, const DataHeader *header, long int resume_size);
+int write_measurement(MeasurementStream *stream, const double *values);
+long int sync_measurement_stream(MeasurementStream *stream);
+int close_measurement_stream(MeasurementStream *stream);
+double wall_seconds(void);
+
+#endif
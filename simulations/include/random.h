@@ -1,10 +1,33 @@
 #ifndef RANDOM_H
 #define RANDOM_H
 
+#include"pcg32min.h"
+
+// 2^-32: a 32 bit output of the generator times MYRAND_NORM is in [0,1)
+#define MYRAND_NORM (1.0/4294967296.0)
+
 // initialize the random number generator
 void myrand_init(unsigned long int initstate, unsigned long int initseq);
 
+// initialize n_streams independent generators, one for each thread, using distinct sequences
+void myrand_init_streams(pcg32_random_t *streams, int n_streams, unsigned long int initstate, unsigned long int initseq);
+
+// initialize n_streams generators on the sequence of master, stream i starting i*stride steps after it (jump-ahead)
+void myrand_split_streams(pcg32_random_t *streams, int n_streams, const pcg32_random_t *master, uint64_t stride);
+
+// advance the generator by delta steps in O(log delta) operations (delta = 2^64 - n goes back by n steps)
+void myrand_advance(pcg32_random_t *rng, uint64_t delta);
+
+// seed from the clock (seconds and nanoseconds) and the process id, different for jobs started in the same second
+unsigned long int myrand_seed_from_clock(void);
+
 // return a random number in [0,1)
 double myrand(void);
 
+// return a random number in [0,1) drawn from the given generator
+double myrand_r(pcg32_random_t *rng);
+
+// fill out with n random numbers in [0,1) drawn from the given generator, the same of n calls of myrand_r
+void myrand_fill(pcg32_random_t *rng, double *out, int n);
+
 #endif
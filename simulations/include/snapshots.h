@@ -0,0 +1,58 @@
+#ifndef SNAPSHOTS_H
+#define SNAPSHOTS_H
+
+#include <stdio.h>
+#include <stdint.h>
+#include <pthread.h>
+#include "functions.h"
+
+// Archive of the configurations of a run: SNAPSHOT_HEADER_SIZE bytes of header followed by the snapshots, each one
+// the whole lattice in the order of the sites (index (i * L + j) * L + k), so that the file can be memory-mapped
+// as an array of shape (n, L, L, L, 2), or (n, L, L, L) for the angles. Layout of the header (byte offset: field):
+//   0: magic "O2SNAP" (8 chars)          8: uint32 version        12: uint32 header size (offset of the snapshots)
+//  16: int32 lattice_side               20: uint32 bytes of a snapshot
+//  24: uint64 snapshot_step             32: uint64 seed          40: float64 beta
+//  48: dtype of the values, numpy string (8 chars, e.g. "<f4")     56: storage (16 chars)
+// Storages: "float64" and "float32" write the two components of the spins, "angle16" the angle atan2(sy, sx)
+// as an int16 q, with theta = q * pi / 32768 (resolution 1e-4, a quarter of the size of float64)
+#define SNAPSHOT_MAGIC "O2SNAP"
+#define SNAPSHOT_VERSION 1
+#define SNAPSHOT_HEADER_SIZE 512
+#define SNAPSHOT_STORAGE_LENGTH 16
+// Snapshots are handed to the writer thread in chunks of about SNAPSHOT_CHUNK_BYTES (at least one snapshot)
+#define SNAPSHOT_CHUNK_BYTES (4 << 20)
+
+typedef enum {SNAPSHOT_FLOAT64, SNAPSHOT_FLOAT32, SNAPSHOT_ANGLE16} SnapshotStorage;
+
+// Writer of an archive with a background thread and two buffers: the simulation copies the lattice into the
+// active buffer, and when it holds a whole chunk the buffer goes to the thread, which converts it to the storage
+// and appends it to the file while the other buffer is filled. The simulation only waits (waits += 1) when a
+// chunk is full before the thread has written the previous one
+typedef struct {
+    FILE *fp;
+    int lattice_side;
+    SnapshotStorage storage;
+    size_t snapshot_bytes;          // bytes of a snapshot in the file
+    int chunk_snapshots;            // snapshots in a chunk
+    Spin2D *buffers[2];             // copies of the lattices, chunk_snapshots each
+    unsigned char *encoded;         // workspace of the thread: the chunk converted to the storage
+    int active;                     // buffer filled by the simulation
+    int filled;                     // snapshots in the active buffer
+    int pending;                    // snapshots of the other buffer still to be written (0: the thread is idle)
+    int stop;                       // set by close_snapshot_writer, the thread ends after the pending chunk
+    int failed;                     // set by the thread if a write fails
+    unsigned long int written;      // snapshots in the file, the ones already there when continuing an archive included
+    unsigned long int waits;
+    pthread_t thread;
+    pthread_mutex_t lock;
+    pthread_cond_t cond;
+} SnapshotWriter;
+
+int parse_snapshot_storage(const char *name, SnapshotStorage *storage);
+SnapshotWriter *open_snapshot_writer(const char *file_name, int lattice_side, SnapshotStorage storage,
+                                     unsigned long int snapshot_step, unsigned long int seed, double beta, long int n_keep);
+int add_snapshot(SnapshotWriter *writer, const Spin2D *lattice);
+int flush_snapshots(SnapshotWriter *writer);
+int close_snapshot_writer(SnapshotWriter *writer);
+
+#endif
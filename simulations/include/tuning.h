@@ -0,0 +1,50 @@
+#ifndef TUNING_H
+#define TUNING_H
+
+#include <stdio.h>
+#include "functions.h"
+#include "cluster.h"
+
+// Candidates of the tuning: Metropolis acceptances used to calibrate alpha and values of epsilon
+#define TUNING_N_ACCEPTANCES 3
+#define TUNING_ACCEPTANCES {0.3, 0.5, 0.7}
+#define TUNING_N_EPSILONS 5
+#define TUNING_EPSILONS {0.05, 0.1, 0.2, 0.5, 1.0}
+// Sweeps of Metropolis used to calibrate alpha for each target acceptance (at most)
+#define TUNING_CALIBRATION_SWEEPS 100
+// Window of the integrated autocorrelation time: the sum stops at the first t >= TAU_WINDOW_FACTOR * tau(t) (Sokal)
+#define TAU_WINDOW_FACTOR 6.0
+
+// Everything needed to perform the updates of o2_mcmc, with the same generators: the choice between the two steps
+// of the mix and the lexicographic Metropolis sweeps and Wolff clusters use rng (the global generator), the
+// checkerboard sweeps and Swendsen-Wang the streams of the threads
+typedef struct {
+    Spin2D *lattice;
+    int *neighbors;
+    int lattice_side;
+    double beta;
+    const char *update_scheme;
+    const Checkerboard *checkerboard;
+    ClusterWorkspace *workspace;
+    int wolff_clusters;
+    pcg32_random_t *rng;
+    pcg32_random_t *streams;
+    int n_streams;
+} UpdateContext;
+
+// Result of the tuning window of a candidate
+typedef struct {
+    double alpha;
+    double epsilon;
+    double acceptance;          // mean acceptance of the Metropolis sweeps in the window (-1 if there were none)
+    double tau;                 // integrated autocorrelation time of |m|, in sweeps
+    double seconds_per_sweep;   // CPU time
+    double cost;                // CPU seconds per independent sample, 2 * tau * seconds_per_sweep
+} TuningCandidate;
+
+double mixed_sweep(const UpdateContext *context, double alpha, double epsilon, LatticeTotals *totals);
+double autocorrelation_time(const double *series, int n);
+int tune_parameters(const UpdateContext *context, unsigned long int tuning_sweeps, double *alpha, double *epsilon,
+                    LatticeTotals *totals, FILE *log);
+
+#endif
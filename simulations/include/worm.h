@@ -0,0 +1,48 @@
+#ifndef WORM_H
+#define WORM_H
+
+#include "functions.h"
+
+// Largest |J| of a bond current: moves beyond it are rejected. At the betas of the XY transition the weight of a
+// current decays as (beta/2)^|J| / |J|!, so the bound is never reached
+#define WORM_MAX_CURRENT 64
+
+// Names of the columns of the data files written by o2_worm: estimators measured in the closed-loop sector
+#define WORM_DATA_COLUMNS "energy_per_site,m2,winding2"
+#define WORM_DATA_N_COLS 3
+
+// State of the worm algorithm in the current (high temperature) representation of the XY model: with
+// exp(beta cos x) = sum_J I_J(beta) exp(i J x) the integration on the angles leaves integer currents J on the
+// bonds, conserved at every site, with weight prod_b I_{J_b}(beta). The worm has two ends, head and tail, where
+// the conservation is violated by +-1: it samples the correlation function <cos(theta_head - theta_tail)>, and
+// head == tail is the closed-loop (Z) sector, the configurations of the partition function
+typedef struct {
+    int lattice_side;
+    int volume;
+    double beta;
+    int *current;               // J of the bond from site n to its forward neighbor in direction d, at 3*n+d
+    int head, tail;             // ends of the worm
+    long int flux[3];           // sum of the currents of the bonds of each direction: L times the winding numbers in the Z sector
+    unsigned long int n_bonds[WORM_MAX_CURRENT + 1];  // number of bonds with |J| = n, to compute the energy without rounding drift
+    int max_current;            // largest |J| reached, the energy is summed up to it
+    double ratio[WORM_MAX_CURRENT + 1];               // I_{n+1}(beta) / I_n(beta)
+} WormState;
+
+// Estimators accumulated by the worm steps between two samples
+typedef struct {
+    unsigned long int steps;    // worm steps
+    unsigned long int z_steps;  // steps starting in the Z sector: steps / z_steps = chi = V <m^2>
+    double energy;              // sum of the energy per site of the Z configurations
+    double winding2;            // sum of W_x^2 + W_y^2 + W_z^2 of the Z configurations
+} WormEstimators;
+
+WormState *allocate_worm(int lattice_side, double beta);
+void free_worm(WormState *worm);
+void bessel_ratios(double beta, double *ratio, int n_max);
+double worm_energy_per_site(const WormState *worm);
+unsigned long int worm_steps(WormState *worm, int *neighbors, unsigned long int n_steps, pcg32_random_t *rng,
+                             WormEstimators *estimators);
+unsigned long int worm_closed_loops(WormState *worm, int *neighbors, unsigned long int n_loops, pcg32_random_t *rng,
+                                    WormEstimators *estimators);
+
+#endif
@@ -0,0 +1,96 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/accumulators.h"
+
+
+// Empties all the accumulators
+void reset_accumulators(Accumulators *acc) {
+    memset(acc, 0, sizeof(Accumulators));
+}
+
+
+// Adds a sample to level 0 of the blocking hierarchy, propagating the completed pairs to the upper levels
+void blocking_add(BlockingAccumulator *blocking, double value) {
+    int k;
+    double delta;
+
+    for (k=0; k<BLOCKING_LEVELS; k++) {
+        // Welford update of the blocks of level k
+        blocking->n_blocks[k] += 1;
+        delta = value - blocking->mean[k];
+        blocking->mean[k] += delta / (double)blocking->n_blocks[k];
+        blocking->m2[k] += delta * (value - blocking->mean[k]);
+        if (!blocking->has_pending[k]) {
+            blocking->pending[k] = value;
+            blocking->has_pending[k] = 1;
+            return;
+        }
+        // The pair is complete: its mean is a new block of level k+1
+        value = 0.5 * (blocking->pending[k] + value);
+        blocking->has_pending[k] = 0;
+    }
+}
+
+
+// Standard error of the mean estimated from the blocks of the given level, sqrt(var_blocks / (n_blocks - 1)).
+// For blocks longer than the autocorrelation time it no longer depends on the level. Returns -1 if the level
+// has less than 2 blocks
+double blocking_error(const BlockingAccumulator *blocking, int level) {
+    unsigned long int n = blocking->n_blocks[level];
+    if (n < 2) {
+        return -1.0;
+    }
+    return sqrt(blocking->m2[level] / (double)n / (double)(n - 1));
+}
+
+
+// Adds a sample of the simulation: magnetization per site and energy per site
+void accumulate_sample(Accumulators *acc, DoubleVector2D magn, double E_per_site) {
+    double m2 = magn.sx * magn.sx + magn.sy * magn.sy;
+    blocking_add(&acc->observables[0], sqrt(m2));
+    blocking_add(&acc->observables[1], m2);
+    blocking_add(&acc->observables[2], m2 * m2);
+    blocking_add(&acc->observables[3], E_per_site);
+    blocking_add(&acc->observables[4], E_per_site * E_per_site);
+}
+
+
+// Writes the summary of the accumulators as a text table, one row for each observable and level with at least
+// 2 blocks: observable, level, block size (samples), number of blocks, mean of all the samples, error from the
+// blocks of that level. The file is replaced only when completely written
+int write_summary(const char *file_name, const Accumulators *acc, int lattice_side, double beta, unsigned long int printing_step,
+                  unsigned long int skipped_samples) {
+    const char *names[N_OBSERVABLES] = OBSERVABLE_NAMES;
+    char tmp_name[256];
+    int i, k;
+    FILE *fp;
+
+    if (snprintf(tmp_name, sizeof(tmp_name), "%s.tmp", file_name) >= (int)sizeof(tmp_name)) {
+        fprintf(stderr, "Summary file name too long: %s\n", file_name);
+        return EXIT_FAILURE;
+    }
+    fp = fopen(tmp_name, "w");
+    if (fp == NULL) {
+        fprintf(stderr, "Error opening summary file %s\n", tmp_name);
+        return EXIT_FAILURE;
+    }
+    fprintf(fp, "# lattice_side %d\n# beta %.15lf\n# printing_step %lu\n# skipped_samples %lu\n# samples %lu\n",
+            lattice_side, beta, printing_step, skipped_samples, acc->observables[0].n_blocks[0]);
+    fprintf(fp, "# observable level block_size n_blocks mean error\n");
+    for (i=0; i<N_OBSERVABLES; i++) {
+        const BlockingAccumulator *blocking = &acc->observables[i];
+        for (k=0; k<BLOCKING_LEVELS && blocking->n_blocks[k]>=2; k++) {
+            fprintf(fp, "%s %d %lu %lu %.15e %.15e\n", names[i], k, 1UL << k, blocking->n_blocks[k], blocking->mean[0],
+                    blocking_error(blocking, k));
+        }
+    }
+    if (fclose(fp) != 0 || rename(tmp_name, file_name) != 0) {
+        fprintf(stderr, "Error writing summary file %s\n", file_name);
+        remove(tmp_name);
+        return EXIT_FAILURE;
+    }
+    return EXIT_SUCCESS;
+}
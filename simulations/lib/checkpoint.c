@@ -0,0 +1,171 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+#include "../include/functions.h"
+#include "../include/checkpoint.h"
+#include "../include/pcg32min.h"
+
+#define CHECKPOINT_MAGIC "O2CHKPT"
+#define CONFIGURATION_MAGIC "O2CONF"
+#define MAX_LENGTH 256
+
+
+// Writes the checkpoint of a simulation: state, global generator, the state->n_streams generators of the threads
+// and the lattice. The file is first written to file_name.tmp, flushed to disk and then renamed over file_name,
+// so that a job killed while writing always leaves the previous checkpoint intact
+int write_checkpoint(const char *file_name, const SimulationState *state, const Spin2D *lattice, const pcg32_random_t *streams) {
+    char tmp_name[MAX_LENGTH];
+    int version = CHECKPOINT_VERSION, failed = 0;
+    size_t Vol = (size_t)state->lattice_side * state->lattice_side * state->lattice_side;
+    FILE *fp;
+
+    if (snprintf(tmp_name, MAX_LENGTH, "%s.tmp", file_name) >= MAX_LENGTH) {
+        fprintf(stderr, "Checkpoint file name too long: %s\n", file_name);
+        return EXIT_FAILURE;
+    }
+    fp = fopen(tmp_name, "wb");
+    if (fp == NULL) {
+        fprintf(stderr, "Error opening checkpoint file %s\n", tmp_name);
+        return EXIT_FAILURE;
+    }
+    failed |= fwrite(CHECKPOINT_MAGIC, sizeof(char), sizeof(CHECKPOINT_MAGIC), fp) != sizeof(CHECKPOINT_MAGIC);
+    failed |= fwrite(&version, sizeof(int), 1, fp) != 1;
+    failed |= fwrite(state, sizeof(SimulationState), 1, fp) != 1;
+    failed |= fwrite(&pcg32_random_state, sizeof(pcg32_random_t), 1, fp) != 1;
+    failed |= fwrite(streams, sizeof(pcg32_random_t), (size_t)state->n_streams, fp) != (size_t)state->n_streams;
+    failed |= fwrite(lattice, sizeof(Spin2D), Vol, fp) != Vol;
+    failed |= fflush(fp) != 0;
+    failed |= fsync(fileno(fp)) != 0;
+    failed |= fclose(fp) != 0;
+    if (failed || rename(tmp_name, file_name) != 0) {
+        fprintf(stderr, "Error writing checkpoint file %s\n", file_name);
+        remove(tmp_name);
+        return EXIT_FAILURE;
+    }
+    return EXIT_SUCCESS;
+}
+
+
+// Reads a checkpoint written by write_checkpoint. On input state must hold lattice_side, n_streams, spin_size
+// and beta of the current simulation: a checkpoint of a different simulation is refused before reading the lattice
+int read_checkpoint(const char *file_name, SimulationState *state, Spin2D *lattice, pcg32_random_t *streams) {
+    char magic[sizeof(CHECKPOINT_MAGIC)];
+    int version;
+    size_t Vol = (size_t)state->lattice_side * state->lattice_side * state->lattice_side;
+    SimulationState saved;
+    pcg32_random_t saved_global;
+    FILE *fp = fopen(file_name, "rb");
+
+    if (fp == NULL) {
+        fprintf(stderr, "Error opening checkpoint file %s\n", file_name);
+        return EXIT_FAILURE;
+    }
+    if (fread(magic, sizeof(char), sizeof(magic), fp) != sizeof(magic) || memcmp(magic, CHECKPOINT_MAGIC, sizeof(magic)) != 0 ||
+        fread(&version, sizeof(int), 1, fp) != 1 || version != CHECKPOINT_VERSION ||
+        fread(&saved, sizeof(SimulationState), 1, fp) != 1) {
+        fprintf(stderr, "%s is not a valid checkpoint file (version %d)\n", file_name, CHECKPOINT_VERSION);
+        fclose(fp);
+        return EXIT_FAILURE;
+    }
+    if (saved.lattice_side != state->lattice_side || saved.n_streams != state->n_streams ||
+        saved.spin_size != state->spin_size || saved.beta != state->beta) {
+        fprintf(stderr, "Checkpoint %s belongs to another simulation: lattice_side = %d, beta = %lf, %d random streams, %d bytes spin components\n",
+                file_name, saved.lattice_side, saved.beta, saved.n_streams, saved.spin_size);
+        fclose(fp);
+        return EXIT_FAILURE;
+    }
+    if (fread(&saved_global, sizeof(pcg32_random_t), 1, fp) != 1 ||
+        fread(streams, sizeof(pcg32_random_t), (size_t)saved.n_streams, fp) != (size_t)saved.n_streams ||
+        fread(lattice, sizeof(Spin2D), Vol, fp) != Vol) {
+        fprintf(stderr, "Checkpoint file %s is truncated\n", file_name);
+        fclose(fp);
+        return EXIT_FAILURE;
+    }
+    fclose(fp);
+    pcg32_random_state = saved_global;
+    *state = saved;
+    return EXIT_SUCCESS;
+}
+
+
+// Writes the configuration of the lattice: magic, version, lattice_side, beta at which it was produced and the
+// spins as float64 pairs, whatever the spin storage, so that the file can be read by both the builds.
+// The file is written to file_name.tmp and renamed as the checkpoints
+int write_configuration(const char *file_name, const Spin2D *lattice, int lattice_side, double beta) {
+    char tmp_name[MAX_LENGTH];
+    int version = CONFIGURATION_VERSION, failed = 0, n;
+    int Vol = lattice_side * lattice_side * lattice_side;
+    double spin[2];
+    FILE *fp;
+
+    if (snprintf(tmp_name, MAX_LENGTH, "%s.tmp", file_name) >= MAX_LENGTH) {
+        fprintf(stderr, "Configuration file name too long: %s\n", file_name);
+        return EXIT_FAILURE;
+    }
+    fp = fopen(tmp_name, "wb");
+    if (fp == NULL) {
+        fprintf(stderr, "Error opening configuration file %s\n", tmp_name);
+        return EXIT_FAILURE;
+    }
+    failed |= fwrite(CONFIGURATION_MAGIC, sizeof(char), sizeof(CONFIGURATION_MAGIC), fp) != sizeof(CONFIGURATION_MAGIC);
+    failed |= fwrite(&version, sizeof(int), 1, fp) != 1;
+    failed |= fwrite(&lattice_side, sizeof(int), 1, fp) != 1;
+    failed |= fwrite(&beta, sizeof(double), 1, fp) != 1;
+    for (n=0; n<Vol && !failed; n++) {
+        spin[0] = lattice[n].sx;
+        spin[1] = lattice[n].sy;
+        failed |= fwrite(spin, sizeof(double), 2, fp) != 2;
+    }
+    failed |= fflush(fp) != 0;
+    failed |= fsync(fileno(fp)) != 0;
+    failed |= fclose(fp) != 0;
+    if (failed || rename(tmp_name, file_name) != 0) {
+        fprintf(stderr, "Error writing configuration file %s\n", file_name);
+        remove(tmp_name);
+        return EXIT_FAILURE;
+    }
+    return EXIT_SUCCESS;
+}
+
+
+// Reads a configuration written by write_configuration into lattice, which must have the same lattice_side.
+// The spins are stored with store_spin, so that a configuration of the float64 build brought to float32 has
+// unit modulus. The beta of the configuration is returned in beta (if not NULL)
+int read_configuration(const char *file_name, Spin2D *lattice, int lattice_side, double *beta) {
+    char magic[sizeof(CONFIGURATION_MAGIC)];
+    int version, saved_side, n;
+    int Vol = lattice_side * lattice_side * lattice_side;
+    double saved_beta, spin[2];
+    FILE *fp = fopen(file_name, "rb");
+
+    if (fp == NULL) {
+        fprintf(stderr, "Error opening configuration file %s\n", file_name);
+        return EXIT_FAILURE;
+    }
+    if (fread(magic, sizeof(char), sizeof(magic), fp) != sizeof(magic) || memcmp(magic, CONFIGURATION_MAGIC, sizeof(magic)) != 0 ||
+        fread(&version, sizeof(int), 1, fp) != 1 || version != CONFIGURATION_VERSION ||
+        fread(&saved_side, sizeof(int), 1, fp) != 1 || fread(&saved_beta, sizeof(double), 1, fp) != 1) {
+        fprintf(stderr, "%s is not a valid configuration file (version %d)\n", file_name, CONFIGURATION_VERSION);
+        fclose(fp);
+        return EXIT_FAILURE;
+    }
+    if (saved_side != lattice_side) {
+        fprintf(stderr, "Configuration %s has lattice_side = %d instead of %d\n", file_name, saved_side, lattice_side);
+        fclose(fp);
+        return EXIT_FAILURE;
+    }
+    for (n=0; n<Vol; n++) {
+        if (fread(spin, sizeof(double), 2, fp) != 2) {
+            fprintf(stderr, "Configuration file %s is truncated\n", file_name);
+            fclose(fp);
+            return EXIT_FAILURE;
+        }
+        store_spin(&lattice[n], spin[0], spin[1]);
+    }
+    fclose(fp);
+    if (beta != NULL) {
+        *beta = saved_beta;
+    }
+    return EXIT_SUCCESS;
+}
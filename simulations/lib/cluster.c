@@ -0,0 +1,253 @@
+#include <stdio.h>
+#include <math.h>
+#include <stdlib.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+#include "../include/functions.h"
+#include "../include/cluster.h"
+#include "../include/random.h"
+
+
+ClusterWorkspace *allocate_cluster_workspace(int lattice_side) {
+    int Vol = lattice_side * lattice_side * lattice_side;
+    ClusterWorkspace *workspace = (ClusterWorkspace *)malloc(sizeof(ClusterWorkspace));
+    if (workspace == NULL) {
+        fprintf(stderr, "Error in the allocation of the cluster workspace.\n");
+        return NULL;
+    }
+    workspace->volume = Vol;
+    workspace->cluster = (int *)malloc((size_t)Vol * sizeof(int));
+    workspace->in_cluster = (unsigned char *)calloc((size_t)Vol, sizeof(unsigned char));
+    workspace->projection = (double *)malloc((size_t)Vol * sizeof(double));
+    workspace->bonds = (unsigned char *)malloc((size_t)3 * Vol * sizeof(unsigned char));
+    workspace->parent = (int *)malloc((size_t)Vol * sizeof(int));
+    workspace->flip = (unsigned char *)malloc((size_t)Vol * sizeof(unsigned char));
+    if (workspace->cluster == NULL || workspace->in_cluster == NULL || workspace->projection == NULL ||
+        workspace->bonds == NULL || workspace->parent == NULL || workspace->flip == NULL) {
+        fprintf(stderr, "Error in the allocation of the cluster workspace.\n");
+        free_cluster_workspace(workspace);
+        return NULL;
+    }
+    return workspace;
+}
+
+
+void free_cluster_workspace(ClusterWorkspace *workspace) {
+    if (workspace == NULL) {
+        return;
+    }
+    free(workspace->cluster);
+    free(workspace->in_cluster);
+    free(workspace->projection);
+    free(workspace->bonds);
+    free(workspace->parent);
+    free(workspace->flip);
+    free(workspace);
+}
+
+
+// Reflection of the spin s with respect to the line orthogonal to the unit vector r: s -> s - 2 (s.r) r
+static inline void reflect(Spin2D *s, DoubleVector2D r) {
+    DoubleVector2D v = spin_value(*s);
+    double proj = scalar_product(v, r);
+    store_spin(s, v.sx - 2 * proj * r.sx, v.sy - 2 * proj * r.sy);
+}
+
+
+// Wolff single cluster update of the embedded Ising model (U. Wolff, PRL 62, 361 (1989)).
+// A random direction r and a random seed site are drawn; the cluster grows through the bonds <i,j>
+// with probability 1 - exp(-2 beta (s_i.r)(s_j.r)) when (s_i.r)(s_j.r) > 0, and all its spins are
+// reflected with respect to the line orthogonal to r. Returns the size of the cluster, whose sites
+// are left in workspace->cluster. If totals is not NULL the variations of energy and magnetization are added to it
+int wolff_cluster(Spin2D *lattice, int *neighbors, double beta, ClusterWorkspace *workspace, pcg32_random_t *rng,
+                  LatticeTotals *totals) {
+    int *cluster = workspace->cluster;
+    unsigned char *in_cluster = workspace->in_cluster;
+    int size = 0, head = 0, site, next, d;
+    double phi, proj_site, proj_next, dE = 0.0, sum_proj = 0.0;
+    DoubleVector2D r;
+
+    // Random direction of the embedded Ising model
+    phi = 2 * PI * myrand_r(rng);
+    r.sx = cos(phi);
+    r.sy = sin(phi);
+
+    // Random seed site, flipped and added to the cluster
+    site = (int)(myrand_r(rng) * workspace->volume);
+    in_cluster[site] = 1;
+    cluster[size++] = site;
+    reflect(&lattice[site], r);
+
+    // The sites of the cluster are both the list of the cluster and the stack of the growth
+    while (head < size) {
+        site = cluster[head++];
+        // The spin has already been reflected, its projection before the flip has the opposite sign
+        proj_site = -scalar_product(spin_value(lattice[site]), r);
+        for (d=0; d<N_NEIGHBORS; d++) {
+            next = neighbors[N_NEIGHBORS*site + d];
+            if (in_cluster[next]) {
+                continue;
+            }
+            proj_next = scalar_product(spin_value(lattice[next]), r);
+            if (proj_site * proj_next > 0 && myrand_r(rng) < 1 - exp(-2 * beta * proj_site * proj_next)) {
+                in_cluster[next] = 1;
+                cluster[size++] = next;
+                reflect(&lattice[next], r);
+            }
+        }
+    }
+
+    // The reflection leaves the bonds inside the cluster unchanged, while the energy of a bond on the border
+    // changes by 2 (s_i.r)(s_j.r), with the projections before the update
+    if (totals != NULL) {
+        for (head=0; head<size; head++) {
+            site = cluster[head];
+            proj_site = -scalar_product(spin_value(lattice[site]), r);
+            sum_proj += proj_site;
+            for (d=0; d<N_NEIGHBORS; d++) {
+                next = neighbors[N_NEIGHBORS*site + d];
+                if (!in_cluster[next]) {
+                    dE += 2 * proj_site * scalar_product(spin_value(lattice[next]), r);
+                }
+            }
+        }
+        totals->energy += dE;
+        totals->magn.sx -= 2 * sum_proj * r.sx;
+        totals->magn.sy -= 2 * sum_proj * r.sy;
+    }
+
+    // Reset the flags for the next cluster
+    for (head=0; head<size; head++) {
+        in_cluster[cluster[head]] = 0;
+    }
+
+    return size;
+}
+
+
+// Sequence of n_clusters Wolff clusters. The number of clusters is fixed in advance: stopping when the
+// reflected spins reach a given amount (e.g. the volume) would make the measurement time depend on the
+// cluster sizes and bias the averages. Returns the number of reflected spins
+unsigned long int wolff_sweep(Spin2D *lattice, int *neighbors, double beta, ClusterWorkspace *workspace,
+                              pcg32_random_t *rng, int n_clusters, LatticeTotals *totals) {
+    unsigned long int flipped = 0;
+
+    for (int c=0; c<n_clusters; c++) {
+        flipped += wolff_cluster(lattice, neighbors, beta, workspace, rng, totals);
+    }
+    return flipped;
+}
+
+
+// Root of the tree containing site n, halving the path on the way up
+static inline int find_root(int *parent, int n) {
+    while (parent[n] != n) {
+        parent[n] = parent[parent[n]];
+        n = parent[n];
+    }
+    return n;
+}
+
+
+// Merges the trees of sites a and b, the smallest root becoming the root of the union
+static inline void merge(int *parent, int a, int b) {
+    int root_a = find_root(parent, a), root_b = find_root(parent, b);
+    if (root_a < root_b) {
+        parent[root_b] = root_a;
+    } else if (root_b < root_a) {
+        parent[root_a] = root_b;
+    }
+}
+
+
+// Swendsen-Wang update of the embedded Ising model (R. H. Swendsen and J.-S. Wang, PRL 58, 86 (1987)).
+// For a random direction r every bond <i,j> is activated with probability 1 - exp(-2 beta (s_i.r)(s_j.r))
+// when (s_i.r)(s_j.r) > 0, the clusters of active bonds are labeled with a union-find scan of the lattice
+// (Hoshen-Kopelman) and each of them is reflected with respect to the line orthogonal to r with probability 1/2.
+// The projections, the bond activation and the reflections are shared among n_streams OpenMP threads, thread t
+// drawing its random numbers from streams[t]; the labeling is serial. Returns the number of clusters.
+// If totals is not NULL the variations of energy and magnetization are added to it
+unsigned long int swendsen_wang(Spin2D *lattice, int *neighbors, double beta, ClusterWorkspace *workspace,
+                                pcg32_random_t *streams, int n_streams, LatticeTotals *totals) {
+    int Vol = workspace->volume;
+    double *projection = workspace->projection;
+    unsigned char *bonds = workspace->bonds, *flip = workspace->flip;
+    int *parent = workspace->parent;
+    int n, d;
+    unsigned long int n_clusters = 0;
+    double phi, dE = 0.0, sum_proj = 0.0;
+    DoubleVector2D r;
+
+    // Random direction of the embedded Ising model
+    phi = 2 * PI * myrand_r(&streams[0]);
+    r.sx = cos(phi);
+    r.sy = sin(phi);
+
+    // Bond activation: every site draws the bonds towards its three forward neighbors
+    #pragma omp parallel num_threads(n_streams)
+    {
+        int m, e, thread = 0;
+        double proj;
+        #ifdef _OPENMP
+        thread = omp_get_thread_num();
+        #endif
+        // Local copy of the generator, to avoid false sharing between the streams of different threads
+        pcg32_random_t rng = streams[thread];
+        #pragma omp for schedule(static)
+        for (m=0; m<Vol; m++) {
+            projection[m] = scalar_product(spin_value(lattice[m]), r);
+        }
+        #pragma omp for schedule(static)
+        for (m=0; m<Vol; m++) {
+            for (e=0; e<3; e++) {
+                proj = projection[m] * projection[neighbors[N_NEIGHBORS*m + e]];
+                bonds[3*m + e] = (proj > 0 && myrand_r(&rng) < 1 - exp(-2 * beta * proj));
+            }
+        }
+        streams[thread] = rng;
+    }
+
+    // Labeling of the clusters
+    for (n=0; n<Vol; n++) {
+        parent[n] = n;
+    }
+    for (n=0; n<Vol; n++) {
+        for (d=0; d<3; d++) {
+            if (bonds[3*n + d]) {
+                merge(parent, n, neighbors[N_NEIGHBORS*n + d]);
+            }
+        }
+    }
+    // Since parent[n] <= n, a single ordered pass points every site directly to its root
+    for (n=0; n<Vol; n++) {
+        parent[n] = parent[parent[n]];
+        if (parent[n] == n) {
+            flip[n] = (myrand_r(&streams[0]) < 0.5);
+            n_clusters += 1;
+        }
+    }
+
+    // Reflection of the clusters: the energy of a bond changes by 2 (s_i.r)(s_j.r) when only one of its sites is reflected
+    #pragma omp parallel for schedule(static) num_threads(n_streams) reduction(+:dE, sum_proj)
+    for (n=0; n<Vol; n++) {
+        int e, m;
+        for (e=0; e<3; e++) {
+            m = neighbors[N_NEIGHBORS*n + e];
+            if (flip[parent[n]] != flip[parent[m]]) {
+                dE += 2 * projection[n] * projection[m];
+            }
+        }
+        if (flip[parent[n]]) {
+            sum_proj += projection[n];
+            store_spin(&lattice[n], lattice[n].sx - 2 * projection[n] * r.sx, lattice[n].sy - 2 * projection[n] * r.sy);
+        }
+    }
+    if (totals != NULL) {
+        totals->energy += dE;
+        totals->magn.sx -= 2 * sum_proj * r.sx;
+        totals->magn.sy -= 2 * sum_proj * r.sy;
+    }
+
+    return n_clusters;
+}
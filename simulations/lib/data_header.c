@@ -0,0 +1,88 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <stdint.h>
+#include "../include/data_header.h"
+
+
+// Copies the field at the given offset of the header buffer
+static void put_field(unsigned char *buffer, size_t offset, const void *value, size_t size) {
+    memcpy(buffer + offset, value, size);
+}
+
+
+// Writes the binary header of a data file (see data_header.h for the layout). The samples are doubles
+// in the byte order of the machine, which is recorded in the dtype so that the reader does not need to guess it
+int write_data_header(FILE *fp, const DataHeader *header) {
+    unsigned char buffer[DATA_HEADER_SIZE];
+    uint32_t version = DATA_VERSION, header_size = DATA_HEADER_SIZE, one = 1;
+    char magic[8] = {0}, dtype[8] = {0};
+    char update_scheme[DATA_UPDATE_SCHEME_LENGTH] = {0}, columns[DATA_COLUMNS_LENGTH] = {0};
+
+    if (strlen(header->update_scheme) >= DATA_UPDATE_SCHEME_LENGTH || strlen(header->columns) >= DATA_COLUMNS_LENGTH) {
+        fprintf(stderr, "Update scheme or column names too long for the data header.\n");
+        return EXIT_FAILURE;
+    }
+    memset(buffer, 0, DATA_HEADER_SIZE);
+    strcpy(magic, DATA_MAGIC);
+    strcpy(dtype, (*(unsigned char *)&one == 1) ? "<f8" : ">f8");
+    strcpy(update_scheme, header->update_scheme);
+    strcpy(columns, header->columns);
+
+    put_field(buffer, 0, magic, sizeof(magic));
+    put_field(buffer, 8, &version, sizeof(uint32_t));
+    put_field(buffer, 12, &header_size, sizeof(uint32_t));
+    put_field(buffer, 16, &header->lattice_side, sizeof(int32_t));
+    put_field(buffer, 20, &header->n_cols, sizeof(int32_t));
+    put_field(buffer, 24, &header->printing_step, sizeof(uint64_t));
+    put_field(buffer, 32, &header->seed, sizeof(uint64_t));
+    put_field(buffer, 40, &header->beta, sizeof(double));
+    put_field(buffer, 48, &header->alpha, sizeof(double));
+    put_field(buffer, 56, &header->epsilon, sizeof(double));
+    put_field(buffer, 64, dtype, sizeof(dtype));
+    put_field(buffer, 72, update_scheme, sizeof(update_scheme));
+    put_field(buffer, 104, columns, sizeof(columns));
+
+    if (fwrite(buffer, 1, DATA_HEADER_SIZE, fp) != DATA_HEADER_SIZE) {
+        fprintf(stderr, "Error writing the header of the data file.\n");
+        return EXIT_FAILURE;
+    }
+    return EXIT_SUCCESS;
+}
+
+
+// Writes the same information as comment lines at the beginning of a text data file
+int write_text_header(FILE *fp, const DataHeader *header) {
+    char columns[DATA_COLUMNS_LENGTH];
+    int i;
+
+    fprintf(fp, "# %s version %d\n", DATA_MAGIC, DATA_VERSION);
+    fprintf(fp, "# lattice_side %d\n# printing_step %lu\n# seed %lu\n", header->lattice_side,
+            (unsigned long)header->printing_step, (unsigned long)header->seed);
+    fprintf(fp, "# beta %.15lf\n# alpha %.15lf\n# epsilon %.15lf\n# update_scheme %s\n", header->beta, header->alpha,
+            header->epsilon, header->update_scheme);
+    // Last comment line: the names of the columns separated by spaces
+    strcpy(columns, header->columns);
+    for (i=0; columns[i]!='\0'; i++) {
+        if (columns[i] == ',') {
+            columns[i] = ' ';
+        }
+    }
+    fprintf(fp, "# %s\n", columns);
+    return EXIT_SUCCESS;
+}
+
+
+// Writes beta as bc prints it with scale=5 in data_run.sh (e.g. .45127, without the zero before the point),
+// so that all the programs and driver scripts give the same name to the data file of a run
+void format_beta(double beta, char *text, size_t size) {
+    char digits[64];
+    snprintf(digits, sizeof(digits), "%.5lf", beta);
+    if (strncmp(digits, "0.", 2)==0) {
+        snprintf(text, size, "%s", digits + 1);
+    } else if (strncmp(digits, "-0.", 3)==0) {
+        snprintf(text, size, "-%s", digits + 2);
+    } else {
+        snprintf(text, size, "%s", digits);
+    }
+}
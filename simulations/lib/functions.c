@@ -2,6 +2,9 @@
 #include <math.h>
 #include <stdlib.h>
 #include <string.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 #include "../include/functions.h"
 #include "../include/random.h"
 
@@ -35,245 +38,835 @@ int normalization(DoubleVector2D *s) {
 
 
 
-// Function to free the memory of a 3D lattice of DoubleVector2D structures
-void free_lattice(DoubleVector2D ***lattice, int lattice_side) {
-    int i, j;
-    // Loop through each level to free memory in reverse order of allocation
-    for (i=0; i<lattice_side; i++) {
-        for (j=0; j<lattice_side; j++) {
-            free(lattice[i][j]); //Free each DoubleVector2D array at the third level
-        }
-        free(lattice[i]); //Free each DoubleVector2D* array at the second level
-    }
-    free(lattice); //Free the main array of DoubleVector2D**
+// Function to free the memory of the contiguous 3D lattice of Spin2D structures
+void free_lattice(Spin2D *lattice) {
+    free(lattice);
 }
 
 
 
 
-// Function to allocate a 3D lattice of DoubleVector2D structures
-DoubleVector2D ***allocate(int lattice_side) {
-    DoubleVector2D ***lattice;
-    int i, j, l;
+// Function to allocate a 3D lattice of Spin2D structures as a single contiguous array
+// of lattice_side^3 sites, the site (i, j, k) being stored at site_index(i, j, k, lattice_side)
+Spin2D *allocate(int lattice_side) {
+    Spin2D *lattice;
+    int Vol = lattice_side * lattice_side * lattice_side;
 
-    // First level allocation - array of pointers to arrays of pointers
-    lattice = (DoubleVector2D ***)malloc(lattice_side * sizeof(DoubleVector2D **));
+    lattice = (Spin2D *)malloc((size_t)Vol * sizeof(Spin2D));
     if (lattice == NULL) {
-        fprintf(stderr, "Error in the allocation of the first level.\n");
+        fprintf(stderr, "Error in the allocation of the lattice.\n");
         return NULL;  // Return NULL if the allocation fails
     }
+    return lattice;  // Return the allocated 3D lattice
+}
 
-    // Second level allocation - for each pointer, allocate an array of DoubleVector2D pointers
-    for (i = 0; i < lattice_side; i++) {
-        lattice[i] = (DoubleVector2D **)malloc(lattice_side * sizeof(DoubleVector2D *));
-        if (lattice[i] == NULL) {
-            fprintf(stderr, "Error in the allocation of the second level.\n");
-
-            // Free previously allocated memory in case of failure
-            for (int k = 0; k < i; k++) {
-                free(lattice[k]);
-            }
-            free(lattice);
-            return NULL;  // Return NULL if allocation fails at this level
-        }
 
-        // Third level allocation - for each DoubleVector2D pointer, allocate the array of structures
-        for (j = 0; j < lattice_side; j++) {
-            lattice[i][j] = (DoubleVector2D *)malloc(lattice_side * sizeof(DoubleVector2D));
-            if (lattice[i][j] == NULL) {
-                fprintf(stderr, "Error in the allocation of the third level.\n");
-
-                // Free the allocated memory at the current level
-                for (l = 0; l < j; l++) {
-                    free(lattice[i][l]);
-                }
-                free(lattice[i]);
-
-                // Free memory allocated in previous levels
-                for (int k = 0; k < i; k++) {
-                    for (l = 0; l < lattice_side; l++) {
-                        free(lattice[k][l]);
-                    }
-                    free(lattice[k]);
-                }
-                free(lattice);
-                return NULL;  // Return NULL if allocation fails at this level
-            }
-        }
-    }
-    return lattice;  // Return the allocated 3D lattice
+// Bytes of each component of the stored spins (sizeof(spin_t)), for the programs that read the lattice
+// through the library without the header, e.g. the Python bindings
+int spin_component_size(void) {
+    return (int)sizeof(spin_t);
 }
 
-DoubleVector2D* magnetization(DoubleVector2D ***lattice, int lattice_side) {
-    DoubleVector2D* m = (DoubleVector2D *)malloc(sizeof(DoubleVector2D));
-    int Vol = lattice_side * lattice_side * lattice_side; // faster and more accurate than pow (math.h) for integers!
-    if (m==NULL) {
-        fprintf(stderr, "Failed allocation for vector magnetization, returning NULL!\n");
+
+
+
+// Function to build the table of nearest neighbors, with periodic boundary conditions.
+// The neighbor of site n in direction d (see the enum in functions.h) is neighbors[N_NEIGHBORS*n + d]:
+// it is computed once here, so that the update kernels need neither modulo operations nor index arithmetic
+int *allocate_neighbors(int lattice_side) {
+    int i, j, k, n;
+    int Vol = lattice_side * lattice_side * lattice_side;
+    int *neighbors = (int *)malloc((size_t)N_NEIGHBORS * Vol * sizeof(int));
+    if (neighbors == NULL) {
+        fprintf(stderr, "Error in the allocation of the neighbors table.\n");
         return NULL;
     }
-    m->sx = 0.0; m->sy = 0.0;
-    int i, j, k;
 
     for (i=0; i<lattice_side; i++) {
         for (j=0; j<lattice_side; j++) {
             for (k=0; k<lattice_side; k++) {
-                m->sx += lattice[i][j][k].sx;
-                m->sy += lattice[i][j][k].sy;
+                n = site_index(i, j, k, lattice_side);
+                neighbors[N_NEIGHBORS*n + I_PLUS]  = site_index((i + 1) % lattice_side, j, k, lattice_side);
+                neighbors[N_NEIGHBORS*n + J_PLUS]  = site_index(i, (j + 1) % lattice_side, k, lattice_side);
+                neighbors[N_NEIGHBORS*n + K_PLUS]  = site_index(i, j, (k + 1) % lattice_side, lattice_side);
+                neighbors[N_NEIGHBORS*n + I_MINUS] = site_index((i - 1 + lattice_side) % lattice_side, j, k, lattice_side);
+                neighbors[N_NEIGHBORS*n + J_MINUS] = site_index(i, (j - 1 + lattice_side) % lattice_side, k, lattice_side);
+                neighbors[N_NEIGHBORS*n + K_MINUS] = site_index(i, j, (k - 1 + lattice_side) % lattice_side, lattice_side);
             }
         }
     }
+    return neighbors;
+}
+
+
+// Sum of the spins of the six nearest neighbors of a site (in the precision of the storage, then converted)
+static inline DoubleVector2D neighbors_sum(Spin2D *lattice, int *neighbors, int site) {
+    const int *nn = neighbors + N_NEIGHBORS * site;
+    DoubleVector2D S_sum;
+
+    S_sum.sx = lattice[nn[I_MINUS]].sx + lattice[nn[I_PLUS]].sx +
+               lattice[nn[J_MINUS]].sx + lattice[nn[J_PLUS]].sx +
+               lattice[nn[K_MINUS]].sx + lattice[nn[K_PLUS]].sx;
+
+    S_sum.sy = lattice[nn[I_MINUS]].sy + lattice[nn[I_PLUS]].sy +
+               lattice[nn[J_MINUS]].sy + lattice[nn[J_PLUS]].sy +
+               lattice[nn[K_MINUS]].sy + lattice[nn[K_PLUS]].sy;
+
+    return S_sum;
+}
+
+
+// Magnetization per site, returned by value (no allocation at each measurement)
+DoubleVector2D magnetization(Spin2D *lattice, int lattice_side) {
+    DoubleVector2D m;
+    int Vol = lattice_side * lattice_side * lattice_side; // faster and more accurate than pow (math.h) for integers!
+    m.sx = 0.0; m.sy = 0.0;
+    int n;
+
+    for (n=0; n<Vol; n++) {
+        m.sx += lattice[n].sx;
+        m.sy += lattice[n].sy;
+    }
 
-    m->sx /= (double) Vol;
-    m->sy /= (double) Vol;
+    m.sx /= (double) Vol;
+    m.sy /= (double) Vol;
 
     return m;
 }
 
-double energy_per_site(DoubleVector2D ***lattice, int lattice_side) {
-    int i, j, k, i_plus, j_plus, k_plus;
+// Structure factor at the smallest nonzero momenta, G(k_min) = (1/V) |sum_x s_x exp(i k_min . x)|^2 with k_min = 2 pi / L
+// along one axis, averaged over the three axes (G(0) = V m^2 is given by the magnetization). The spins are first summed
+// on the planes orthogonal to each axis, so that the cost is O(V) additions and O(L) trigonometric functions.
+// With G(0) gives the second-moment correlation length, xi = sqrt(G(0) / G(k_min) - 1) / (2 sin(pi / L))
+double structure_factor_kmin(Spin2D *lattice, int lattice_side) {
+    int L = lattice_side, Vol = L * L * L, i, j, k, a, n;
+    double *planes = (double *)calloc((size_t)3 * 2 * L, sizeof(double)); // planes[(a*L + n)*2 + c]
+    double re_x, im_x, re_y, im_y, c, s, g = 0.0;
+    DoubleVector2D v;
+
+    if (planes == NULL) {
+        fprintf(stderr, "Error in the allocation of the plane sums of the structure factor.\n");
+        return NAN;
+    }
+    for (i=0; i<L; i++) {
+        for (j=0; j<L; j++) {
+            for (k=0; k<L; k++) {
+                v = spin_value(lattice[site_index(i, j, k, L)]);
+                planes[(0*L + i)*2] += v.sx; planes[(0*L + i)*2 + 1] += v.sy;
+                planes[(1*L + j)*2] += v.sx; planes[(1*L + j)*2 + 1] += v.sy;
+                planes[(2*L + k)*2] += v.sx; planes[(2*L + k)*2 + 1] += v.sy;
+            }
+        }
+    }
+    for (a=0; a<3; a++) {
+        re_x = im_x = re_y = im_y = 0.0;
+        for (n=0; n<L; n++) {
+            c = cos(2.0 * PI * n / L);
+            s = sin(2.0 * PI * n / L);
+            re_x += planes[(a*L + n)*2] * c; im_x += planes[(a*L + n)*2] * s;
+            re_y += planes[(a*L + n)*2 + 1] * c; im_y += planes[(a*L + n)*2 + 1] * s;
+        }
+        g += (re_x * re_x + im_x * im_x + re_y * re_y + im_y * im_y) / (double)Vol;
+    }
+    free(planes);
+    return g / 3.0;
+}
+
+double energy_per_site(Spin2D *lattice, int *neighbors, int lattice_side) {
+    int n;
+    const int *nn;
     int Vol = lattice_side * lattice_side * lattice_side;
     double energy_per_site = 0.0;
     DoubleVector2D S_nearest; S_nearest.sx = 0.0; S_nearest.sy = 0.0;
 
-    for (i=0; i<lattice_side; i++) {
-        for (j=0; j<lattice_side; j++) {
-            for (k=0; k<lattice_side; k++) {
-                // Periodic boudary conditions
-                // Only sites after the one we are considering are included, to avoid double counting
-                i_plus  = (i + 1) % lattice_side;
-                j_plus  = (j + 1) % lattice_side;
-                k_plus  = (k + 1) % lattice_side;
+    for (n=0; n<Vol; n++) {
+        // Only the forward neighbors of each site are included, to avoid double counting
+        nn = neighbors + N_NEIGHBORS * n;
+        S_nearest.sx = (double)lattice[nn[I_PLUS]].sx + lattice[nn[J_PLUS]].sx + lattice[nn[K_PLUS]].sx;
+        S_nearest.sy = (double)lattice[nn[I_PLUS]].sy + lattice[nn[J_PLUS]].sy + lattice[nn[K_PLUS]].sy;
 
-                S_nearest.sx = lattice[i_plus][j][k].sx + lattice[i][j_plus][k].sx + lattice[i][j][k_plus].sx;
-                S_nearest.sy = lattice[i_plus][j][k].sy + lattice[i][j_plus][k].sy + lattice[i][j][k_plus].sy;
+        energy_per_site += - scalar_product(spin_value(lattice[n]), S_nearest);
+    }
 
-                energy_per_site += - scalar_product(lattice[i][j][k], S_nearest) / (double) Vol;
-            }
-        }
+    return energy_per_site / (double) Vol;
+}
+
+
+// Bond sums of the helicity modulus on the same forward bonds of energy_per_site: for each axis a,
+// C_a = sum_x cos(theta_x - theta_{x+a}) and S_a = sum_x sin(theta_x - theta_{x+a}), with the cosines and sines of the
+// differences given by the scalar and cross products of the spins. On output bond_cos = sum_a C_a / (3V), which is
+// - energy_per_site / 3, and bond_sin2 = sum_a S_a^2 / (3V): averaged over the three axes the helicity modulus is
+// Upsilon = <bond_cos> - beta <bond_sin2>, and Upsilon L is dimensionless at the critical point
+void helicity_sums(Spin2D *lattice, int *neighbors, int lattice_side, double *bond_cos, double *bond_sin2) {
+    int n;
+    const int *nn;
+    int Vol = lattice_side * lattice_side * lattice_side;
+    double cos_sum = 0.0, sin_i = 0.0, sin_j = 0.0, sin_k = 0.0;
+    DoubleVector2D s, s_i, s_j, s_k;
+
+    for (n=0; n<Vol; n++) {
+        nn = neighbors + N_NEIGHBORS * n;
+        s = spin_value(lattice[n]);
+        s_i = spin_value(lattice[nn[I_PLUS]]);
+        s_j = spin_value(lattice[nn[J_PLUS]]);
+        s_k = spin_value(lattice[nn[K_PLUS]]);
+        // the cosines of the three bonds at once, as in energy_per_site
+        cos_sum += s.sx * (s_i.sx + s_j.sx + s_k.sx) + s.sy * (s_i.sy + s_j.sy + s_k.sy);
+        sin_i += s.sy * s_i.sx - s.sx * s_i.sy;
+        sin_j += s.sy * s_j.sx - s.sx * s_j.sy;
+        sin_k += s.sy * s_k.sx - s.sx * s_k.sy;
     }
+    *bond_cos = cos_sum / (3.0 * Vol);
+    *bond_sin2 = (sin_i * sin_i + sin_j * sin_j + sin_k * sin_k) / (3.0 * Vol);
+}
+
 
-    return energy_per_site;
+// Total energy and total magnetization computed from scratch, to initialize the running totals
+// and to periodically remove the rounding errors accumulated by the incremental updates
+LatticeTotals lattice_totals(Spin2D *lattice, int *neighbors, int lattice_side) {
+    int n;
+    const int *nn;
+    int Vol = lattice_side * lattice_side * lattice_side;
+    LatticeTotals totals = {0.0, {0.0, 0.0}};
+    DoubleVector2D S_nearest;
+
+    // Single pass on the lattice, with the same forward bonds of energy_per_site
+    for (n=0; n<Vol; n++) {
+        nn = neighbors + N_NEIGHBORS * n;
+        S_nearest.sx = (double)lattice[nn[I_PLUS]].sx + lattice[nn[J_PLUS]].sx + lattice[nn[K_PLUS]].sx;
+        S_nearest.sy = (double)lattice[nn[I_PLUS]].sy + lattice[nn[J_PLUS]].sy + lattice[nn[K_PLUS]].sy;
+        totals.energy += - scalar_product(spin_value(lattice[n]), S_nearest);
+        totals.magn.sx += lattice[n].sx;
+        totals.magn.sy += lattice[n].sy;
+    }
+    return totals;
 }
 
 
-// Initializes all matrix values with random values for sx and sy s.t module = 1
-int initialize_lattice(DoubleVector2D ***lattice, int lattice_side) {
-    double theta;
-    for (int i = 0; i < lattice_side; i++) {
-        for (int j = 0; j < lattice_side; j++) {
-            for (int k = 0; k < lattice_side; k++) {
-                theta = (2*myrand() - 1)*PI;
-                lattice[i][j][k].sx = cos(theta);
-                lattice[i][j][k].sy = sin(theta);
-            }
+// Initializes all matrix values with random values for sx and sy s.t module = 1, drawing the angles from rng
+// in blocks of INIT_BLOCK numbers (the same sequence of one myrand_r per site)
+#define INIT_BLOCK 256
+int initialize_lattice(Spin2D *lattice, int lattice_side, pcg32_random_t *rng) {
+    double theta, u[INIT_BLOCK];
+    int Vol = lattice_side * lattice_side * lattice_side;
+    int n, b, block;
+    for (n = 0; n < Vol; n += block) {
+        block = (Vol - n < INIT_BLOCK) ? Vol - n : INIT_BLOCK;
+        myrand_fill(rng, u, block);
+        for (b = 0; b < block; b++) {
+            theta = (2*u[b] - 1)*PI;
+            lattice[n + b].sx = cos(theta);
+            lattice[n + b].sy = sin(theta);
         }
     }
     return EXIT_SUCCESS;
 }
 
-int microcanonical(DoubleVector2D ***lattice, int i, int j, int k, int lattice_side) {
-    int i_minus, i_plus, j_minus, j_plus, k_minus, k_plus, acc=0;
-    DoubleVector2D S_sum;
-    double sq_mod_S, sS_scal_prod;
-    // Checking index validity
-    if (i < 0 || i >= lattice_side || j < 0 || j >= lattice_side || k < 0 || k >= lattice_side) {
-        fprintf(stderr, "Invalid lattice indices: %d, %d, %d. Lattice side is %d \n", i, j, k, lattice_side);
-        return EXIT_FAILURE;
-    }
-    // Calculating neighboring indices with periodic boundary conditions
-    i_minus = (i - 1 + lattice_side) % lattice_side;
-    i_plus  = (i + 1) % lattice_side;
-    j_minus = (j - 1 + lattice_side) % lattice_side;
-    j_plus  = (j + 1) % lattice_side;
-    k_minus = (k - 1 + lattice_side) % lattice_side;
-    k_plus  = (k + 1) % lattice_side;
+// Microcanonical (overrelaxation) step: the spin is reflected with respect to the sum of its neighbors,
+// leaving the energy unchanged. If delta is not NULL the variation of the magnetization is added to it
+int microcanonical(Spin2D *lattice, int *neighbors, int site, LatticeTotals *delta) {
+    int acc=0;
+    DoubleVector2D S_sum, s_old;
+    double sq_mod_S, sS_scal_prod, sx_new, sy_new;
 
     // Calculating the sum of neighbors for sx and sy
-    S_sum.sx = lattice[i_minus][j][k].sx + lattice[i_plus][j][k].sx +
-               lattice[i][j_minus][k].sx + lattice[i][j_plus][k].sx +
-               lattice[i][j][k_minus].sx + lattice[i][j][k_plus].sx;
-
-    S_sum.sy = lattice[i_minus][j][k].sy + lattice[i_plus][j][k].sy +
-               lattice[i][j_minus][k].sy + lattice[i][j_plus][k].sy +
-               lattice[i][j][k_minus].sy + lattice[i][j][k_plus].sy;
+    S_sum = neighbors_sum(lattice, neighbors, site);
     // Modulus of S_sum
     sq_mod_S = scalar_product(S_sum, S_sum);
     // Check if it's big enought to avoid numerical errors
     if (sqrt(sq_mod_S)<1e-13) {
          return acc;
     } else { // If its modulus is ok, then compute scalar product
-        sS_scal_prod = scalar_product(lattice[i][j][k], S_sum);
-        lattice[i][j][k].sx = 2 * S_sum.sx * sS_scal_prod / sq_mod_S - lattice[i][j][k].sx;
-        lattice[i][j][k].sy = 2 * S_sum.sy * sS_scal_prod / sq_mod_S - lattice[i][j][k].sy;
+        s_old = spin_value(lattice[site]);
+        sS_scal_prod = scalar_product(s_old, S_sum);
+        sx_new = 2 * S_sum.sx * sS_scal_prod / sq_mod_S - s_old.sx;
+        sy_new = 2 * S_sum.sy * sS_scal_prod / sq_mod_S - s_old.sy;
+        store_spin(&lattice[site], sx_new, sy_new);
+        // Variation computed with the stored (rounded) spin, to keep the running totals consistent
+        if (delta != NULL) {
+            delta->magn.sx += lattice[site].sx - s_old.sx;
+            delta->magn.sy += lattice[site].sy - s_old.sy;
+        }
         acc = 1;
         return acc;
     }
 }
 
 
-int local_metropolis(DoubleVector2D ***lattice, int i, int j, int k, int lattice_side, double alpha, double beta) {
-    int i_minus, i_plus, j_minus, j_plus, k_minus, k_plus, acc=0;
+// Metropolis step with a trial rotation of the spin by an angle in [-alpha, alpha). If delta is not NULL
+// the variations of energy and magnetization of an accepted move are added to it
+int local_metropolis(Spin2D *lattice, int *neighbors, int site, double alpha, double beta, pcg32_random_t *rng, LatticeTotals *delta) {
+    int acc=0;
     double t, theta, dE, w, y;
     DoubleVector2D s_old, s_trial, S_sum;
-
-    // Checking index validity
-    if (i < 0 || i >= lattice_side || j < 0 || j >= lattice_side || k < 0 || k >= lattice_side) {
-        fprintf(stderr, "Invalid lattice indices: %d, %d, %d. Lattice side is %d \n", i, j, k, lattice_side);
-        return EXIT_FAILURE;
-    }
-
-    // Calculating neighboring indices with periodic boundary conditions
-    i_minus = (i - 1 + lattice_side) % lattice_side;
-    i_plus  = (i + 1) % lattice_side;
-    j_minus = (j - 1 + lattice_side) % lattice_side;
-    j_plus  = (j + 1) % lattice_side;
-    k_minus = (k - 1 + lattice_side) % lattice_side;
-    k_plus  = (k + 1) % lattice_side;
+    Spin2D spin_trial;
 
     // Generating random number U([0,1)) and calculating theta
-    t = myrand();
+    t = myrand_r(rng);
     theta = (2 * t - 1) * alpha;
 
     // Retrieving current spin values at the site
-    s_old = lattice[i][j][k];
+    s_old = spin_value(lattice[site]);
 
-    // Generating trial state from the old one
-    s_trial.sx = cos(theta) * s_old.sx + sin(theta) * s_old.sy;
-    s_trial.sy = -sin(theta) * s_old.sx + cos(theta) * s_old.sy;
+    // Generating trial state from the old one, rounded to the storage precision so that dE is the
+    // variation of energy of the spin that is actually stored
+    store_spin(&spin_trial, cos(theta) * s_old.sx + sin(theta) * s_old.sy,
+               -sin(theta) * s_old.sx + cos(theta) * s_old.sy);
+    s_trial = spin_value(spin_trial);
 
     // Calculating the sum of neighbors for sx and sy
-    S_sum.sx = lattice[i_minus][j][k].sx + lattice[i_plus][j][k].sx +
-               lattice[i][j_minus][k].sx + lattice[i][j_plus][k].sx +
-               lattice[i][j][k_minus].sx + lattice[i][j][k_plus].sx;
-
-    S_sum.sy = lattice[i_minus][j][k].sy + lattice[i_plus][j][k].sy +
-               lattice[i][j_minus][k].sy + lattice[i][j_plus][k].sy +
-               lattice[i][j][k_minus].sy + lattice[i][j][k_plus].sy;
+    S_sum = neighbors_sum(lattice, neighbors, site);
 
     // Calculating dE (energy) between the trial configuration and the old one
     dE = -(scalar_product(s_trial, S_sum) - scalar_product(s_old, S_sum));
 
     // Implementing the Metropolis algorithm
     if (dE < 0) {
-        lattice[i][j][k].sx = s_trial.sx;
-        lattice[i][j][k].sy = s_trial.sy;
+        lattice[site] = spin_trial;
         acc = 1;
     } else {
-        w = myrand();
+        w = myrand_r(rng);
         y = exp(-beta * dE);
         if (w <= y) {
-            lattice[i][j][k].sx = s_trial.sx;
-            lattice[i][j][k].sy = s_trial.sy;
+            lattice[site] = spin_trial;
             acc = 1;
         }
     }
+    if (acc == 1 && delta != NULL) {
+        delta->energy += dE;
+        delta->magn.sx += s_trial.sx - s_old.sx;
+        delta->magn.sy += s_trial.sy - s_old.sy;
+    }
+
+    return acc;
+}
+
+
+
+// Draws x in [-pi, pi) from the von Mises distribution p(x) ~ exp(kappa cos(x)) with the rejection algorithm of
+// Best and Fisher (1979), whose acceptance is above 65% for every kappa. Returns cos(x) and sin(x), the angle itself
+// is never needed
+static void von_mises(double kappa, pcg32_random_t *rng, double *cos_x, double *sin_x) {
+    double tau, rho, r, u1, u2, z, f, c;
+
+    if (kappa < DBL_MIN) {
+        // Flat distribution: kappa = 0, or so small that r ~ 1 / kappa would overflow
+        u1 = (2 * myrand_r(rng) - 1) * PI;
+        *cos_x = cos(u1);
+        *sin_x = sin(u1);
+        return;
+    }
+    tau = 1.0 + sqrt(1.0 + 4.0 * kappa * kappa);
+    // rho = (tau - sqrt(2 tau)) / (2 kappa), written without the cancellation of the difference: for small kappa
+    // tau rounds to 2 and the difference would be 0 (rho = 0, r = inf, f = NaN)
+    rho = 2.0 * kappa / (tau + sqrt(2.0 * tau));
+    r = (1.0 + rho * rho) / (2.0 * rho);
+    do {
+        u1 = myrand_r(rng);
+        u2 = myrand_r(rng);
+        z = cos(PI * u1);
+        f = (1.0 + r * z) / (r + z);
+        c = kappa * (r - f);
+    } while (c * (2.0 - c) - u2 <= 0 && log(c / u2) + 1.0 - c < 0);
+    *cos_x = f;
+    *sin_x = (myrand_r(rng) < 0.5 ? -1.0 : 1.0) * sqrt(fmax(1.0 - f * f, 0.0));
+}
+
+
+// Heat-bath step: the new spin is drawn from its conditional distribution given the neighbors,
+// p(s) ~ exp(beta s.S), i.e. its angle from S has the von Mises distribution with kappa = beta |S|.
+// The move is always accepted (there is no alpha to tune); if delta is not NULL the variations of energy
+// and magnetization are added to it
+int local_heat_bath(Spin2D *lattice, int *neighbors, int site, double beta, pcg32_random_t *rng, LatticeTotals *delta) {
+    double mod_S, cos_x, sin_x, ux, uy;
+    DoubleVector2D s_old, s_new, S_sum;
+
+    S_sum = neighbors_sum(lattice, neighbors, site);
+    mod_S = sqrt(scalar_product(S_sum, S_sum));
+    // Direction of S, any direction if S vanishes (the distribution is flat)
+    if (mod_S < 1e-13) {
+        ux = 1.0; uy = 0.0;
+    } else {
+        ux = S_sum.sx / mod_S; uy = S_sum.sy / mod_S;
+    }
+    von_mises(beta * mod_S, rng, &cos_x, &sin_x);
+
+    s_old = spin_value(lattice[site]);
+    // S direction rotated by the drawn angle
+    store_spin(&lattice[site], cos_x * ux - sin_x * uy, sin_x * ux + cos_x * uy);
+    if (delta != NULL) {
+        s_new = spin_value(lattice[site]);
+        delta->energy += -(scalar_product(s_new, S_sum) - scalar_product(s_old, S_sum));
+        delta->magn.sx += s_new.sx - s_old.sx;
+        delta->magn.sy += s_new.sy - s_old.sy;
+    }
+    return 1;
+}
+
+
+
+// Function to build the coloring of the lattice used by the checkerboard sweeps.
+// Sites are colored greedily in lexicographic order with the smallest color not already taken by one of
+// their neighbors: for even lattice_side this gives back the two sublattices with (i+j+k) even and odd
+Checkerboard *allocate_checkerboard(int *neighbors, int lattice_side) {
+    int Vol = lattice_side * lattice_side * lattice_side;
+    int n, d, c, used, n_colors = 0;
+    int *color, *counts;
+    Checkerboard *checkerboard = (Checkerboard *)malloc(sizeof(Checkerboard));
+    color = (int *)malloc((size_t)Vol * sizeof(int));
+    if (checkerboard == NULL || color == NULL) {
+        fprintf(stderr, "Error in the allocation of the checkerboard.\n");
+        free(checkerboard);
+        free(color);
+        return NULL;
+    }
+
+    for (n=0; n<Vol; n++) {
+        color[n] = -1;
+    }
+    for (n=0; n<Vol; n++) {
+        used = 0; // bitmask of the colors of the neighbors, at most N_NEIGHBORS+1 colors are needed
+        for (d=0; d<N_NEIGHBORS; d++) {
+            if (color[neighbors[N_NEIGHBORS*n + d]] >= 0) {
+                used |= 1 << color[neighbors[N_NEIGHBORS*n + d]];
+            }
+        }
+        c = 0;
+        while (used & (1 << c)) {
+            c++;
+        }
+        color[n] = c;
+        if (c + 1 > n_colors) {
+            n_colors = c + 1;
+        }
+    }
+
+    checkerboard->n_colors = n_colors;
+    checkerboard->offsets = (int *)calloc((size_t)n_colors + 1, sizeof(int));
+    checkerboard->sites = (int *)malloc((size_t)Vol * sizeof(int));
+    counts = (int *)calloc((size_t)n_colors, sizeof(int));
+    if (checkerboard->offsets == NULL || checkerboard->sites == NULL || counts == NULL) {
+        fprintf(stderr, "Error in the allocation of the checkerboard.\n");
+        free(counts);
+        free(color);
+        free_checkerboard(checkerboard);
+        return NULL;
+    }
+
+    // Sites of each color are stored contiguously, in lexicographic order
+    for (n=0; n<Vol; n++) {
+        checkerboard->offsets[color[n] + 1] += 1;
+    }
+    for (c=0; c<n_colors; c++) {
+        checkerboard->offsets[c + 1] += checkerboard->offsets[c];
+    }
+    for (n=0; n<Vol; n++) {
+        checkerboard->sites[checkerboard->offsets[color[n]] + counts[color[n]]] = n;
+        counts[color[n]] += 1;
+    }
+
+    free(counts);
+    free(color);
+    return checkerboard;
+}
+
+
+void free_checkerboard(Checkerboard *checkerboard) {
+    if (checkerboard == NULL) {
+        return;
+    }
+    free(checkerboard->offsets);
+    free(checkerboard->sites);
+    free(checkerboard);
+}
+
+
+// Adds the variations collected during a sweep to the running totals (if they are tracked)
+static inline void add_totals(LatticeTotals *totals, LatticeTotals delta) {
+    if (totals != NULL) {
+        totals->energy += delta.energy;
+        totals->magn.sx += delta.magn.sx;
+        totals->magn.sy += delta.magn.sy;
+    }
+}
+
+
+// Complete Metropolis sweep of the lattice, returning the number of accepted steps.
+// With checkerboard == NULL the sites are visited in lexicographic order using streams[0];
+// otherwise the colors are updated one after the other, and the sites of each color are shared
+// among the OpenMP threads, thread t drawing its random numbers from streams[t].
+// The variations of energy and magnetization are added to totals, unless it is NULL
+unsigned long int metropolis_sweep(Spin2D *lattice, int *neighbors, int lattice_side, double alpha, double beta,
+                                   const Checkerboard *checkerboard, pcg32_random_t *streams, LatticeTotals *totals) {
+    int Vol = lattice_side * lattice_side * lattice_side;
+    int n;
+    unsigned long int acc = 0;
+    // The variations of a sweep are summed apart and then added to the totals, to limit the rounding errors
+    LatticeTotals delta = {0.0, {0.0, 0.0}};
+
+    if (checkerboard == NULL) {
+        for (n=0; n<Vol; n++) {
+            acc += local_metropolis(lattice, neighbors, n, alpha, beta, streams, &delta);
+        }
+        add_totals(totals, delta);
+        return acc;
+    }
+
+    #pragma omp parallel reduction(+:acc)
+    {
+        int c, idx, thread = 0;
+        LatticeTotals thread_delta = {0.0, {0.0, 0.0}};
+        #ifdef _OPENMP
+        thread = omp_get_thread_num();
+        #endif
+        // Local copy of the generator, to avoid false sharing between the streams of different threads
+        pcg32_random_t rng = streams[thread];
+        for (c=0; c<checkerboard->n_colors; c++) {
+            #pragma omp for schedule(static)
+            for (idx=checkerboard->offsets[c]; idx<checkerboard->offsets[c + 1]; idx++) {
+                acc += local_metropolis(lattice, neighbors, checkerboard->sites[idx], alpha, beta, &rng, &thread_delta);
+            }
+        }
+        streams[thread] = rng;
+        #pragma omp critical
+        add_totals(&delta, thread_delta);
+    }
+    add_totals(totals, delta);
+    return acc;
+}
+
+
+// Complete heat-bath sweep of the lattice, returning the number of updated spins (all of them).
+// Visiting order, generators, threading and running totals as in metropolis_sweep
+unsigned long int heat_bath_sweep(Spin2D *lattice, int *neighbors, int lattice_side, double beta,
+                                  const Checkerboard *checkerboard, pcg32_random_t *streams, LatticeTotals *totals) {
+    int Vol = lattice_side * lattice_side * lattice_side;
+    int n;
+    unsigned long int acc = 0;
+    LatticeTotals delta = {0.0, {0.0, 0.0}};
+
+    if (checkerboard == NULL) {
+        for (n=0; n<Vol; n++) {
+            acc += local_heat_bath(lattice, neighbors, n, beta, streams, &delta);
+        }
+        add_totals(totals, delta);
+        return acc;
+    }
+
+    #pragma omp parallel reduction(+:acc)
+    {
+        int c, idx, thread = 0;
+        LatticeTotals thread_delta = {0.0, {0.0, 0.0}};
+        #ifdef _OPENMP
+        thread = omp_get_thread_num();
+        #endif
+        pcg32_random_t rng = streams[thread];
+        for (c=0; c<checkerboard->n_colors; c++) {
+            #pragma omp for schedule(static)
+            for (idx=checkerboard->offsets[c]; idx<checkerboard->offsets[c + 1]; idx++) {
+                acc += local_heat_bath(lattice, neighbors, checkerboard->sites[idx], beta, &rng, &thread_delta);
+            }
+        }
+        streams[thread] = rng;
+        #pragma omp critical
+        add_totals(&delta, thread_delta);
+    }
+    add_totals(totals, delta);
+    return acc;
+}
+
+
+// Complete microcanonical sweep of the lattice, returning the number of accepted steps.
+// Visiting order, threading and running totals as in metropolis_sweep
+unsigned long int microcanonical_sweep(Spin2D *lattice, int *neighbors, int lattice_side, const Checkerboard *checkerboard,
+                                       LatticeTotals *totals) {
+    int Vol = lattice_side * lattice_side * lattice_side;
+    int n;
+    unsigned long int acc = 0;
+    LatticeTotals delta = {0.0, {0.0, 0.0}};
+
+    if (checkerboard == NULL) {
+        for (n=0; n<Vol; n++) {
+            acc += microcanonical(lattice, neighbors, n, &delta);
+        }
+        add_totals(totals, delta);
+        return acc;
+    }
 
+    #pragma omp parallel reduction(+:acc)
+    {
+        int c, idx;
+        LatticeTotals thread_delta = {0.0, {0.0, 0.0}};
+        for (c=0; c<checkerboard->n_colors; c++) {
+            #pragma omp for schedule(static)
+            for (idx=checkerboard->offsets[c]; idx<checkerboard->offsets[c + 1]; idx++) {
+                acc += microcanonical(lattice, neighbors, checkerboard->sites[idx], &thread_delta);
+            }
+        }
+        #pragma omp critical
+        add_totals(&delta, thread_delta);
+    }
+    add_totals(totals, delta);
     return acc;
 }
 
 
 
 
+// Function to allocate R replicas of the lattice in the interleaved layout (see ReplicaLattice in functions.h),
+// with their generators and running totals. The replicas still have to be seeded and initialized
+ReplicaLattice *allocate_replicas(int lattice_side, int n_replicas) {
+    size_t R = (size_t)n_replicas, Vol = (size_t)lattice_side * lattice_side * lattice_side;
+    ReplicaLattice *replicas = (ReplicaLattice *)calloc(1, sizeof(ReplicaLattice));
+
+    if (replicas == NULL) {
+        fprintf(stderr, "Error in the allocation of the replicas.\n");
+        return NULL;
+    }
+    replicas->n_replicas = n_replicas;
+    replicas->lattice_side = lattice_side;
+    replicas->sx = (spin_t *)malloc(Vol * R * sizeof(spin_t));
+    replicas->sy = (spin_t *)malloc(Vol * R * sizeof(spin_t));
+    replicas->rng_state = (uint64_t *)malloc(R * sizeof(uint64_t));
+    replicas->rng_inc = (uint64_t *)malloc(R * sizeof(uint64_t));
+    replicas->energy = (double *)calloc(R, sizeof(double));
+    replicas->magn_x = (double *)calloc(R, sizeof(double));
+    replicas->magn_y = (double *)calloc(R, sizeof(double));
+    replicas->delta = (double *)calloc(3 * R, sizeof(double));
+    replicas->accepted = (unsigned long int *)calloc(R, sizeof(unsigned long int));
+    if (replicas->sx == NULL || replicas->sy == NULL || replicas->rng_state == NULL || replicas->rng_inc == NULL ||
+        replicas->energy == NULL || replicas->magn_x == NULL || replicas->magn_y == NULL || replicas->delta == NULL ||
+        replicas->accepted == NULL) {
+        fprintf(stderr, "Error in the allocation of the replicas.\n");
+        free_replicas(replicas);
+        return NULL;
+    }
+    return replicas;
+}
+
+
+void free_replicas(ReplicaLattice *replicas) {
+    if (replicas == NULL) {
+        return;
+    }
+    free(replicas->sx);
+    free(replicas->sy);
+    free(replicas->rng_state);
+    free(replicas->rng_inc);
+    free(replicas->energy);
+    free(replicas->magn_x);
+    free(replicas->magn_y);
+    free(replicas->delta);
+    free(replicas->accepted);
+    free(replicas);
+}
+
+
+// Seeds the generator of each replica: replica r gets the stream r of myrand_init_streams with the same arguments
+void seed_replicas(ReplicaLattice *replicas, unsigned long int initstate, unsigned long int initseq) {
+    pcg32_random_t rng;
+    int r;
+    for (r=0; r<replicas->n_replicas; r++) {
+        pcg32_srandom_r(&rng, (uint64_t)initstate, (uint64_t)initseq + 1 + (uint64_t)r);
+        replicas->rng_state[r] = rng.state;
+        replicas->rng_inc[r] = rng.inc;
+    }
+}
+
+
+// Step of the generator of one replica, the same of pcg32_random_r, returning a number in [0,1) as myrand_r.
+// It is written on the two words of the generator so that it can be inlined in the loops on the replicas
+static inline double replica_rand(uint64_t *state, uint64_t inc) {
+    uint64_t oldstate = *state;
+    *state = oldstate * 6364136223846793005ULL + (inc | 1);
+    uint32_t xorshifted = (uint32_t)(((oldstate >> 18u) ^ oldstate) >> 27u);
+    uint32_t rot = (uint32_t)(oldstate >> 59u);
+    return (double)((xorshifted >> rot) | (xorshifted << ((-rot) & 31))) * (1.0 / 4294967296.0);
+}
+
+
+// Random configuration of every replica (hot start), drawn from its own generator as initialize_lattice does.
+// The running totals must then be computed with replica_totals
+void initialize_replicas(ReplicaLattice *replicas) {
+    int R = replicas->n_replicas, Vol = replicas->lattice_side * replicas->lattice_side * replicas->lattice_side;
+    int n, r;
+    double theta;
+    for (r=0; r<R; r++) {
+        for (n=0; n<Vol; n++) {
+            theta = (2 * replica_rand(&replicas->rng_state[r], replicas->rng_inc[r]) - 1) * PI;
+            replicas->sx[(size_t)n * R + r] = cos(theta);
+            replicas->sy[(size_t)n * R + r] = sin(theta);
+        }
+    }
+}
+
+
+// Copies replica r to an ordinary lattice, e.g. to measure it or to save it with the functions of a single lattice
+void get_replica(const ReplicaLattice *replicas, int r, Spin2D *lattice) {
+    int R = replicas->n_replicas, Vol = replicas->lattice_side * replicas->lattice_side * replicas->lattice_side;
+    for (int n = 0; n < Vol; n++) {
+        lattice[n].sx = replicas->sx[(size_t)n * R + r];
+        lattice[n].sy = replicas->sy[(size_t)n * R + r];
+    }
+}
+
+
+// Copies an ordinary lattice into replica r (its running totals must then be recomputed)
+void set_replica(ReplicaLattice *replicas, int r, const Spin2D *lattice) {
+    int R = replicas->n_replicas, Vol = replicas->lattice_side * replicas->lattice_side * replicas->lattice_side;
+    for (int n = 0; n < Vol; n++) {
+        replicas->sx[(size_t)n * R + r] = lattice[n].sx;
+        replicas->sy[(size_t)n * R + r] = lattice[n].sy;
+    }
+}
+
+
+// Computes the running totals of all the replicas from scratch, with the forward bonds of lattice_totals
+void replica_totals(ReplicaLattice *replicas, int *neighbors) {
+    int R = replicas->n_replicas, Vol = replicas->lattice_side * replicas->lattice_side * replicas->lattice_side;
+    int n, r;
+    const spin_t *sx = replicas->sx, *sy = replicas->sy;
+    double *energy = replicas->energy, *magn_x = replicas->magn_x, *magn_y = replicas->magn_y;
+
+    for (r=0; r<R; r++) {
+        energy[r] = 0.0; magn_x[r] = 0.0; magn_y[r] = 0.0;
+    }
+    for (n=0; n<Vol; n++) {
+        const int *nn = neighbors + N_NEIGHBORS * n;
+        const spin_t *x = sx + (size_t)n * R, *y = sy + (size_t)n * R;
+        const spin_t *xi = sx + (size_t)nn[I_PLUS] * R, *xj = sx + (size_t)nn[J_PLUS] * R, *xk = sx + (size_t)nn[K_PLUS] * R;
+        const spin_t *yi = sy + (size_t)nn[I_PLUS] * R, *yj = sy + (size_t)nn[J_PLUS] * R, *yk = sy + (size_t)nn[K_PLUS] * R;
+        #pragma omp simd
+        for (r=0; r<R; r++) {
+            double Sx = (double)xi[r] + xj[r] + xk[r];
+            double Sy = (double)yi[r] + yj[r] + yk[r];
+            energy[r] += -((double)x[r] * Sx + (double)y[r] * Sy);
+            magn_x[r] += x[r];
+            magn_y[r] += y[r];
+        }
+    }
+}
+
+
+// Adds the variations of a sweep of the replicas to their running totals and clears them
+static void add_replica_totals(ReplicaLattice *replicas) {
+    int R = replicas->n_replicas;
+    for (int r = 0; r < R; r++) {
+        replicas->energy[r] += replicas->delta[r];
+        replicas->magn_x[r] += replicas->delta[R + r];
+        replicas->magn_y[r] += replicas->delta[2 * R + r];
+        replicas->delta[r] = 0.0; replicas->delta[R + r] = 0.0; replicas->delta[2 * R + r] = 0.0;
+    }
+}
+
+
+// Complete Metropolis sweep of all the replicas, replica r at inverse temperature betas[r] (the same beta with
+// different seeds or different betas). The sites are visited in lexicographic order and each site is updated
+// on all the replicas at once, without branches: trial rotation, acceptance and running totals as in
+// local_metropolis, but the random number of the acceptance is drawn also when dE < 0, so that all the
+// generators advance together. Returns the accepted moves of all the replicas, those of each one are in accepted[r]
+unsigned long int metropolis_sweep_replicas(ReplicaLattice *replicas, int *neighbors, double alpha, const double *betas) {
+    int R = replicas->n_replicas, Vol = replicas->lattice_side * replicas->lattice_side * replicas->lattice_side;
+    int n, r;
+    unsigned long int acc = 0;
+    spin_t *sx = replicas->sx, *sy = replicas->sy;
+    uint64_t *state = replicas->rng_state;
+    const uint64_t *inc = replicas->rng_inc;
+    unsigned long int *accepted = replicas->accepted;
+    double *d_energy = replicas->delta, *d_mx = replicas->delta + R, *d_my = replicas->delta + 2 * R;
+
+    for (r=0; r<R; r++) {
+        accepted[r] = 0;
+    }
+    for (n=0; n<Vol; n++) {
+        const int *nn = neighbors + N_NEIGHBORS * n;
+        spin_t *x = sx + (size_t)n * R, *y = sy + (size_t)n * R;
+        const spin_t *xim = sx + (size_t)nn[I_MINUS] * R, *xip = sx + (size_t)nn[I_PLUS] * R;
+        const spin_t *xjm = sx + (size_t)nn[J_MINUS] * R, *xjp = sx + (size_t)nn[J_PLUS] * R;
+        const spin_t *xkm = sx + (size_t)nn[K_MINUS] * R, *xkp = sx + (size_t)nn[K_PLUS] * R;
+        const spin_t *yim = sy + (size_t)nn[I_MINUS] * R, *yip = sy + (size_t)nn[I_PLUS] * R;
+        const spin_t *yjm = sy + (size_t)nn[J_MINUS] * R, *yjp = sy + (size_t)nn[J_PLUS] * R;
+        const spin_t *ykm = sy + (size_t)nn[K_MINUS] * R, *ykp = sy + (size_t)nn[K_PLUS] * R;
+        // The neighbors are other sites, so the lanes of different replicas never overlap
+        #pragma omp simd reduction(+:acc)
+        for (r=0; r<R; r++) {
+            double Sx = xim[r] + xip[r] + xjm[r] + xjp[r] + xkm[r] + xkp[r];
+            double Sy = yim[r] + yip[r] + yjm[r] + yjp[r] + ykm[r] + ykp[r];
+            double theta = (2 * replica_rand(&state[r], inc[r]) - 1) * alpha;
+            double w = replica_rand(&state[r], inc[r]);
+            double ox = x[r], oy = y[r];
+            // sin(theta) written as a cosine: the compiler would merge sin and cos into sincos, which has no
+            // SIMD version, while cos and exp are vectorized with -ffast-math
+            double cos_theta = cos(theta), sin_theta = cos(theta - 0.5 * PI);
+            double tx = cos_theta * ox + sin_theta * oy, ty = -sin_theta * ox + cos_theta * oy;
+            // Trial spin rounded as store_spin does
+            double c = 1.5 - 0.5 * (tx * tx + ty * ty);
+            spin_t new_x = (spin_t)(c * tx), new_y = (spin_t)(c * ty);
+            double dE = -(((double)new_x * Sx + (double)new_y * Sy) - (ox * Sx + oy * Sy));
+            int a = (dE < 0) | (w <= exp(-betas[r] * dE));
+            x[r] = a ? new_x : x[r];
+            y[r] = a ? new_y : y[r];
+            d_energy[r] += a ? dE : 0.0;
+            d_mx[r] += a ? new_x - ox : 0.0;
+            d_my[r] += a ? new_y - oy : 0.0;
+            accepted[r] += a;
+            acc += a;
+        }
+    }
+    add_replica_totals(replicas);
+    return acc;
+}
+
+
+// Complete microcanonical sweep of all the replicas, in lexicographic order with the reflection of microcanonical
+// applied to all the replicas of a site at once. Returns the accepted moves, those of each replica are in accepted[r]
+unsigned long int microcanonical_sweep_replicas(ReplicaLattice *replicas, int *neighbors) {
+    int R = replicas->n_replicas, Vol = replicas->lattice_side * replicas->lattice_side * replicas->lattice_side;
+    int n, r;
+    unsigned long int acc = 0;
+    spin_t *sx = replicas->sx, *sy = replicas->sy;
+    unsigned long int *accepted = replicas->accepted;
+    double *d_mx = replicas->delta + R, *d_my = replicas->delta + 2 * R;
+
+    for (r=0; r<R; r++) {
+        accepted[r] = 0;
+    }
+    for (n=0; n<Vol; n++) {
+        const int *nn = neighbors + N_NEIGHBORS * n;
+        spin_t *x = sx + (size_t)n * R, *y = sy + (size_t)n * R;
+        const spin_t *xim = sx + (size_t)nn[I_MINUS] * R, *xip = sx + (size_t)nn[I_PLUS] * R;
+        const spin_t *xjm = sx + (size_t)nn[J_MINUS] * R, *xjp = sx + (size_t)nn[J_PLUS] * R;
+        const spin_t *xkm = sx + (size_t)nn[K_MINUS] * R, *xkp = sx + (size_t)nn[K_PLUS] * R;
+        const spin_t *yim = sy + (size_t)nn[I_MINUS] * R, *yip = sy + (size_t)nn[I_PLUS] * R;
+        const spin_t *yjm = sy + (size_t)nn[J_MINUS] * R, *yjp = sy + (size_t)nn[J_PLUS] * R;
+        const spin_t *ykm = sy + (size_t)nn[K_MINUS] * R, *ykp = sy + (size_t)nn[K_PLUS] * R;
+        #pragma omp simd reduction(+:acc)
+        for (r=0; r<R; r++) {
+            double Sx = xim[r] + xip[r] + xjm[r] + xjp[r] + xkm[r] + xkp[r];
+            double Sy = yim[r] + yip[r] + yjm[r] + yjp[r] + ykm[r] + ykp[r];
+            double sq_mod_S = Sx * Sx + Sy * Sy;
+            double ox = x[r], oy = y[r];
+            // Spins with a vanishing sum of the neighbors are left unchanged (divisor replaced to avoid 0/0)
+            int a = sqrt(sq_mod_S) >= 1e-13;
+            double sq = a ? sq_mod_S : 1.0;
+            double sS_scal_prod = ox * Sx + oy * Sy;
+            double nx = 2 * Sx * sS_scal_prod / sq - ox, ny = 2 * Sy * sS_scal_prod / sq - oy;
+            double c = 1.5 - 0.5 * (nx * nx + ny * ny);
+            spin_t new_x = (spin_t)(c * nx), new_y = (spin_t)(c * ny);
+            x[r] = a ? new_x : x[r];
+            y[r] = a ? new_y : y[r];
+            d_mx[r] += a ? new_x - ox : 0.0;
+            d_my[r] += a ? new_y - oy : 0.0;
+            accepted[r] += a;
+            acc += a;
+        }
+    }
+    add_replica_totals(replicas);
+    return acc;
+}
+
+
+
 int read_parameter(FILE *fp, char *param_name, char *param_type, void *value) {
     char file_param_name[50];
     rewind(fp); // Reset file pointer to the beginning
@@ -0,0 +1,93 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include <unistd.h>
+#include "../include/measurements.h"
+
+#define MAX_LENGTH 256
+
+
+// Opens the stream of a group of observables, named data_name.extension. A new stream (resume_size < 0) starts with
+// the header of the data file, with the step and the columns of the group; a resumed one is truncated to the
+// resume_size bytes written up to the checkpoint and continued, like the data file
+int open_measurement_stream(MeasurementStream *stream, const char *data_name, const DataHeader *header, long int resume_size) {
+    char file_name[MAX_LENGTH];
+
+    stream->fp = NULL;
+    stream->rows = 0;
+    stream->seconds = 0.0;
+    if (snprintf(file_name, MAX_LENGTH, "%s.%s", data_name, stream->extension) >= MAX_LENGTH) {
+        fprintf(stderr, "Stream file name too long: %s.%s\n", data_name, stream->extension);
+        return EXIT_FAILURE;
+    }
+    if (resume_size < 0) {
+        stream->fp = fopen(file_name, stream->text ? "w" : "wb");
+        if (stream->fp == NULL) {
+            fprintf(stderr, "Error opening stream file %s\n", file_name);
+            return EXIT_FAILURE;
+        }
+        if ((stream->text ? write_text_header(stream->fp, header) : write_data_header(stream->fp, header)) != EXIT_SUCCESS) {
+            fclose(stream->fp);
+            stream->fp = NULL;
+            return EXIT_FAILURE;
+        }
+        return EXIT_SUCCESS;
+    }
+    stream->fp = fopen(file_name, "r+b");
+    if (stream->fp == NULL || fseek(stream->fp, 0, SEEK_END) != 0 || ftell(stream->fp) < resume_size ||
+        ftruncate(fileno(stream->fp), resume_size) != 0 || fseek(stream->fp, 0, SEEK_END) != 0) {
+        fprintf(stderr, "Stream file %s is missing or shorter than the data saved up to the checkpoint\n", file_name);
+        if (stream->fp != NULL) {
+            fclose(stream->fp);
+            stream->fp = NULL;
+        }
+        return EXIT_FAILURE;
+    }
+    return EXIT_SUCCESS;
+}
+
+
+// Appends a row of n_cols values to the stream
+int write_measurement(MeasurementStream *stream, const double *values) {
+    int i;
+
+    if (stream->text) {
+        for (i=0; i<stream->n_cols; i++) {
+            fprintf(stream->fp, (i == 0) ? "%.15lf" : " %.15lf", values[i]);
+        }
+        fprintf(stream->fp, "\n");
+    } else if (fwrite(values, sizeof(double), (size_t)stream->n_cols, stream->fp) != (size_t)stream->n_cols) {
+        return EXIT_FAILURE;
+    }
+    stream->rows += 1;
+    return EXIT_SUCCESS;
+}
+
+
+// Flushes the stream to disk and returns its size in bytes, recorded in the checkpoints
+long int sync_measurement_stream(MeasurementStream *stream) {
+    fflush(stream->fp);
+    fsync(fileno(stream->fp));
+    return ftell(stream->fp);
+}
+
+
+int close_measurement_stream(MeasurementStream *stream) {
+    int failed = 0;
+
+    if (stream->fp != NULL) {
+        failed = (fclose(stream->fp) != 0);
+        stream->fp = NULL;
+    }
+    return failed ? EXIT_FAILURE : EXIT_SUCCESS;
+}
+
+
+// Wall-clock time in seconds from an arbitrary origin, for the times of the updates and of the measurements
+double wall_seconds(void) {
+    struct timespec now;
+
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return (double)now.tv_sec + 1e-9 * (double)now.tv_nsec;
+}
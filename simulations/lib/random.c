@@ -1,5 +1,8 @@
+#define _POSIX_C_SOURCE 199309L
 #include<math.h>
 #include<stdint.h>
+#include<time.h>
+#include<unistd.h>
 
 #include"../include/pcg32min.h"
 #include"../include/random.h"
@@ -11,10 +14,91 @@ void myrand_init(unsigned long int initstate, unsigned long int initseq)
   }
 
 
+// initialization of one stream per thread: same state, different sequence for each stream
+// (sequences start from initseq+1, so that no stream coincides with the one of myrand_init)
+void myrand_init_streams(pcg32_random_t *streams, int n_streams, unsigned long int initstate, unsigned long int initseq)
+  {
+  int i;
+  for(i=0; i<n_streams; i++)
+     {
+     pcg32_srandom_r(&streams[i], (uint64_t) initstate, (uint64_t) initseq + 1 + (uint64_t) i);
+     }
+  }
+
+
+// initialization of streams as blocks of the sequence of master: stream i is master advanced by i*stride steps,
+// so that the streams do not overlap for less than stride draws each
+void myrand_split_streams(pcg32_random_t *streams, int n_streams, const pcg32_random_t *master, uint64_t stride)
+  {
+  int i;
+  for(i=0; i<n_streams; i++)
+     {
+     streams[i] = *master;
+     myrand_advance(&streams[i], (uint64_t) i * stride);
+     }
+  }
+
+
+// jump-ahead of the LCG of pcg32 (Brown, "Random number generation with arbitrary strides", 1994):
+// the multiplier and the increment of 2^k steps are obtained by squaring, the bits of delta select them
+void myrand_advance(pcg32_random_t *rng, uint64_t delta)
+  {
+  uint64_t cur_mult = 6364136223846793005ULL, cur_plus = rng->inc|1;
+  uint64_t acc_mult = 1u, acc_plus = 0u;
+  while(delta>0)
+     {
+     if(delta & 1)
+       {
+       acc_mult *= cur_mult;
+       acc_plus = acc_plus*cur_mult + cur_plus;
+       }
+     cur_plus = (cur_mult+1)*cur_plus;
+     cur_mult *= cur_mult;
+     delta >>= 1;
+     }
+  rng->state = acc_mult*rng->state + acc_plus;
+  }
+
+
+// seed from the clock and the process id, mixed with the finalizer of splitmix64: time(NULL) alone is the same
+// for all the jobs started in the same second
+unsigned long int myrand_seed_from_clock(void)
+  {
+  struct timespec now;
+  uint64_t z;
+  clock_gettime(CLOCK_REALTIME, &now);
+  z = ((uint64_t) now.tv_sec * 1000000000ULL + (uint64_t) now.tv_nsec) ^ ((uint64_t) getpid() << 40);
+  z += 0x9e3779b97f4a7c15ULL;
+  z = (z ^ (z >> 30)) * 0xbf58476d1ce4e5b9ULL;
+  z = (z ^ (z >> 27)) * 0x94d049bb133111ebULL;
+  z ^= z >> 31;
+  return (unsigned long int) (z >> 1); // 63 bits, so that seed + 137 does not overflow
+  }
+
+
 // number in [0,1)
 double myrand(void)
   {
-  return (double) pcg32_random_r(&pcg32_random_state)/(pow(2.0, 32.0));
+  return (double) pcg32_random_r(&pcg32_random_state)*MYRAND_NORM;
   }
 
 
+// number in [0,1) from a given generator
+double myrand_r(pcg32_random_t *rng)
+  {
+  return (double) pcg32_random_r(rng)*MYRAND_NORM;
+  }
+
+
+// block of numbers in [0,1) from a given generator, the generator is kept in a local copy during the loop
+void myrand_fill(pcg32_random_t *rng, double *out, int n)
+  {
+  pcg32_random_t local = *rng;
+  int i;
+  for(i=0; i<n; i++)
+     {
+     out[i] = (double) pcg32_random_r(&local)*MYRAND_NORM;
+     }
+  *rng = local;
+  }
+
@@ -0,0 +1,283 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <stdint.h>
+#include <math.h>
+#include <unistd.h>
+#include <pthread.h>
+#include "../include/functions.h"
+#include "../include/snapshots.h"
+
+static const char *storage_names[] = {"float64", "float32", "angle16"};
+static const size_t storage_sizes[] = {2 * sizeof(double), 2 * sizeof(float), sizeof(int16_t)};
+
+
+// Storage of the keyword name ('float64', 'float32' or 'angle16'), returns EXIT_FAILURE for an invalid keyword
+int parse_snapshot_storage(const char *name, SnapshotStorage *storage) {
+    int s;
+    for (s=SNAPSHOT_FLOAT64; s<=SNAPSHOT_ANGLE16; s++) {
+        if (strcmp(name, storage_names[s])==0) {
+            *storage = (SnapshotStorage)s;
+            return EXIT_SUCCESS;
+        }
+    }
+    return EXIT_FAILURE;
+}
+
+
+// Converts n_snapshots lattices to the storage of the archive
+static void encode_snapshots(const SnapshotWriter *writer, const Spin2D *lattices, int n_snapshots, unsigned char *out) {
+    size_t n, n_spins = (size_t)n_snapshots * writer->lattice_side * writer->lattice_side * writer->lattice_side;
+    double *out64 = (double *)out;
+    float *out32 = (float *)out;
+    int16_t *out16 = (int16_t *)out;
+    long int q;
+
+    for (n=0; n<n_spins; n++) {
+        if (writer->storage == SNAPSHOT_FLOAT64) {
+            out64[2*n] = lattices[n].sx;
+            out64[2*n+1] = lattices[n].sy;
+        } else if (writer->storage == SNAPSHOT_FLOAT32) {
+            out32[2*n] = (float)lattices[n].sx;
+            out32[2*n+1] = (float)lattices[n].sy;
+        } else {
+            // atan2 is in [-pi, pi]: pi is written as -pi, the same angle
+            q = lrint(atan2(lattices[n].sy, lattices[n].sx) * (32768.0 / PI));
+            out16[n] = (int16_t)((q >= 32768) ? q - 65536 : q);
+        }
+    }
+}
+
+
+// Body of the writer thread: waits for a full buffer, converts it and appends it to the file
+static void *snapshot_writer_thread(void *arg) {
+    SnapshotWriter *writer = (SnapshotWriter *)arg;
+    int n_snapshots, failed;
+    size_t bytes;
+    const Spin2D *buffer;
+
+    pthread_mutex_lock(&writer->lock);
+    while (1) {
+        while (writer->pending == 0 && !writer->stop) {
+            pthread_cond_wait(&writer->cond, &writer->lock);
+        }
+        if (writer->pending == 0) {
+            break;
+        }
+        n_snapshots = writer->pending;
+        buffer = writer->buffers[1 - writer->active];
+        pthread_mutex_unlock(&writer->lock);
+
+        encode_snapshots(writer, buffer, n_snapshots, writer->encoded);
+        bytes = (size_t)n_snapshots * writer->snapshot_bytes;
+        failed = (fwrite(writer->encoded, 1, bytes, writer->fp) != bytes);
+
+        pthread_mutex_lock(&writer->lock);
+        writer->failed |= failed;
+        writer->written += (unsigned long int)n_snapshots;
+        writer->pending = 0;
+        pthread_cond_broadcast(&writer->cond);
+    }
+    pthread_mutex_unlock(&writer->lock);
+    return NULL;
+}
+
+
+// Writes the header of a new archive (see snapshots.h for the layout)
+static int write_snapshot_header(SnapshotWriter *writer, unsigned long int snapshot_step, unsigned long int seed, double beta) {
+    unsigned char buffer[SNAPSHOT_HEADER_SIZE] = {0};
+    uint32_t version = SNAPSHOT_VERSION, header_size = SNAPSHOT_HEADER_SIZE, snapshot_bytes = (uint32_t)writer->snapshot_bytes;
+    uint32_t one = 1;
+    int32_t lattice_side = writer->lattice_side;
+    uint64_t step = snapshot_step, seed64 = seed;
+    char dtype[8] = {0};
+
+    // values in the byte order of the machine, recorded in the dtype
+    dtype[0] = (*(unsigned char *)&one == 1) ? '<' : '>';
+    strcpy(dtype + 1, (writer->storage == SNAPSHOT_FLOAT64) ? "f8" : (writer->storage == SNAPSHOT_FLOAT32) ? "f4" : "i2");
+    memcpy(buffer, SNAPSHOT_MAGIC, sizeof(SNAPSHOT_MAGIC));
+    memcpy(buffer + 8, &version, sizeof(uint32_t));
+    memcpy(buffer + 12, &header_size, sizeof(uint32_t));
+    memcpy(buffer + 16, &lattice_side, sizeof(int32_t));
+    memcpy(buffer + 20, &snapshot_bytes, sizeof(uint32_t));
+    memcpy(buffer + 24, &step, sizeof(uint64_t));
+    memcpy(buffer + 32, &seed64, sizeof(uint64_t));
+    memcpy(buffer + 40, &beta, sizeof(double));
+    memcpy(buffer + 48, dtype, sizeof(dtype));
+    memcpy(buffer + 56, storage_names[writer->storage], strlen(storage_names[writer->storage]));
+    if (fwrite(buffer, 1, SNAPSHOT_HEADER_SIZE, writer->fp) != SNAPSHOT_HEADER_SIZE) {
+        fprintf(stderr, "Error writing the header of the snapshot archive.\n");
+        return EXIT_FAILURE;
+    }
+    return EXIT_SUCCESS;
+}
+
+
+// Continues an existing archive keeping its first n_keep snapshots (the ones up to the checkpoint of a resumed run):
+// the archive must have the same lattice_side and storage
+static int continue_snapshot_archive(SnapshotWriter *writer, const char *file_name, long int n_keep) {
+    unsigned char buffer[SNAPSHOT_HEADER_SIZE];
+    int32_t lattice_side;
+    uint32_t snapshot_bytes;
+    long int size = (long int)SNAPSHOT_HEADER_SIZE + n_keep * (long int)writer->snapshot_bytes;
+
+    if (fread(buffer, 1, SNAPSHOT_HEADER_SIZE, writer->fp) != SNAPSHOT_HEADER_SIZE ||
+        memcmp(buffer, SNAPSHOT_MAGIC, sizeof(SNAPSHOT_MAGIC)) != 0) {
+        fprintf(stderr, "%s is not a valid snapshot archive\n", file_name);
+        return EXIT_FAILURE;
+    }
+    memcpy(&lattice_side, buffer + 16, sizeof(int32_t));
+    memcpy(&snapshot_bytes, buffer + 20, sizeof(uint32_t));
+    if (lattice_side != writer->lattice_side || snapshot_bytes != writer->snapshot_bytes ||
+        strcmp((char *)buffer + 56, storage_names[writer->storage]) != 0) {
+        fprintf(stderr, "Snapshot archive %s has a different lattice_side or storage\n", file_name);
+        return EXIT_FAILURE;
+    }
+    if (fseek(writer->fp, 0, SEEK_END) != 0 || ftell(writer->fp) < size) {
+        fprintf(stderr, "Snapshot archive %s is shorter than the snapshots saved up to the checkpoint\n", file_name);
+        return EXIT_FAILURE;
+    }
+    if (ftruncate(fileno(writer->fp), size) != 0 || fseek(writer->fp, 0, SEEK_END) != 0) {
+        fprintf(stderr, "Error truncating the snapshot archive %s\n", file_name);
+        return EXIT_FAILURE;
+    }
+    writer->written = (unsigned long int)n_keep;
+    return EXIT_SUCCESS;
+}
+
+
+// Opens the archive file_name and starts its writer thread. With n_keep < 0 a new archive is created, otherwise the
+// existing one is continued after its first n_keep snapshots. Returns NULL on failure
+SnapshotWriter *open_snapshot_writer(const char *file_name, int lattice_side, SnapshotStorage storage,
+                                     unsigned long int snapshot_step, unsigned long int seed, double beta, long int n_keep) {
+    size_t Vol = (size_t)lattice_side * lattice_side * lattice_side;
+    SnapshotWriter *writer = (SnapshotWriter *)calloc(1, sizeof(SnapshotWriter));
+    int opened;
+
+    if (writer == NULL) {
+        fprintf(stderr, "Error in the allocation of the snapshot writer.\n");
+        return NULL;
+    }
+    writer->lattice_side = lattice_side;
+    writer->storage = storage;
+    writer->snapshot_bytes = Vol * storage_sizes[storage];
+    writer->chunk_snapshots = (int)(SNAPSHOT_CHUNK_BYTES / (Vol * sizeof(Spin2D)));
+    if (writer->chunk_snapshots < 1) {
+        writer->chunk_snapshots = 1;
+    }
+    writer->buffers[0] = (Spin2D *)malloc(writer->chunk_snapshots * Vol * sizeof(Spin2D));
+    writer->buffers[1] = (Spin2D *)malloc(writer->chunk_snapshots * Vol * sizeof(Spin2D));
+    writer->encoded = (unsigned char *)malloc(writer->chunk_snapshots * writer->snapshot_bytes);
+    writer->fp = fopen(file_name, (n_keep < 0) ? "wb" : "r+b");
+    if (writer->buffers[0] == NULL || writer->buffers[1] == NULL || writer->encoded == NULL || writer->fp == NULL) {
+        fprintf(stderr, "Error opening the snapshot archive %s\n", file_name);
+        opened = EXIT_FAILURE;
+    } else if (n_keep < 0) {
+        opened = write_snapshot_header(writer, snapshot_step, seed, beta);
+    } else {
+        opened = continue_snapshot_archive(writer, file_name, n_keep);
+    }
+    if (opened == EXIT_SUCCESS) {
+        pthread_mutex_init(&writer->lock, NULL);
+        pthread_cond_init(&writer->cond, NULL);
+        if (pthread_create(&writer->thread, NULL, snapshot_writer_thread, writer) != 0) {
+            fprintf(stderr, "Error starting the writer thread of the snapshots.\n");
+            pthread_mutex_destroy(&writer->lock);
+            pthread_cond_destroy(&writer->cond);
+            opened = EXIT_FAILURE;
+        }
+    }
+    if (opened != EXIT_SUCCESS) {
+        if (writer->fp != NULL) {
+            fclose(writer->fp);
+        }
+        free(writer->buffers[0]);
+        free(writer->buffers[1]);
+        free(writer->encoded);
+        free(writer);
+        return NULL;
+    }
+    return writer;
+}
+
+
+// Hands the active buffer to the writer thread, waiting for the previous chunk to be written
+static void submit_chunk(SnapshotWriter *writer) {
+    pthread_mutex_lock(&writer->lock);
+    if (writer->pending > 0) {
+        writer->waits += 1;
+    }
+    while (writer->pending > 0) {
+        pthread_cond_wait(&writer->cond, &writer->lock);
+    }
+    writer->pending = writer->filled;
+    writer->active = 1 - writer->active;
+    writer->filled = 0;
+    pthread_cond_broadcast(&writer->cond);
+    pthread_mutex_unlock(&writer->lock);
+}
+
+
+// Adds a copy of the lattice to the archive. Returns EXIT_FAILURE if a previous write of the thread failed
+int add_snapshot(SnapshotWriter *writer, const Spin2D *lattice) {
+    size_t Vol = (size_t)writer->lattice_side * writer->lattice_side * writer->lattice_side;
+    int failed;
+
+    memcpy(writer->buffers[writer->active] + writer->filled * Vol, lattice, Vol * sizeof(Spin2D));
+    writer->filled += 1;
+    if (writer->filled == writer->chunk_snapshots) {
+        submit_chunk(writer);
+    }
+    pthread_mutex_lock(&writer->lock);
+    failed = writer->failed;
+    pthread_mutex_unlock(&writer->lock);
+    return failed ? EXIT_FAILURE : EXIT_SUCCESS;
+}
+
+
+// Writes all the snapshots added so far and flushes the archive to disk (before a checkpoint)
+int flush_snapshots(SnapshotWriter *writer) {
+    int failed;
+
+    if (writer->filled > 0) {
+        submit_chunk(writer);
+    }
+    pthread_mutex_lock(&writer->lock);
+    while (writer->pending > 0) {
+        pthread_cond_wait(&writer->cond, &writer->lock);
+    }
+    failed = writer->failed;
+    pthread_mutex_unlock(&writer->lock);
+    // the thread is idle: the file can be used here
+    failed |= fflush(writer->fp) != 0;
+    failed |= fsync(fileno(writer->fp)) != 0;
+    if (failed) {
+        fprintf(stderr, "Error writing the snapshot archive.\n");
+        return EXIT_FAILURE;
+    }
+    return EXIT_SUCCESS;
+}
+
+
+// Writes the remaining snapshots, stops the thread and closes the archive
+int close_snapshot_writer(SnapshotWriter *writer) {
+    int failed;
+
+    if (writer == NULL) {
+        return EXIT_SUCCESS;
+    }
+    failed = (flush_snapshots(writer) != EXIT_SUCCESS);
+    pthread_mutex_lock(&writer->lock);
+    writer->stop = 1;
+    pthread_cond_broadcast(&writer->cond);
+    pthread_mutex_unlock(&writer->lock);
+    pthread_join(writer->thread, NULL);
+    pthread_mutex_destroy(&writer->lock);
+    pthread_cond_destroy(&writer->cond);
+    failed |= fclose(writer->fp) != 0;
+    free(writer->buffers[0]);
+    free(writer->buffers[1]);
+    free(writer->encoded);
+    free(writer);
+    return failed ? EXIT_FAILURE : EXIT_SUCCESS;
+}
@@ -0,0 +1,153 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+#include <time.h>
+#include "../include/functions.h"
+#include "../include/cluster.h"
+#include "../include/random.h"
+#include "../include/tuning.h"
+
+
+// One sweep of the mix of o2_mcmc: with probability epsilon the update of update_scheme, otherwise a microcanonical
+// sweep. Returns the acceptance of a Metropolis sweep, -1 for all the other updates
+double mixed_sweep(const UpdateContext *context, double alpha, double epsilon, LatticeTotals *totals) {
+    int Vol = context->lattice_side * context->lattice_side * context->lattice_side;
+    // lexicographic sweeps use the global generator, checkerboard ones the streams of the threads
+    pcg32_random_t *sweep_rng = (context->checkerboard==NULL) ? context->rng : context->streams;
+
+    if (myrand_r(context->rng) >= epsilon) {
+        microcanonical_sweep(context->lattice, context->neighbors, context->lattice_side, context->checkerboard, totals);
+    } else if (strcmp(context->update_scheme, "swendsen_wang")==0) {
+        swendsen_wang(context->lattice, context->neighbors, context->beta, context->workspace, context->streams,
+                      context->n_streams, totals);
+    } else if (strcmp(context->update_scheme, "wolff")==0) {
+        wolff_sweep(context->lattice, context->neighbors, context->beta, context->workspace, context->rng,
+                    context->wolff_clusters, totals);
+    } else if (strcmp(context->update_scheme, "heat_bath")==0) {
+        heat_bath_sweep(context->lattice, context->neighbors, context->lattice_side, context->beta, context->checkerboard,
+                        sweep_rng, totals);
+    } else {
+        return (double)metropolis_sweep(context->lattice, context->neighbors, context->lattice_side, alpha, context->beta,
+                                        context->checkerboard, sweep_rng, totals) / (double)Vol;
+    }
+    return -1.0;
+}
+
+
+// Integrated autocorrelation time of a series, tau = 1/2 + sum_t rho(t), with the automatic window of Sokal:
+// the sum stops at the first t >= TAU_WINDOW_FACTOR * tau(t). A constant series gives 1/2
+double autocorrelation_time(const double *series, int n) {
+    double mean = 0.0, c0 = 0.0, ct, tau = 0.5;
+    int i, t;
+
+    for (i=0; i<n; i++) {
+        mean += series[i];
+    }
+    mean /= n;
+    for (i=0; i<n; i++) {
+        c0 += (series[i] - mean) * (series[i] - mean);
+    }
+    c0 /= n;
+    if (c0 <= 0.0) {
+        return tau;
+    }
+    for (t=1; t<n/2; t++) {
+        ct = 0.0;
+        for (i=0; i<n-t; i++) {
+            ct += (series[i] - mean) * (series[i + t] - mean);
+        }
+        tau += ct / (n - t) / c0;
+        if (t >= TAU_WINDOW_FACTOR * tau) {
+            break;
+        }
+    }
+    return tau;
+}
+
+
+// Thermalization phase choosing alpha and epsilon, then frozen for the production. After tuning_sweeps / 4 sweeps
+// with the parameters of the input, alpha is calibrated to each of the TUNING_ACCEPTANCES of the Metropolis sweeps
+// (only for update_scheme metropolis, the other updates do not use it); then every pair (alpha, epsilon) of the
+// candidates runs for a window of sweeps, in which the integrated autocorrelation time of |m| and the CPU time
+// per sweep are measured. The chosen pair is the one with the lowest CPU time per independent sample,
+// 2 * tau * seconds_per_sweep. The candidates are written to log. Returns EXIT_FAILURE if the windows are too short
+int tune_parameters(const UpdateContext *context, unsigned long int tuning_sweeps, double *alpha, double *epsilon,
+                    LatticeTotals *totals, FILE *log) {
+    const double acceptances[TUNING_N_ACCEPTANCES] = TUNING_ACCEPTANCES, epsilons[TUNING_N_EPSILONS] = TUNING_EPSILONS;
+    double alphas[TUNING_N_ACCEPTANCES], acc, acc_sum, *series;
+    int metropolis = (strcmp(context->update_scheme, "metropolis")==0);
+    int n_alphas = metropolis ? TUNING_N_ACCEPTANCES : 1;
+    int Vol = context->lattice_side * context->lattice_side * context->lattice_side;
+    int a, e, n_metro;
+    unsigned long int s, warmup = tuning_sweeps / 4, calibration = 0, window;
+    TuningCandidate candidate, best = {0};
+    clock_t t_start;
+
+    if (metropolis) {
+        calibration = (tuning_sweeps / 20 < TUNING_CALIBRATION_SWEEPS) ? tuning_sweeps / 20 : TUNING_CALIBRATION_SWEEPS;
+    }
+    if ((tuning_sweeps - warmup - n_alphas * calibration) / (n_alphas * TUNING_N_EPSILONS) < 50) {
+        fprintf(stderr, "Too few tuning sweeps: at least 50 sweeps are needed for each of the %d candidates\n", n_alphas * TUNING_N_EPSILONS);
+        return EXIT_FAILURE;
+    }
+
+    for (s=0; s<warmup; s++) {
+        mixed_sweep(context, *alpha, *epsilon, totals);
+    }
+    // Multiplicative updates of alpha towards the target acceptance, alpha in [0.01, PI]. Near and above the critical
+    // beta the low acceptances cannot be reached and alpha stops at PI: repeated values are tried only once
+    alphas[0] = *alpha;
+    for (a=0; a<TUNING_N_ACCEPTANCES && metropolis; a++) {
+        alphas[a] = *alpha;
+        for (s=0; s<calibration; s++) {
+            acc = mixed_sweep(context, alphas[a], 1.0, totals);
+            alphas[a] = fmin(fmax(alphas[a] * exp(acc - acceptances[a]), 0.01), PI);
+        }
+    }
+    for (a=1, n_alphas=(metropolis ? 1 : n_alphas); a<TUNING_N_ACCEPTANCES && metropolis; a++) {
+        if (fabs(alphas[a] - alphas[n_alphas - 1]) > 1e-3 * alphas[a]) {
+            alphas[n_alphas++] = alphas[a];
+        }
+    }
+    window = (tuning_sweeps - warmup - TUNING_N_ACCEPTANCES * calibration) / (n_alphas * TUNING_N_EPSILONS);
+    series = (double *)malloc(window * sizeof(double));
+    if (series == NULL) {
+        fprintf(stderr, "Error in the allocation of the tuning series.\n");
+        return EXIT_FAILURE;
+    }
+
+    fprintf(log, "Tuning of alpha and epsilon: %d candidates, %lu sweeps each\n", n_alphas * TUNING_N_EPSILONS, window);
+    fprintf(log, "alpha epsilon acceptance tau seconds_per_sweep cost\n");
+    for (a=0; a<n_alphas; a++) {
+        for (e=0; e<TUNING_N_EPSILONS; e++) {
+            acc_sum = 0.0;
+            n_metro = 0;
+            t_start = clock();
+            for (s=0; s<window; s++) {
+                acc = mixed_sweep(context, alphas[a], epsilons[e], totals);
+                if (acc >= 0.0) {
+                    acc_sum += acc;
+                    n_metro += 1;
+                }
+                series[s] = sqrt(totals->magn.sx * totals->magn.sx + totals->magn.sy * totals->magn.sy) / Vol;
+            }
+            candidate.alpha = alphas[a];
+            candidate.epsilon = epsilons[e];
+            candidate.acceptance = (n_metro > 0) ? acc_sum / n_metro : -1.0;
+            candidate.seconds_per_sweep = (double)(clock() - t_start) / CLOCKS_PER_SEC / (double)window;
+            candidate.tau = autocorrelation_time(series, (int)window);
+            // tau below 1/2 (anticorrelated samples) is not trusted from such short windows
+            candidate.cost = 2.0 * fmax(candidate.tau, 0.5) * candidate.seconds_per_sweep;
+            fprintf(log, "%lf %lf %lf %lf %.3e %.3e\n", candidate.alpha, candidate.epsilon, candidate.acceptance,
+                    candidate.tau, candidate.seconds_per_sweep, candidate.cost);
+            if ((a == 0 && e == 0) || candidate.cost < best.cost) {
+                best = candidate;
+            }
+        }
+    }
+    *alpha = best.alpha;
+    *epsilon = best.epsilon;
+    free(series);
+    return EXIT_SUCCESS;
+}
@@ -0,0 +1,140 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <math.h>
+#include "../include/functions.h"
+#include "../include/random.h"
+#include "../include/worm.h"
+
+
+// Worm in the Z sector at site 0 with all the currents equal to zero (the beta = 0 configuration)
+WormState *allocate_worm(int lattice_side, double beta) {
+    int Vol = lattice_side * lattice_side * lattice_side;
+    WormState *worm = (WormState *)calloc(1, sizeof(WormState));
+    if (worm == NULL) {
+        fprintf(stderr, "Error in the allocation of the worm.\n");
+        return NULL;
+    }
+    worm->current = (int *)calloc((size_t)3 * Vol, sizeof(int));
+    if (worm->current == NULL) {
+        fprintf(stderr, "Error in the allocation of the worm.\n");
+        free(worm);
+        return NULL;
+    }
+    worm->lattice_side = lattice_side;
+    worm->volume = Vol;
+    worm->beta = beta;
+    worm->n_bonds[0] = (unsigned long int)3 * Vol;
+    bessel_ratios(beta, worm->ratio, WORM_MAX_CURRENT);
+    return worm;
+}
+
+
+void free_worm(WormState *worm) {
+    if (worm == NULL) {
+        return;
+    }
+    free(worm->current);
+    free(worm);
+}
+
+
+// Ratios I_{n+1}(beta) / I_n(beta) of the modified Bessel functions for n = 0, ..., n_max, from the backward
+// recurrence r_n = 1 / (2 (n+1) / beta + r_{n+1}) started well beyond n_max, where r_n ~ beta / (2 n) -> 0
+void bessel_ratios(double beta, double *ratio, int n_max) {
+    double r = 0.0;
+    int n;
+    for (n=n_max+100; n>=0; n--) {
+        r = 1.0 / (2.0 * (n + 1) / beta + r);
+        if (n <= n_max) {
+            ratio[n] = r;
+        }
+    }
+}
+
+
+// Energy per site of a Z configuration, -(1/V) sum_b d ln I_{J_b}(beta) / d beta, with
+// d ln I_n / d beta = I_{n+1} / I_n + n / beta
+double worm_energy_per_site(const WormState *worm) {
+    double energy = 0.0;
+    int n;
+    for (n=0; n<=worm->max_current; n++) {
+        energy -= (double)worm->n_bonds[n] * (worm->ratio[n] + n / worm->beta);
+    }
+    return energy / worm->volume;
+}
+
+
+// One step of the worm algorithm (N. Prokof'ev and B. Svistunov, PRL 87, 160601 (2001)). In the Z sector the
+// estimators are accumulated and both ends are moved to a random site; then the head moves to one of its
+// neighbors (chosen uniformly), changing by +-1 the current of the bond it crosses, with the Metropolis
+// probability min(1, I_{|J'|}(beta) / I_{|J|}(beta)). Returns 1 if the move is accepted
+static inline int worm_step(WormState *worm, int *neighbors, pcg32_random_t *rng, WormEstimators *estimators) {
+    int L = worm->lattice_side;
+    int d, next, bond, axis, dj, n_old, n_new;
+    double w2;
+
+    if (worm->head == worm->tail) {
+        // the currents are conserved everywhere: the flux through each plane is the winding number
+        w2 = 0.0;
+        for (axis=0; axis<3; axis++) {
+            w2 += (double)(worm->flux[axis] / L) * (double)(worm->flux[axis] / L);
+        }
+        estimators->z_steps += 1;
+        estimators->energy += worm_energy_per_site(worm);
+        estimators->winding2 += w2;
+        worm->head = worm->tail = (int)(myrand_r(rng) * worm->volume);
+    }
+    estimators->steps += 1;
+    d = (int)(myrand_r(rng) * N_NEIGHBORS);
+    next = neighbors[N_NEIGHBORS*worm->head + d];
+    // the current flows from the head to next: +1 on a forward bond, -1 on the forward bond of next
+    if (d < 3) {
+        axis = d;
+        bond = 3*worm->head + axis;
+        dj = 1;
+    } else {
+        axis = d - 3;
+        bond = 3*next + axis;
+        dj = -1;
+    }
+    n_old = abs(worm->current[bond]);
+    n_new = abs(worm->current[bond] + dj);
+    if (n_new > n_old && (n_new > WORM_MAX_CURRENT || myrand_r(rng) >= worm->ratio[n_old])) {
+        return 0;
+    }
+    worm->current[bond] += dj;
+    worm->n_bonds[n_old] -= 1;
+    worm->n_bonds[n_new] += 1;
+    if (n_new > worm->max_current) {
+        worm->max_current = n_new;
+    }
+    worm->flux[axis] += dj;
+    worm->head = next;
+    return 1;
+}
+
+
+// n_steps steps of the worm algorithm, returns the number of accepted moves
+unsigned long int worm_steps(WormState *worm, int *neighbors, unsigned long int n_steps, pcg32_random_t *rng,
+                             WormEstimators *estimators) {
+    unsigned long int s, accepted = 0;
+    for (s=0; s<n_steps; s++) {
+        accepted += worm_step(worm, neighbors, rng, estimators);
+    }
+    return accepted;
+}
+
+
+// Steps of the worm algorithm until n_loops more closed-loop configurations have been measured, stopping as soon
+// as the worm closes again (the next configuration, not yet measured, is in the Z sector). Blocks with the same
+// number of closed-loop configurations have the same weight: the mean of their steps / z_steps is the ratio of
+// the totals, while blocks of a fixed number of steps would give too much weight to the ones with few long worms,
+// whose length has a broad distribution at the critical point. Returns the number of accepted moves
+unsigned long int worm_closed_loops(WormState *worm, int *neighbors, unsigned long int n_loops, pcg32_random_t *rng,
+                                    WormEstimators *estimators) {
+    unsigned long int accepted = 0, target = estimators->z_steps + n_loops;
+    while (estimators->z_steps < target || worm->head != worm->tail) {
+        accepted += worm_step(worm, neighbors, rng, estimators);
+    }
+    return accepted;
+}
@@ -0,0 +1,51 @@
+import os
+import sys
+import logging
+
+# Add the utils directory to the system path to import custom utility functions
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../utils/')))
+from io_utils import setup_logging, load_config, prompt_user_choice
+from scheduler_utils import calibrate_cost_model, write_campaign_inputs, run_campaign
+from interface_utils import get_user_inputs_for_campaign
+
+
+if __name__ == "__main__":
+    """
+    Scheduler of a simulation campaign, alternative to data_run.sh (to be run from simulations/src).
+    The runs of the grid are dispatched longest first (cost proportional to L^3 * sweeps) onto the available
+    cores, a new run starting as soon as one ends, and the failed runs are retried from their checkpoints.
+    The cost model is calibrated on the .out files of the previous campaign, to estimate the duration.
+    """
+
+    # Setup logging
+    setup_logging(log_dir="../../logs/", log_file="campaign_scheduler.log")
+
+    try:
+        # Load and verify the configuration
+        config_path = "../../configs/campaign_scheduler_config.yaml"
+        config = load_config(config_path)
+        print("Loaded configuration:")
+        for key, value in config.items():
+            print(f"{key}: {value}\n")
+
+        # Ask the user if they want to adjust the configuration
+        if not prompt_user_choice("Is this configuration correct?"):
+            config = get_user_inputs_for_campaign(config)
+
+        settings, paths = config['settings'], config['paths']
+        n_workers = settings['n_workers'] or os.cpu_count()
+
+        seconds_per_update, n_runs = calibrate_cost_model(paths['outputs_dir'])
+        if seconds_per_update is None:
+            logging.info("No completed run in the outputs directory, the cost model is not calibrated")
+        else:
+            logging.info(f"Cost model calibrated on {n_runs} runs: {seconds_per_update * 1e9:.3f} ns per site update")
+
+        jobs = write_campaign_inputs(settings, paths)
+        results = run_campaign(jobs, settings['executable'], n_workers, settings['max_retries'],
+                               settings['poll_interval'], seconds_per_update)
+        if results['failed']:
+            logging.error(f"Failed runs: {', '.join(results['failed'])}")
+    except Exception as main_e:
+        # Log any unexpected errors
+        logging.critical(f"Unexpected error in main script: {main_e}", exc_info=True)
@@ -2,15 +2,22 @@
 
 # Check if a file was provided as an argument
 if [ -z "$1" ]; then
-    echo "Usage: ./compile.sh file_to_compile.c"
+    echo "Usage: ./compile.sh file_to_compile.c [float]"
+    echo "With 'float' the spins of the lattice are stored in single precision"
     exit 1
 fi
 
+# Optional compact storage of the spins (float32 components instead of float64)
+spin_flags=""
+if [ "$2" == "float" ]; then
+    spin_flags="-DFLOAT_SPINS"
+fi
+
 # Get the filename without the extension
 filename="${1%.*}"
 
 # Compile the file with optimization flags and all the useful libraries
-gcc -o "$filename".o "$1" ../lib/functions.c ../lib/random.c ../lib/pcg32min.c -O3 -march=native -mtune=native -flto -funroll-loops -fstrict-aliasing -ffast-math -lm
+gcc $spin_flags -o "$filename".o "$1" ../lib/functions.c ../lib/cluster.c ../lib/checkpoint.c ../lib/accumulators.c ../lib/tuning.c ../lib/worm.c ../lib/snapshots.c ../lib/measurements.c ../lib/data_header.c ../lib/random.c ../lib/pcg32min.c -O3 -march=native -mtune=native -flto -funroll-loops -fstrict-aliasing -ffast-math -fopenmp -pthread -lm
 
 # Check if the compilation was successful
 if [ $? -eq 0 ]; then
@@ -0,0 +1,25 @@
+#!/bin/bash
+
+# Builds the shared library ../lib/libo2.so with all the functions of ../lib, used by the Python bindings
+# (utils/o2_bindings.py). With 'float' the spins of the lattice are stored in single precision
+if [ -n "$1" ] && [ "$1" != "float" ]; then
+    echo "Usage: ./compile_lib.sh [float]"
+    exit 1
+fi
+
+spin_flags=""
+if [ "$1" == "float" ]; then
+    spin_flags="-DFLOAT_SPINS"
+fi
+
+# Same optimization flags of compile.sh but -ffast-math: linked in a shared library it would change the
+# floating point mode (flush to zero) of the whole Python process loading it
+gcc $spin_flags -shared -fPIC -o ../lib/libo2.so ../lib/functions.c ../lib/cluster.c ../lib/checkpoint.c ../lib/accumulators.c ../lib/tuning.c ../lib/worm.c ../lib/snapshots.c ../lib/measurements.c ../lib/data_header.c ../lib/random.c ../lib/pcg32min.c -O3 -march=native -mtune=native -funroll-loops -fstrict-aliasing -fopenmp -pthread -lm
+
+# Check if the compilation was successful
+if [ $? -eq 0 ]; then
+    echo "Compilation successful: ../lib/libo2.so"
+else
+    echo "Compilation failed."
+    exit 1
+fi
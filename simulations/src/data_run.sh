@@ -31,11 +31,22 @@ sample_size=20000000 # number of total sweeps for each lattice
 printing_step=200 # complete lattice iterations between means computing (sampling)
 alpha=1.0 # amplitude of the angle for Metropolis step
 epsilon=0.1 # percentage of Metropolis w.r.t. Microcanonical 
+checkpoint_step=100000 # complete lattice iterations between two checkpoints: rerunning an input resumes from the last one
 
-# Check and remove directories if they exist
+# Remove the inputs (written again below) and the files of the runs that cannot be resumed: a data file with its
+# checkpoint (data_file.chk) is kept, together with its other files (data_file.*) and its output, so that
+# rerunning this script resumes it from the checkpoint and appends to its output
+shopt -s nullglob
 [[ -d inputs ]] && rm -r inputs
-[[ -d data ]] && rm -r data
-[[ -d outputs ]] && rm -r outputs
+for data_file in data/lattice*/data_b*.bin; do
+    [[ -f "${data_file}.chk" ]] || rm -f "$data_file" "$data_file".*
+done
+for output_file in outputs/lattice*/output_b*.out; do
+    data_file="data/${output_file#outputs/}"
+    data_file="${data_file/\/output_b//data_b}"
+    [[ -f "${data_file%.out}.bin.chk" ]] || rm -f "$output_file"
+done
+shopt -u nullglob
 
 # Create directories for input, data, and output files, together with all the lattice subdirectories
 for lattice_side in "${lattice_side_values[@]}"; do
@@ -73,11 +84,13 @@ beta $beta
 alpha $alpha
 epsilon $epsilon
 verbose false
+checkpoint_step $checkpoint_step
+resume true
 EOF
 
-        # Run the simulation in the background, redirecting stdout to output file
+        # Run the simulation in the background, appending stdout to the output file (empty unless resumed)
         echo "Running simulation with beta=$beta, alpha=$alpha, lattice_side=$lattice_side"
-        ./$executable "$input_file" "$data_file" > "$output_file" &
+        ./$executable "$input_file" "$data_file" >> "$output_file" &
 
         # Increment the process counter
         ((proc_count++))
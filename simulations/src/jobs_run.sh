@@ -0,0 +1,71 @@
+#!/bin/bash
+
+# Set locale for correct numeric formatting
+export LC_NUMERIC=C
+scale=5 #scale for numerical precision
+beta_c=0.45275
+scaled_beta=40
+number_betas=31
+
+# Check if both arguments are provided
+if [[ $# -ne 2 ]]; then
+    echo "Usage: $0 o2_jobs.o num_threads"
+    exit 1
+fi
+
+# Assign arguments to variables
+executable="$1"
+# Number of workers, each one running a simulation at a time
+num_threads="$2"
+
+# Sequence for lattice_side
+lattice_side_values=(30 27 24 21 18 15 12 9)
+echo -e "chosen lattices: ${lattice_side_values[*]}"
+
+# Parameters for the simulations
+sample_size=20000000 # number of total sweeps for each lattice
+printing_step=200 # complete lattice iterations between means computing (sampling)
+alpha=1.0 # amplitude of the angle for Metropolis step
+epsilon=0.1 # percentage of Metropolis w.r.t. Microcanonical
+
+# Check and remove directories if they exist
+[[ -d inputs ]] && rm -r inputs
+[[ -d data ]] && rm -r data
+[[ -d outputs ]] && rm -r outputs
+
+# Create directories for input, data, and output files (the lattice subdirectories of data are created by the program)
+mkdir -p inputs data outputs
+
+input_file="inputs/input_jobs.in"
+job_list="inputs/job_list.txt"
+output_file="outputs/output_jobs.out"
+
+# Generate the input file, common to all the jobs
+cat > "$input_file" <<EOF
+seed time
+total_lattice_sweeps $sample_size
+printing_step $printing_step
+data_format binary
+alpha $alpha
+epsilon $epsilon
+num_threads $num_threads
+EOF
+
+# One job for each (lattice_side, beta), the grid is the same of data_run.sh
+echo "# lattice_side beta" > "$job_list"
+for lattice_side in "${lattice_side_values[@]}"; do
+    beta_down=$(echo "scale=$scale; $beta_c - $scaled_beta / e(l($lattice_side) * 3.0)" | bc -l)
+    beta_up=$(echo "scale=$scale; $beta_c + $scaled_beta / e(l($lattice_side) * 3.0)" | bc -l)
+    delta_beta=$(echo "scale=$scale; ($beta_up - $beta_down) / $number_betas" | bc -l)
+    for i in $(seq 0 $number_betas); do
+        beta=$(echo "scale=$scale; $beta_down + $i * $delta_beta" | bc -l)
+        echo "$lattice_side $beta" >> "$job_list"
+    done
+    echo -e "Lattice $lattice_side betas: from $beta_down, $((number_betas + 1)) jobs"
+done
+
+# Run all the jobs in a single process, redirecting stdout to output file
+echo "Running $(grep -vc '^#' "$job_list") jobs on $num_threads workers"
+./$executable "$input_file" "$job_list" data > "$output_file"
+
+echo "Done."
@@ -0,0 +1,47 @@
+import os
+import sys
+import logging
+
+# Add the utils directory to the system path to import custom utility functions
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../utils/')))
+from io_utils import setup_logging, load_config, prompt_user_choice
+from scheduler_utils import beta_grid
+from numpy_simulation_utils import run_numpy_simulation
+from interface_utils import get_user_inputs_for_numpy_simulation
+
+
+if __name__ == "__main__":
+    """
+    NumPy simulation of the small lattices, alternative to data_run.sh (to be run from simulations/src).
+    All the betas of a lattice are replicas evolved together by vectorized checkerboard sweeps (Metropolis with
+    probability epsilon, microcanonical otherwise), and the data files have the names and the format of o2_mcmc.
+    """
+
+    # Setup logging
+    setup_logging(log_dir="../../logs/", log_file="numpy_simulation.log")
+
+    try:
+        # Load and verify the configuration
+        config_path = "../../configs/numpy_simulation_config.yaml"
+        config = load_config(config_path)
+        print("Loaded configuration:")
+        for key, value in config.items():
+            print(f"{key}: {value}\n")
+
+        # Ask the user if they want to adjust the configuration
+        if not prompt_user_choice("Is this configuration correct?"):
+            config = get_user_inputs_for_numpy_simulation(config)
+
+        settings, paths = config['settings'], config['paths']
+        for lattice_side in settings['lattice_sides']:
+            betas = beta_grid(lattice_side, settings['beta_c'], settings['scaled_beta'], settings['number_betas'])
+            logging.info(f"Simulating L = {lattice_side} with {len(betas)} replicas: {', '.join(betas)}")
+            acceptances = run_numpy_simulation(lattice_side, betas, settings['sample_size'], settings['printing_step'],
+                                               settings['alpha'], settings['epsilon'], settings['seed'] + lattice_side,
+                                               paths['data_dir'], settings['data_format'])
+            for beta, acceptance in acceptances.items():
+                logging.info(f"L = {lattice_side}, beta = {beta}: Metropolis acceptance {acceptance['metropolis']:.4f}, "
+                             f"microcanonical acceptance {acceptance['microcanonical']:.4f}")
+    except Exception as main_e:
+        # Log any unexpected errors
+        logging.critical(f"Unexpected error in main script: {main_e}", exc_info=True)
@@ -0,0 +1,528 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include <math.h>
+#include <errno.h>
+#include <sys/stat.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+#include "../include/functions.h"
+#include "../include/cluster.h"
+#include "../include/data_header.h"
+#include "../include/random.h"
+
+#define MAX_LENGTH 128
+
+// One simulation of the job list: a lattice side, a beta and the seed of its generator
+typedef struct {
+    int lattice_side;
+    double beta;
+    unsigned long int seed;
+    int seed_given;   // 1 if the seed was written in the job list, then it is also part of the name of the data file
+    int index;        // position in the job list
+} Job;
+
+
+// Jobs with the largest volume first (all the jobs perform the same number of sweeps, so the cost is proportional
+// to L^3), in the order of the job list for equal volumes
+static int compare_jobs(const void *a, const void *b) {
+    const Job *ja = (const Job *)a, *jb = (const Job *)b;
+    if (ja->lattice_side != jb->lattice_side) {
+        return (ja->lattice_side < jb->lattice_side) ? 1 : -1;
+    }
+    return ja->index - jb->index;
+}
+
+
+// Reads the job list: one job per line, 'lattice_side beta' or 'lattice_side beta seed', empty lines and
+// lines starting with '#' are skipped. Jobs without a seed get base_seed + their position in the list.
+// Returns the number of jobs (and the array in *jobs), -1 in case of errors
+static int read_job_list(const char *file_name, unsigned long int base_seed, Job **jobs) {
+    FILE *fp = fopen(file_name, "r");
+    char line[4 * MAX_LENGTH];
+    int n_jobs = 0, capacity = 64, n_read, line_number = 0;
+    Job job, *tmp;
+
+    if (fp == NULL) {
+        fprintf(stderr, "Error opening the job list %s\n", file_name);
+        return -1;
+    }
+    *jobs = (Job *)malloc((size_t)capacity * sizeof(Job));
+    if (*jobs == NULL) {
+        fclose(fp);
+        return -1;
+    }
+    while (fgets(line, sizeof(line), fp) != NULL) {
+        line_number += 1;
+        if (line[strspn(line, " \t\r\n")] == '\0' || line[strspn(line, " \t")] == '#') {
+            continue;
+        }
+        n_read = sscanf(line, "%d %lf %lu", &job.lattice_side, &job.beta, &job.seed);
+        if (n_read < 2 || job.lattice_side < 2) {
+            fprintf(stdout, "Invalid job at line %d of %s: %s", line_number, file_name, line);
+            fclose(fp);
+            free(*jobs);
+            return -1;
+        }
+        job.seed_given = (n_read == 3);
+        job.index = n_jobs;
+        if (!job.seed_given) {
+            job.seed = base_seed + (unsigned long int)n_jobs;
+        }
+        if (n_jobs == capacity) {
+            capacity *= 2;
+            tmp = (Job *)realloc(*jobs, (size_t)capacity * sizeof(Job));
+            if (tmp == NULL) {
+                fclose(fp);
+                free(*jobs);
+                return -1;
+            }
+            *jobs = tmp;
+        }
+        (*jobs)[n_jobs] = job;
+        n_jobs += 1;
+    }
+    fclose(fp);
+    return n_jobs;
+}
+
+
+// Multi-job driver: runs all the simulations of a job list (a grid of lattice sides, betas and seeds) in a single
+// process. The jobs are taken from a queue, largest lattices first, by a fixed pool of worker threads; each worker
+// runs one job at a time with the same updates of o2_mcmc.c and its own generator, keeping its lattice and its
+// cluster work arrays from one job to the next. The neighbor tables are built once for every lattice side.
+// Job i writes data_directory/lattice<L>/data_b<beta>_L<L>.bin (or .dat), with beta written as bc does in data_run.sh
+// (.45127) and _s<seed> before the extension if the seed is given in the job list, with the same layout of the files
+// written by o2_mcmc.c
+int main(int argc, char * argv[]) {
+    clock_t t_start, t_end;
+    struct timespec wall_start, wall_end;
+    double cpu_time_used, wall_time_used;
+    t_start = clock();
+    clock_gettime(CLOCK_MONOTONIC, &wall_start);
+
+    // Check if the number of parameters is 4, i.e. ./program inputfile.in job_list data_directory
+    if (argc!=4) {
+        fprintf(stdout, "Invalid input!\nHow to use this program:\n./program input.inp job_list data_directory\n");
+	fprintf(stdout, "Input.inp must be like (do not include ' '):\nseed int or 'time'\ntotal_lattice_sweeps int\nprinting_step int\ndata_format 'binary' or 'text'\nalpha double\nepsilon double\n");
+	fprintf(stdout, "Optional parameters:\nnum_threads int (number of workers, each one running a job at a time, default: OpenMP default)\n");
+	fprintf(stdout, "sweep_mode 'lexicographic' (default) or 'checkerboard'\n");
+	fprintf(stdout, "update_scheme 'metropolis' (default), 'heat_bath' (alpha unused), 'wolff' or 'swendsen_wang', mixed with microcanonical sweeps according to epsilon\nwolff_clusters int (only for wolff, clusters per Wolff step, default: 1)\n");
+	fprintf(stdout, "recompute_step int (sweeps between two full computations of energy and magnetization, default: 1000)\n");
+	fprintf(stdout, "The job list has a job per line, 'lattice_side beta' or 'lattice_side beta seed' (default seed: seed + line of the job), '#' for comments\n");
+        return EXIT_SUCCESS;
+    }
+
+    char inp_file_name[MAX_LENGTH], job_file_name[MAX_LENGTH], data_dir[MAX_LENGTH];
+    strcpy(inp_file_name, argv[1]);
+    strcpy(job_file_name, argv[2]);
+    strcpy(data_dir, argv[3]);
+
+    ///////////////////////////////////////////////////////////////
+    // Opening input file from which inputs parameters are taken //
+    ///////////////////////////////////////////////////////////////
+    FILE *inp_file = fopen(inp_file_name, "r");
+    if (inp_file == NULL) {
+        fprintf(stderr, "Error opening input file\n");
+        return EXIT_SUCCESS;
+    }
+    fprintf(stdout, "Parameters input file name: %s\n", inp_file_name);
+
+    /////////////////////////////////////////////////////////////////
+    // Let's extract all the useful parameters from the input file //
+    /////////////////////////////////////////////////////////////////
+    int param_found = 0;
+    char param_name[MAX_LENGTH], param_type[MAX_LENGTH];
+    char data_format[MAX_LENGTH], seed[MAX_LENGTH], sweep_mode[MAX_LENGTH], update_scheme[MAX_LENGTH];
+    unsigned long int total_lattice_sweeps, printing_step, recompute_step;
+    int num_threads = 1, wolff_clusters = 0;
+    double alpha, epsilon;
+    fprintf(stdout, "### Parameters of the simulations:\n");
+    // Type of data format of the output files
+    strcpy(param_name, "data_format");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &data_format);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, data_format);
+        if (strcmp(data_format, "binary")!=0 && strcmp(data_format, "text")!=0) {
+            fprintf(stdout, "Invalid type of format choosen for the file! Valid keywords: 'binary' and 'text'.\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // total_lattice_sweeps = number of complete sweeps of the lattice of each job
+    strcpy(param_name, "total_lattice_sweeps");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &total_lattice_sweeps);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lu\n", param_name, total_lattice_sweeps);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // printing_step = number of complete sweeps after which we want to compute and collect E and |m|
+    strcpy(param_name, "printing_step");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &printing_step);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lu\n", param_name, printing_step);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // alpha = amplitude of the angle for the Metropolis step
+    strcpy(param_name, "alpha");
+    strcpy(param_type, "%lf");
+    param_found = read_parameter(inp_file, param_name, param_type, &alpha);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lf\n", param_name, alpha);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // epsilon = probability of perfoming a Metropolis sweep (or a cluster step, see update_scheme) instead of a microcanonical one
+    strcpy(param_name, "epsilon");
+    strcpy(param_type, "%lf");
+    param_found = read_parameter(inp_file, param_name, param_type, &epsilon);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lf\n", param_name, epsilon);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // seed = base seed of the jobs without a seed in the job list
+    strcpy(param_name, "seed");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &seed);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, seed);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // sweep_mode = order of the updates in a sweep, lexicographic or checkerboard (each job is run by a single thread anyway)
+    strcpy(param_name, "sweep_mode");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &sweep_mode);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, sweep_mode);
+        if (strcmp(sweep_mode, "lexicographic")!=0 && strcmp(sweep_mode, "checkerboard")!=0) {
+            fprintf(stdout, "Invalid sweep mode! Valid keywords: 'lexicographic' and 'checkerboard'.\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    } else if (param_found==0) {
+        strcpy(sweep_mode, "lexicographic");
+        fprintf(stdout, "%s = %s (default)\n", param_name, sweep_mode);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // recompute_step = number of complete sweeps after which energy and magnetization are computed from scratch
+    strcpy(param_name, "recompute_step");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &recompute_step);
+    if (param_found==1 && recompute_step>0) {
+        fprintf(stdout, "%s = %lu\n", param_name, recompute_step);
+    } else if (param_found==0) {
+        recompute_step = 1000;
+        fprintf(stdout, "%s = %lu (default)\n", param_name, recompute_step);
+    } else {
+        fprintf(stdout, "Invalid recompute step!\n");
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // update_scheme = non-microcanonical step of the mix: local Metropolis or heat-bath sweep, a fixed number of Wolff clusters or a Swendsen-Wang update
+    strcpy(param_name, "update_scheme");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &update_scheme);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, update_scheme);
+        if (strcmp(update_scheme, "metropolis")!=0 && strcmp(update_scheme, "heat_bath")!=0 && strcmp(update_scheme, "wolff")!=0 &&
+            strcmp(update_scheme, "swendsen_wang")!=0) {
+            fprintf(stdout, "Invalid update scheme! Valid keywords: 'metropolis', 'heat_bath', 'wolff' and 'swendsen_wang'.\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    } else if (param_found==0) {
+        strcpy(update_scheme, "metropolis");
+        fprintf(stdout, "%s = %s (default)\n", param_name, update_scheme);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // wolff_clusters = number of Wolff clusters built in a Wolff step
+    if (strcmp(update_scheme, "wolff")==0) {
+        strcpy(param_name, "wolff_clusters");
+        strcpy(param_type, "%d");
+        param_found = read_parameter(inp_file, param_name, param_type, &wolff_clusters);
+        if (param_found==1 && wolff_clusters>0) {
+            fprintf(stdout, "%s = %d\n", param_name, wolff_clusters);
+        } else if (param_found==0) {
+            wolff_clusters = 1;
+            fprintf(stdout, "%s = %d (default)\n", param_name, wolff_clusters);
+        } else {
+            fprintf(stdout, "Invalid number of Wolff clusters!\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    }
+    // num_threads = number of workers, each one running a whole job at a time
+    #ifdef _OPENMP
+    num_threads = omp_get_max_threads();
+    #endif
+    strcpy(param_name, "num_threads");
+    strcpy(param_type, "%d");
+    param_found = read_parameter(inp_file, param_name, param_type, &num_threads);
+    if (param_found==-1 || num_threads<1) {
+        fprintf(stdout, "Invalid number of threads!\n");
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    #ifdef _OPENMP
+    omp_set_num_threads(num_threads);
+    // The sweeps of a job must not open their own teams inside a worker
+    omp_set_max_active_levels(1);
+    #else
+    num_threads = 1;
+    #endif
+    fprintf(stdout, "%s = %d\n", param_name, num_threads);
+    fclose(inp_file);
+    unsigned long int seed1;
+    if (strcmp(seed, "time")==0) {
+        seed1 = myrand_seed_from_clock(); // clock and process id: jobs started in the same second get different seeds
+    } else { // Everything else other than the keyword "time" is converted to a long unsigned int, so be careful
+        seed1 = strtoul(seed, NULL, 10);
+    }
+
+    /////////////////////////////////////////////////////////
+    // Job list, sorted to start from the largest lattices //
+    /////////////////////////////////////////////////////////
+    Job * jobs = NULL;
+    int n_jobs = read_job_list(job_file_name, seed1, &jobs);
+    if (n_jobs<=0) {
+        fprintf(stdout, "No valid job in %s, simulation aborted!\n", job_file_name);
+        return EXIT_SUCCESS;
+    }
+    qsort(jobs, (size_t)n_jobs, sizeof(Job), compare_jobs);
+    int max_side = jobs[0].lattice_side;
+    fprintf(stdout, "Jobs in %s: %d, largest lattice side: %d\n", job_file_name, n_jobs, max_side);
+    fprintf(stdout, "Spin storage: %s\n", SPIN_STORAGE);
+
+    /////////////////////////////////////////////////////////////////////////////////
+    // Tables shared by the workers, built once for every lattice side of the list //
+    /////////////////////////////////////////////////////////////////////////////////
+    int ** neighbors = (int **)calloc((size_t)max_side + 1, sizeof(int *));
+    Checkerboard ** checkerboards = (Checkerboard **)calloc((size_t)max_side + 1, sizeof(Checkerboard *));
+    char dir_name[2*MAX_LENGTH];
+    int j, alloc_failed = 0, failed_jobs = 0;
+    if (neighbors==NULL || checkerboards==NULL) {
+        alloc_failed = 1;
+    }
+    for (j=0; j<n_jobs && alloc_failed==0; j++) {
+        int side = jobs[j].lattice_side;
+        if (neighbors[side]!=NULL) {
+            continue;
+        }
+        neighbors[side] = allocate_neighbors(side);
+        if (neighbors[side]==NULL) {
+            alloc_failed = 1;
+            break;
+        }
+        if (strcmp(sweep_mode, "checkerboard")==0) {
+            checkerboards[side] = allocate_checkerboard(neighbors[side], side);
+            if (checkerboards[side]==NULL) {
+                alloc_failed = 1;
+            }
+        }
+        // One subdirectory for each lattice side, as in data_run.sh
+        snprintf(dir_name, sizeof(dir_name), "%s/lattice%d", data_dir, side);
+        if (mkdir(dir_name, 0755)!=0 && errno!=EEXIST) {
+            fprintf(stderr, "Error creating the data directory %s\n", dir_name);
+            alloc_failed = 1;
+        }
+    }
+    if (alloc_failed==1) {
+        fprintf(stdout, "Failed allocation of the tables of the lattices, simulation aborted!\n");
+    }
+
+    ////////////////////////////////////////////////////////////////////////
+    // Pool of workers: each thread takes the next job of the sorted list //
+    ////////////////////////////////////////////////////////////////////////
+    #pragma omp parallel if(alloc_failed==0) reduction(+:failed_jobs)
+    {
+        // Allocations of the worker, reused by all its jobs: the lattice has the largest volume of the list,
+        // the cluster work arrays are rebuilt only when the lattice side changes
+        Spin2D * lattice = allocate(max_side);
+        ClusterWorkspace * workspace = NULL;
+        int workspace_side = 0, worker = 0;
+        #ifdef _OPENMP
+        worker = omp_get_thread_num();
+        #endif
+
+        #pragma omp for schedule(dynamic, 1)
+        for (j=0; j<n_jobs; j++) {
+            const Job * job = &jobs[j];
+            int lattice_side = job->lattice_side, Vol = lattice_side * lattice_side * lattice_side;
+            int * nn = neighbors[lattice_side];
+            const Checkerboard * checkerboard = checkerboards[lattice_side];
+            char data_name[3*MAX_LENGTH], suffix[MAX_LENGTH] = "", beta_text[MAX_LENGTH];
+            pcg32_random_t rng;
+            LatticeTotals totals;
+            DoubleVector2D magn;
+            double E_per_site, percentage_metro_acc = 0.0, job_time, job_cpu_time;
+            unsigned long int sweep, metro_full_lattice = 0, cluster_steps = 0, cluster_count = 0;
+            struct timespec job_start, job_end, job_cpu_start, job_cpu_end;
+            FILE * data;
+
+            if (lattice==NULL || alloc_failed==1) {
+                failed_jobs += 1;
+                continue;
+            }
+            if ((strcmp(update_scheme, "wolff")==0 || strcmp(update_scheme, "swendsen_wang")==0) && workspace_side!=lattice_side) {
+                free_cluster_workspace(workspace);
+                workspace = allocate_cluster_workspace(lattice_side);
+                workspace_side = (workspace!=NULL) ? lattice_side : 0;
+                if (workspace==NULL) {
+                    failed_jobs += 1;
+                    continue;
+                }
+            }
+            if (job->seed_given) {
+                snprintf(suffix, sizeof(suffix), "_s%lu", job->seed);
+            }
+            format_beta(job->beta, beta_text, sizeof(beta_text));
+            snprintf(data_name, sizeof(data_name), "%s/lattice%d/data_b%s_L%d%s.%s", data_dir, lattice_side, beta_text,
+                     lattice_side, suffix, (strcmp(data_format, "text")==0) ? "dat" : "bin");
+            data = fopen(data_name, (strcmp(data_format, "text")==0) ? "w" : "wb");
+            if (data==NULL) {
+                #pragma omp critical(job_log)
+                fprintf(stderr, "Error opening output data file %s\n", data_name);
+                failed_jobs += 1;
+                continue;
+            }
+            clock_gettime(CLOCK_MONOTONIC, &job_start);
+            clock_gettime(CLOCK_THREAD_CPUTIME_ID, &job_cpu_start);
+
+            // Same generator of o2_mcmc.c with the same seed: in lexicographic mode a job reproduces its samples
+            pcg32_srandom_r(&rng, (uint64_t)job->seed, (uint64_t)(job->seed + 137));
+            initialize_lattice(lattice, lattice_side, &rng);
+            totals = lattice_totals(lattice, nn, lattice_side);
+            DataHeader header = {lattice_side, DATA_N_COLS, printing_step, job->seed, job->beta, alpha, epsilon, "", DATA_COLUMNS};
+            strcpy(header.update_scheme, update_scheme);
+            if (strcmp(data_format, "text")==0) {
+                write_text_header(data, &header);
+            } else {
+                write_data_header(data, &header);
+            }
+
+            for (sweep=1; sweep<=total_lattice_sweeps; sweep++) {
+                if (myrand_r(&rng)>=epsilon) {
+                    microcanonical_sweep(lattice, nn, lattice_side, checkerboard, &totals);
+                } else if (strcmp(update_scheme, "swendsen_wang")==0) {
+                    cluster_steps += 1;
+                    cluster_count += swendsen_wang(lattice, nn, job->beta, workspace, &rng, 1, &totals);
+                } else if (strcmp(update_scheme, "wolff")==0) {
+                    cluster_steps += 1;
+                    cluster_count += wolff_sweep(lattice, nn, job->beta, workspace, &rng, wolff_clusters, &totals);
+                } else if (strcmp(update_scheme, "heat_bath")==0) {
+                    metro_full_lattice += 1;
+                    percentage_metro_acc += (double)heat_bath_sweep(lattice, nn, lattice_side, job->beta, checkerboard, &rng, &totals) / (double)Vol;
+                } else {
+                    metro_full_lattice += 1;
+                    percentage_metro_acc += (double)metropolis_sweep(lattice, nn, lattice_side, alpha, job->beta, checkerboard, &rng, &totals) / (double)Vol;
+                }
+                if (sweep%recompute_step==0) {
+                    totals = lattice_totals(lattice, nn, lattice_side);
+                }
+                if (sweep%printing_step==0) {
+                    E_per_site = totals.energy / (double)Vol;
+                    magn.sx = totals.magn.sx / (double)Vol;
+                    magn.sy = totals.magn.sy / (double)Vol;
+                    if (strcmp(data_format, "text")==0) {
+                        fprintf(data, "%.15lf %.15lf %.15lf\n", magn.sx, magn.sy, E_per_site);
+                    } else {
+                        fwrite(&magn.sx, sizeof(double), 1, data);
+                        fwrite(&magn.sy, sizeof(double), 1, data);
+                        fwrite(&E_per_site, sizeof(double), 1, data);
+                    }
+                }
+            }
+            fclose(data);
+            clock_gettime(CLOCK_MONOTONIC, &job_end);
+            clock_gettime(CLOCK_THREAD_CPUTIME_ID, &job_cpu_end);
+            job_time = (double)(job_end.tv_sec - job_start.tv_sec) + 1e-9 * (double)(job_end.tv_nsec - job_start.tv_nsec);
+            job_cpu_time = (double)(job_cpu_end.tv_sec - job_cpu_start.tv_sec) + 1e-9 * (double)(job_cpu_end.tv_nsec - job_cpu_start.tv_nsec);
+
+            #pragma omp critical(job_log)
+            {
+                fprintf(stdout, "Job %d (lattice_side = %d, beta = %s, seed = %lu) done by worker %d in %.3lf s: %s\n", job->index,
+                        lattice_side, beta_text, job->seed, worker, job_time, data_name);
+                // CPU time of the worker thread for this job, the runtime of o2_mcmc for the same simulation
+                fprintf(stdout, "    Runtime of the simulation with lattice_side = %d, beta = %s: %.10lf\n", lattice_side,
+                        beta_text, job_cpu_time);
+                if (strcmp(update_scheme, "metropolis")==0) {
+                    fprintf(stdout, "    Metropolis complete sweeps: %lu, mean acceptance: %lf\n", metro_full_lattice,
+                            percentage_metro_acc / (double)metro_full_lattice);
+                } else if (strcmp(update_scheme, "heat_bath")==0) {
+                    fprintf(stdout, "    Heat-bath complete sweeps: %lu\n", metro_full_lattice);
+                } else {
+                    fprintf(stdout, "    %s steps: %lu, mean %s per step: %lf\n", update_scheme, cluster_steps,
+                            (strcmp(update_scheme, "wolff")==0) ? "flipped spins" : "clusters", (double)cluster_count / (double)cluster_steps);
+                }
+                fflush(stdout);
+            }
+        }
+        free_lattice(lattice);
+        free_cluster_workspace(workspace);
+    }
+
+    if (alloc_failed==0) {
+        fprintf(stdout, "\nSimulations ended.\nJobs completed: %d of %d\n", n_jobs - failed_jobs, n_jobs);
+    }
+    for (j=0; j<=max_side; j++) {
+        if (neighbors!=NULL) {
+            free(neighbors[j]);
+        }
+        if (checkerboards!=NULL) {
+            free_checkerboard(checkerboards[j]);
+        }
+    }
+    free(neighbors);
+    free(checkerboards);
+    free(jobs);
+    t_end = clock();
+    clock_gettime(CLOCK_MONOTONIC, &wall_end);
+    cpu_time_used = ((double) (t_end - t_start)) / CLOCKS_PER_SEC;
+    wall_time_used = (double)(wall_end.tv_sec - wall_start.tv_sec) + 1e-9 * (double)(wall_end.tv_nsec - wall_start.tv_nsec);
+    // Totals of the whole job list (CPU time of all the workers), the runtimes of the jobs are in their reports
+    fprintf(stdout, "Runtime of all the jobs: %.10lf\n", cpu_time_used);
+    fprintf(stdout, "Wall-clock time of all the jobs: %.10lf\n", wall_time_used);
+    return EXIT_SUCCESS;
+}
@@ -3,21 +3,45 @@
 #include <string.h>
 #include <time.h>
 #include <math.h>
+#include <unistd.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 
 #include "../include/functions.h"
+#include "../include/cluster.h"
 #include "../include/random.h"
+#include "../include/checkpoint.h"
+#include "../include/data_header.h"
+#include "../include/accumulators.h"
+#include "../include/tuning.h"
+#include "../include/snapshots.h"
+#include "../include/measurements.h"
 
 #define MAX_LENGTH 128
 
 int main(int argc, char * argv[]) {
     clock_t t_start, t_end;
-    double cpu_time_used;
+    struct timespec wall_start, wall_end;
+    double cpu_time_used, wall_time_used;
     t_start = clock();
+    clock_gettime(CLOCK_MONOTONIC, &wall_start);
    
     // Check if the number of parameters is 3, i.e. ./program inputfile.in data.dat
     if (argc!=3) {
         fprintf(stdout, "Invalid input!\nHow to use this program:\n./program input.inp datafile(.dat or .bin)\n");
 	fprintf(stdout, "Input.inp must be like (do not include ' '):\nlattice_side int\nseed int or 'time'\ntotal_lattice_sweeps int\nprinting_step int\ndata_format 'binary' or 'text'\nbeta double\nalpha double\nepsilon double\nverbose 'false' or 'true'\n");
+	fprintf(stdout, "Optional parameters:\nsweep_mode 'lexicographic' (default) or 'checkerboard'\nnum_threads int (only for checkerboard or swendsen_wang, default: OpenMP default)\n");
+	fprintf(stdout, "update_scheme 'metropolis' (default), 'heat_bath' (alpha unused), 'wolff' or 'swendsen_wang', mixed with microcanonical sweeps according to epsilon\nwolff_clusters int (only for wolff, clusters per Wolff step, default: 1)\n");
+	fprintf(stdout, "recompute_step int (sweeps between two full computations of energy and magnetization, default: 1000)\n");
+	fprintf(stdout, "checkpoint_step int (sweeps between two checkpoints, default: 0, no checkpoints)\ncheckpoint_file name (default: datafile.chk)\n");
+	fprintf(stdout, "resume 'false' (default) or 'true' (continue from the checkpoint, if it exists, appending to the datafile)\n");
+	fprintf(stdout, "initial_configuration name (lattice saved by final_configuration of another run, default: none, random lattice)\nfinal_configuration name (file where the last lattice is saved, default: none)\n");
+	fprintf(stdout, "structure_factor_step int (sweeps between two measurements of G(0) and G(k_min), written to datafile.sf, for the second-moment correlation length, default: 0, not measured)\nhelicity_step int (sweeps between two measurements of the bond sums of the helicity modulus, written to datafile.hel, default: 0, not measured)\n");
+	fprintf(stdout, "snapshot_step int (sweeps between two configurations saved in the snapshot archive, default: 0, no snapshots)\nsnapshot_file name (default: datafile.snap)\nsnapshot_storage 'float64' (default), 'float32' or 'angle16' (angles quantized to 16 bits)\n");
+	fprintf(stdout, "accumulate 'false' (default) or 'true' (means and blocking errors of |m|, m^2, m^4, energy and its square, computed during the run)\n");
+	fprintf(stdout, "thermalization_samples int (only for accumulate, first samples not accumulated, default: 0)\nsummary_file name (only for accumulate, default: datafile.sum)\n");
+	fprintf(stdout, "tune 'false' (default) or 'true' (alpha and epsilon chosen in a thermalization phase to minimize the CPU time per independent sample, then frozen)\ntuning_sweeps int (only for tune, sweeps of the thermalization phase, default: 20000)\n");
         return EXIT_SUCCESS;
     }
 
@@ -41,9 +65,12 @@ int main(int argc, char * argv[]) {
     /////////////////////////////////////////////////////////////////
     int param_found = 0;
     char param_name[MAX_LENGTH], param_type[MAX_LENGTH];
-    char data_format[MAX_LENGTH], seed[MAX_LENGTH], verbose[MAX_LENGTH];
-    unsigned long int total_lattice_sweeps, printing_step;
-    int lattice_side;
+    char data_format[MAX_LENGTH], seed[MAX_LENGTH], verbose[MAX_LENGTH], sweep_mode[MAX_LENGTH], update_scheme[MAX_LENGTH];
+    char checkpoint_file[MAX_LENGTH], resume[MAX_LENGTH], accumulate[MAX_LENGTH], summary_file[MAX_LENGTH], tune[MAX_LENGTH];
+    char initial_configuration[MAX_LENGTH], final_configuration[MAX_LENGTH], snapshot_file[MAX_LENGTH], snapshot_storage[MAX_LENGTH];
+    unsigned long int total_lattice_sweeps, printing_step, recompute_step, checkpoint_step, thermalization_samples = 0, tuning_sweeps = 0;
+    unsigned long int snapshot_step, structure_factor_step, helicity_step;
+    int lattice_side, num_threads = 1, wolff_clusters = 0;
     double beta, alpha, epsilon;
     fprintf(stdout, "### Parameters of the simulation:\n");
     // Type of data format of the output .dat file
@@ -144,7 +171,7 @@ int main(int argc, char * argv[]) {
         fclose(inp_file);
         return EXIT_SUCCESS;
     }
-    // epsilon = probability of perfoming L^3 metropolis update; (1-epsilon) is the prob. of performing L^3 microcan. updates
+    // epsilon = probability of perfoming L^3 metropolis update (or a Wolff step, see update_scheme); (1-epsilon) is the prob. of performing L^3 microcan. updates
     strcpy(param_name, "epsilon");
     strcpy(param_type, "%lf");
     param_found = read_parameter(inp_file, param_name, param_type, &epsilon);
@@ -169,10 +196,357 @@ int main(int argc, char * argv[]) {
         fclose(inp_file);
         return EXIT_SUCCESS;
     }
+    // sweep_mode = order of the updates in a sweep, lexicographic or checkerboard (colors updated in parallel by OpenMP threads)
+    strcpy(param_name, "sweep_mode");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &sweep_mode);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, sweep_mode);
+        if (strcmp(sweep_mode, "lexicographic")!=0 && strcmp(sweep_mode, "checkerboard")!=0) {
+            fprintf(stdout, "Invalid sweep mode! Valid keywords: 'lexicographic' and 'checkerboard'.\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    } else if (param_found==0) {
+        strcpy(sweep_mode, "lexicographic");
+        fprintf(stdout, "%s = %s (default)\n", param_name, sweep_mode);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // update_scheme = non-microcanonical step of the mix: local Metropolis or heat-bath sweep, a fixed number of Wolff clusters or a Swendsen-Wang update
+    strcpy(param_name, "update_scheme");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &update_scheme);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, update_scheme);
+        if (strcmp(update_scheme, "metropolis")!=0 && strcmp(update_scheme, "heat_bath")!=0 && strcmp(update_scheme, "wolff")!=0 &&
+            strcmp(update_scheme, "swendsen_wang")!=0) {
+            fprintf(stdout, "Invalid update scheme! Valid keywords: 'metropolis', 'heat_bath', 'wolff' and 'swendsen_wang'.\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    } else if (param_found==0) {
+        strcpy(update_scheme, "metropolis");
+        fprintf(stdout, "%s = %s (default)\n", param_name, update_scheme);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // wolff_clusters = number of Wolff clusters built in a Wolff step
+    if (strcmp(update_scheme, "wolff")==0) {
+        strcpy(param_name, "wolff_clusters");
+        strcpy(param_type, "%d");
+        param_found = read_parameter(inp_file, param_name, param_type, &wolff_clusters);
+        if (param_found==1 && wolff_clusters>0) {
+            fprintf(stdout, "%s = %d\n", param_name, wolff_clusters);
+        } else if (param_found==0) {
+            wolff_clusters = 1;
+            fprintf(stdout, "%s = %d (default)\n", param_name, wolff_clusters);
+        } else {
+            fprintf(stdout, "Invalid number of Wolff clusters!\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    }
+    // recompute_step = number of complete sweeps after which energy and magnetization are computed from scratch:
+    // in between they are updated with the variations returned by the update kernels
+    strcpy(param_name, "recompute_step");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &recompute_step);
+    if (param_found==1 && recompute_step>0) {
+        fprintf(stdout, "%s = %lu\n", param_name, recompute_step);
+    } else if (param_found==0) {
+        recompute_step = 1000;
+        fprintf(stdout, "%s = %lu (default)\n", param_name, recompute_step);
+    } else {
+        fprintf(stdout, "Invalid recompute step!\n");
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // checkpoint_step = number of complete sweeps between two checkpoints of the simulation (0: no checkpoints).
+    // A checkpoint is also written at the end, so that a run can be extended by increasing total_lattice_sweeps
+    strcpy(param_name, "checkpoint_step");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &checkpoint_step);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lu\n", param_name, checkpoint_step);
+    } else if (param_found==0) {
+        checkpoint_step = 0;
+        fprintf(stdout, "%s = %lu (default)\n", param_name, checkpoint_step);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // checkpoint_file = file with lattice, random generators and counters of the last checkpoint
+    strcpy(param_name, "checkpoint_file");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &checkpoint_file);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, checkpoint_file);
+    } else if (param_found==0 && strlen(data_name) + strlen(".chk") < MAX_LENGTH) {
+        sprintf(checkpoint_file, "%s.chk", data_name);
+        fprintf(stdout, "%s = %s (default)\n", param_name, checkpoint_file);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // resume = continue the simulation from checkpoint_file, if it exists: data are appended to the data file.
+    // Without a checkpoint the simulation starts from scratch, so that the same input can be resubmitted to a queue
+    strcpy(param_name, "resume");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &resume);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, resume);
+        if (strcmp(resume, "true")!=0 && strcmp(resume, "false")!=0) {
+            fprintf(stdout, "Invalid resume keyword! Valid keywords: 'true' and 'false'.\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    } else if (param_found==0) {
+        strcpy(resume, "false");
+        fprintf(stdout, "%s = %s (default)\n", param_name, resume);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    int resuming = (strcmp(resume, "true")==0 && access(checkpoint_file, F_OK)==0);
+    // initial_configuration = lattice to start from instead of a random one (warm start), e.g. the final configuration
+    // of the run at a neighboring beta. Not used when the simulation is resumed from its checkpoint
+    strcpy(param_name, "initial_configuration");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &initial_configuration);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, initial_configuration);
+    } else if (param_found==0) {
+        strcpy(initial_configuration, "none");
+        fprintf(stdout, "%s = %s (default)\n", param_name, initial_configuration);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // final_configuration = file where the lattice at the end of the simulation is saved
+    strcpy(param_name, "final_configuration");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &final_configuration);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, final_configuration);
+    } else if (param_found==0) {
+        strcpy(final_configuration, "none");
+        fprintf(stdout, "%s = %s (default)\n", param_name, final_configuration);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // structure_factor_step = number of complete sweeps between two measurements of G(0) and G(k_min), the structure
+    // factor at the smallest nonzero momenta, for the second-moment correlation length (0: not measured). It is
+    // O(V) like a sweep, so it is written to its own stream, datafile.sf, and can be measured less often than m and E
+    strcpy(param_name, "structure_factor_step");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &structure_factor_step);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lu\n", param_name, structure_factor_step);
+    } else if (param_found==0) {
+        structure_factor_step = 0;
+        fprintf(stdout, "%s = %lu (default)\n", param_name, structure_factor_step);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // helicity_step = number of complete sweeps between two measurements of the bond sums of the helicity modulus
+    // (0: not measured), an O(V) pass on the bonds written to its own stream, datafile.hel
+    strcpy(param_name, "helicity_step");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &helicity_step);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lu\n", param_name, helicity_step);
+    } else if (param_found==0) {
+        helicity_step = 0;
+        fprintf(stdout, "%s = %lu (default)\n", param_name, helicity_step);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // snapshot_step = number of complete sweeps between two configurations appended to the snapshot archive (0: no
+    // snapshots), from which observables not written in the data file can be measured without repeating the run
+    strcpy(param_name, "snapshot_step");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &snapshot_step);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lu\n", param_name, snapshot_step);
+    } else if (param_found==0) {
+        snapshot_step = 0;
+        fprintf(stdout, "%s = %lu (default)\n", param_name, snapshot_step);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    SnapshotStorage storage = SNAPSHOT_FLOAT64;
+    if (snapshot_step>0) {
+        // snapshot_file = archive of the configurations, see snapshots.h for the layout
+        strcpy(param_name, "snapshot_file");
+        strcpy(param_type, "%s");
+        param_found = read_parameter(inp_file, param_name, param_type, &snapshot_file);
+        if (param_found==1) {
+            fprintf(stdout, "%s = %s\n", param_name, snapshot_file);
+        } else if (param_found==0 && strlen(data_name) + strlen(".snap") < MAX_LENGTH) {
+            sprintf(snapshot_file, "%s.snap", data_name);
+            fprintf(stdout, "%s = %s (default)\n", param_name, snapshot_file);
+        } else {
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+        // snapshot_storage = values written for each spin: both components in double or single precision, or the angle
+        // quantized to 16 bits (2 B per site instead of 16)
+        strcpy(param_name, "snapshot_storage");
+        strcpy(param_type, "%s");
+        param_found = read_parameter(inp_file, param_name, param_type, &snapshot_storage);
+        if (param_found==1) {
+            fprintf(stdout, "%s = %s\n", param_name, snapshot_storage);
+            if (parse_snapshot_storage(snapshot_storage, &storage)!=EXIT_SUCCESS) {
+                fprintf(stdout, "Invalid snapshot storage! Valid keywords: 'float64', 'float32' and 'angle16'.\n");
+                fprintf(stdout, "Simulation aborted!\n");
+                fclose(inp_file);
+                return EXIT_SUCCESS;
+            }
+        } else if (param_found==0) {
+            strcpy(snapshot_storage, "float64");
+            fprintf(stdout, "%s = %s (default)\n", param_name, snapshot_storage);
+        } else {
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    }
+    // accumulate = keep the means and the blocking analysis of the samples during the simulation, written to
+    // summary_file at every checkpoint and at the end (the data file is written anyway)
+    strcpy(param_name, "accumulate");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &accumulate);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, accumulate);
+        if (strcmp(accumulate, "true")!=0 && strcmp(accumulate, "false")!=0) {
+            fprintf(stdout, "Invalid accumulate keyword! Valid keywords: 'true' and 'false'.\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    } else if (param_found==0) {
+        strcpy(accumulate, "false");
+        fprintf(stdout, "%s = %s (default)\n", param_name, accumulate);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    if (strcmp(accumulate, "true")==0) {
+        // thermalization_samples = number of samples (one every printing_step sweeps) left out of the accumulators
+        strcpy(param_name, "thermalization_samples");
+        strcpy(param_type, "%lu");
+        param_found = read_parameter(inp_file, param_name, param_type, &thermalization_samples);
+        if (param_found==1) {
+            fprintf(stdout, "%s = %lu\n", param_name, thermalization_samples);
+        } else if (param_found==0) {
+            thermalization_samples = 0;
+            fprintf(stdout, "%s = %lu (default)\n", param_name, thermalization_samples);
+        } else {
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+        // summary_file = text file with the means and the blocking errors of the accumulated observables
+        strcpy(param_name, "summary_file");
+        strcpy(param_type, "%s");
+        param_found = read_parameter(inp_file, param_name, param_type, &summary_file);
+        if (param_found==1) {
+            fprintf(stdout, "%s = %s\n", param_name, summary_file);
+        } else if (param_found==0 && strlen(data_name) + strlen(".sum") < MAX_LENGTH) {
+            sprintf(summary_file, "%s.sum", data_name);
+            fprintf(stdout, "%s = %s (default)\n", param_name, summary_file);
+        } else {
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    }
+    // tune = thermalization phase of tuning_sweeps sweeps (not written to the data file) choosing alpha and epsilon, starting
+    // from the values of the input, that minimize the CPU time per independent sample of |m|; they are then kept fixed
+    strcpy(param_name, "tune");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &tune);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, tune);
+        if (strcmp(tune, "true")!=0 && strcmp(tune, "false")!=0) {
+            fprintf(stdout, "Invalid tune keyword! Valid keywords: 'true' and 'false'.\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    } else if (param_found==0) {
+        strcpy(tune, "false");
+        fprintf(stdout, "%s = %s (default)\n", param_name, tune);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    if (strcmp(tune, "true")==0) {
+        strcpy(param_name, "tuning_sweeps");
+        strcpy(param_type, "%lu");
+        param_found = read_parameter(inp_file, param_name, param_type, &tuning_sweeps);
+        if (param_found==1 && tuning_sweeps>0) {
+            fprintf(stdout, "%s = %lu\n", param_name, tuning_sweeps);
+        } else if (param_found==0) {
+            tuning_sweeps = 20000;
+            fprintf(stdout, "%s = %lu (default)\n", param_name, tuning_sweeps);
+        } else {
+            fprintf(stdout, "Invalid number of tuning sweeps!\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    }
+    // num_threads = number of OpenMP threads used by the checkerboard sweeps and by the Swendsen-Wang bond activation
+    if (strcmp(sweep_mode, "checkerboard")==0 || strcmp(update_scheme, "swendsen_wang")==0) {
+        #ifdef _OPENMP
+        num_threads = omp_get_max_threads();
+        #endif
+        strcpy(param_name, "num_threads");
+        strcpy(param_type, "%d");
+        param_found = read_parameter(inp_file, param_name, param_type, &num_threads);
+        if (param_found==-1 || num_threads<1) {
+            fprintf(stdout, "Invalid number of threads!\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+        #ifdef _OPENMP
+        omp_set_num_threads(num_threads);
+        #else
+        num_threads = 1;
+        #endif
+        fprintf(stdout, "%s = %d\n", param_name, num_threads);
+    }
     if (strcmp(seed, "time")==0) {
-        seed1 = (const unsigned long int)time(NULL);
+        seed1 = myrand_seed_from_clock(); // clock and process id: jobs started in the same second get different seeds
     } else { // Everything else other than the keyword "time" is converted to a long unsigned int, so be careful
-        seed1 = (const unsigned long int)atoi(seed);
+        seed1 = strtoul(seed, NULL, 10);
     }
 
     //////////////////////////////////////////////////////////////////
@@ -180,10 +554,11 @@ int main(int argc, char * argv[]) {
     //////////////////////////////////////////////////////////////////
     // Trying to open the file give as output
     FILE * data;
-    if (strcmp(data_format, "text")==0) {
+    if (resuming) {
+        data = fopen(data_name, "r+b"); // the data after the checkpoint are discarded and the file is continued
+    } else if (strcmp(data_format, "text")==0) {
 	data = fopen(data_name, "w"); // we are choosing to write in a human readible file
-    }
-    if (strcmp(data_format, "binary")==0) {
+    } else {
         data = fopen(data_name, "wb"); // we are choosing to write in a binary
     }
     if (data == NULL) {
@@ -197,50 +572,230 @@ int main(int argc, char * argv[]) {
     // Initialize seed for rng //
     /////////////////////////////
     const unsigned long int seed2 = seed1 + 137;
-    fprintf(stdout, "Current seeds: %d, %d\n", (int)seed1, (int)seed2);
+    fprintf(stdout, "Current seeds: %lu, %lu\n", seed1, seed2);
+    fprintf(stdout, "Spin storage: %s\n", SPIN_STORAGE);
     myrand_init(seed1, seed2);
+    // one independent stream for each thread of the checkerboard sweeps
+    pcg32_random_t * streams = (pcg32_random_t *)malloc((size_t)num_threads * sizeof(pcg32_random_t));
+    if (streams==NULL) {
+        fprintf(stdout, "Failed allocation of the random streams, simulation aborted!\n");
+        fclose(inp_file);
+        fclose(data);
+        return EXIT_SUCCESS;
+    }
+    myrand_init_streams(streams, num_threads, seed1, seed2);
 
     ///////////////////////////////////////////
     // Structure allocation & initialization //
     ///////////////////////////////////////////
-    DoubleVector2D *** lattice = allocate(lattice_side);
+    Spin2D * lattice = allocate(lattice_side);
     if (lattice==NULL) {
         fprintf(stdout, "Failed lattice structure allocation, simulation aborted!\n");
         fclose(inp_file);
 	fclose(data);
+        free(streams);
         return EXIT_SUCCESS;
     }
-    if (initialize_lattice(lattice, lattice_side)==EXIT_SUCCESS) {
+    int * neighbors = allocate_neighbors(lattice_side);
+    if (neighbors==NULL) {
+        fprintf(stdout, "Failed neighbors table allocation, simulation aborted!\n");
+        fclose(inp_file);
+	fclose(data);
+        free_lattice(lattice);
+        free(streams);
+        return EXIT_SUCCESS;
+    }
+    Checkerboard * checkerboard = NULL; // NULL means lexicographic sweeps
+    if (strcmp(sweep_mode, "checkerboard")==0) {
+        checkerboard = allocate_checkerboard(neighbors, lattice_side);
+        if (checkerboard==NULL) {
+            fprintf(stdout, "Failed checkerboard allocation, simulation aborted!\n");
+            fclose(inp_file);
+            fclose(data);
+            free_lattice(lattice);
+            free(neighbors);
+            free(streams);
+            return EXIT_SUCCESS;
+        }
+        fprintf(stdout, "Checkerboard sweeps with %d colors on %d threads\n", checkerboard->n_colors, num_threads);
+    }
+    ClusterWorkspace * cluster_workspace = NULL;
+    if (strcmp(update_scheme, "wolff")==0 || strcmp(update_scheme, "swendsen_wang")==0) {
+        cluster_workspace = allocate_cluster_workspace(lattice_side);
+        if (cluster_workspace==NULL) {
+            fprintf(stdout, "Failed cluster workspace allocation, simulation aborted!\n");
+            fclose(inp_file);
+            fclose(data);
+            free_lattice(lattice);
+            free(neighbors);
+            free_checkerboard(checkerboard);
+            free(streams);
+            return EXIT_SUCCESS;
+        }
+    }
+    // Counters, acceptances and running totals of the simulation, saved in the checkpoints
+    SimulationState state = {0};
+    state.lattice_side = lattice_side;
+    state.n_streams = num_threads;
+    state.spin_size = (int)sizeof(spin_t);
+    state.beta = beta;
+    if (resuming) {
+        // The samples written after the checkpoint are discarded, the sweeps that produced them are repeated
+        int resumed = (read_checkpoint(checkpoint_file, &state, lattice, streams)==EXIT_SUCCESS);
+        if (resumed && (fseek(data, 0, SEEK_END)!=0 || ftell(data)<state.data_size)) {
+            fprintf(stderr, "Data file %s is shorter than the data saved up to the checkpoint\n", data_name);
+            resumed = 0;
+        }
+        if (resumed && ftruncate(fileno(data), state.data_size)==0 && fseek(data, 0, SEEK_END)==0) {
+            fprintf(stdout, "Simulation resumed from %s after %lu complete sweeps\n", checkpoint_file, state.complete_lattice_sweeps);
+        } else {
+            fprintf(stdout, "Failed resuming from the checkpoint, simulation aborted!\n");
+            fclose(inp_file);
+            fclose(data);
+            free_lattice(lattice);
+            free(neighbors);
+            free_checkerboard(checkerboard);
+            free_cluster_workspace(cluster_workspace);
+            free(streams);
+            return EXIT_SUCCESS;
+        }
+    } else if (strcmp(initial_configuration, "none")!=0) {
+        double initial_beta;
+        if (read_configuration(initial_configuration, lattice, lattice_side, &initial_beta)==EXIT_SUCCESS) {
+            state.totals = lattice_totals(lattice, neighbors, lattice_side);
+            fprintf(stdout, "Lattice initialized from %s (configuration at beta = %lf)\n", initial_configuration, initial_beta);
+        } else {
+            fprintf(stdout, "Failed initialization of lattice from %s, simulation aborted!\n", initial_configuration);
+            fclose(inp_file);
+            fclose(data);
+            free_lattice(lattice);
+            free(neighbors);
+            free_checkerboard(checkerboard);
+            free_cluster_workspace(cluster_workspace);
+            free(streams);
+            return EXIT_SUCCESS;
+        }
+    } else if (initialize_lattice(lattice, lattice_side, &pcg32_random_state)==EXIT_SUCCESS) {
+        state.totals = lattice_totals(lattice, neighbors, lattice_side);
         fprintf(stdout, "Correctly allocated and randomly inizialized lattice\n");
     } else {
         fprintf(stdout, "Failed randomly inizialization of lattice, simulation aborted!\n");
         fclose(inp_file);
         fclose(data);
-        free_lattice(lattice, lattice_side);
+        free_lattice(lattice);
+        free(neighbors);
+        free_checkerboard(checkerboard);
+        free_cluster_workspace(cluster_workspace);
+        free(streams);
         return EXIT_SUCCESS;
     }
 
+    // Tuning of alpha and epsilon, frozen for the production: a resumed simulation keeps the values of its checkpoint
+    if (strcmp(tune, "true")==0 && resuming) {
+        alpha = state.alpha;
+        epsilon = state.epsilon;
+        fprintf(stdout, "Tuned parameters from the checkpoint: alpha = %lf, epsilon = %lf\n", alpha, epsilon);
+    } else if (strcmp(tune, "true")==0) {
+        UpdateContext context = {lattice, neighbors, lattice_side, beta, update_scheme, checkerboard, cluster_workspace,
+                                 wolff_clusters, &pcg32_random_state, streams, num_threads};
+        if (tune_parameters(&context, tuning_sweeps, &alpha, &epsilon, &state.totals, stdout)!=EXIT_SUCCESS) {
+            fprintf(stdout, "Failed tuning of the parameters, simulation aborted!\n");
+            fclose(inp_file);
+            fclose(data);
+            free_lattice(lattice);
+            free(neighbors);
+            free_checkerboard(checkerboard);
+            free_cluster_workspace(cluster_workspace);
+            free(streams);
+            return EXIT_SUCCESS;
+        }
+        state.totals = lattice_totals(lattice, neighbors, lattice_side);
+        fprintf(stdout, "Tuned parameters: alpha = %lf, epsilon = %lf\n", alpha, epsilon);
+    }
+    state.alpha = alpha;
+    state.epsilon = epsilon;
+
     ////////////////////////////////////
     // Let's start with the for cicle //
     ////////////////////////////////////
-    unsigned long int complete_lattice_sweeps=0, micro_acc=0, metro_acc=0, metro_steps=0, micro_steps=0;
-    unsigned long int micro_full_lattice=0, metro_full_lattice=0;
-    int Vol, i, j, k, l, m, n, metro=0;
+    unsigned long int micro_acc=0, metro_acc=0;
+    int Vol, metro=0;
     Vol = lattice_side * lattice_side * lattice_side;
-    double random_n, E_per_site;
-    double percentage_micro_acc = 0.0, percentage_metro_acc = 0.0; // Mean percentage of acceptance for micro and metro 
-    DoubleVector2D s_old, s_new, * magn;
-    if (strcmp(data_format, "text")==0) {
-        fprintf(data, "# mx my Energy_per_site\n");
-    } 
+    double random_n, E_per_site, values[2]; // row of a measurement stream
+    // time spent in the updates and in the measurements of the data file and of the snapshots (the streams keep
+    // their own), reported at the end to choose the cadences of the measurements
+    double t_mark, update_seconds = 0.0, data_seconds = 0.0, snapshot_seconds = 0.0;
+    DoubleVector2D magn;
+    // Header with the parameters of the simulation and the names of the columns (already there when resuming)
+    if (!resuming) {
+        DataHeader header = {lattice_side, DATA_N_COLS, printing_step, seed1, beta, alpha, epsilon, "", DATA_COLUMNS};
+        strcpy(header.update_scheme, update_scheme);
+        if (strcmp(data_format, "text")==0) {
+            write_text_header(data, &header);
+        } else {
+            write_data_header(data, &header);
+        }
+    }
+    // Streams of the observables measured with their own step, each one with the header of the data file (with its
+    // step and columns): a resumed simulation continues them from the sizes saved in the checkpoint
+    MeasurementStream measurement_streams[] = {
+        {"structure_factor", STRUCTURE_FACTOR_EXTENSION, STRUCTURE_FACTOR_COLUMNS, structure_factor_step, STRUCTURE_FACTOR_N_COLS, 0, NULL, 0, 0.0},
+        {"helicity", HELICITY_EXTENSION, HELICITY_COLUMNS, helicity_step, HELICITY_N_COLS, 0, NULL, 0, 0.0},
+    };
+    int n_measurement_streams = (int)(sizeof(measurement_streams) / sizeof(MeasurementStream)), m, streams_opened = 1;
+    for (m=0; m<n_measurement_streams; m++) {
+        MeasurementStream * stream = &measurement_streams[m];
+        DataHeader header = {lattice_side, stream->n_cols, stream->step, seed1, beta, alpha, epsilon, "", ""};
+        strcpy(header.update_scheme, update_scheme);
+        strcpy(header.columns, stream->columns);
+        stream->text = (strcmp(data_format, "text")==0);
+        if (stream->step>0) {
+            streams_opened &= (open_measurement_stream(stream, data_name, &header, resuming ? state.stream_sizes[m] : -1)==EXIT_SUCCESS);
+        }
+    }
+    if (!streams_opened) {
+        fprintf(stdout, "Failed opening of the measurement streams, simulation aborted!\n");
+        for (m=0; m<n_measurement_streams; m++) {
+            close_measurement_stream(&measurement_streams[m]);
+        }
+        fclose(inp_file);
+        fclose(data);
+        free_lattice(lattice);
+        free(neighbors);
+        free_checkerboard(checkerboard);
+        free_cluster_workspace(cluster_workspace);
+        free(streams);
+        return EXIT_SUCCESS;
+    }
+    // Snapshot archive, written by a background thread: a resumed simulation keeps the snapshots up to its checkpoint
+    SnapshotWriter * snapshots = NULL;
+    if (snapshot_step>0) {
+        snapshots = open_snapshot_writer(snapshot_file, lattice_side, storage, snapshot_step, seed1, beta,
+                                         resuming ? (long int)(state.complete_lattice_sweeps / snapshot_step) : -1);
+        if (snapshots==NULL) {
+            fprintf(stdout, "Failed opening of the snapshot archive, simulation aborted!\n");
+            for (m=0; m<n_measurement_streams; m++) {
+                close_measurement_stream(&measurement_streams[m]);
+            }
+            fclose(inp_file);
+            fclose(data);
+            free_lattice(lattice);
+            free(neighbors);
+            free_checkerboard(checkerboard);
+            free_cluster_workspace(cluster_workspace);
+            free(streams);
+            return EXIT_SUCCESS;
+        }
+    }
 
-    while (complete_lattice_sweeps<total_lattice_sweeps) {
+    while (state.complete_lattice_sweeps<total_lattice_sweeps) {
+	t_mark = wall_seconds();
 	// random number generation after a complete update of the lattice
 	random_n = myrand();
 	if (random_n<epsilon) { // if such number is less than epsilon then the next L^3
-	    metro=1;  // steps are metropolis, otherwise they are microcanonical
+	    metro=1;  // steps are metropolis (or Wolff), otherwise they are microcanonical
 	    if (strcmp(verbose, "true")==0) {
-	        fprintf(stdout, "Next L^3 steps will be Metropolis!\n");
+	        fprintf(stdout, "Next step will be %s!\n", update_scheme);
 	    }
 	} else {
 	    metro=0; // microcanonical steps
@@ -248,89 +803,173 @@ int main(int argc, char * argv[]) {
 	        fprintf(stdout, "Next L^3 steps will be microcanonical!\n");
 	    }
 	}
-	// normalization of all the sites after a complete update of the lattice
-	for (l=0; l<lattice_side; l++) {
-	    for (m=0; m<lattice_side; m++) {
-	        for (n=0; n<lattice_side; n++) {
-	            normalization(&lattice[l][m][n]);
-		}
+
+        if(metro == 0){
+	    state.micro_full_lattice += 1;
+	    micro_acc = microcanonical_sweep(lattice, neighbors, lattice_side, checkerboard, &state.totals);
+	    state.percentage_micro_acc += (double)micro_acc / (double)Vol;
+        } else if (strcmp(update_scheme, "swendsen_wang")==0) {
+	    state.sw_steps += 1;
+	    state.sw_clusters += swendsen_wang(lattice, neighbors, beta, cluster_workspace, streams, num_threads, &state.totals);
+        } else if (strcmp(update_scheme, "wolff")==0) {
+	    // Wolff clusters are built serially, using the global generator
+	    state.wolff_steps += 1;
+	    state.wolff_flipped += wolff_sweep(lattice, neighbors, beta, cluster_workspace, &pcg32_random_state, wolff_clusters, &state.totals);
+        } else if (strcmp(update_scheme, "heat_bath")==0) {
+	    // heat-bath sweeps take the place of the Metropolis ones (and of their counters), every move is accepted
+	    state.metro_full_lattice += 1;
+	    metro_acc = heat_bath_sweep(lattice, neighbors, lattice_side, beta, checkerboard, (checkerboard==NULL) ? &pcg32_random_state : streams, &state.totals);
+	    state.percentage_metro_acc += (double)metro_acc / (double)Vol;
+        } else {
+	    state.metro_full_lattice += 1;
+	    // in lexicographic mode the global generator is used, as in the previous versions of the code
+	    if (checkerboard==NULL) {
+	        metro_acc = metropolis_sweep(lattice, neighbors, lattice_side, alpha, beta, checkerboard, &pcg32_random_state, &state.totals);
+	    } else {
+	        metro_acc = metropolis_sweep(lattice, neighbors, lattice_side, alpha, beta, checkerboard, streams, &state.totals);
 	    }
+	    state.percentage_metro_acc += (double)metro_acc / (double)Vol;
 	}
-	if (strcmp(verbose, "true")==0) {
-	    fprintf(stdout, "Normalization has been performed!\n");
+	state.complete_lattice_sweeps += 1;
+	// full computation of the totals, to remove the rounding errors of the incremental updates
+	if (state.complete_lattice_sweeps%recompute_step==0) {
+	    state.totals = lattice_totals(lattice, neighbors, lattice_side);
 	}
 
-        if(metro == 0){
-	    micro_full_lattice += 1;
-	    micro_steps = 0;
-	    micro_acc = 0;
-            for (i=0; i<lattice_side; i++) {
-                for (j=0; j<lattice_side; j++) {
-                    for (k=0; k<lattice_side; k++) {
-                        s_old = lattice[i][j][k];
-                        micro_acc += microcanonical(lattice, i, j, k, lattice_side);
-                        micro_steps += 1;
-                        s_new = lattice[i][j][k];
-                    }
-                }
-            }
-	    percentage_micro_acc += (double)micro_acc / (double)micro_steps;
-	    complete_lattice_sweeps += 1;
-	    if (complete_lattice_sweeps%printing_step==0) {
-                E_per_site = energy_per_site(lattice, lattice_side);
-		magn = magnetization(lattice, lattice_side);
-		if (strcmp(data_format, "text")==0) {
-		    fprintf(data, "%.15lf %.15lf %.15lf\n", magn->sx, magn->sy, E_per_site);
-		}
-		if (strcmp(data_format, "binary")==0) {
-		    // To write in a binary we use fwrite()
-		    fwrite(&magn->sx, sizeof(double), 1, data);
-		    fwrite(&magn->sy, sizeof(double), 1, data);
-		    fwrite(&E_per_site, sizeof(double), 1, data);
-		}
-	    }
-        }
+	update_seconds += wall_seconds() - t_mark;
 
-        if(metro == 1){
-	    metro_full_lattice += 1;
-	    metro_steps = 0;
-	    metro_acc = 0;
-            for (i=0; i<lattice_side; i++) {
-                for (j=0; j<lattice_side; j++) {
-                    for (k=0; k<lattice_side; k++) {
-                        s_old = lattice[i][j][k];
-                        metro_acc += local_metropolis(lattice, i, j, k, lattice_side, alpha, beta);
-                        metro_steps += 1;
-                        s_new = lattice[i][j][k];
-                    }
-                }
-            }
-	    percentage_metro_acc += (double)metro_acc / (double)metro_steps;
-            complete_lattice_sweeps += 1;
-	    if (complete_lattice_sweeps%printing_step==0) {
-                E_per_site = energy_per_site(lattice, lattice_side);
-		magn = magnetization(lattice, lattice_side);
-		if (strcmp(data_format, "text")==0) {
-		    fprintf(data, "%.15lf %.15lf %.15lf\n", magn->sx, magn->sy, E_per_site);
-		}
-		if (strcmp(data_format, "binary")==0) {
-		    // To write in a binary we use fwrite()
-		    fwrite(&magn->sx, sizeof(double), 1, data);
-		    fwrite(&magn->sy, sizeof(double), 1, data);
-		    fwrite(&E_per_site, sizeof(double), 1, data);
-		}
+	if (state.complete_lattice_sweeps%printing_step==0) {
+	    t_mark = wall_seconds();
+	    E_per_site = state.totals.energy / (double)Vol;
+	    magn.sx = state.totals.magn.sx / (double)Vol;
+	    magn.sy = state.totals.magn.sy / (double)Vol;
+	    if (strcmp(data_format, "text")==0) {
+	        fprintf(data, "%.15lf %.15lf %.15lf", magn.sx, magn.sy, E_per_site);
+	    }
+	    if (strcmp(data_format, "binary")==0) {
+	        // To write in a binary we use fwrite()
+	        fwrite(&magn.sx, sizeof(double), 1, data);
+	        fwrite(&magn.sy, sizeof(double), 1, data);
+	        fwrite(&E_per_site, sizeof(double), 1, data);
+	    }
+	    if (strcmp(data_format, "text")==0) {
+	        fprintf(data, "\n");
+	    }
+	    if (strcmp(accumulate, "true")==0 && state.complete_lattice_sweeps / printing_step > thermalization_samples) {
+	        accumulate_sample(&state.accumulators, magn, E_per_site);
+	    }
+	    data_seconds += wall_seconds() - t_mark;
+	}
+	// G(0) = V m^2 from the running totals, G(k_min) from the plane sums of the lattice
+	if (structure_factor_step>0 && state.complete_lattice_sweeps%structure_factor_step==0) {
+	    t_mark = wall_seconds();
+	    values[0] = (state.totals.magn.sx * state.totals.magn.sx + state.totals.magn.sy * state.totals.magn.sy) / (double)Vol;
+	    values[1] = structure_factor_kmin(lattice, lattice_side);
+	    write_measurement(&measurement_streams[0], values);
+	    measurement_streams[0].seconds += wall_seconds() - t_mark;
+	}
+	if (helicity_step>0 && state.complete_lattice_sweeps%helicity_step==0) {
+	    t_mark = wall_seconds();
+	    helicity_sums(lattice, neighbors, lattice_side, &values[0], &values[1]);
+	    write_measurement(&measurement_streams[1], values);
+	    measurement_streams[1].seconds += wall_seconds() - t_mark;
+	}
+	// the lattice is copied and the writer thread converts and writes it while the simulation goes on
+	if (snapshots!=NULL && state.complete_lattice_sweeps%snapshot_step==0) {
+	    t_mark = wall_seconds();
+	    add_snapshot(snapshots, lattice);
+	    snapshot_seconds += wall_seconds() - t_mark;
+	}
+	// The data file is flushed to disk before the checkpoint, which records how much of it is valid
+	if (checkpoint_step>0 && (state.complete_lattice_sweeps%checkpoint_step==0 || state.complete_lattice_sweeps==total_lattice_sweeps)) {
+	    fflush(data);
+	    fsync(fileno(data));
+	    state.data_size = ftell(data);
+	    for (m=0; m<n_measurement_streams; m++) {
+	        if (measurement_streams[m].fp!=NULL) {
+	            state.stream_sizes[m] = sync_measurement_stream(&measurement_streams[m]);
+	        }
+	    }
+	    if (snapshots!=NULL) {
+	        flush_snapshots(snapshots);
+	    }
+	    if (write_checkpoint(checkpoint_file, &state, lattice, streams)==EXIT_SUCCESS && strcmp(verbose, "true")==0) {
+	        fprintf(stdout, "Checkpoint written after %lu complete sweeps\n", state.complete_lattice_sweeps);
+	    }
+	    if (strcmp(accumulate, "true")==0) {
+	        write_summary(summary_file, &state.accumulators, lattice_side, beta, printing_step, thermalization_samples);
 	    }
 	}
     }
+    if (strcmp(accumulate, "true")==0) {
+        write_summary(summary_file, &state.accumulators, lattice_side, beta, printing_step, thermalization_samples);
+        fprintf(stdout, "Means and blocking errors written to %s\n", summary_file);
+    }
+    if (snapshots!=NULL) {
+        // after the flush the writer thread is idle and its counters are final
+        int snapshots_flushed = flush_snapshots(snapshots);
+        unsigned long int n_snapshots = snapshots->written, n_waits = snapshots->waits;
+        if (close_snapshot_writer(snapshots)==EXIT_SUCCESS && snapshots_flushed==EXIT_SUCCESS) {
+            fprintf(stdout, "Snapshot archive %s: %lu snapshots (the simulation waited for the writer %lu times)\n", snapshot_file, n_snapshots, n_waits);
+        } else {
+            fprintf(stdout, "Error writing the snapshot archive %s\n", snapshot_file);
+        }
+    }
+    for (m=0; m<n_measurement_streams; m++) {
+        if (measurement_streams[m].fp!=NULL) {
+            fprintf(stdout, "Stream %s.%s: %lu rows of %s, one every %lu sweeps\n", data_name, measurement_streams[m].extension,
+                    measurement_streams[m].rows, measurement_streams[m].name, measurement_streams[m].step);
+        }
+        if (close_measurement_stream(&measurement_streams[m])!=EXIT_SUCCESS) {
+            fprintf(stdout, "Error writing the stream %s.%s\n", data_name, measurement_streams[m].extension);
+        }
+    }
+    if (strcmp(final_configuration, "none")!=0 && write_configuration(final_configuration, lattice, lattice_side, beta)==EXIT_SUCCESS) {
+        fprintf(stdout, "Final configuration written to %s\n", final_configuration);
+    }
 
-    fprintf(stdout, "\nSimulation ended.\nTotal steps: %lu\n", complete_lattice_sweeps);
-    fprintf(stdout, "Metropolis complete sweeps of the lattice performed: %lu\nMean of the percentage of acceptance for Metropolis: %lf\n", metro_full_lattice, percentage_metro_acc / (double)metro_full_lattice);
-    fprintf(stdout, "Microcanonical complete sweeps of the lattice performed: %lu\nMean of the percentage of acceptance for Microcanonical: %lf\n", micro_full_lattice, percentage_micro_acc / (double)micro_full_lattice);
-    free_lattice(lattice, lattice_side);
+    fprintf(stdout, "\nSimulation ended.\nTotal steps: %lu\n", state.complete_lattice_sweeps);
+    if (strcmp(update_scheme, "heat_bath")==0) {
+        fprintf(stdout, "Heat-bath complete sweeps of the lattice performed: %lu\n", state.metro_full_lattice);
+    } else {
+        fprintf(stdout, "Metropolis complete sweeps of the lattice performed: %lu\nMean of the percentage of acceptance for Metropolis: %lf\n", state.metro_full_lattice, state.percentage_metro_acc / (double)state.metro_full_lattice);
+    }
+    fprintf(stdout, "Microcanonical complete sweeps of the lattice performed: %lu\nMean of the percentage of acceptance for Microcanonical: %lf\n", state.micro_full_lattice, state.percentage_micro_acc / (double)state.micro_full_lattice);
+    if (strcmp(update_scheme, "swendsen_wang")==0) {
+        fprintf(stdout, "Swendsen-Wang updates performed: %lu\nMean number of Swendsen-Wang clusters: %lf\n", state.sw_steps, (double)state.sw_clusters / (double)state.sw_steps);
+    }
+    if (strcmp(update_scheme, "wolff")==0) {
+        fprintf(stdout, "Wolff steps performed: %lu\nMean Wolff cluster size over volume: %lf\n", state.wolff_steps, (double)state.wolff_flipped / (double)(state.wolff_steps * wolff_clusters) / (double)Vol);
+    }
+    // Time of the measurements of each group against the time of the updates of this run (a resumed run only counts
+    // its own sweeps), to see which cadences are worth lowering
+    double measure_seconds = data_seconds + snapshot_seconds;
+    for (m=0; m<n_measurement_streams; m++) {
+        measure_seconds += measurement_streams[m].seconds;
+    }
+    fprintf(stdout, "Time spent in the updates: %lf s\nTime spent in the measurements: %lf s (%.2lf%% of the updates)\n",
+            update_seconds, measure_seconds, 100.0 * measure_seconds / update_seconds);
+    fprintf(stdout, "    %s every %lu sweeps: %lf s\n", DATA_COLUMNS, printing_step, data_seconds);
+    for (m=0; m<n_measurement_streams; m++) {
+        if (measurement_streams[m].step>0) {
+            fprintf(stdout, "    %s every %lu sweeps: %lf s\n", measurement_streams[m].name, measurement_streams[m].step, measurement_streams[m].seconds);
+        }
+    }
+    if (snapshot_step>0) {
+        fprintf(stdout, "    snapshots every %lu sweeps: %lf s\n", snapshot_step, snapshot_seconds);
+    }
+    free_lattice(lattice);
+    free(neighbors);
+    free_checkerboard(checkerboard);
+    free_cluster_workspace(cluster_workspace);
+    free(streams);
     fclose(inp_file);
     fclose(data);
     t_end = clock();
+    clock_gettime(CLOCK_MONOTONIC, &wall_end);
     cpu_time_used = ((double) (t_end - t_start)) / CLOCKS_PER_SEC;
+    wall_time_used = (double)(wall_end.tv_sec - wall_start.tv_sec) + 1e-9 * (double)(wall_end.tv_nsec - wall_start.tv_nsec);
     fprintf(stdout, "Runtime of the last simulation: %.10lf\n", cpu_time_used);
+    fprintf(stdout, "Wall-clock time of the last simulation: %.10lf\n", wall_time_used);
     return EXIT_SUCCESS;
 }
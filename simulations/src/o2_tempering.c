@@ -0,0 +1,479 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include <math.h>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+#include "../include/functions.h"
+#include "../include/cluster.h"
+#include "../include/data_header.h"
+#include "../include/random.h"
+
+#define MAX_LENGTH 128
+
+// Parallel tempering (replica exchange): one replica of the lattice for every beta of the grid
+// beta_min, ..., beta_max, all evolved with the same updates of o2_mcmc.c. Every swap_step sweeps
+// the configurations of neighboring betas are exchanged with probability
+// min(1, exp((beta_b - beta_b+1) * (E_b - E_b+1))), alternating even and odd pairs.
+// Each beta writes its own data file data_b<beta>_L<lattice_side>.bin (or .dat) in the data directory,
+// with the same layout of the files written by o2_mcmc.c
+int main(int argc, char * argv[]) {
+    clock_t t_start, t_end;
+    struct timespec wall_start, wall_end;
+    double cpu_time_used, wall_time_used;
+    t_start = clock();
+    clock_gettime(CLOCK_MONOTONIC, &wall_start);
+
+    // Check if the number of parameters is 3, i.e. ./program inputfile.in data_directory
+    if (argc!=3) {
+        fprintf(stdout, "Invalid input!\nHow to use this program:\n./program input.inp data_directory\n");
+	fprintf(stdout, "Input.inp must be like (do not include ' '):\nlattice_side int\nseed int or 'time'\ntotal_lattice_sweeps int\nprinting_step int\ndata_format 'binary' or 'text'\nbeta_min double\nbeta_max double\nn_betas int\nalpha double\nepsilon double\nverbose 'false' or 'true'\n");
+	fprintf(stdout, "Optional parameters:\nswap_step int (sweeps between two swap attempts, default: 10)\nnum_threads int (threads sharing the replicas, default: OpenMP default)\n");
+	fprintf(stdout, "update_scheme 'metropolis' (default), 'heat_bath' (alpha unused), 'wolff' or 'swendsen_wang', mixed with microcanonical sweeps according to epsilon\nwolff_clusters int (only for wolff, clusters per Wolff step, default: 1)\n");
+	fprintf(stdout, "recompute_step int (sweeps between two full computations of energy and magnetization, default: 1000)\n");
+        return EXIT_SUCCESS;
+    }
+
+    char inp_file_name[MAX_LENGTH], data_dir[MAX_LENGTH], data_name[2*MAX_LENGTH], beta_text[MAX_LENGTH];
+    strcpy(inp_file_name, argv[1]);
+    strcpy(data_dir, argv[2]);
+
+    ///////////////////////////////////////////////////////////////
+    // Opening input file from which inputs parameters are taken //
+    ///////////////////////////////////////////////////////////////
+    FILE *inp_file = fopen(inp_file_name, "r");
+    if (inp_file == NULL) {
+        fprintf(stderr, "Error opening input file\n");
+        return EXIT_SUCCESS;
+    }
+    fprintf(stdout, "Parameters input file name: %s\n", inp_file_name);
+
+    /////////////////////////////////////////////////////////////////
+    // Let's extract all the useful parameters from the input file //
+    /////////////////////////////////////////////////////////////////
+    int param_found = 0;
+    char param_name[MAX_LENGTH], param_type[MAX_LENGTH];
+    char data_format[MAX_LENGTH], seed[MAX_LENGTH], verbose[MAX_LENGTH], update_scheme[MAX_LENGTH];
+    unsigned long int total_lattice_sweeps, printing_step, swap_step, recompute_step;
+    int lattice_side, n_betas, num_threads = 1, wolff_clusters = 0;
+    double beta_min, beta_max, alpha, epsilon;
+    fprintf(stdout, "### Parameters of the simulation:\n");
+    // Type of data format of the output files
+    strcpy(param_name, "data_format");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &data_format);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, data_format);
+        if (strcmp(data_format, "binary")!=0 && strcmp(data_format, "text")!=0) {
+            fprintf(stdout, "Invalid type of format choosen for the file! Valid keywords: 'binary' and 'text'.\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // Type of verbosity
+    strcpy(param_name, "verbose");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &verbose);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, verbose);
+        if (strcmp(verbose, "true")!=0 && strcmp(verbose, "false")!=0) {
+            fprintf(stdout, "Invalid type of verbosity choosen for the file! Valid keywords: 'true' and 'false'.\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // lattice_side = side of the 3D square lattice
+    strcpy(param_name, "lattice_side");
+    strcpy(param_type, "%d");
+    param_found = read_parameter(inp_file, param_name, param_type, &lattice_side);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %d\n", param_name, lattice_side);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // total_lattice_sweeps = number of complete sweeps of each replica
+    strcpy(param_name, "total_lattice_sweeps");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &total_lattice_sweeps);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lu\n", param_name, total_lattice_sweeps);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // printing_step = number of complete sweeps after which we want to compute and collect E and |m|
+    strcpy(param_name, "printing_step");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &printing_step);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lu\n", param_name, printing_step);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // beta_min = smallest beta of the grid
+    strcpy(param_name, "beta_min");
+    strcpy(param_type, "%lf");
+    param_found = read_parameter(inp_file, param_name, param_type, &beta_min);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lf\n", param_name, beta_min);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // beta_max = largest beta of the grid
+    strcpy(param_name, "beta_max");
+    strcpy(param_type, "%lf");
+    param_found = read_parameter(inp_file, param_name, param_type, &beta_max);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lf\n", param_name, beta_max);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // n_betas = number of equally spaced betas (i.e. of replicas) between beta_min and beta_max included
+    strcpy(param_name, "n_betas");
+    strcpy(param_type, "%d");
+    param_found = read_parameter(inp_file, param_name, param_type, &n_betas);
+    if (param_found==1 && n_betas>1 && beta_max>beta_min) {
+        fprintf(stdout, "%s = %d\n", param_name, n_betas);
+    } else {
+        fprintf(stdout, "%s has not been found in %s or the beta grid is not valid!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // alpha = amplitude of the angle for the Metropolis step
+    strcpy(param_name, "alpha");
+    strcpy(param_type, "%lf");
+    param_found = read_parameter(inp_file, param_name, param_type, &alpha);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lf\n", param_name, alpha);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // epsilon = probability of perfoming a Metropolis sweep (or a cluster step, see update_scheme) instead of a microcanonical one
+    strcpy(param_name, "epsilon");
+    strcpy(param_type, "%lf");
+    param_found = read_parameter(inp_file, param_name, param_type, &epsilon);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lf\n", param_name, epsilon);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // seed = seed of the random number generators
+    strcpy(param_name, "seed");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &seed);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, seed);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // swap_step = number of complete sweeps between two attempts of exchanging the replicas
+    strcpy(param_name, "swap_step");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &swap_step);
+    if (param_found==1 && swap_step>0) {
+        fprintf(stdout, "%s = %lu\n", param_name, swap_step);
+    } else if (param_found==0) {
+        swap_step = 10;
+        fprintf(stdout, "%s = %lu (default)\n", param_name, swap_step);
+    } else {
+        fprintf(stdout, "Invalid swap step!\n");
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // recompute_step = number of complete sweeps after which energy and magnetization are computed from scratch
+    strcpy(param_name, "recompute_step");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &recompute_step);
+    if (param_found==1 && recompute_step>0) {
+        fprintf(stdout, "%s = %lu\n", param_name, recompute_step);
+    } else if (param_found==0) {
+        recompute_step = 1000;
+        fprintf(stdout, "%s = %lu (default)\n", param_name, recompute_step);
+    } else {
+        fprintf(stdout, "Invalid recompute step!\n");
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // update_scheme = non-microcanonical step of the mix: local Metropolis or heat-bath sweep, a fixed number of Wolff clusters or a Swendsen-Wang update
+    strcpy(param_name, "update_scheme");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &update_scheme);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, update_scheme);
+        if (strcmp(update_scheme, "metropolis")!=0 && strcmp(update_scheme, "heat_bath")!=0 && strcmp(update_scheme, "wolff")!=0 &&
+            strcmp(update_scheme, "swendsen_wang")!=0) {
+            fprintf(stdout, "Invalid update scheme! Valid keywords: 'metropolis', 'heat_bath', 'wolff' and 'swendsen_wang'.\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    } else if (param_found==0) {
+        strcpy(update_scheme, "metropolis");
+        fprintf(stdout, "%s = %s (default)\n", param_name, update_scheme);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // wolff_clusters = number of Wolff clusters built in a Wolff step
+    if (strcmp(update_scheme, "wolff")==0) {
+        strcpy(param_name, "wolff_clusters");
+        strcpy(param_type, "%d");
+        param_found = read_parameter(inp_file, param_name, param_type, &wolff_clusters);
+        if (param_found==1 && wolff_clusters>0) {
+            fprintf(stdout, "%s = %d\n", param_name, wolff_clusters);
+        } else if (param_found==0) {
+            wolff_clusters = 1;
+            fprintf(stdout, "%s = %d (default)\n", param_name, wolff_clusters);
+        } else {
+            fprintf(stdout, "Invalid number of Wolff clusters!\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    }
+    // num_threads = number of OpenMP threads, each one updating a subset of the replicas
+    #ifdef _OPENMP
+    num_threads = omp_get_max_threads();
+    #endif
+    strcpy(param_name, "num_threads");
+    strcpy(param_type, "%d");
+    param_found = read_parameter(inp_file, param_name, param_type, &num_threads);
+    if (param_found==-1 || num_threads<1) {
+        fprintf(stdout, "Invalid number of threads!\n");
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    #ifdef _OPENMP
+    omp_set_num_threads(num_threads);
+    #else
+    num_threads = 1;
+    #endif
+    fprintf(stdout, "%s = %d\n", param_name, num_threads);
+    fclose(inp_file);
+    unsigned long int seed1;
+    if (strcmp(seed, "time")==0) {
+        seed1 = myrand_seed_from_clock(); // clock and process id: jobs started in the same second get different seeds
+    } else { // Everything else other than the keyword "time" is converted to a long unsigned int, so be careful
+        seed1 = strtoul(seed, NULL, 10);
+    }
+
+    /////////////////////////////////////////////////////
+    // Structure allocation, one replica for each beta //
+    /////////////////////////////////////////////////////
+    double * betas = (double *)malloc((size_t)n_betas * sizeof(double));
+    LatticeTotals * totals = (LatticeTotals *)malloc((size_t)n_betas * sizeof(LatticeTotals));
+    Spin2D ** lattices = (Spin2D **)calloc((size_t)n_betas, sizeof(Spin2D *));
+    ClusterWorkspace ** workspaces = (ClusterWorkspace **)calloc((size_t)n_betas, sizeof(ClusterWorkspace *));
+    FILE ** data = (FILE **)calloc((size_t)n_betas, sizeof(FILE *));
+    pcg32_random_t * streams = (pcg32_random_t *)malloc((size_t)n_betas * sizeof(pcg32_random_t));
+    unsigned long int * swap_attempts = (unsigned long int *)calloc((size_t)n_betas, sizeof(unsigned long int));
+    unsigned long int * swap_accepted = (unsigned long int *)calloc((size_t)n_betas, sizeof(unsigned long int));
+    int * neighbors = allocate_neighbors(lattice_side);
+    int b, alloc_failed = 0;
+    if (betas==NULL || totals==NULL || lattices==NULL || workspaces==NULL || data==NULL || streams==NULL ||
+        swap_attempts==NULL || swap_accepted==NULL || neighbors==NULL) {
+        alloc_failed = 1;
+    }
+    for (b=0; b<n_betas && alloc_failed==0; b++) {
+        betas[b] = beta_min + b * (beta_max - beta_min) / (double)(n_betas - 1);
+        lattices[b] = allocate(lattice_side);
+        if (lattices[b]==NULL) {
+            alloc_failed = 1;
+        }
+        if (strcmp(update_scheme, "wolff")==0 || strcmp(update_scheme, "swendsen_wang")==0) {
+            workspaces[b] = allocate_cluster_workspace(lattice_side);
+            if (workspaces[b]==NULL) {
+                alloc_failed = 1;
+            }
+        }
+        // One data file for each beta, named as the ones of data_run.sh (beta written as bc does, e.g. .45127)
+        format_beta(betas[b], beta_text, sizeof(beta_text));
+        if (strcmp(data_format, "text")==0) {
+            snprintf(data_name, sizeof(data_name), "%s/data_b%s_L%d.dat", data_dir, beta_text, lattice_side);
+            data[b] = fopen(data_name, "w");
+        } else {
+            snprintf(data_name, sizeof(data_name), "%s/data_b%s_L%d.bin", data_dir, beta_text, lattice_side);
+            data[b] = fopen(data_name, "wb");
+        }
+        if (data[b]==NULL) {
+            fprintf(stderr, "Error opening output data file %s\n", data_name);
+            alloc_failed = 1;
+        } else {
+            fprintf(stdout, "Data file name for beta = %lf: %s\n", betas[b], data_name);
+        }
+    }
+
+    /////////////////////////////
+    // Initialize seed for rng //
+    /////////////////////////////
+    const unsigned long int seed2 = seed1 + 137;
+    fprintf(stdout, "Current seeds: %lu, %lu\n", seed1, seed2);
+    fprintf(stdout, "Spin storage: %s\n", SPIN_STORAGE);
+    myrand_init(seed1, seed2);
+    // one independent stream for each beta, the global generator is used for the swaps
+    if (streams!=NULL) {
+        myrand_init_streams(streams, n_betas, seed1, seed2);
+    }
+
+    if (alloc_failed==0) {
+        for (b=0; b<n_betas; b++) {
+            initialize_lattice(lattices[b], lattice_side, &pcg32_random_state);
+            totals[b] = lattice_totals(lattices[b], neighbors, lattice_side);
+            // Header with the parameters of the replica and the names of the columns
+            DataHeader header = {lattice_side, DATA_N_COLS, printing_step, seed1, betas[b], alpha, epsilon, "", DATA_COLUMNS};
+            strcpy(header.update_scheme, update_scheme);
+            if (strcmp(data_format, "text")==0) {
+                write_text_header(data[b], &header);
+            } else {
+                write_data_header(data[b], &header);
+            }
+        }
+        fprintf(stdout, "Correctly allocated and randomly inizialized %d replicas\n", n_betas);
+    } else {
+        fprintf(stdout, "Failed allocation of the replicas, simulation aborted!\n");
+    }
+
+    ////////////////////////////////////
+    // Let's start with the for cicle //
+    ////////////////////////////////////
+    unsigned long int complete_lattice_sweeps=0, swap_rounds=0;
+    int Vol = lattice_side * lattice_side * lattice_side;
+    double delta;
+    Spin2D * tmp_lattice;
+    LatticeTotals tmp_totals;
+
+    while (alloc_failed==0 && complete_lattice_sweeps<total_lattice_sweeps) {
+        complete_lattice_sweeps += 1;
+        // Every replica performs a complete update, the replicas are shared among the threads
+        #pragma omp parallel for schedule(dynamic)
+        for (b=0; b<n_betas; b++) {
+            DoubleVector2D magn;
+            double E_per_site;
+            if (myrand_r(&streams[b])>=epsilon) {
+                microcanonical_sweep(lattices[b], neighbors, lattice_side, NULL, &totals[b]);
+            } else if (strcmp(update_scheme, "swendsen_wang")==0) {
+                swendsen_wang(lattices[b], neighbors, betas[b], workspaces[b], &streams[b], 1, &totals[b]);
+            } else if (strcmp(update_scheme, "wolff")==0) {
+                wolff_sweep(lattices[b], neighbors, betas[b], workspaces[b], &streams[b], wolff_clusters, &totals[b]);
+            } else if (strcmp(update_scheme, "heat_bath")==0) {
+                heat_bath_sweep(lattices[b], neighbors, lattice_side, betas[b], NULL, &streams[b], &totals[b]);
+            } else {
+                metropolis_sweep(lattices[b], neighbors, lattice_side, alpha, betas[b], NULL, &streams[b], &totals[b]);
+            }
+            if (complete_lattice_sweeps%recompute_step==0) {
+                totals[b] = lattice_totals(lattices[b], neighbors, lattice_side);
+            }
+            if (complete_lattice_sweeps%printing_step==0) {
+                E_per_site = totals[b].energy / (double)Vol;
+                magn.sx = totals[b].magn.sx / (double)Vol;
+                magn.sy = totals[b].magn.sy / (double)Vol;
+                if (strcmp(data_format, "text")==0) {
+                    fprintf(data[b], "%.15lf %.15lf %.15lf\n", magn.sx, magn.sy, E_per_site);
+                } else {
+                    fwrite(&magn.sx, sizeof(double), 1, data[b]);
+                    fwrite(&magn.sy, sizeof(double), 1, data[b]);
+                    fwrite(&E_per_site, sizeof(double), 1, data[b]);
+                }
+            }
+        }
+
+        // Exchange of the configurations of neighboring betas, pairs (0,1), (2,3), ... and (1,2), (3,4), ... alternately
+        if (complete_lattice_sweeps%swap_step==0) {
+            for (b=(int)(swap_rounds%2); b<n_betas-1; b+=2) {
+                swap_attempts[b] += 1;
+                delta = (betas[b] - betas[b + 1]) * (totals[b].energy - totals[b + 1].energy);
+                if (delta>=0 || myrand()<exp(delta)) {
+                    swap_accepted[b] += 1;
+                    tmp_lattice = lattices[b];
+                    lattices[b] = lattices[b + 1];
+                    lattices[b + 1] = tmp_lattice;
+                    tmp_totals = totals[b];
+                    totals[b] = totals[b + 1];
+                    totals[b + 1] = tmp_totals;
+                    if (strcmp(verbose, "true")==0) {
+                        fprintf(stdout, "Sweep %lu: exchanged replicas at beta = %lf and beta = %lf\n", complete_lattice_sweeps, betas[b], betas[b + 1]);
+                    }
+                }
+            }
+            swap_rounds += 1;
+        }
+    }
+
+    if (alloc_failed==0) {
+        fprintf(stdout, "\nSimulation ended.\nTotal steps: %lu\nSwap rounds: %lu\n", complete_lattice_sweeps, swap_rounds);
+        for (b=0; b<n_betas-1; b++) {
+            fprintf(stdout, "Acceptance of the swaps between beta = %lf and beta = %lf: %lf\n", betas[b], betas[b + 1],
+                    (double)swap_accepted[b] / (double)swap_attempts[b]);
+        }
+    }
+    for (b=0; b<n_betas; b++) {
+        if (lattices!=NULL) {
+            free_lattice(lattices[b]);
+        }
+        if (workspaces!=NULL) {
+            free_cluster_workspace(workspaces[b]);
+        }
+        if (data!=NULL && data[b]!=NULL) {
+            fclose(data[b]);
+        }
+    }
+    free(betas);
+    free(totals);
+    free(lattices);
+    free(workspaces);
+    free(data);
+    free(streams);
+    free(swap_attempts);
+    free(swap_accepted);
+    free(neighbors);
+    t_end = clock();
+    clock_gettime(CLOCK_MONOTONIC, &wall_end);
+    cpu_time_used = ((double) (t_end - t_start)) / CLOCKS_PER_SEC;
+    wall_time_used = (double)(wall_end.tv_sec - wall_start.tv_sec) + 1e-9 * (double)(wall_end.tv_nsec - wall_start.tv_nsec);
+    fprintf(stdout, "Runtime of the last simulation: %.10lf\n", cpu_time_used);
+    fprintf(stdout, "Wall-clock time of the last simulation: %.10lf\n", wall_time_used);
+    return EXIT_SUCCESS;
+}
@@ -0,0 +1,266 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include <math.h>
+
+#include "../include/functions.h"
+#include "../include/random.h"
+#include "../include/data_header.h"
+#include "../include/worm.h"
+
+#define MAX_LENGTH 128
+
+// Worm algorithm for the 3D XY model in the current representation (see worm.h). A complete sweep is made of
+// L^3 worm steps, the same number of elementary moves of a sweep of the local updates. A row of the data file holds
+// the estimators averaged over printing_step closed-loop configurations (a fixed number, so that the mean of the
+// rows is the mean over all of them) and rows are written until total_lattice_sweeps sweeps have been done:
+// energy_per_site, m2 = <m^2> (= chi / V, from the fraction of the steps spent in the closed-loop sector) and
+// winding2 = <W_x^2 + W_y^2 + W_z^2>, from which the helicity modulus is <winding2> / (3 beta L).
+// The data file has the header and the layout of the files of o2_mcmc.c, with update_scheme 'worm'
+int main(int argc, char * argv[]) {
+    clock_t t_start, t_end;
+    struct timespec wall_start, wall_end;
+    double cpu_time_used, wall_time_used;
+    t_start = clock();
+    clock_gettime(CLOCK_MONOTONIC, &wall_start);
+
+    // Check if the number of parameters is 3, i.e. ./program inputfile.in data.dat
+    if (argc!=3) {
+        fprintf(stdout, "Invalid input!\nHow to use this program:\n./program input.inp datafile(.dat or .bin)\n");
+	fprintf(stdout, "Input.inp must be like (do not include ' '):\nlattice_side int\nseed int or 'time'\ntotal_lattice_sweeps int (sweeps of L^3 worm steps)\nprinting_step int (closed-loop configurations in a row)\ndata_format 'binary' or 'text'\nbeta double\nverbose 'false' or 'true'\n");
+	fprintf(stdout, "Optional parameters:\nthermalization_sweeps int (sweeps before the first sample, not written, default: 0)\n");
+        return EXIT_SUCCESS;
+    }
+    char inp_file_name[MAX_LENGTH], data_name[MAX_LENGTH];
+    strcpy(inp_file_name, argv[1]);
+    strcpy(data_name, argv[2]);
+
+    ///////////////////////////////////////////////////////////////
+    // Opening input file from which inputs parameters are taken //
+    ///////////////////////////////////////////////////////////////
+    FILE *inp_file = fopen(inp_file_name, "r");
+    if (inp_file == NULL) {
+        fprintf(stderr, "Error opening input file\n");
+        return EXIT_SUCCESS;
+    }
+    fprintf(stdout, "Parameters input file name: %s\n", inp_file_name);
+
+    /////////////////////////////////////////////////////////////////
+    // Let's extract all the useful parameters from the input file //
+    /////////////////////////////////////////////////////////////////
+    int param_found = 0;
+    char param_name[MAX_LENGTH], param_type[MAX_LENGTH];
+    char data_format[MAX_LENGTH], seed[MAX_LENGTH], verbose[MAX_LENGTH];
+    unsigned long int total_lattice_sweeps, printing_step, thermalization_sweeps;
+    int lattice_side;
+    double beta;
+    fprintf(stdout, "### Parameters of the simulation:\n");
+    // Type of data format of the output .dat file
+    strcpy(param_name, "data_format");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &data_format);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, data_format);
+        if (strcmp(data_format, "binary")!=0 && strcmp(data_format, "text")!=0) {
+            fprintf(stdout, "Invalid type of format choosen for the file! Valid keywords: 'binary' and 'text'.\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // Type of verbosity
+    strcpy(param_name, "verbose");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &verbose);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, verbose);
+        if (strcmp(verbose, "true")!=0 && strcmp(verbose, "false")!=0) {
+            fprintf(stdout, "Invalid type of verbosity choosen for the file! Valid keywords: 'true' and 'false'.\n");
+            fprintf(stdout, "Simulation aborted!\n");
+            fclose(inp_file);
+            return EXIT_SUCCESS;
+        }
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // lattice_side = side of the 3D square lattice
+    strcpy(param_name, "lattice_side");
+    strcpy(param_type, "%d");
+    param_found = read_parameter(inp_file, param_name, param_type, &lattice_side);
+    if (param_found==1 && lattice_side>0) {
+        fprintf(stdout, "%s = %d\n", param_name, lattice_side);
+    } else {
+        fprintf(stdout, "%s has not been found in %s or it is not valid!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // total_lattice_sweeps = number of sweeps, each of L^3 worm steps
+    strcpy(param_name, "total_lattice_sweeps");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &total_lattice_sweeps);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lu\n", param_name, total_lattice_sweeps);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // printing_step = number of closed-loop configurations whose estimators are averaged in a row of the data file
+    strcpy(param_name, "printing_step");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &printing_step);
+    if (param_found==1 && printing_step>0) {
+        fprintf(stdout, "%s = %lu\n", param_name, printing_step);
+    } else {
+        fprintf(stdout, "%s has not been found in %s or it is not valid!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // beta = 1 / temperature, > 0 (the energy estimator contains |J| / beta)
+    strcpy(param_name, "beta");
+    strcpy(param_type, "%lf");
+    param_found = read_parameter(inp_file, param_name, param_type, &beta);
+    if (param_found==1 && beta>0) {
+        fprintf(stdout, "%s = %lf\n", param_name, beta);
+    } else {
+        fprintf(stdout, "%s has not been found in %s or it is not valid!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // seed = seed for rng, can be choosen to be time or a custom number to make simulation reproducible
+    strcpy(param_name, "seed");
+    strcpy(param_type, "%s");
+    param_found = read_parameter(inp_file, param_name, param_type, &seed);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %s\n", param_name, seed);
+    } else {
+        fprintf(stdout, "%s has not been found in %s!\n", param_name, inp_file_name);
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    // thermalization_sweeps = sweeps done before the first sample, whose estimators are not written
+    strcpy(param_name, "thermalization_sweeps");
+    strcpy(param_type, "%lu");
+    param_found = read_parameter(inp_file, param_name, param_type, &thermalization_sweeps);
+    if (param_found==1) {
+        fprintf(stdout, "%s = %lu\n", param_name, thermalization_sweeps);
+    } else if (param_found==0) {
+        thermalization_sweeps = 0;
+        fprintf(stdout, "%s = %lu (default)\n", param_name, thermalization_sweeps);
+    } else {
+        fprintf(stdout, "Simulation aborted!\n");
+        fclose(inp_file);
+        return EXIT_SUCCESS;
+    }
+    fclose(inp_file);
+    unsigned long int seed1;
+    if (strcmp(seed, "time")==0) {
+        seed1 = myrand_seed_from_clock(); // clock and process id: jobs started in the same second get different seeds
+    } else { // Everything else other than the keyword "time" is converted to a long unsigned int, so be careful
+        seed1 = strtoul(seed, NULL, 10);
+    }
+
+    //////////////////////////////////////////////////////////////////
+    // Opening data file in which simulation is going to be written //
+    //////////////////////////////////////////////////////////////////
+    FILE * data;
+    if (strcmp(data_format, "text")==0) {
+	data = fopen(data_name, "w");
+    } else {
+        data = fopen(data_name, "wb");
+    }
+    if (data == NULL) {
+        fprintf(stderr, "Error opening output data file\n");
+        return EXIT_SUCCESS;
+    }
+    fprintf(stdout, "Data file name: %s\n", data_name);
+
+    /////////////////////////////
+    // Initialize seed for rng //
+    /////////////////////////////
+    const unsigned long int seed2 = seed1 + 137;
+    fprintf(stdout, "Current seeds: %lu, %lu\n", seed1, seed2);
+    myrand_init(seed1, seed2);
+
+    ///////////////////////////////////////////
+    // Structure allocation & initialization //
+    ///////////////////////////////////////////
+    int Vol = lattice_side * lattice_side * lattice_side;
+    int *neighbors = allocate_neighbors(lattice_side);
+    WormState *worm = allocate_worm(lattice_side, beta);
+    if (neighbors==NULL || worm==NULL) {
+        fprintf(stdout, "Failed allocation of the worm, simulation aborted!\n");
+        fclose(data);
+        free(neighbors);
+        free_worm(worm);
+        return EXIT_SUCCESS;
+    }
+
+    ////////////////////////////////////
+    // Let's start with the for cicle //
+    ////////////////////////////////////
+    DataHeader header = {lattice_side, WORM_DATA_N_COLS, printing_step, seed1, beta, 0.0, 0.0, "worm", WORM_DATA_COLUMNS};
+    if (strcmp(data_format, "text")==0) {
+        write_text_header(data, &header);
+    } else {
+        write_data_header(data, &header);
+    }
+    WormEstimators estimators = {0};
+    unsigned long int n_rows = 0, accepted = 0, total_steps = 0, total_z_steps = 0;
+    unsigned long int max_steps = (unsigned long int)Vol * total_lattice_sweeps;
+    double sample[WORM_DATA_N_COLS];
+    // thermalization, then the worm is closed: every row starts from a closed-loop configuration
+    worm_steps(worm, neighbors, (unsigned long int)Vol * thermalization_sweeps, &pcg32_random_state, &estimators);
+    while (worm->head!=worm->tail) {
+        worm_steps(worm, neighbors, 1, &pcg32_random_state, &estimators);
+    }
+    estimators = (WormEstimators){0};
+
+    while (total_steps < max_steps) {
+        accepted += worm_closed_loops(worm, neighbors, printing_step, &pcg32_random_state, &estimators);
+        n_rows += 1;
+        sample[0] = estimators.energy / (double)estimators.z_steps;
+        sample[1] = (double)estimators.steps / (double)estimators.z_steps / (double)Vol;
+        sample[2] = estimators.winding2 / (double)estimators.z_steps;
+        if (strcmp(data_format, "text")==0) {
+            fprintf(data, "%.15lf %.15lf %.15lf\n", sample[0], sample[1], sample[2]);
+        } else {
+            fwrite(sample, sizeof(double), WORM_DATA_N_COLS, data);
+        }
+        if (strcmp(verbose, "true")==0) {
+            fprintf(stdout, "Row %lu: %lu worm steps, E = %lf, m2 = %lf\n", n_rows, estimators.steps, sample[0], sample[1]);
+        }
+        total_steps += estimators.steps;
+        total_z_steps += estimators.z_steps;
+        estimators = (WormEstimators){0};
+    }
+    fclose(data);
+
+    fprintf(stdout, "\nSimulation ended.\nRows written: %lu\n", n_rows);
+    fprintf(stdout, "Worm steps performed: %lu\nMean acceptance of the worm moves: %lf\n", total_steps, (double)accepted / (double)total_steps);
+    fprintf(stdout, "Closed-loop configurations visited: %lu\nLargest current on a bond: %d\n", total_z_steps, worm->max_current);
+    free(neighbors);
+    free_worm(worm);
+
+    t_end = clock();
+    clock_gettime(CLOCK_MONOTONIC, &wall_end);
+    cpu_time_used = ((double) (t_end - t_start)) / CLOCKS_PER_SEC;
+    wall_time_used = (double)(wall_end.tv_sec - wall_start.tv_sec) + 1e-9 * (double)(wall_end.tv_nsec - wall_start.tv_nsec);
+    fprintf(stdout, "Runtime of the last simulation: %.10lf\n", cpu_time_used);
+    fprintf(stdout, "Wall-clock time of the last simulation: %.10lf\n", wall_time_used);
+    return EXIT_SUCCESS;
+}
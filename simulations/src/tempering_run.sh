@@ -0,0 +1,79 @@
+#!/bin/bash
+
+# Set locale for correct numeric formatting
+export LC_NUMERIC=C
+scale=5 #scale for numerical precision
+beta_c=0.45275
+scaled_beta=40
+number_betas=31
+
+# Check if both arguments are provided
+if [[ $# -ne 2 ]]; then
+    echo "Usage: $0 o2_tempering.o num_threads"
+    exit 1
+fi
+
+# Assign arguments to variables
+executable="$1"
+# Number of threads sharing the replicas of a lattice
+num_threads="$2"
+
+# Sequence for lattice_side
+lattice_side_values=(30 27 24 21 18 15 12 9)
+echo -e "chosen lattices: ${lattice_side_values[*]}"
+
+# Parameters for the simulations
+sample_size=20000000 # number of total sweeps for each replica
+printing_step=200 # complete lattice iterations between means computing (sampling)
+swap_step=10 # complete lattice iterations between two attempts of exchanging the replicas
+alpha=1.0 # amplitude of the angle for Metropolis step
+epsilon=0.1 # percentage of Metropolis w.r.t. Microcanonical
+
+# Check and remove directories if they exist
+[[ -d inputs ]] && rm -r inputs
+[[ -d data ]] && rm -r data
+[[ -d outputs ]] && rm -r outputs
+
+# Create directories for input, data, and output files, together with all the lattice subdirectories
+for lattice_side in "${lattice_side_values[@]}"; do
+    mkdir -p inputs/lattice${lattice_side}
+    mkdir -p data/lattice${lattice_side}
+    mkdir -p outputs/lattice${lattice_side}
+done
+
+# One job for each lattice side, holding the replicas of all the betas: the grid is the same of data_run.sh
+for lattice_side in "${lattice_side_values[@]}"; do
+    beta_down=$(echo "scale=$scale; $beta_c - $scaled_beta / e(l($lattice_side) * 3.0)" | bc -l)
+    beta_up=$(echo "scale=$scale; $beta_c + $scaled_beta / e(l($lattice_side) * 3.0)" | bc -l)
+    delta_beta=$(echo "scale=$scale; ($beta_up - $beta_down) / $number_betas" | bc -l)
+    beta_max=$(echo "scale=$scale; $beta_down + $number_betas * $delta_beta" | bc -l)
+    echo -e "Lattice $lattice_side betas: from $beta_down to $beta_max, $((number_betas + 1)) replicas"
+
+    # Define filenames within their respective folders
+    input_file="inputs/lattice${lattice_side}/input_tempering_L${lattice_side}.in"
+    data_dir="data/lattice${lattice_side}"
+    output_file="outputs/lattice${lattice_side}/output_tempering_L${lattice_side}.out"
+
+    # Generate the input file for this run
+    cat > "$input_file" <<EOF
+lattice_side $lattice_side
+seed time
+total_lattice_sweeps $sample_size
+printing_step $printing_step
+data_format binary
+beta_min $beta_down
+beta_max $beta_max
+n_betas $((number_betas + 1))
+alpha $alpha
+epsilon $epsilon
+verbose false
+swap_step $swap_step
+num_threads $num_threads
+EOF
+
+    # Run the simulation of all the betas, redirecting stdout to output file
+    echo "Running parallel tempering with lattice_side=$lattice_side on $num_threads threads"
+    ./$executable "$input_file" "$data_dir" > "$output_file"
+done
+
+echo "Done."
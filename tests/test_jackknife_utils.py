@@ -0,0 +1,87 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils/')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../data_processing/')))
+from io_utils import write_data_header
+from jackknife_utils import perform_jackknife_blocking, perform_jackknife_blocking_analysis
+from lattice_metrics_to_csv import process_file
+
+L = 6
+BETA = 0.45
+N_ROWS = 2000
+
+
+def write_worm_file(directory, rng):
+    """Writes a data file as o2_worm does (columns of WORM_DATA_COLUMNS), returns its path and the winding numbers."""
+    path = os.path.join(directory, f"data_b.45000_L{L}.bin")
+    winding2 = 3 * BETA * L * (0.16 + 0.01 * rng.standard_normal(N_ROWS))
+    samples = np.column_stack([-1.0 + 0.01 * rng.standard_normal(N_ROWS), 0.05 + 0.001 * rng.standard_normal(N_ROWS), winding2])
+    with open(path, "wb") as file:
+        write_data_header(file, L, 1, 1, BETA, 0.0, 0.0, update_scheme="worm", columns=("energy_per_site", "m2", "winding2"))
+        file.write(samples.tobytes())
+    return path, winding2
+
+
+def test_worm_csv_through_jackknife(tmp_path):
+    # The worm CSVs have no absm and m4: C and Upsilon L are computed, chi' and U are NaN
+    path, winding2 = write_worm_file(str(tmp_path), np.random.default_rng(1))
+    process_file(path, str(tmp_path / "csv"), idx_threshold=0)
+    csv_path = str(tmp_path / "csv" / f"L{L}" / f"data_L{L}_b{BETA:.5f}_summary.csv")
+    assert "absm" not in pd.read_csv(csv_path, nrows=0).columns
+
+    perform_jackknife_blocking([csv_path], str(tmp_path / "jk"), 0, 1, 20)
+    means = pd.read_csv(tmp_path / "jk" / "secondary_quantities_means.csv")
+    variances = pd.read_csv(tmp_path / "jk" / "secondary_quantities_variances.csv")
+    assert np.isfinite(means["C_mean"][0]) and np.isfinite(variances["var_C"][0])
+    assert np.isclose(means["helicity_L_mean"][0], np.mean(winding2) / (3 * BETA))
+    assert np.isfinite(variances["var_helicity_L"][0])
+    assert np.isnan(means["chi_prime_mean"][0]) and np.isnan(means["U_mean"][0])
+
+    perform_jackknife_blocking_analysis([csv_path], str(tmp_path / "blocking"), 0, 1, 4)
+    blocking = pd.read_csv(tmp_path / "blocking" / f"L{L}" / f"data_L{L}_{BETA}_jackknife_blocking.csv")
+    assert len(blocking) == 4
+    assert np.isfinite(blocking["var_C"]).all() and blocking["var_U"].isna().all()
+
+
+def write_mcmc_file(directory, rng, lattice_side, helicity_step):
+    """
+    Writes a data file as o2_mcmc does, with the helicity stream (data_file.hel) measured every helicity_step
+    sweeps, returns its path and the helicity modulus of the stream.
+    """
+    path = os.path.join(directory, f"data_b.45000_L{lattice_side}.bin")
+    angles = rng.uniform(0.0, 2.0 * np.pi, N_ROWS)
+    samples = np.column_stack([0.1 * np.cos(angles), 0.1 * np.sin(angles), -1.0 + 0.01 * rng.standard_normal(N_ROWS)])
+    bonds = np.column_stack([0.33 + 0.01 * rng.standard_normal(N_ROWS // helicity_step),
+                             0.2 + 0.02 * rng.standard_normal(N_ROWS // helicity_step)])
+    with open(path, "wb") as file:
+        write_data_header(file, lattice_side, 1, 1, BETA, 1.0, 0.0)
+        file.write(samples.tobytes())
+    with open(f"{path}.hel", "wb") as file:
+        write_data_header(file, lattice_side, helicity_step, 1, BETA, 1.0, 0.0, columns=("bond_cos", "bond_sin2"))
+        file.write(bonds.tobytes())
+    return path, bonds[:, 0] - BETA * bonds[:, 1]
+
+
+def test_helicity_L_of_mcmc_and_worm_files(tmp_path):
+    # Upsilon L from the bond sums of the .hel stream and from the winding numbers of the worm files
+    rng = np.random.default_rng(2)
+    mcmc_dir, worm_dir = tmp_path / "mcmc", tmp_path / "worm"
+    mcmc_dir.mkdir()
+    worm_dir.mkdir()
+    mcmc_path, helicity = write_mcmc_file(str(mcmc_dir), rng, 8, 5)
+    worm_path, winding2 = write_worm_file(str(worm_dir), rng)
+    for path in (mcmc_path, worm_path):
+        process_file(path, str(tmp_path / "csv"), idx_threshold=0)
+    csv_paths = [str(tmp_path / "csv" / f"L{side}" / f"data_L{side}_b{BETA:.5f}_summary.csv") for side in (8, L)]
+
+    perform_jackknife_blocking(csv_paths, str(tmp_path / "jk"), 0, 1, 20)
+    means = pd.read_csv(tmp_path / "jk" / "secondary_quantities_means.csv")
+    variances = pd.read_csv(tmp_path / "jk" / "secondary_quantities_variances.csv")
+    assert list(means["L"]) == [8, L]
+    assert np.isclose(means["helicity_L_mean"][0], np.mean(helicity) * 8)
+    assert np.isclose(means["helicity_L_mean"][1], np.mean(winding2) / (3 * BETA))
+    assert np.isfinite(variances["var_helicity_L"]).all()
+    assert np.isfinite(means["U_mean"][0]) and np.isnan(means["U_mean"][1])
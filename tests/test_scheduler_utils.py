@@ -0,0 +1,27 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../utils/')))
+from scheduler_utils import beta_grid, estimate_makespan
+
+
+def test_beta_grid_as_bc():
+    # Betas printed by the bc commands of data_run.sh (scale=5, beta_c = 0.45275, scaled_beta = 40, number_betas = 31)
+    betas = beta_grid(30, 0.45275, 40, 31)
+    assert len(betas) == 32
+    assert betas[:3] == [".45127", ".45136", ".45145"]
+    assert betas[-1] == ".45406"
+
+    betas = beta_grid(9, 0.45275, 40, 31)
+    assert betas[:2] == [".39788", ".40142"]
+    assert betas[-1] == ".50762"
+
+
+def test_makespan_of_warm_start_chains():
+    # Without chains the longest jobs are spread over the workers, a chain runs its jobs one after the other
+    assert estimate_makespan([1.0, 1.0, 1.0], 3) == 1.0
+    assert estimate_makespan([1.0, 1.0, 1.0], 3, after=[None, 0, 1]) == 3.0
+    # The second worker runs the short job, then waits for the end of the first job to start the one chained to it
+    assert estimate_makespan([2.0, 2.0, 1.0], 2) == 3.0
+    assert estimate_makespan([2.0, 2.0, 1.0], 2, after=[None, 0, None]) == 4.0
+    assert estimate_makespan([], 4) == 0.0
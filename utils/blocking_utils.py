@@ -134,7 +134,10 @@ def process_csv_for_blocking(input_file, output_dir, plot_dir, min_block_size, m
 
     # Paths for blocking CSV and plot files
     blocking_csv = os.path.join(lattice_csv_dir, f"{base_name}_blocking_{max_block_size}.csv")
-    plot_files = [os.path.join(file_plot_dir, f"L{lattice_side}_beta{beta}_{column}_blocking_{max_block_size}.png") for column in ["mx", "my", "epsilon", "absm", "m2", "m4"]]
+    # helicity only for the runs that measured it (helicity_step > 0 or worm runs)
+    columns_to_process = [column for column in ["mx", "my", "epsilon", "absm", "m2", "m4", "helicity"]
+                          if column != "helicity" or column in data.columns]
+    plot_files = [os.path.join(file_plot_dir, f"L{lattice_side}_beta{beta}_{column}_blocking_{max_block_size}.png") for column in columns_to_process]
 
     # Check existing files and prompt for actions
     user_choices = check_existing_blocking_files(blocking_csv, plot_files)
@@ -146,7 +149,6 @@ def process_csv_for_blocking(input_file, output_dir, plot_dir, min_block_size, m
     results = {"block_size": range(min_block_size, max_block_size + 1)}
 
     # Process each column for blocking analysis
-    columns_to_process = ["mx", "my", "epsilon", "absm", "m2", "m4"]
     for column in columns_to_process:
         if column not in data.columns:
             logging.warning(f"Column '{column}' not found in {input_file}. Skipping...")
@@ -154,7 +156,8 @@ def process_csv_for_blocking(input_file, output_dir, plot_dir, min_block_size, m
         
         if user_choices["recompute_blocking"]:
             # Calculate variances if required
-            column_data = data[column].to_numpy()
+            # the columns of the measurement streams are NaN in the rows without a measurement
+            column_data = data[column].dropna().to_numpy()
             logging.info(f"Performing blocking analysis for column: {column}")
             try:
                 variances = calculate_blocking_variances(column_data, min_block_size, max_block_size, num_cores)
@@ -243,7 +246,8 @@ def process_blocking_files(input_dir, output_dir, output_file, block_size_thresh
                             "var_epsilon": row["var_epsilon"].iloc[0],
                             "var_absm": row["var_absm"].iloc[0],
                             "var_m2": row["var_m2"].iloc[0],
-                            "var_m4": row["var_m4"].iloc[0]
+                            "var_m4": row["var_m4"].iloc[0],
+                            "var_helicity": row["var_helicity"].iloc[0] if "var_helicity" in row else np.nan
                         })
                     except Exception as e:
                         logging.error(f"Failed to process file {file_path}: {e}")
@@ -0,0 +1,64 @@
+import numpy as np
+
+
+def structure_factor(spins):
+    """
+    Structure factor of a batch of configurations at k = 0 and at the smallest nonzero momenta,
+    G(k) = (1/V) |sum_x s_x exp(i k . x)|^2, from the real FFT of each spin component on the three axes.
+
+    Parameters:
+        spins (np.ndarray): Configurations, shape (n, L, L, L, 2) (e.g. a batch of snapshots).
+
+    Returns:
+        tuple: G(0) and G(k_min), arrays of n values. G(k_min) is averaged over the three momenta
+               2 pi / L along one axis, as the column g_kmin written by o2_mcmc.
+    """
+    spins = np.asarray(spins, dtype=np.float64)
+    L = spins.shape[1]
+    # rfftn keeps the non-negative momenta of the last axis, enough for |F(k)|^2 = |F(-k)|^2
+    power = np.sum(np.abs(np.fft.rfftn(spins, axes=(1, 2, 3)))**2, axis=-1) / L**3
+    g_0 = power[:, 0, 0, 0]
+    g_kmin = (power[:, 1, 0, 0] + power[:, 0, 1, 0] + power[:, 0, 0, 1]) / 3
+    return g_0, g_kmin
+
+
+def snapshots_structure_factor(snapshots, batch_size=64, first_index=0):
+    """
+    Structure factor of all the snapshots of an archive (see io_utils.load_snapshots), transformed in batches
+    of batch_size configurations to bound the memory used by the FFT.
+
+    Parameters:
+        snapshots (np.ndarray or AngleSnapshots): Snapshots, shape (n, L, L, L, 2).
+        batch_size (int): Snapshots transformed at once.
+        first_index (int): First snapshot used (post-thermalization).
+
+    Returns:
+        tuple: G(0) and G(k_min) of each snapshot from first_index on.
+    """
+    g_0, g_kmin = [], []
+    for start in range(first_index, len(snapshots), batch_size):
+        batch_g_0, batch_g_kmin = structure_factor(snapshots[start:start + batch_size])
+        g_0.append(batch_g_0)
+        g_kmin.append(batch_g_kmin)
+    if not g_0:
+        return np.empty(0), np.empty(0)
+    return np.concatenate(g_0), np.concatenate(g_kmin)
+
+
+def xi_over_L(g_0, g_kmin, L):
+    """
+    Second-moment correlation length over the lattice side,
+    xi / L = sqrt(<G(0)> / <G(k_min)> - 1) / (2 L sin(pi / L)).
+    At the critical point it tends to a universal value, so the curves of different L cross at beta_c
+    with smaller corrections than the Binder cumulant.
+
+    Parameters:
+        g_0 (float or np.ndarray): Mean(s) of G(0).
+        g_kmin (float or np.ndarray): Mean(s) of G(k_min).
+        L (int): Lattice side.
+
+    Returns:
+        float or np.ndarray: xi / L (NaN where G(0) < G(k_min), deep in the disordered phase of small lattices).
+    """
+    ratio = np.asarray(g_0, dtype=np.float64) / np.asarray(g_kmin, dtype=np.float64) - 1
+    return np.sqrt(np.where(ratio >= 0, ratio, np.nan)) / (2 * L * np.sin(np.pi / L))
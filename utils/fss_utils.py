@@ -94,6 +94,43 @@ def create_starting_params(beta, chi):
     return alpha, beta_c, chi_max
 
 
+def find_crossings(beta_list, means_list, L_list):
+    """
+    Finds where the curves of a quantity of consecutive lattice sides cross (e.g. xi / L or U, whose crossings
+    approach beta_c), interpolating linearly both curves on the union of their betas.
+
+    Args:
+        beta_list (list of np.ndarray): Beta values of each lattice side, sorted (as from prepare_dataset_fss_plot).
+        means_list (list of np.ndarray): Values of the quantity at those betas.
+        L_list (list or np.ndarray): Lattice sides, sorted.
+
+    Returns:
+        pd.DataFrame: One row per crossing, with columns 'L1', 'L2', 'beta_cross' and 'value'.
+    """
+    crossings = []
+    for i in range(len(L_list) - 1):
+        mask1, mask2 = np.isfinite(means_list[i]), np.isfinite(means_list[i + 1])
+        beta1, y1 = beta_list[i][mask1], means_list[i][mask1]
+        beta2, y2 = beta_list[i + 1][mask2], means_list[i + 1][mask2]
+        if len(beta1) < 2 or len(beta2) < 2:
+            continue
+        # common interval of the two grids
+        beta = np.union1d(beta1, beta2)
+        beta = beta[(beta >= max(beta1[0], beta2[0])) & (beta <= min(beta1[-1], beta2[-1]))]
+        y1_interp, y2_interp = np.interp(beta, beta1, y1), np.interp(beta, beta2, y2)
+        diff = y2_interp - y1_interp
+        for j in np.nonzero(np.sign(diff[:-1]) * np.sign(diff[1:]) < 0)[0]:
+            t = diff[j] / (diff[j] - diff[j + 1])
+            beta_cross = beta[j] + t * (beta[j + 1] - beta[j])
+            crossings.append({
+                "L1": L_list[i],
+                "L2": L_list[i + 1],
+                "beta_cross": beta_cross,
+                "value": y1_interp[j] + t * (y1_interp[j + 1] - y1_interp[j]),
+            })
+    return pd.DataFrame(crossings, columns=["L1", "L2", "beta_cross", "value"])
+
+
 def get_new_beta_interval():
     """
     Prompts the user to enter a new beta interval.
@@ -634,3 +634,55 @@ def get_user_input_for_chi_prime_fit(config):
     config['paths']['plot_dir'] = plot_dir_input or config['paths']['plot_dir']
    
     return config
+
+
+def get_user_inputs_for_reweighting(config):
+    """Update the configuration of the multi-histogram reweighting based on user input."""
+    first_index_input = input(f"Enter first index (default: {config['settings']['first_index']}): ").strip()
+    config['settings']['first_index'] = int(first_index_input) if first_index_input else config['settings']['first_index']
+
+    n_blocks_input = input(f"Enter number of jackknife blocks (default: {config['settings']['n_blocks']}): ").strip()
+    config['settings']['n_blocks'] = int(n_blocks_input) if n_blocks_input else config['settings']['n_blocks']
+
+    n_points_input = input(f"Enter number of betas of the grid for each lattice (default: {config['settings']['n_points']}): ").strip()
+    config['settings']['n_points'] = int(n_points_input) if n_points_input else config['settings']['n_points']
+
+    config['paths']['output_dir'] = input(f"Enter output data directory (default: {config['paths']['output_dir']}): ").strip() or config['paths']['output_dir']
+
+    # Summary files (or binary files) of the runs to reweight, of one or more lattices
+    logging.info("======== Selection of files for the reweighting ========")
+    config['paths']['input_files'] = navigate_directories(start_path=".", multi_select=True, file_extension=".csv")
+
+    return config
+
+
+def get_user_inputs_for_campaign(config):
+    """Update the configuration of the simulation campaign based on user input."""
+    config['settings']['executable'] = input(f"Enter the simulation executable (default: {config['settings']['executable']}): ").strip() or config['settings']['executable']
+
+    n_workers_input = input(f"Enter number of simultaneous runs (default: {config['settings']['n_workers']}): ").strip()
+    config['settings']['n_workers'] = int(n_workers_input) if n_workers_input else config['settings']['n_workers']
+
+    max_retries_input = input(f"Enter maximum number of retries of a failed run (default: {config['settings']['max_retries']}): ").strip()
+    config['settings']['max_retries'] = int(max_retries_input) if max_retries_input else config['settings']['max_retries']
+
+    sample_size_input = input(f"Enter number of sweeps of each run (default: {config['settings']['sample_size']}): ").strip()
+    config['settings']['sample_size'] = int(sample_size_input) if sample_size_input else config['settings']['sample_size']
+
+    return config
+
+
+def get_user_inputs_for_numpy_simulation(config):
+    """Update the configuration of the NumPy simulation based on user input."""
+    lattice_sides_input = input(f"Enter the lattice sides separated by spaces (default: {config['settings']['lattice_sides']}): ").strip()
+    config['settings']['lattice_sides'] = [int(L) for L in lattice_sides_input.split()] if lattice_sides_input else config['settings']['lattice_sides']
+
+    sample_size_input = input(f"Enter number of sweeps of each lattice (default: {config['settings']['sample_size']}): ").strip()
+    config['settings']['sample_size'] = int(sample_size_input) if sample_size_input else config['settings']['sample_size']
+
+    seed_input = input(f"Enter the seed (default: {config['settings']['seed']}): ").strip()
+    config['settings']['seed'] = int(seed_input) if seed_input else config['settings']['seed']
+
+    config['settings']['data_format'] = input(f"Enter the data format, 'binary' or 'text' (default: {config['settings']['data_format']}): ").strip() or config['settings']['data_format']
+
+    return config
@@ -81,21 +81,264 @@ def load_config(config_path="config.yaml"):
 
 
 
-def load_binary_file(filepath, n_cols):
+DATA_MAGIC = b"O2DATA"
+
+
+def read_data_header(filepath):
     """
-    Loads binary files and reshapes them into a NumPy array.
+    Reads the header of a binary data file written by o2_mcmc or o2_tempering (layout in simulations/include/data_header.h).
+
+    Parameters:
+        filepath (str): Path to the binary file.
+
+    Returns:
+        dict: Header fields ('version', 'header_size', 'L', 'n_cols', 'printing_step', 'seed', 'beta', 'alpha',
+              'epsilon', 'dtype', 'update_scheme', 'columns'), or None for the old files without header.
+    """
+    with open(filepath, "rb") as file:
+        raw = file.read(104)
+        if len(raw) < 104 or raw[:8].rstrip(b"\0") != DATA_MAGIC:
+            return None
+        dtype = raw[64:72].rstrip(b"\0").decode()
+        header_layout = np.dtype([
+            ("magic", "S8"), ("version", "u4"), ("header_size", "u4"), ("L", "i4"), ("n_cols", "i4"),
+            ("printing_step", "u8"), ("seed", "u8"), ("beta", "f8"), ("alpha", "f8"), ("epsilon", "f8"),
+        ]).newbyteorder(dtype[0])  # numbers are stored in the byte order of the samples
+        fields = np.frombuffer(raw[:64], dtype=header_layout)[0]
+        header = {name: fields[name].item() for name in header_layout.names if name != "magic"}
+        file.seek(72)
+        header["update_scheme"] = file.read(32).rstrip(b"\0").decode()
+        header["columns"] = file.read(256).rstrip(b"\0").decode().split(",")
+    header["dtype"] = dtype
+    return header
+
+
+def write_data_header(file, lattice_side, printing_step, seed, beta, alpha, epsilon, update_scheme="metropolis",
+                      columns=("mx", "my", "energy_per_site"), data_format="binary"):
+    """
+    Writes the header of a data file as o2_mcmc does (write_data_header and write_text_header in
+    simulations/lib/data_header.c), so that the files written from Python are read as the ones of the simulation.
+
+    Parameters:
+        file (file object): Data file opened for writing, in binary mode for data_format 'binary'.
+        lattice_side (int), printing_step (int), seed (int), beta (float), alpha (float), epsilon (float): Parameters of the run.
+        update_scheme (str): Update of the Metropolis steps.
+        columns (sequence[str]): Names of the columns of the samples.
+        data_format (str): 'binary' (512 bytes header, samples as float64) or 'text' (comment lines).
+    """
+    if data_format == "text":
+        file.write(f"# {DATA_MAGIC.decode()} version 1\n# lattice_side {lattice_side}\n# printing_step {printing_step}\n"
+                   f"# seed {seed}\n# beta {beta:.15f}\n# alpha {alpha:.15f}\n# epsilon {epsilon:.15f}\n"
+                   f"# update_scheme {update_scheme}\n# {' '.join(columns)}\n")
+        return
+    dtype = np.dtype(np.float64).str  # byte order of the machine, as for the samples
+    header_layout = np.dtype([
+        ("magic", "S8"), ("version", "u4"), ("header_size", "u4"), ("L", "i4"), ("n_cols", "i4"),
+        ("printing_step", "u8"), ("seed", "u8"), ("beta", "f8"), ("alpha", "f8"), ("epsilon", "f8"),
+        ("dtype", "S8"), ("update_scheme", "S32"), ("columns", "S256"),
+    ])
+    column_names = ",".join(columns).encode()
+    if len(update_scheme) >= 32 or len(column_names) >= 256:
+        raise ValueError("Update scheme or column names too long for the data header.")
+    buffer = np.zeros(512, dtype=np.uint8)
+    buffer[:header_layout.itemsize] = np.array([(DATA_MAGIC, 1, 512, lattice_side, len(columns), printing_step, seed,
+                                                 beta, alpha, epsilon, dtype.encode(), update_scheme.encode(),
+                                                 column_names)], dtype=header_layout).view(np.uint8)
+    file.write(buffer.tobytes())
+
+
+def load_binary_file(filepath, n_cols=None):
+    """
+    Loads a binary data file as a (samples, columns) array memory-mapped on the file, without reading it.
+    Files with a header describe their own columns and dtype; n_cols selects the first n_cols columns,
+    so that readers of the first observables keep working when new columns are added. The old files
+    without header are read as float64 with n_cols columns.
 
     Parameters:
         filepath (str): Path to the binary file.
-        n_cols (int): Number of columns the data should have.
+        n_cols (int, optional): Number of columns to return (required for files without header).
 
     Returns:
-        np.ndarray: Reshaped binary data.
+        np.ndarray: Samples, one row per measurement (read-only memory map).
     """
-    data = np.fromfile(filepath, dtype=np.float64)
-    if data.size % n_cols != 0:
+    header = read_data_header(filepath)
+    if header is None:
+        if n_cols is None:
+            raise ValueError(f"{filepath} has no header: the number of columns must be specified.")
+        offset, total_cols, dtype = 0, n_cols, np.dtype(np.float64)
+    else:
+        offset, total_cols, dtype = header["header_size"], header["n_cols"], np.dtype(header["dtype"])
+        if n_cols is None:
+            n_cols = total_cols
+        elif n_cols > total_cols:
+            raise ValueError(f"{filepath} has only {total_cols} columns, {n_cols} were requested.")
+
+    payload = os.path.getsize(filepath) - offset
+    if payload % (total_cols * dtype.itemsize) != 0:
         raise ValueError("The binary file cannot be reshaped into the specified columns.")
-    return data.reshape(-1, n_cols)
+    n_rows = payload // (total_cols * dtype.itemsize)
+    if n_rows == 0:
+        return np.empty((0, n_cols), dtype=dtype)
+    data = np.memmap(filepath, dtype=dtype, mode="r", offset=offset, shape=(n_rows, total_cols))
+    return data[:, :n_cols]
+
+
+# Measurement streams of o2_mcmc (simulations/include/measurements.h): observables measured with their own step,
+# written next to the data file as data_file.<extension>, each one with its own data header
+MEASUREMENT_STREAMS = {"structure_factor": "sf", "helicity": "hel"}
+
+
+def load_measurement_streams(filepath):
+    """
+    Loads the measurement streams written by o2_mcmc next to a data file, the ones of the observables
+    measured with a step different from printing_step (e.g. structure_factor_step).
+
+    Parameters:
+        filepath (str): Path to the data file.
+
+    Returns:
+        dict: Name of the stream -> (header, samples) as read by read_data_header and load_binary_file, with the
+              row r measured after (r + 1) * header['printing_step'] complete sweeps. Only the streams found.
+    """
+    streams = {}
+    for name, extension in MEASUREMENT_STREAMS.items():
+        stream_path = f"{filepath}.{extension}"
+        if os.path.isfile(stream_path):
+            header = read_data_header(stream_path)
+            if header is None:
+                raise ValueError(f"{stream_path} is not a measurement stream with a data header.")
+            streams[name] = (header, load_binary_file(stream_path))
+    return streams
+
+
+def align_stream_rows(stream_header, stream_data, printing_step, n_rows):
+    """
+    Places the rows of a measurement stream on the rows of the data file measured at the same sweep, so that
+    the stream can be added as columns of the data: the rows of the data file without a measurement of the
+    stream are NaN.
+
+    Parameters:
+        stream_header (dict): Header of the stream.
+        stream_data (np.ndarray): Samples of the stream.
+        printing_step (int): Step of the data file.
+        n_rows (int): Rows of the data file.
+
+    Returns:
+        np.ndarray: Array of shape (n_rows, columns of the stream).
+    """
+    step = stream_header["printing_step"]
+    if step % printing_step != 0:
+        raise ValueError(f"Stream step {step} is not a multiple of the printing step {printing_step} of the data file.")
+    stride = step // printing_step
+    # stream row r: sweep (r + 1) * step, the row (r + 1) * stride - 1 of the data file
+    n_aligned = min(len(stream_data), n_rows // stride)
+    aligned = np.full((n_rows, stream_data.shape[1]), np.nan)
+    aligned[stride - 1:n_aligned * stride:stride] = stream_data[:n_aligned]
+    return aligned
+
+
+SNAPSHOT_MAGIC = b"O2SNAP"
+
+
+def read_snapshot_header(filepath):
+    """
+    Reads the header of a snapshot archive written by o2_mcmc with snapshot_step > 0 (layout in
+    simulations/include/snapshots.h).
+
+    Parameters:
+        filepath (str): Path to the archive.
+
+    Returns:
+        dict: Header fields ('version', 'header_size', 'L', 'snapshot_bytes', 'snapshot_step', 'seed', 'beta',
+              'dtype', 'storage').
+    """
+    with open(filepath, "rb") as file:
+        raw = file.read(72)
+    if len(raw) < 72 or raw[:8].rstrip(b"\0") != SNAPSHOT_MAGIC:
+        raise ValueError(f"{filepath} is not a snapshot archive.")
+    dtype = raw[48:56].rstrip(b"\0").decode()
+    header_layout = np.dtype([
+        ("magic", "S8"), ("version", "u4"), ("header_size", "u4"), ("L", "i4"), ("snapshot_bytes", "u4"),
+        ("snapshot_step", "u8"), ("seed", "u8"), ("beta", "f8"),
+    ]).newbyteorder(dtype[0])  # numbers are stored in the byte order of the values
+    fields = np.frombuffer(raw[:48], dtype=header_layout)[0]
+    header = {name: fields[name].item() for name in header_layout.names if name != "magic"}
+    header["dtype"] = dtype
+    header["storage"] = raw[56:72].rstrip(b"\0").decode()
+    return header
+
+
+class AngleSnapshots:
+    """
+    Snapshots of an 'angle16' archive seen as an array of spins of shape (n, L, L, L, 2): the angles stay
+    memory-mapped (attribute angles, int16 of shape (n, L, L, L)) and only the indexed snapshots are
+    converted to the components (cos, sin) as float32.
+    """
+
+    def __init__(self, angles):
+        self.angles = angles
+        self.shape = angles.shape + (2,)
+        self.dtype = np.dtype(np.float32)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        theta = np.asarray(self.angles[index], dtype=np.float32) * np.float32(np.pi / 32768)
+        return np.stack((np.cos(theta), np.sin(theta)), axis=-1)
+
+
+def load_snapshots(filepath):
+    """
+    Loads a snapshot archive memory-mapped on the file, without reading it. The snapshot s holds the spin of the
+    site (i, j, k) at [s, i, j, k]; the snapshot s was taken after (s + 1) * snapshot_step complete sweeps.
+
+    Parameters:
+        filepath (str): Path to the archive.
+
+    Returns:
+        tuple: Header (see read_snapshot_header) and the snapshots, an array of shape (n, L, L, L, 2) for the
+               storages 'float64' and 'float32' (read-only memory map) or an AngleSnapshots for 'angle16'.
+    """
+    header = read_snapshot_header(filepath)
+    L, dtype = header["L"], np.dtype(header["dtype"])
+    shape = (L, L, L) if header["storage"] == "angle16" else (L, L, L, 2)
+    payload = os.path.getsize(filepath) - header["header_size"]
+    if payload % header["snapshot_bytes"] != 0:
+        raise ValueError(f"{filepath} does not hold a whole number of snapshots.")
+    n_snapshots = payload // header["snapshot_bytes"]
+    if n_snapshots == 0:
+        snapshots = np.empty((0,) + shape, dtype=dtype)
+    else:
+        snapshots = np.memmap(filepath, dtype=dtype, mode="r", offset=header["header_size"],
+                              shape=(n_snapshots,) + shape)
+    if header["storage"] == "angle16":
+        return header, AngleSnapshots(snapshots)
+    return header, snapshots
+
+
+def load_summary_file(filepath):
+    """
+    Loads the summary written by o2_mcmc with 'accumulate true': means and blocking errors of |m|, m^2, m^4,
+    the energy per site and its square, computed during the simulation.
+
+    Parameters:
+        filepath (str): Path to the .sum file.
+
+    Returns:
+        tuple: Dictionary of the header ('lattice_side', 'beta', 'printing_step', 'skipped_samples', 'samples')
+               and DataFrame with columns 'observable', 'level', 'block_size', 'n_blocks', 'mean', 'error'.
+    """
+    header = {}
+    with open(filepath, "r") as file:
+        for line in file:
+            fields = line[1:].split()
+            if not line.startswith("#") or len(fields) != 2:
+                continue
+            header[fields[0]] = float(fields[1]) if fields[0] == "beta" else int(fields[1])
+    table = pd.read_csv(filepath, sep=" ", comment="#", header=None,
+                        names=["observable", "level", "block_size", "n_blocks", "mean", "error"])
+    return header, table
 
 
 
@@ -281,17 +524,31 @@ def check_existing_autocorr_file(file_path):
     
 
 
+def _header_value(file_path, name):
+    """
+    Value of a field of the header of a binary data file, or None if the file has no header.
+    """
+    if not (file_path.endswith(".bin") and os.path.isfile(file_path)):
+        return None
+    header = read_data_header(file_path)
+    return None if header is None else header[name]
+
+
 def extract_lattice_side(file_path):
     """
-    Extract the lattice side from the file name based on a naming convention.
+    Extract the lattice side from the header of a binary data file or, for the other files,
+    from the file name based on a naming convention.
     Example: "data_b0.456_a1.0_L15.bin" -> lattice_side = 15
 
     Parameters:
         file_path (str): Path to the file.
 
     Returns:
-        int: Lattice side extracted from the file name, or None if not found.
+        int: Lattice side extracted from the file, or None if not found.
     """
+    lattice_side = _header_value(file_path, "L")
+    if lattice_side is not None:
+        return lattice_side
     # Regex pattern to match '_L<number>'
     match = re.search(r"_L(\d+)", file_path)
     if match:
@@ -303,15 +560,19 @@ def extract_lattice_side(file_path):
 
 def extract_beta(file_path):
     """
-    Extract the beta value from the file name based on a naming convention.
+    Extract the beta value from the header of a binary data file or, for the other files,
+    from the file name based on a naming convention.
     Example: "data_b0.456_a1.0_L15.bin" -> beta = 0.456
 
     Parameters:
         file_path (str): Path to the file.
 
     Returns:
-        float: Beta value extracted from the file name, or None if not found.
+        float: Beta value extracted from the file, or None if not found.
     """
+    beta = _header_value(file_path, "beta")
+    if beta is not None:
+        return beta
     # Regex pattern to match 'b<number>'
     match = re.search(r"_b([\d\.]+)", file_path)
     if match:
@@ -356,7 +617,7 @@ def save_lattice_metrics_to_csv(output_dir, lattice_side, beta, metrics):
     output_file = os.path.join(lattice_dir, f"data_L{lattice_side}_b{beta:.5f}_summary.csv")
 
     # Add L and beta to each row
-    num_rows = len(metrics["mx"])  # Assumes all metrics have the same length
+    num_rows = len(next(iter(metrics.values())))  # Assumes all metrics have the same length
     data = {
         "L": [lattice_side] * num_rows,
         "beta": [beta] * num_rows,
@@ -6,6 +6,7 @@ from multiprocessing import Pool
 from io_utils import prompt_user_choice, load_config, ensure_directory, extract_lattice_side, extract_beta
 from interface_utils import navigate_directories
 from plot_utils import plot_jackknife_blocking_variance
+from correlation_utils import xi_over_L
 
 def blocking_data(data, block_size):
     """
@@ -124,6 +125,64 @@ def chi_prime_var_jk(m, m_squared, beta, L, D):
     chi_prime_var = np.var(chi_prime, ddof=1) * (len(chi_prime) - 1) 
     return chi_prime_var
 
+def xi_L_var_jk(m_squared, g_kmin, L, D):
+    """
+    Compute the variance for the second-moment correlation length over L, from G(0) = L^D * <m^2> and G(k_min).
+
+    Parameters:
+        m_squared (numpy.ndarray): 1D array of the dataset to the second power
+        g_kmin (numpy.ndarray): 1D array of the structure factor at the smallest momenta
+        L (int): lattice size
+        D (int): dimensionality
+
+    Returns:
+        var_xi_L (float): variance of xi / L
+    """
+    m_squared_jk = jackknife_means_generation(m_squared)
+    g_kmin_jk = jackknife_means_generation(g_kmin)
+    xi_L = xi_over_L(m_squared_jk * L**D, g_kmin_jk, L)
+
+    var_xi_L = np.var(xi_L, ddof=1) * (len(xi_L) - 1)
+    return var_xi_L
+
+def helicity_L_var_jk(helicity, L):
+    """
+    Compute the variance for the helicity modulus times the lattice size, Upsilon L.
+
+    Parameters:
+        helicity (numpy.ndarray): 1D array of the helicity modulus estimator, bond_cos - beta * bond_sin2
+        L (int): lattice size
+
+    Returns:
+        var_helicity_L (float): variance of Upsilon L
+    """
+    helicity_L = jackknife_means_generation(helicity) * L
+
+    var_helicity_L = np.var(helicity_L, ddof=1) * (len(helicity_L) - 1)
+    return var_helicity_L
+
+def load_jackknife_columns(path, columns, first_index):
+    """
+    Reads the columns of a summary CSV used by the jackknife + blocking analysis.
+
+    The columns missing in the file are filled with NaN, e.g. 'absm' and 'm4' of the worm files, which have no
+    magnetization vector: the quantities depending on them come out NaN, the others are computed as usual.
+
+    Parameters:
+        path (str): Path to the CSV file.
+        columns (list of str): Columns to read.
+        first_index (int): Index of the first row kept.
+
+    Returns:
+        pd.DataFrame: The selected columns from first_index on.
+    """
+    df = pd.read_csv(path)
+    missing = [column for column in columns if column not in df.columns]
+    if missing:
+        logging.warning(f"Columns {missing} not found in {path}, the quantities depending on them are NaN.")
+        df = df.assign(**{column: np.nan for column in missing})
+    return df[columns][first_index:]
+
 def perform_jackknife_blocking_analysis(input_paths, output_dir, first_index, num_cores, max_block_size):
     """
     Performs data analysis on input files and saves the results.
@@ -153,7 +212,7 @@ def perform_jackknife_blocking_analysis(input_paths, output_dir, first_index, nu
     beta_list = []
 
     for path in input_paths:
-        df = pd.read_csv(path)[columns_to_process][first_index:]
+        df = load_jackknife_columns(path, columns_to_process, first_index)
         df_list.append(df)
         lattice_list.append(df["L"].iloc[0])
         beta_list.append(df["beta"].iloc[0])
@@ -205,7 +264,11 @@ def perform_jackknife_blocking(input_paths, output_dir, first_index, num_cores,
 
     Parameters:
         input_paths (list of str): List of file paths to the input CSV files. Each file 
-                                   should contain columns for 'L', 'beta', 'absm', 'm2', and 'm4'.
+                                   should contain columns for 'L', 'beta', 'absm', 'm2', and 'm4' (NaN if
+                                   missing, as in the worm files); with
+                                   the columns 'g_0' and 'g_kmin' of the structure factor stream (NaN in the
+                                   rows without a measurement) also xi / L is computed, with the column
+                                   'helicity' also Upsilon L (NaN for the other files).
         output_dir (str): Directory where the output files will be saved.
         first_index (int): Index to start reading the data from each input file, allowing 
                            for skipping initial rows (e.g., for equilibration).
@@ -228,12 +291,20 @@ def perform_jackknife_blocking(input_paths, output_dir, first_index, num_cores,
     var_U = []
     C_mean = []
     var_C = []
+    xi_L_mean = []
+    var_xi_L = []
+    helicity_L_mean = []
+    var_helicity_L = []
 
     total_files_to_process = len(input_paths)
     processed_files = 1
     
     for path in input_paths:
-        df = pd.read_csv(path)[columns_to_process][first_index:]
+        file_columns = pd.read_csv(path, nrows=0).columns
+        has_g_kmin = "g_0" in file_columns and "g_kmin" in file_columns
+        has_helicity = "helicity" in file_columns
+        df = load_jackknife_columns(path, columns_to_process + (["g_0", "g_kmin"] if has_g_kmin else [])
+                                    + (["helicity"] if has_helicity else []), first_index)
         df_list.append(df)
         L = df["L"].iloc[0]
         beta = df["beta"].iloc[0]
@@ -255,6 +326,24 @@ def perform_jackknife_blocking(input_paths, output_dir, first_index, num_cores,
         var_U.append(binder_var_jk(m2_blocked, m4_blocked))
         C_mean.append((np.mean(epsilon2_blocked) - np.mean(epsilon_blocked)**2) * L**D)
         var_C.append(specific_heat_var_jk(epsilon_blocked, epsilon2_blocked, L, D))
+        if has_g_kmin:
+            # measured every stride rows: blocks of the stream spanning the same sweeps as the blocks above
+            g_0, g_kmin = df["g_0"].dropna().values, df["g_kmin"].dropna().values
+            stream_block_size = max(1, round(block_size * len(g_0) / len(df)))
+            xi_L_mean.append(xi_over_L(np.mean(g_0), np.mean(g_kmin), L))
+            var_xi_L.append(xi_L_var_jk(blocking_data(g_0 / L**D, stream_block_size),
+                                        blocking_data(g_kmin, stream_block_size), L, D))
+        else:
+            xi_L_mean.append(np.nan)
+            var_xi_L.append(np.nan)
+        if has_helicity:
+            helicity = df["helicity"].dropna().values
+            stream_block_size = max(1, round(block_size * len(helicity) / len(df)))
+            helicity_L_mean.append(np.mean(helicity) * L)
+            var_helicity_L.append(helicity_L_var_jk(blocking_data(helicity, stream_block_size), L))
+        else:
+            helicity_L_mean.append(np.nan)
+            var_helicity_L.append(np.nan)
 
         logging.info(f"Loaded and processed lattice {L} with beta {beta}, {processed_files}/{total_files_to_process}.\n")
         processed_files += 1
@@ -265,7 +354,9 @@ def perform_jackknife_blocking(input_paths, output_dir, first_index, num_cores,
         'beta': beta_list,
         'var_chi_prime': var_chi_prime,
         'var_U': var_U,
-        'var_C': var_C
+        'var_C': var_C,
+        'var_xi_L': var_xi_L,
+        'var_helicity_L': var_helicity_L
     })
 
     ensure_directory(output_dir)
@@ -277,7 +368,9 @@ def perform_jackknife_blocking(input_paths, output_dir, first_index, num_cores,
         'beta': beta_list,
         'chi_prime_mean': chi_prime_mean,
         'U_mean': U_mean,
-        'C_mean': C_mean
+        'C_mean': C_mean,
+        'xi_L_mean': xi_L_mean,
+        'helicity_L_mean': helicity_L_mean
     })
 
     output_path = os.path.join(output_dir, f'secondary_quantities_means.csv')
@@ -0,0 +1,228 @@
+import os
+import logging
+import numpy as np
+from io_utils import ensure_directory, write_data_header
+
+
+# Order of the neighbors in the table, the same of simulations/include/functions.h
+I_PLUS, J_PLUS, K_PLUS, I_MINUS, J_MINUS, K_MINUS = range(6)
+# Order in which the C kernels sum the neighbors of a site (neighbors_sum in simulations/lib/functions.c)
+SUM_ORDER = (I_MINUS, I_PLUS, J_MINUS, J_PLUS, K_MINUS, K_PLUS)
+
+
+def neighbor_table(lattice_side):
+    """
+    Builds the table of the nearest neighbors with periodic boundary conditions, as allocate_neighbors.
+
+    Parameters:
+        lattice_side (int): Side L of the lattice.
+
+    Returns:
+        np.ndarray: (L^3, 6) indices of the neighbors of each site, site (i, j, k) having index (i*L + j)*L + k.
+    """
+    index = np.arange(lattice_side**3).reshape(lattice_side, lattice_side, lattice_side)
+    shifts = [(-1, 0), (-1, 1), (-1, 2), (1, 0), (1, 1), (1, 2)]  # I_PLUS, J_PLUS, K_PLUS, I_MINUS, J_MINUS, K_MINUS
+    return np.stack([np.roll(index, shift, axis=axis) for shift, axis in shifts], axis=-1).reshape(-1, 6)
+
+
+def checkerboard_colors(neighbors):
+    """
+    Colors the sites greedily in lexicographic order as allocate_checkerboard, so that no two neighbors share a color:
+    for even L these are the two sublattices with i+j+k even and odd, odd L needs more colors.
+
+    Parameters:
+        neighbors (np.ndarray): Table of the neighbors, see neighbor_table.
+
+    Returns:
+        list[np.ndarray]: Sites of each color, in lexicographic order.
+    """
+    color = np.full(len(neighbors), -1)
+    for n, nn in enumerate(neighbors):
+        used = set(color[nn])
+        c = 0
+        while c in used:
+            c += 1
+        color[n] = c
+    return [np.flatnonzero(color == c) for c in range(color.max() + 1)]
+
+
+def store_spins(sx, sy):
+    """Renormalizes the spins with one Newton step towards modulus 1, as store_spin does."""
+    c = 1.5 - 0.5 * (sx * sx + sy * sy)
+    return c * sx, c * sy
+
+
+class NumpyReplicas:
+    """
+    Replicas of the 3D XY model evolved together with NumPy: the spins of all the replicas are an array of shape
+    (R, L, L, L, 2) and each color of the checkerboard is updated in one vectorized step for all of them.
+    Every replica has its own beta, and in each sweep it can do a Metropolis or a microcanonical step independently
+    of the others. The kernels follow the ones of simulations/lib/functions.c step by step (same trial rotation,
+    acceptance, reflection and renormalization), so that they also serve as a reference to test the C code:
+    a microcanonical sweep starting from the same spins agrees with the checkerboard one of the library to the rounding
+    (the C compiler may fuse multiplications and additions), Metropolis chains agree in the averages.
+    """
+
+    def __init__(self, lattice_side, betas, seed=0):
+        """
+        Parameters:
+            lattice_side (int): Side L of the lattice.
+            betas (sequence[float]): Inverse temperature of each replica.
+            seed (int): Seed of the NumPy generator.
+        """
+        self.lattice_side = int(lattice_side)
+        self.volume = self.lattice_side**3
+        self.betas = np.asarray(betas, dtype=np.float64)
+        self.n_replicas = len(self.betas)
+        self.rng = np.random.Generator(np.random.PCG64(seed))
+        neighbors = neighbor_table(self.lattice_side)
+        self._forward = neighbors[:, [I_PLUS, J_PLUS, K_PLUS]]
+        # Neighbors of the sites of each color, in the order in which they are summed
+        self._colors = [(sites, neighbors[sites][:, SUM_ORDER]) for sites in checkerboard_colors(neighbors)]
+        self._spins = np.empty((self.n_replicas, self.volume, 2))
+        self.randomize()
+
+    @property
+    def spins(self):
+        """Spins as an array of shape (R, L, L, L, 2), a view that can also be written."""
+        L = self.lattice_side
+        return self._spins.reshape(self.n_replicas, L, L, L, 2)
+
+    def randomize(self):
+        """Random configuration of all the replicas (hot start)."""
+        theta = (2 * self.rng.random((self.n_replicas, self.volume)) - 1) * np.pi
+        self._spins[..., 0] = np.cos(theta)
+        self._spins[..., 1] = np.sin(theta)
+
+    def _neighbors_sum(self, rows, nn):
+        # Sum in the order of the C kernels, to give the same rounding
+        S = self._spins[rows, nn[:, 0]]
+        for d in range(1, 6):
+            S = S + self._spins[rows, nn[:, d]]
+        return S
+
+    def sweep(self, alpha, metropolis):
+        """
+        Complete checkerboard sweep of all the replicas.
+
+        Parameters:
+            alpha (float): Amplitude of the Metropolis trial rotation, angles in [-alpha, alpha).
+            metropolis (np.ndarray): Boolean for each replica, Metropolis if True, microcanonical otherwise.
+
+        Returns:
+            np.ndarray: Acceptance of each replica in this sweep.
+        """
+        metropolis = np.asarray(metropolis, dtype=bool)
+        accepted = np.zeros(self.n_replicas, dtype=np.int64)
+        for replicas, kernel in ((metropolis, self._metropolis_color), (~metropolis, self._microcanonical_color)):
+            if not replicas.any():
+                continue
+            # Rows of the replicas to update: a slice when they are all, cheaper than fancy indexing
+            rows = slice(None) if replicas.all() else np.flatnonzero(replicas)[:, None]
+            betas = self.betas[replicas, None]
+            for sites, nn in self._colors:
+                accepted[replicas] += kernel(rows, sites, nn, alpha, betas)
+        return accepted / self.volume
+
+    def metropolis_sweep(self, alpha):
+        """Metropolis sweep of all the replicas, returns the acceptance of each replica."""
+        return self.sweep(alpha, np.ones(self.n_replicas, dtype=bool))
+
+    def microcanonical_sweep(self):
+        """Microcanonical (overrelaxation) sweep of all the replicas, returns the acceptance of each replica."""
+        return self.sweep(0.0, np.zeros(self.n_replicas, dtype=bool))
+
+    def _metropolis_color(self, rows, sites, nn, alpha, betas):
+        S = self._neighbors_sum(rows, nn)
+        old = self._spins[rows, sites]
+        theta = (2 * self.rng.random(old.shape[:2]) - 1) * alpha
+        cos, sin = np.cos(theta), np.sin(theta)
+        trial_x, trial_y = store_spins(cos * old[..., 0] + sin * old[..., 1], -sin * old[..., 0] + cos * old[..., 1])
+        dE = -((trial_x * S[..., 0] + trial_y * S[..., 1]) - (old[..., 0] * S[..., 0] + old[..., 1] * S[..., 1]))
+        # The random number of the acceptance is drawn for all the sites, also where dE < 0
+        with np.errstate(over="ignore"):
+            accept = (dE < 0) | (self.rng.random(dE.shape) <= np.exp(-betas * dE))
+        self._spins[rows, sites] = np.where(accept[..., None], np.stack([trial_x, trial_y], axis=-1), old)
+        return accept.sum(axis=1)
+
+    def _microcanonical_color(self, rows, sites, nn, alpha, betas):
+        S = self._neighbors_sum(rows, nn)
+        old = self._spins[rows, sites]
+        sq_mod_S = S[..., 0] * S[..., 0] + S[..., 1] * S[..., 1]
+        sS_scal_prod = old[..., 0] * S[..., 0] + old[..., 1] * S[..., 1]
+        # Spins with a vanishing sum of the neighbors are left unchanged
+        accept = np.sqrt(sq_mod_S) >= 1e-13
+        with np.errstate(divide="ignore", invalid="ignore"):
+            new_x, new_y = store_spins(2 * S[..., 0] * sS_scal_prod / sq_mod_S - old[..., 0],
+                                       2 * S[..., 1] * sS_scal_prod / sq_mod_S - old[..., 1])
+        self._spins[rows, sites] = np.where(accept[..., None], np.stack([new_x, new_y], axis=-1), old)
+        return accept.sum(axis=1)
+
+    def energy_per_site(self):
+        """Energy per site of each replica, from the forward bonds of every site as lattice_totals."""
+        s = self._spins
+        S_nearest = s[:, self._forward[:, 0]] + s[:, self._forward[:, 1]] + s[:, self._forward[:, 2]]
+        return -(s[..., 0] * S_nearest[..., 0] + s[..., 1] * S_nearest[..., 1]).sum(axis=1) / self.volume
+
+    def magnetization(self):
+        """Magnetization per site (mx, my) of each replica, shape (R, 2)."""
+        return self._spins.sum(axis=1) / self.volume
+
+
+def run_numpy_simulation(lattice_side, betas, total_lattice_sweeps, printing_step, alpha, epsilon, seed, data_dir,
+                         data_format="binary"):
+    """
+    Simulates all the betas of a lattice in one process with NumpyReplicas, writing one data file for each beta
+    with the name, header and samples (mx, my, energy per site every printing_step sweeps) of o2_mcmc, so that the
+    analysis reads them as the files of data_run.sh. In each sweep every replica does a Metropolis step with
+    probability epsilon and a microcanonical one otherwise, as o2_mcmc.
+
+    Parameters:
+        lattice_side (int): Side of the lattice.
+        betas (list[str]): Betas of the replicas, formatted as in the names of the files (see scheduler_utils.beta_grid).
+        total_lattice_sweeps (int): Complete sweeps of each replica.
+        printing_step (int): Complete sweeps between two samples.
+        alpha (float): Amplitude of the Metropolis trial rotation.
+        epsilon (float): Probability of a Metropolis sweep.
+        seed (int): Seed of the generator.
+        data_dir (str): Directory of the data, the files are written in data_dir/lattice{L}.
+        data_format (str): 'binary' or 'text'.
+
+    Returns:
+        dict: Mean acceptance of the Metropolis and microcanonical sweeps of each replica, keyed by beta.
+    """
+    if data_format not in ("binary", "text"):
+        raise ValueError(f"Invalid data format: {data_format}. Valid keywords: 'binary' and 'text'.")
+    replicas = NumpyReplicas(lattice_side, [float(beta) for beta in betas], seed)
+    lattice_dir = os.path.join(data_dir, f"lattice{lattice_side}")
+    ensure_directory(lattice_dir)
+    extension = ".bin" if data_format == "binary" else ".dat"
+    files = [open(os.path.join(lattice_dir, f"data_b{beta}_L{lattice_side}{extension}"),
+                  "wb" if data_format == "binary" else "w") for beta in betas]
+    acceptance = {"metropolis": np.zeros(replicas.n_replicas), "microcanonical": np.zeros(replicas.n_replicas)}
+    counts = {"metropolis": np.zeros(replicas.n_replicas), "microcanonical": np.zeros(replicas.n_replicas)}
+    try:
+        for file, beta in zip(files, replicas.betas):
+            write_data_header(file, lattice_side, printing_step, seed, beta, alpha, epsilon, data_format=data_format)
+        for sweep in range(1, total_lattice_sweeps + 1):
+            metropolis = replicas.rng.random(replicas.n_replicas) < epsilon
+            accepted = replicas.sweep(alpha, metropolis)
+            acceptance["metropolis"] += np.where(metropolis, accepted, 0.0)
+            acceptance["microcanonical"] += np.where(metropolis, 0.0, accepted)
+            counts["metropolis"] += metropolis
+            counts["microcanonical"] += ~metropolis
+            if sweep % printing_step == 0:
+                samples = np.column_stack([replicas.magnetization(), replicas.energy_per_site()])
+                for file, sample in zip(files, samples):
+                    if data_format == "binary":
+                        file.write(sample.tobytes())
+                    else:
+                        file.write(f"{sample[0]:.15f} {sample[1]:.15f} {sample[2]:.15f}\n")
+            if sweep % max(total_lattice_sweeps // 10, 1) == 0:
+                logging.info(f"L = {lattice_side}: {sweep} of {total_lattice_sweeps} sweeps done")
+    finally:
+        for file in files:
+            file.close()
+    with np.errstate(invalid="ignore"):
+        mean_acceptance = {key: acceptance[key] / counts[key] for key in acceptance}
+    return {beta: {key: mean_acceptance[key][r] for key in mean_acceptance} for r, beta in enumerate(betas)}
@@ -0,0 +1,375 @@
+import os
+import ctypes
+import numpy as np
+
+
+# Shared library built by simulations/src/compile_lib.sh, the path can be changed with the environment variable O2_LIBRARY
+DEFAULT_LIBRARY = os.path.abspath(os.path.join(os.path.dirname(__file__), '../simulations/lib/libo2.so'))
+
+
+class DoubleVector2D(ctypes.Structure):
+    _fields_ = [("sx", ctypes.c_double), ("sy", ctypes.c_double)]
+
+
+class LatticeTotals(ctypes.Structure):
+    _fields_ = [("energy", ctypes.c_double), ("magn", DoubleVector2D)]
+
+
+class Pcg32RandomT(ctypes.Structure):
+    _fields_ = [("state", ctypes.c_uint64), ("inc", ctypes.c_uint64)]
+
+
+class ReplicaLattice(ctypes.Structure):
+    # Layout of ReplicaLattice (simulations/include/functions.h), sx and sy are arrays of spin_t
+    _fields_ = [("n_replicas", ctypes.c_int), ("lattice_side", ctypes.c_int), ("sx", ctypes.c_void_p), ("sy", ctypes.c_void_p),
+                ("rng_state", ctypes.POINTER(ctypes.c_uint64)), ("rng_inc", ctypes.POINTER(ctypes.c_uint64)),
+                ("energy", ctypes.POINTER(ctypes.c_double)), ("magn_x", ctypes.POINTER(ctypes.c_double)),
+                ("magn_y", ctypes.POINTER(ctypes.c_double)), ("delta", ctypes.POINTER(ctypes.c_double)),
+                ("accepted", ctypes.POINTER(ctypes.c_ulong))]
+
+
+_library = None
+
+
+def load_library(path=None):
+    """
+    Loads the shared library of the simulation (once) and declares the signatures of its functions.
+
+    Parameters:
+        path (str): Path to libo2.so, by default $O2_LIBRARY or simulations/lib/libo2.so.
+
+    Returns:
+        ctypes.CDLL: The loaded library.
+    """
+    global _library
+    if _library is not None:
+        return _library
+    path = path or os.environ.get("O2_LIBRARY", DEFAULT_LIBRARY)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Library not found: {path}. Build it with simulations/src/compile_lib.sh")
+    lib = ctypes.CDLL(path)
+
+    p_void, p_int, p_totals, p_rng = ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(LatticeTotals), ctypes.POINTER(Pcg32RandomT)
+    c_int, c_ulong, c_double = ctypes.c_int, ctypes.c_ulong, ctypes.c_double
+    p_replicas = ctypes.POINTER(ReplicaLattice)
+    signatures = {
+        "allocate": ([c_int], p_void),
+        "free_lattice": ([p_void], None),
+        "spin_component_size": ([], c_int),
+        "allocate_neighbors": ([c_int], p_int),
+        "allocate_checkerboard": ([p_int, c_int], p_void),
+        "free_checkerboard": ([p_void], None),
+        "initialize_lattice": ([p_void, c_int, p_rng], c_int),
+        "lattice_totals": ([p_void, p_int, c_int], LatticeTotals),
+        "metropolis_sweep": ([p_void, p_int, c_int, c_double, c_double, p_void, p_rng, p_totals], c_ulong),
+        "microcanonical_sweep": ([p_void, p_int, c_int, p_void, p_totals], c_ulong),
+        "heat_bath_sweep": ([p_void, p_int, c_int, c_double, p_void, p_rng, p_totals], c_ulong),
+        "allocate_replicas": ([c_int, c_int], p_replicas),
+        "free_replicas": ([p_replicas], None),
+        "seed_replicas": ([p_replicas, c_ulong, c_ulong], None),
+        "initialize_replicas": ([p_replicas], None),
+        "replica_totals": ([p_replicas, p_int], None),
+        "metropolis_sweep_replicas": ([p_replicas, p_int, c_double, ctypes.POINTER(c_double)], c_ulong),
+        "microcanonical_sweep_replicas": ([p_replicas, p_int], c_ulong),
+        "allocate_cluster_workspace": ([c_int], p_void),
+        "free_cluster_workspace": ([p_void], None),
+        "wolff_sweep": ([p_void, p_int, c_double, p_void, p_rng, c_int, p_totals], c_ulong),
+        "swendsen_wang": ([p_void, p_int, c_double, p_void, p_rng, c_int, p_totals], c_ulong),
+        "myrand_init_streams": ([p_rng, c_int, c_ulong, c_ulong], None),
+        "myrand_r": ([p_rng], c_double),
+        "myrand_fill": ([p_rng, ctypes.POINTER(c_double), c_int], None),
+        "myrand_advance": ([p_rng, ctypes.c_uint64], None),
+        "pcg32_srandom_r": ([p_rng, ctypes.c_uint64, ctypes.c_uint64], None),
+        # From the OpenMP runtime linked by the library
+        "omp_get_max_threads": ([], c_int),
+        "omp_set_num_threads": ([c_int], None),
+    }
+    for name, (argtypes, restype) in signatures.items():
+        function = getattr(lib, name)
+        function.argtypes = argtypes
+        function.restype = restype
+    # The pointers of the C side are kept as plain integers: the buffers are not owned by ctypes
+    lib.free = ctypes.CDLL(None).free
+    lib.free.argtypes = [p_void]
+    lib.free.restype = None
+    _library = lib
+    return lib
+
+
+class O2Lattice:
+    """
+    Lattice of the 3D XY model living in the C library, evolved in-process with the same kernels of o2_mcmc.
+
+    The spins are exposed as a NumPy array of shape (L, L, L, 2) that is a view of the C lattice (no copies):
+    changes made by the sweeps are seen immediately and the spins can also be written from Python, after which
+    recompute_totals() must be called. Energy and magnetization are the running totals updated by the kernels.
+    With the same seed the generator is the one of o2_mcmc: a lexicographic Metropolis chain mixed by random()
+    as in o2_mcmc reproduces its samples.
+    """
+
+    def __init__(self, lattice_side, seed=0, sweep_mode="lexicographic", n_threads=None, library=None):
+        """
+        Parameters:
+            lattice_side (int): Side L of the lattice.
+            seed (int): Seed of the random generators.
+            sweep_mode (str): 'lexicographic' or 'checkerboard' (sites of a color updated by OpenMP threads).
+            n_threads (int): OpenMP threads of the checkerboard sweeps and of Swendsen-Wang, default OpenMP default.
+            library (str): Path to libo2.so, see load_library.
+        """
+        if sweep_mode not in ("lexicographic", "checkerboard"):
+            raise ValueError(f"Invalid sweep mode: {sweep_mode}. Valid keywords: 'lexicographic' and 'checkerboard'.")
+        self._lib = load_library(library)
+        self.lattice_side = int(lattice_side)
+        self.volume = self.lattice_side**3
+        self.n_threads = int(n_threads or self._lib.omp_get_max_threads())
+        self._lattice = self._lib.allocate(self.lattice_side)
+        self._neighbors = self._lib.allocate_neighbors(self.lattice_side)
+        self._checkerboard = None
+        self._workspace = None
+        if not self._lattice or not self._neighbors:
+            self.close()
+            raise MemoryError("Failed allocation of the lattice.")
+        if sweep_mode == "checkerboard":
+            self._checkerboard = self._lib.allocate_checkerboard(self._neighbors, self.lattice_side)
+            if not self._checkerboard:
+                self.close()
+                raise MemoryError("Failed allocation of the checkerboard.")
+        self._rng = Pcg32RandomT()
+        self._streams = (Pcg32RandomT * self.n_threads)()
+        self._totals = LatticeTotals()
+
+        dtype = {4: np.float32, 8: np.float64}[self._lib.spin_component_size()]
+        buffer = (ctypes.c_char * (self.volume * 2 * np.dtype(dtype).itemsize)).from_address(self._lattice)
+        self.spins = np.frombuffer(buffer, dtype=dtype).reshape(self.lattice_side, self.lattice_side, self.lattice_side, 2)
+        self.seed(seed)
+        self.randomize()
+
+    def seed(self, seed):
+        """Seeds the generator of the lattice and the streams of the threads as o2_mcmc does with the same seed."""
+        self._lib.pcg32_srandom_r(ctypes.byref(self._rng), seed, seed + 137)
+        self._lib.myrand_init_streams(self._streams, self.n_threads, seed, seed + 137)
+
+    def random(self, size=None):
+        """
+        Random numbers in [0, 1) from the generator of the lattice, e.g. to choose the next update.
+
+        Parameters:
+            size (int): None for a single float, otherwise the length of the returned array, drawn in one call
+                        with the same sequence of size single draws.
+        """
+        if size is None:
+            return self._lib.myrand_r(ctypes.byref(self._rng))
+        out = np.empty(int(size), dtype=np.float64)
+        self._lib.myrand_fill(ctypes.byref(self._rng), out.ctypes.data_as(ctypes.POINTER(ctypes.c_double)), out.size)
+        return out
+
+    def randomize(self):
+        """Random configuration (hot start)."""
+        self._lib.initialize_lattice(self._lattice, self.lattice_side, ctypes.byref(self._rng))
+        self.recompute_totals()
+
+    def recompute_totals(self):
+        """Computes energy and magnetization from scratch, e.g. after writing the spins from Python."""
+        self._totals = self._lib.lattice_totals(self._lattice, self._neighbors, self.lattice_side)
+
+    def metropolis_sweep(self, alpha, beta):
+        """Metropolis sweep with angles in [-alpha, alpha), returns the acceptance."""
+        if self._checkerboard is None:
+            accepted = self._lib.metropolis_sweep(self._lattice, self._neighbors, self.lattice_side, alpha, beta, None,
+                                                  ctypes.byref(self._rng), ctypes.byref(self._totals))
+        else:
+            self._lib.omp_set_num_threads(self.n_threads)
+            accepted = self._lib.metropolis_sweep(self._lattice, self._neighbors, self.lattice_side, alpha, beta,
+                                                  self._checkerboard, self._streams, ctypes.byref(self._totals))
+        return accepted / self.volume
+
+    def heat_bath_sweep(self, beta):
+        """Heat-bath sweep: every spin is drawn from its distribution given the neighbors, returns the acceptance (1)."""
+        if self._checkerboard is None:
+            accepted = self._lib.heat_bath_sweep(self._lattice, self._neighbors, self.lattice_side, beta, None,
+                                                 ctypes.byref(self._rng), ctypes.byref(self._totals))
+        else:
+            self._lib.omp_set_num_threads(self.n_threads)
+            accepted = self._lib.heat_bath_sweep(self._lattice, self._neighbors, self.lattice_side, beta,
+                                                 self._checkerboard, self._streams, ctypes.byref(self._totals))
+        return accepted / self.volume
+
+    def microcanonical_sweep(self):
+        """Microcanonical (overrelaxation) sweep, returns the acceptance."""
+        if self._checkerboard is not None:
+            self._lib.omp_set_num_threads(self.n_threads)
+        accepted = self._lib.microcanonical_sweep(self._lattice, self._neighbors, self.lattice_side, self._checkerboard,
+                                                  ctypes.byref(self._totals))
+        return accepted / self.volume
+
+    def wolff_sweep(self, beta, n_clusters=1):
+        """Builds and reflects n_clusters Wolff clusters, returns the number of reflected spins."""
+        return self._lib.wolff_sweep(self._lattice, self._neighbors, beta, self._cluster_workspace(), ctypes.byref(self._rng),
+                                     n_clusters, ctypes.byref(self._totals))
+
+    def swendsen_wang(self, beta):
+        """Swendsen-Wang update of the whole lattice, returns the number of clusters."""
+        self._lib.omp_set_num_threads(self.n_threads)
+        return self._lib.swendsen_wang(self._lattice, self._neighbors, beta, self._cluster_workspace(), self._streams,
+                                       self.n_threads, ctypes.byref(self._totals))
+
+    def _cluster_workspace(self):
+        # Work arrays of the cluster algorithms, allocated at the first cluster update
+        if self._workspace is None:
+            self._workspace = self._lib.allocate_cluster_workspace(self.lattice_side)
+            if not self._workspace:
+                self._workspace = None
+                raise MemoryError("Failed allocation of the cluster workspace.")
+        return self._workspace
+
+    @property
+    def energy_per_site(self):
+        return self._totals.energy / self.volume
+
+    @property
+    def magnetization(self):
+        """Magnetization per site (mx, my)."""
+        return np.array([self._totals.magn.sx, self._totals.magn.sy]) / self.volume
+
+    def close(self):
+        """Frees the C memory. The spins view must not be used afterwards."""
+        if getattr(self, "_lib", None) is None:
+            return
+        if getattr(self, "_lattice", None):
+            self._lib.free_lattice(self._lattice)
+        if getattr(self, "_neighbors", None):
+            self._lib.free(self._neighbors)
+        if getattr(self, "_checkerboard", None):
+            self._lib.free_checkerboard(self._checkerboard)
+        if getattr(self, "_workspace", None):
+            self._lib.free_cluster_workspace(self._workspace)
+        self._lattice = self._neighbors = self._checkerboard = self._workspace = None
+        self.spins = None
+        self._lib = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+class O2Replicas:
+    """
+    R replicas of the lattice of the 3D XY model living in the C library, evolved together by the sweeps of the
+    replicas (metropolis_sweep_replicas and microcanonical_sweep_replicas): each site is updated on all the
+    replicas at once in the SIMD lanes, replica r with its own beta, generator and running totals.
+
+    The components of the spins are exposed as two NumPy arrays sx and sy of shape (L, L, L, R), views of the
+    interleaved C layout (no copies): as for O2Lattice.spins, after writing them recompute_totals() must be called.
+    Replica r draws from the stream r of the thread streams of an O2Lattice with the same seed.
+    """
+
+    def __init__(self, lattice_side, n_replicas, seed=0, library=None):
+        """
+        Parameters:
+            lattice_side (int): Side L of the lattice.
+            n_replicas (int): Number R of replicas, best a multiple of the SIMD width (4 or 8).
+            seed (int): Seed of the random generators.
+            library (str): Path to libo2.so, see load_library.
+        """
+        self._lib = load_library(library)
+        self.lattice_side = int(lattice_side)
+        self.n_replicas = int(n_replicas)
+        self.volume = self.lattice_side**3
+        self._replicas = self._lib.allocate_replicas(self.lattice_side, self.n_replicas)
+        self._neighbors = self._lib.allocate_neighbors(self.lattice_side)
+        if not self._replicas or not self._neighbors:
+            self.close()
+            raise MemoryError("Failed allocation of the replicas.")
+
+        replicas = self._replicas.contents
+        dtype = np.dtype({4: np.float32, 8: np.float64}[self._lib.spin_component_size()])
+        shape = (self.lattice_side, self.lattice_side, self.lattice_side, self.n_replicas)
+        self.sx, self.sy = (np.frombuffer((ctypes.c_char * (self.volume * self.n_replicas * dtype.itemsize)).from_address(address),
+                                          dtype=dtype).reshape(shape) for address in (replicas.sx, replicas.sy))
+        self._energy = np.ctypeslib.as_array(replicas.energy, shape=(self.n_replicas,))
+        self._magn_x = np.ctypeslib.as_array(replicas.magn_x, shape=(self.n_replicas,))
+        self._magn_y = np.ctypeslib.as_array(replicas.magn_y, shape=(self.n_replicas,))
+        self._accepted = np.ctypeslib.as_array(replicas.accepted, shape=(self.n_replicas,))
+        self.seed(seed)
+        self.randomize()
+
+    def seed(self, seed):
+        """Seeds the generators of the replicas, replica r with the stream r of myrand_init_streams(seed, seed + 137)."""
+        self._lib.seed_replicas(self._replicas, seed, seed + 137)
+
+    def randomize(self):
+        """Random configuration of every replica (hot start)."""
+        self._lib.initialize_replicas(self._replicas)
+        self.recompute_totals()
+
+    def recompute_totals(self):
+        """Computes energy and magnetization of all the replicas from scratch, e.g. after writing the spins."""
+        self._lib.replica_totals(self._replicas, self._neighbors)
+
+    def metropolis_sweep(self, alpha, betas):
+        """
+        Metropolis sweep of all the replicas with angles in [-alpha, alpha).
+
+        Parameters:
+            alpha (float): Amplitude of the trial rotations.
+            betas (float or sequence[float]): Inverse temperature of each replica, or one for all of them.
+
+        Returns:
+            np.ndarray: Acceptance of each replica.
+        """
+        betas = np.ascontiguousarray(np.broadcast_to(np.asarray(betas, dtype=np.float64), (self.n_replicas,)))
+        self._lib.metropolis_sweep_replicas(self._replicas, self._neighbors, alpha,
+                                            betas.ctypes.data_as(ctypes.POINTER(ctypes.c_double)))
+        return self._accepted / self.volume
+
+    def microcanonical_sweep(self):
+        """Microcanonical (overrelaxation) sweep of all the replicas, returns the acceptance of each replica."""
+        self._lib.microcanonical_sweep_replicas(self._replicas, self._neighbors)
+        return self._accepted / self.volume
+
+    def replica(self, r):
+        """Copy of the spins of replica r, shape (L, L, L, 2) as O2Lattice.spins."""
+        return np.stack([self.sx[..., r], self.sy[..., r]], axis=-1)
+
+    def set_replica(self, r, spins):
+        """Writes the spins of replica r from an array of shape (L, L, L, 2), e.g. O2Lattice.spins, and updates the totals."""
+        self.sx[..., r] = spins[..., 0]
+        self.sy[..., r] = spins[..., 1]
+        self.recompute_totals()
+
+    @property
+    def energy_per_site(self):
+        """Energy per site of each replica."""
+        return self._energy / self.volume
+
+    @property
+    def magnetization(self):
+        """Magnetization per site of each replica, shape (R, 2)."""
+        return np.column_stack([self._magn_x, self._magn_y]) / self.volume
+
+    def close(self):
+        """Frees the C memory. The views sx and sy must not be used afterwards."""
+        if getattr(self, "_lib", None) is None:
+            return
+        if getattr(self, "_replicas", None):
+            self._lib.free_replicas(self._replicas)
+        if getattr(self, "_neighbors", None):
+            self._lib.free(self._neighbors)
+        self._replicas = self._neighbors = None
+        self.sx = self.sy = None
+        self._energy = self._magn_x = self._magn_y = self._accepted = None
+        self._lib = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        self.close()
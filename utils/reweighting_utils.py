@@ -0,0 +1,237 @@
+import os
+import logging
+import numpy as np
+import pandas as pd
+from scipy.special import logsumexp
+from io_utils import ensure_directory, load_binary_file, extract_lattice_side, extract_beta
+
+
+def load_reweighting_samples(file_path, first_index=0):
+    """
+    Loads the time series needed by the reweighting from a summary CSV (output of lattice_metrics_to_csv.py)
+    or directly from a binary file of the simulation.
+
+    Parameters:
+        file_path (str): Path to the summary .csv or to the .bin file.
+        first_index (int): Index to start reading the data from, to skip the thermalization.
+
+    Returns:
+        tuple: Lattice side, beta and a dictionary with the arrays 'absm', 'm2', 'm4' and 'epsilon'.
+    """
+    if file_path.endswith(".bin"):
+        L = extract_lattice_side(file_path)
+        beta = extract_beta(file_path)
+        data = load_binary_file(file_path, 3)[first_index:]
+        m2 = data[:, 0]**2 + data[:, 1]**2
+        epsilon = data[:, 2]
+    else:
+        df = pd.read_csv(file_path)[["L", "beta", "m2", "epsilon"]][first_index:]
+        L = int(df["L"].iloc[0])
+        beta = float(df["beta"].iloc[0])
+        m2, epsilon = df["m2"].values, df["epsilon"].values
+    samples = {
+        "absm": np.sqrt(m2),
+        "m2": m2,
+        "m4": m2**2,
+        "epsilon": epsilon,
+    }
+    return L, beta, samples
+
+
+def solve_wham(betas, energies, f_start=None, tol=1e-10, max_iter=10000):
+    """
+    Solves the self-consistency equations of the multi-histogram reweighting (Ferrenberg-Swendsen, WHAM)
+    for the dimensionless free energies f_j = -ln Z(beta_j), iterating
+
+        ln Z(beta_k) = ln sum_t exp(-beta_k E_t - ln D(E_t)),   D(E) = sum_j N_j exp(-beta_j E + f_j)
+
+    over all the samples E_t of all the runs. Every sum is done with logsumexp, so that the total energies
+    of large lattices do not overflow. The free energies are fixed by f_0 = 0.
+
+    Parameters:
+        betas (np.ndarray): Betas of the R runs.
+        energies (list of np.ndarray): Total energies (not per site) of the samples of each run.
+        f_start (np.ndarray): Starting free energies, e.g. the solution for a similar dataset.
+        tol (float): Tolerance on the largest change of the free energies.
+        max_iter (int): Maximum number of iterations.
+
+    Returns:
+        tuple: Free energies f (np.ndarray of length R) and ln D(E_t) for the concatenated samples.
+    """
+    betas = np.asarray(betas, dtype=np.float64)
+    E = np.concatenate(energies)
+    log_N = np.log([len(e) for e in energies])
+    minus_beta_E = -np.outer(E, betas)  # shape (samples, runs)
+    f = np.zeros(len(betas)) if f_start is None else np.array(f_start, dtype=np.float64)
+
+    for iteration in range(max_iter):
+        log_den = logsumexp(log_N + minus_beta_E + f, axis=1)
+        f_new = -logsumexp(minus_beta_E - log_den[:, None], axis=0)
+        f_new -= f_new[0]
+        delta = np.max(np.abs(f_new - f))
+        f = f_new
+        if delta < tol:
+            break
+    else:
+        logging.warning(f"WHAM did not converge in {max_iter} iterations, last change {delta:.3e}.")
+    log_den = logsumexp(log_N + minus_beta_E + f, axis=1)
+    return f, log_den
+
+
+def reweighted_means(beta, E, log_den, observables):
+    """
+    Averages of the observables at a given beta, reweighting all the samples with the WHAM density of states.
+
+    Parameters:
+        beta (float): Beta at which the averages are computed.
+        E (np.ndarray): Total energies of the concatenated samples.
+        log_den (np.ndarray): ln D(E_t) returned by solve_wham.
+        observables (dict): Arrays of the concatenated samples of each observable.
+
+    Returns:
+        dict: Reweighted mean of each observable.
+    """
+    log_w = -beta * E - log_den
+    w = np.exp(log_w - np.max(log_w))
+    w /= np.sum(w)
+    return {name: np.dot(w, values) for name, values in observables.items()}
+
+
+def secondary_quantities(beta, means, L, D):
+    """
+    Chi prime, Binder cumulant and specific heat from the averages, with the same definitions of jackknife_utils.
+
+    Parameters:
+        beta (float): Reciprocal of the temperature.
+        means (dict): Averages of 'absm', 'm2', 'm4', 'epsilon' and 'epsilon2'.
+        L (int): Lattice size.
+        D (int): Dimensionality.
+
+    Returns:
+        dict: Values of 'chi_prime', 'U' and 'C'.
+    """
+    return {
+        "chi_prime": (means["m2"] - means["absm"]**2) * beta * L**D,
+        "U": means["m4"] / means["m2"]**2,
+        "C": (means["epsilon2"] - means["epsilon"]**2) * L**D,
+    }
+
+
+def reweight_on_grid(betas, samples, beta_grid, L, D, f_start=None, tol=1e-10, max_iter=10000):
+    """
+    Solves WHAM for a set of runs of the same lattice and evaluates all the quantities on a grid of betas.
+
+    Parameters:
+        betas (np.ndarray): Betas of the runs.
+        samples (list of dict): Arrays 'absm', 'm2', 'm4', 'epsilon' of each run.
+        beta_grid (np.ndarray): Betas at which the quantities are evaluated.
+        L (int): Lattice size.
+        D (int): Dimensionality.
+        f_start (np.ndarray): Starting free energies for WHAM.
+        tol (float): Tolerance of WHAM.
+        max_iter (int): Maximum number of iterations of WHAM.
+
+    Returns:
+        tuple: Dictionary of arrays (one value per beta of the grid) for 'absm', 'm2', 'm4', 'chi_prime', 'U', 'C',
+               and the free energies of the runs.
+    """
+    volume = L**D
+    energies = [s["epsilon"] * volume for s in samples]
+    f, log_den = solve_wham(betas, energies, f_start=f_start, tol=tol, max_iter=max_iter)
+    E = np.concatenate(energies)
+    observables = {name: np.concatenate([s[name] for s in samples]) for name in ["absm", "m2", "m4", "epsilon"]}
+    observables["epsilon2"] = observables["epsilon"]**2
+
+    results = {name: np.empty(len(beta_grid)) for name in ["absm", "m2", "m4", "chi_prime", "U", "C"]}
+    for i, beta in enumerate(beta_grid):
+        means = reweighted_means(beta, E, log_den, observables)
+        means.update(secondary_quantities(beta, means, L, D))
+        for name in results:
+            results[name][i] = means[name]
+    return results, f
+
+
+def reweighting_jackknife(betas, samples, beta_grid, L, D=3, n_blocks=20, tol=1e-10, max_iter=10000):
+    """
+    Reweighted quantities on the grid with jackknife variances. Every run is divided in n_blocks blocks
+    of consecutive samples, and the j-th jackknife sample drops the j-th block of all the runs together,
+    solving WHAM again (starting from the free energies of the full dataset).
+
+    Parameters:
+        betas (np.ndarray): Betas of the runs.
+        samples (list of dict): Arrays 'absm', 'm2', 'm4', 'epsilon' of each run.
+        beta_grid (np.ndarray): Betas at which the quantities are evaluated.
+        L (int): Lattice size.
+        D (int): Dimensionality.
+        n_blocks (int): Number of jackknife blocks; each block must be longer than the autocorrelation time.
+        tol (float): Tolerance of WHAM.
+        max_iter (int): Maximum number of iterations of WHAM.
+
+    Returns:
+        tuple: Dictionaries of arrays with the means and the jackknife variances of each quantity.
+    """
+    means, f = reweight_on_grid(betas, samples, beta_grid, L, D, tol=tol, max_iter=max_iter)
+
+    jk_values = {name: np.empty((n_blocks, len(beta_grid))) for name in means}
+    for j in range(n_blocks):
+        jk_samples = []
+        for s in samples:
+            n = len(s["epsilon"])
+            keep = np.ones(n, dtype=bool)
+            keep[j * n // n_blocks:(j + 1) * n // n_blocks] = False
+            jk_samples.append({name: values[keep] for name, values in s.items()})
+        jk_results = reweight_on_grid(betas, jk_samples, beta_grid, L, D, f_start=f, tol=tol, max_iter=max_iter)[0]
+        for name in jk_values:
+            jk_values[name][j] = jk_results[name]
+        logging.info(f"L = {L}: jackknife sample {j + 1}/{n_blocks} done.")
+
+    variances = {name: np.var(values, axis=0, ddof=1) * (n_blocks - 1)**2 / n_blocks
+                 for name, values in jk_values.items()}
+    return means, variances
+
+
+def perform_reweighting(input_paths, output_dir, first_index, n_blocks, n_points, tol=1e-10, max_iter=10000):
+    """
+    Multi-histogram reweighting of all the selected runs, grouped by lattice side, on a grid of n_points
+    betas spanning the simulated ones. Means and variances are saved in the same format of the secondary
+    quantities of jackknife_analysis.py, so that the FSS scripts can read them directly.
+
+    Parameters:
+        input_paths (list of str): Summary .csv (or .bin) files of the runs.
+        output_dir (str): Directory where the output files will be saved.
+        first_index (int): Index to start reading the data from each input file.
+        n_blocks (int): Number of jackknife blocks.
+        n_points (int): Number of betas of the grid of each lattice side.
+        tol (float): Tolerance of WHAM.
+        max_iter (int): Maximum number of iterations of WHAM.
+
+    Returns:
+        tuple: DataFrames of the means and of the variances.
+    """
+    D = 3
+    runs = {}
+    for path in input_paths:
+        L, beta, samples = load_reweighting_samples(path, first_index)
+        runs.setdefault(L, []).append((beta, samples))
+        logging.info(f"Loaded lattice {L} with beta {beta} from {path}.")
+
+    df_means_list = []
+    df_vars_list = []
+    for L in sorted(runs):
+        runs[L].sort(key=lambda run: run[0])
+        betas = np.array([run[0] for run in runs[L]])
+        samples = [run[1] for run in runs[L]]
+        beta_grid = np.linspace(betas[0], betas[-1], n_points)
+        logging.info(f"Reweighting lattice {L}: {len(betas)} runs, betas from {betas[0]} to {betas[-1]}.")
+
+        means, variances = reweighting_jackknife(betas, samples, beta_grid, L, D, n_blocks, tol, max_iter)
+        df_means_list.append(pd.DataFrame({"L": L, "beta": beta_grid, **{f"{name}_mean": values for name, values in means.items()}}))
+        df_vars_list.append(pd.DataFrame({"L": L, "beta": beta_grid, **{f"var_{name}": values for name, values in variances.items()}}))
+
+    df_means = pd.concat(df_means_list, ignore_index=True)
+    df_vars = pd.concat(df_vars_list, ignore_index=True)
+    ensure_directory(output_dir)
+    df_means.to_csv(os.path.join(output_dir, "reweighted_quantities_means.csv"), index=False)
+    df_vars.to_csv(os.path.join(output_dir, "reweighted_quantities_variances.csv"), index=False)
+    logging.info(f"Reweighted quantities saved in {output_dir}.")
+    return df_means, df_vars
@@ -0,0 +1,292 @@
+import os
+import re
+import glob
+import time
+import logging
+import subprocess
+import numpy as np
+from decimal import Decimal, ROUND_DOWN, localcontext
+from io_utils import ensure_directory
+
+
+def bc_format(value):
+    """Writes a Decimal as bc prints it: all the digits of its scale, without the zero before the point."""
+    text = f"{value:f}"
+    return text.replace("0.", ".", 1) if text.lstrip("-").startswith("0.") else text
+
+
+def beta_grid(lattice_side, beta_c, scaled_beta, number_betas, scale=5):
+    """
+    Builds the betas simulated for a lattice, the grid of data_run.sh: number_betas + 1 equally spaced
+    betas from beta_c - scaled_beta / L^3 to beta_c + scaled_beta / L^3. The arithmetic is the one of bc
+    with the given scale, every intermediate result truncated to scale digits (l(L), l(L) * 3,
+    e(l(L) * 3), the half width and the step), so that the betas and the names of the files are the same.
+
+    Parameters:
+        lattice_side (int): Side of the lattice.
+        beta_c (float): Center of the grid.
+        scaled_beta (float): Half width of the grid times L^3.
+        number_betas (int): Number of intervals of the grid.
+        scale (int): Decimal digits of the betas.
+
+    Returns:
+        list[str]: Betas, formatted as bc prints them (e.g. '.45127') as in the names of the files.
+    """
+    quantum = Decimal(1).scaleb(-scale)
+
+    def truncate(value):
+        return value.quantize(quantum, rounding=ROUND_DOWN)
+
+    with localcontext() as context:
+        context.prec = 50
+        # scaled_beta / e(l(L) * 3.0)
+        half_width = truncate(Decimal(str(scaled_beta)) / truncate(truncate(truncate(Decimal(lattice_side).ln()) * 3).exp()))
+        beta_down = Decimal(str(beta_c)) - half_width
+        beta_up = Decimal(str(beta_c)) + half_width
+        delta_beta = truncate((beta_up - beta_down) / number_betas)
+        return [bc_format(beta_down + i * delta_beta) for i in range(number_betas + 1)]
+
+
+def read_simulation_output(output_path):
+    """
+    Reads the quantities needed by the cost model from the stdout of o2_mcmc (.out file). If the outputs of
+    several attempts of the same run are appended to the file, only the last one is read.
+
+    Parameters:
+        output_path (str): Path to the .out file.
+
+    Returns:
+        dict: 'lattice_side', 'total_lattice_sweeps', 'resumed_sweeps' (sweeps done before the last restart),
+              'runtime' (CPU seconds, None if the run did not end), 'ended' and 'aborted' (bool).
+    """
+    with open(output_path, "r") as file:
+        text = file.read()
+    text = text[max(text.rfind("Parameters input file name:"), 0):]
+    info = {"lattice_side": None, "total_lattice_sweeps": None, "resumed_sweeps": 0, "runtime": None}
+    patterns = {
+        "lattice_side": r"^lattice_side = (\d+)",
+        "total_lattice_sweeps": r"^total_lattice_sweeps = (\d+)",
+        "resumed_sweeps": r"^Simulation resumed from .* after (\d+) complete sweeps",
+    }
+    for key, pattern in patterns.items():
+        match = re.search(pattern, text, re.MULTILINE)
+        if match:
+            info[key] = int(match.group(1))
+    match = re.search(r"^Runtime of the last simulation: ([\d.eE+-]+)", text, re.MULTILINE)
+    if match:
+        info["runtime"] = float(match.group(1))
+    info["ended"] = "Simulation ended." in text
+    info["aborted"] = "aborted!" in text
+    return info
+
+
+def job_work(lattice_side, total_lattice_sweeps):
+    """Work of a run in site updates, L^3 * total_lattice_sweeps, to which the cost model is proportional."""
+    return float(lattice_side)**3 * float(total_lattice_sweeps)
+
+
+def calibrate_cost_model(outputs_dir):
+    """
+    Fits the seconds per site update of the cost model, runtime = c * L^3 * sweeps, on the runs of a previous
+    campaign: every .out file of outputs_dir (subdirectories included) of a run that ended.
+    The fit is a least squares line through the origin, c = sum(t * w) / sum(w^2).
+
+    Parameters:
+        outputs_dir (str): Directory with the .out files.
+
+    Returns:
+        tuple: c (float, None if there are no completed runs) and the number of runs used.
+    """
+    work, runtime = [], []
+    for output_path in glob.glob(os.path.join(outputs_dir, "**", "*.out"), recursive=True):
+        info = read_simulation_output(output_path)
+        if not info["ended"] or info["runtime"] is None or info["lattice_side"] is None or info["total_lattice_sweeps"] is None:
+            continue
+        # A resumed run only measures the time of the sweeps after the restart
+        sweeps = info["total_lattice_sweeps"] - info["resumed_sweeps"]
+        if sweeps > 0:
+            work.append(job_work(info["lattice_side"], sweeps))
+            runtime.append(info["runtime"])
+    if not work:
+        return None, 0
+    work, runtime = np.array(work), np.array(runtime)
+    return float(np.sum(runtime * work) / np.sum(work**2)), len(work)
+
+
+def estimate_makespan(costs, n_workers, after=None):
+    """
+    Wall-clock time of a list of jobs dispatched as run_campaign does: the first free worker takes the longest
+    job that can start, a job chained to another one (warm start) only after that job has ended. When no job
+    can start, the worker waits for the end of the first job that a pending job is waiting for.
+
+    Parameters:
+        costs (list[float]): Estimated durations of the jobs.
+        n_workers (int): Number of jobs running at the same time.
+        after (list[int]): For each job the index of the job it has to wait for, or None (default: no chains).
+
+    Returns:
+        float: Estimated time at which the last job ends.
+    """
+    if not len(costs):
+        return 0.0
+    after = after if after is not None else [None] * len(costs)
+    pending = sorted(range(len(costs)), key=lambda i: costs[i], reverse=True)
+    end = [None] * len(costs)
+    workers = np.zeros(n_workers)
+    while pending:
+        worker = np.argmin(workers)
+        ready = [i for i in pending
+                 if after[i] is None or (end[after[i]] is not None and end[after[i]] <= workers[worker])]
+        if not ready:
+            workers[worker] = min(end[after[i]] for i in pending if end[after[i]] is not None)
+            continue
+        pending.remove(ready[0])
+        end[ready[0]] = workers[worker] + costs[ready[0]]
+        workers[worker] = end[ready[0]]
+    return float(max(end))
+
+
+def write_campaign_inputs(settings, paths):
+    """
+    Writes the input files of the campaign (same grid and parameters of data_run.sh) and creates the
+    data and output directories of every lattice.
+
+    With warm_start_chains = k > 0 the betas of each lattice are split into k chains of adjacent betas: the first
+    run of a chain starts from a random lattice, each of the others from the final configuration of the previous
+    (lower) beta of its chain, so that it starts close to equilibrium. A run of a chain can only start after the
+    previous one has ended, so k trades the thermalization saved for the runs that can go in parallel.
+
+    Parameters:
+        settings (dict): 'lattice_sides', 'beta_c', 'scaled_beta', 'number_betas', 'sample_size',
+                         'printing_step', 'alpha', 'epsilon', 'tune', 'checkpoint_step', 'warm_start_chains',
+                         'snapshot_step' and 'snapshot_storage' (optional, archive of the configurations of each run),
+                         'structure_factor_step' and 'helicity_step' (optional, streams data_*.bin.sf and .hel).
+        paths (dict): 'inputs_dir', 'data_dir', 'outputs_dir'.
+
+    Returns:
+        list[dict]: One job for each run, with 'name', 'lattice_side', 'beta', 'work', 'input', 'data', 'output'
+                    and 'after' (name of the job whose final configuration it starts from, None for a random start).
+    """
+    jobs = []
+    n_chains = settings.get("warm_start_chains") or 0
+    for L in settings["lattice_sides"]:
+        for directory in (paths["inputs_dir"], paths["data_dir"], paths["outputs_dir"]):
+            ensure_directory(os.path.join(directory, f"lattice{L}"))
+        betas = beta_grid(L, settings["beta_c"], settings["scaled_beta"], settings["number_betas"])
+        # first beta of each chain, the chains having lengths that differ at most by one
+        chain_starts = set(np.linspace(0, len(betas), n_chains, endpoint=False).astype(int)) if n_chains else set()
+        previous = None
+        for i, beta in enumerate(betas):
+            name = f"b{beta}_L{L}"
+            job = {
+                "name": name,
+                "lattice_side": L,
+                "beta": beta,
+                "work": job_work(L, settings["sample_size"]),
+                "input": os.path.join(paths["inputs_dir"], f"lattice{L}", f"input_{name}.in"),
+                "data": os.path.join(paths["data_dir"], f"lattice{L}", f"data_{name}.bin"),
+                "output": os.path.join(paths["outputs_dir"], f"lattice{L}", f"output_{name}.out"),
+                "after": None if (not n_chains or i in chain_starts) else previous["name"],
+            }
+            # resume true: a run that is started again continues from its last checkpoint
+            with open(job["input"], "w") as file:
+                file.write(f"lattice_side {L}\nseed time\ntotal_lattice_sweeps {settings['sample_size']}\n"
+                           f"printing_step {settings['printing_step']}\ndata_format binary\nbeta {beta}\n"
+                           f"alpha {settings['alpha']}\nepsilon {settings['epsilon']}\nverbose false\n"
+                           f"tune {'true' if settings['tune'] else 'false'}\n"
+                           f"checkpoint_step {settings['checkpoint_step']}\nresume true\n")
+                if settings.get("snapshot_step"):
+                    file.write(f"snapshot_step {settings['snapshot_step']}\n"
+                               f"snapshot_storage {settings.get('snapshot_storage') or 'float64'}\n")
+                if settings.get("structure_factor_step"):
+                    file.write(f"structure_factor_step {settings['structure_factor_step']}\n")
+                if settings.get("helicity_step"):
+                    file.write(f"helicity_step {settings['helicity_step']}\n")
+                if n_chains:
+                    file.write(f"final_configuration {os.path.splitext(job['data'])[0]}.conf\n")
+                if job["after"] is not None:
+                    file.write(f"initial_configuration {os.path.splitext(previous['data'])[0]}.conf\n")
+            jobs.append(job)
+            previous = job
+    return jobs
+
+
+def run_campaign(jobs, executable, n_workers, max_retries=2, poll_interval=5.0, seconds_per_update=None):
+    """
+    Runs the jobs longest first, keeping n_workers processes of the executable busy until all of them are done.
+    A job with 'after' starts only when that job has completed, and fails if that job failed. A job whose process
+    fails (non-zero exit status or no 'Simulation ended.' in its output) is started again, up to max_retries
+    times, and continues from its last checkpoint. Jobs aborted by the program (invalid input, failed
+    allocations) are not retried.
+
+    Parameters:
+        jobs (list[dict]): Jobs written by write_campaign_inputs.
+        executable (str): Path of the compiled o2_mcmc.
+        n_workers (int): Number of runs at the same time, usually the number of cores.
+        max_retries (int): Maximum number of restarts of a job.
+        poll_interval (float): Seconds between two checks of the running processes.
+        seconds_per_update (float): Calibrated cost model, used only to log the estimated times.
+
+    Returns:
+        dict: Names of the 'completed' and 'failed' jobs and the 'cpu_time' and 'wall_time' of the campaign.
+    """
+    pending = sorted(jobs, key=lambda job: job["work"], reverse=True)
+    attempts = {job["name"]: 0 for job in jobs}
+    running, completed, failed = {}, [], []
+    cpu_time = 0.0
+    start = time.time()
+
+    if seconds_per_update is not None:
+        costs = [seconds_per_update * job["work"] for job in jobs]
+        index = {job["name"]: i for i, job in enumerate(jobs)}
+        after = [index.get(job.get("after")) for job in jobs]
+        logging.info(f"Estimated CPU time: {sum(costs):.0f} s, estimated wall-clock time on {n_workers} workers "
+                     f"(warm-start chains included): {estimate_makespan(costs, n_workers, after):.0f} s")
+
+    while pending or running:
+        # Jobs chained to a failed job cannot start
+        for job in [job for job in pending if job.get("after") in failed]:
+            pending.remove(job)
+            failed.append(job["name"])
+            logging.error(f"Job {job['name']} not started: the run it starts from, {job['after']}, failed")
+        # Free workers take the longest pending jobs whose initial configuration is ready
+        ready = [job for job in pending if job.get("after") is None or job["after"] in completed]
+        while ready and len(running) < n_workers:
+            job = ready.pop(0)
+            pending.remove(job)
+            attempts[job["name"]] += 1
+            # On a retry the output of the previous attempt is kept, the new one is appended to it
+            output_file = open(job["output"], "a" if attempts[job["name"]] > 1 else "w")
+            process = subprocess.Popen([executable, job["input"], job["data"]], stdout=output_file,
+                                       stderr=subprocess.STDOUT)
+            running[job["name"]] = (job, process, output_file)
+            logging.info(f"Started {job['name']} (attempt {attempts[job['name']]}), {len(pending)} jobs pending")
+
+        time.sleep(poll_interval)
+        for name in list(running):
+            job, process, output_file = running[name]
+            if process.poll() is None:
+                continue
+            output_file.close()
+            del running[name]
+            info = read_simulation_output(job["output"])
+            if process.returncode == 0 and info["ended"]:
+                completed.append(name)
+                cpu_time += info["runtime"] or 0.0
+                logging.info(f"Completed {name}, {len(completed)}/{len(jobs)} jobs done")
+            elif info["aborted"] and process.returncode == 0:
+                failed.append(name)
+                logging.error(f"Job {name} aborted by the simulation, see {job['output']}")
+            elif attempts[name] <= max_retries:
+                # Retried before the other pending jobs, it is at least as long as them
+                pending.insert(0, job)
+                logging.warning(f"Job {name} failed (exit status {process.returncode}), retrying")
+            else:
+                failed.append(name)
+                logging.error(f"Job {name} failed {attempts[name]} times, giving up")
+
+    wall_time = time.time() - start
+    logging.info(f"Campaign done: {len(completed)} completed, {len(failed)} failed, CPU time {cpu_time:.0f} s, "
+                 f"wall-clock time {wall_time:.0f} s on {n_workers} workers")
+    return {"completed": completed, "failed": failed, "cpu_time": cpu_time, "wall_time": wall_time}
+